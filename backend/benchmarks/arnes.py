@@ -0,0 +1,168 @@
+"""
+Arnés de Benchmarks
+Ejecuta casos de benchmark con semillas fijas, calcula percentiles de tiempo
+y operaciones por segundo, y compara los resultados con una línea base JSON
+para detectar regresiones.
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
+
+# Un caso se prepara una vez y retorna la función a medir; esa función
+# retorna la cantidad de operaciones realizadas (iteraciones, nodos, ...)
+Preparador = Callable[[], Callable[[], int]]
+
+
+class Caso:
+    """Definición de un caso de benchmark."""
+
+    def __init__(
+        self,
+        nombre: str,
+        preparar: Preparador,
+        repeticiones: int = 10,
+        calentamiento: int = 1,
+        semilla: int = 42,
+        unidad: str = 'ops'
+    ):
+        """
+        Args:
+            nombre: Identificador único del caso (p. ej. 'temple/presupuesto=100')
+            preparar: Función que construye los datos y retorna la función a medir
+            repeticiones: Ejecuciones medidas
+            calentamiento: Ejecuciones previas no medidas
+            semilla: Semilla de `random` fijada antes de cada ejecución
+            unidad: Nombre de la operación contada por la función medida
+        """
+        self.nombre = nombre
+        self.preparar = preparar
+        self.repeticiones = repeticiones
+        self.calentamiento = calentamiento
+        self.semilla = semilla
+        self.unidad = unidad
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista de valores."""
+    ordenados = sorted(valores)
+    rango = math.ceil(p / 100 * len(ordenados))
+    return ordenados[max(0, min(len(ordenados), rango) - 1)]
+
+
+def ejecutar_caso(caso: Caso) -> Dict:
+    """
+    Ejecuta un caso y retorna sus estadísticas.
+
+    Args:
+        caso: Caso a ejecutar
+
+    Returns:
+        Diccionario con percentiles de tiempo (ms) y operaciones por segundo
+    """
+    random.seed(caso.semilla)
+    funcion = caso.preparar()
+
+    for i in range(caso.calentamiento):
+        random.seed(caso.semilla + i)
+        funcion()
+
+    tiempos = []
+    operaciones = 0
+    for i in range(caso.repeticiones):
+        random.seed(caso.semilla + i)
+        inicio = time.perf_counter()
+        operaciones += funcion() or 0
+        tiempos.append(time.perf_counter() - inicio)
+
+    total = sum(tiempos)
+    return {
+        'repeticiones': caso.repeticiones,
+        'p50_ms': round(percentil(tiempos, 50) * 1000, 4),
+        'p90_ms': round(percentil(tiempos, 90) * 1000, 4),
+        'p99_ms': round(percentil(tiempos, 99) * 1000, 4),
+        'media_ms': round(total / len(tiempos) * 1000, 4),
+        'unidad': caso.unidad,
+        'ops_por_segundo': round(operaciones / total, 2) if total > 0 else 0.0,
+    }
+
+
+def ejecutar_casos(casos: List[Caso], filtro: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Ejecuta una lista de casos, opcionalmente filtrados por subcadena del nombre.
+
+    Returns:
+        Diccionario nombre -> estadísticas
+    """
+    resultados = {}
+    for caso in casos:
+        if filtro and filtro not in caso.nombre:
+            continue
+        resultados[caso.nombre] = ejecutar_caso(caso)
+        r = resultados[caso.nombre]
+        print(
+            f"  {caso.nombre:<48} p50 {r['p50_ms']:>10.2f} ms  p90 {r['p90_ms']:>10.2f} ms  "
+            f"{r['ops_por_segundo']:>12.0f} {r['unidad']}/s",
+            flush=True
+        )
+    return resultados
+
+
+def guardar_linea_base(resultados: Dict[str, Dict], ruta: str):
+    """Guarda los resultados como línea base, conservando casos no ejecutados."""
+    existentes = cargar_linea_base(ruta).get('casos', {})
+    existentes.update(resultados)
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump({
+            'python': platform.python_version(),
+            'maquina': platform.machine(),
+            'casos': dict(sorted(existentes.items()))
+        }, archivo, indent=2, ensure_ascii=False)
+        archivo.write('\n')
+
+
+def cargar_linea_base(ruta: str) -> Dict:
+    """Carga una línea base JSON (vacía si el archivo no existe)."""
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def comparar_con_linea_base(
+    resultados: Dict[str, Dict],
+    linea_base: Dict,
+    umbral: float = 0.20
+) -> List[str]:
+    """
+    Compara la mediana de tiempo de cada caso con la línea base.
+
+    Args:
+        resultados: Resultados actuales
+        linea_base: Contenido de la línea base
+        umbral: Aumento relativo tolerado de p50 (0.20 = 20%)
+
+    Returns:
+        Lista de descripciones de las regresiones encontradas
+    """
+    regresiones = []
+    casos_base = linea_base.get('casos', {})
+    for nombre, resultado in resultados.items():
+        base = casos_base.get(nombre)
+        if not base:
+            continue
+        limite = base['p50_ms'] * (1 + umbral)
+        if resultado['p50_ms'] > limite:
+            regresiones.append(
+                f"{nombre}: p50 {resultado['p50_ms']:.2f} ms > {limite:.2f} ms "
+                f"(línea base {base['p50_ms']:.2f} ms, +{umbral:.0%})"
+            )
+    return regresiones
@@ -0,0 +1,115 @@
+"""
+Benchmark de codificación JSON de rutas
+Mide el tiempo de codificación de respuestas de compra según la longitud de
+la ruta detallada, comparando el camino por defecto de Flask con el
+codificador rápido, la ruta compacta y la serialización por partes.
+
+Uso:
+    python benchmarks/bench_codificacion_json.py
+    python benchmarks/bench_codificacion_json.py --longitudes 100 1000 10000 --repeticiones 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'server'))
+
+from utils.codificacion_json import (
+    CODIFICADORES, codificador_activo, compactar_rutas, configurar_codificador, codificar,
+    iterar_json
+)
+
+
+def generar_resultado_compra(pasos: int) -> dict:
+    """Construye un resultado de compra sintético con una ruta de `pasos` pasos."""
+    ruta = []
+    for i in range(pasos):
+        paso = {'paso': i + 1, 'posicion': [i // 30, i % 30], 'accion': 'avanzar'}
+        if i % 50 == 25:
+            paso['accion'] = 'recoger_producto'
+            paso['producto'] = {'id': i, 'nombre': f'Producto {i}', 'cantidad': 1}
+            paso['descripcion'] = f'Recoger 1x Producto {i}'
+        ruta.append(paso)
+    ruta[0]['accion'] = 'inicio'
+    ruta[-1]['accion'] = 'caja'
+
+    return {
+        'comprador_id': 'COMP001',
+        'sucursal_id': 'SUC001',
+        'sucursal_nombre': 'Hipermaxi - Circunvalación',
+        'productos_recolectados': [],
+        'ruta_detallada': ruta,
+        'distancia_total': pasos - 1,
+        'total_items': pasos // 50,
+        'tiempo_estimado': '1 min 0 seg',
+        'posicion_final': [0, 0],
+        'estado': 'finalizado'
+    }
+
+
+def codificar_como_flask(datos) -> bytes:
+    """Aproxima el proveedor JSON por defecto de Flask (ASCII, claves ordenadas)."""
+    return json.dumps(datos, ensure_ascii=True, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Retorna la mediana en milisegundos de `repeticiones` ejecuciones."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de codificación JSON de rutas')
+    parser.add_argument('--longitudes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--repeticiones', type=int, default=10)
+    args = parser.parse_args()
+
+    variantes = [('flask (json por defecto)', codificar_como_flask)]
+    for nombre in sorted(CODIFICADORES):
+        def directo(datos, nombre=nombre):
+            configurar_codificador(nombre)
+            return codificar(datos)
+
+        def compacto(datos, nombre=nombre):
+            configurar_codificador(nombre)
+            return codificar(compactar_rutas(datos))
+
+        def por_partes(datos, nombre=nombre):
+            configurar_codificador(nombre)
+            return b''.join(iterar_json(datos))
+
+        variantes.append((nombre, directo))
+        variantes.append((f'{nombre} + ruta compacta', compacto))
+        variantes.append((f'{nombre} por partes', por_partes))
+
+    print("="*80)
+    print("BENCHMARK: codificación JSON de ruta_detallada")
+    print("="*80)
+    print(f"{'pasos':>8}  {'variante':<32}{'ms':>10}{'µs/paso':>10}{'KB':>10}")
+    print("-"*80)
+
+    # Las variantes cambian el codificador global; se restaura al terminar
+    original = codificador_activo()
+    try:
+        for pasos in args.longitudes:
+            datos = generar_resultado_compra(pasos)
+            for nombre, funcion in variantes:
+                tamano = len(funcion(datos))
+                ms = medir(lambda: funcion(datos), args.repeticiones)
+                print(f"{pasos:>8}  {nombre:<32}{ms:>10.2f}{ms * 1000 / pasos:>10.2f}{tamano / 1024:>10.1f}")
+            print("-"*80)
+    finally:
+        configurar_codificador(original)
+
+
+if __name__ == '__main__':
+    main()
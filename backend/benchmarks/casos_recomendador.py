@@ -0,0 +1,135 @@
+"""
+Casos de benchmark del agente recomendador
+Temple Simulado por presupuesto y tamaño de inventario, los demás
+optimizadores sobre un inventario grande y el flujo completo de
+generar_recomendaciones.
+"""
+
+from itertools import cycle
+
+from arnes import Caso
+from datos_sinteticos import cargar_inventario_real, inventario_ampliado
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.algoritmos_busqueda import TempleSimulado
+from utils.indice_productos import IndiceProductos
+from utils.optimizadores import crear_optimizador
+
+
+def _temple_por_defecto() -> TempleSimulado:
+    # Mismos parámetros que usa AgenteRecomendador, pero con el esquema
+    # completo: el caso mide iteraciones por segundo y las cuenta de antemano
+    return TempleSimulado(
+        temperatura_inicial=1000.0,
+        temperatura_minima=1.0,
+        factor_enfriamiento=0.95,
+        iteraciones_por_temperatura=100,
+        iteraciones_sin_mejora=0
+    )
+
+
+def _iteraciones(temple: TempleSimulado) -> int:
+    """Iteraciones que realiza una ejecución completa del temple."""
+    temperatura = temple.temperatura_inicial
+    pasos = 0
+    while temperatura > temple.temperatura_minima:
+        pasos += 1
+        temperatura *= temple.factor_enfriamiento
+    return pasos * temple.iteraciones_por_temperatura
+
+
+def caso_temple(presupuesto: float, productos: int) -> Caso:
+    def preparar():
+        inventario = cargar_inventario_real() if productos == 35 else inventario_ampliado(productos)
+        temple = _temple_por_defecto()
+        iteraciones = _iteraciones(temple)
+
+        def ejecutar():
+            temple.optimizar(inventario, presupuesto, ['lacteos', 'verduras'])
+            return iteraciones
+        return ejecutar
+
+    return Caso(
+        f'temple/presupuesto={presupuesto:g}/productos={productos}',
+        preparar, repeticiones=5, unidad='iter'
+    )
+
+
+def caso_optimizador(nombre: str, presupuesto: float, productos: int) -> Caso:
+    def preparar():
+        inventario = inventario_ampliado(productos)
+        indice = IndiceProductos(inventario)
+        optimizador = crear_optimizador(nombre)
+
+        def ejecutar():
+            optimizador.optimizar(inventario, presupuesto, ['lacteos', 'verduras'], indice=indice)
+            return 1
+        return ejecutar
+
+    return Caso(
+        f'optimizador/{nombre}/presupuesto={presupuesto:g}/productos={productos}',
+        preparar, repeticiones=5, unidad='listas'
+    )
+
+
+def caso_recomendaciones(sucursal_id: str, presupuesto: float) -> Caso:
+    def preparar():
+        agente = AgenteRecomendador(sucursal_id)
+
+        def ejecutar():
+            agente.generar_recomendaciones(presupuesto, ['lacteos', 'panaderia'])
+            return 1
+        return ejecutar
+
+    return Caso(
+        f'recomendador/{sucursal_id}/presupuesto={presupuesto:g}',
+        preparar, repeticiones=5, unidad='recomendaciones'
+    )
+
+
+def caso_recomendaciones_tibias(sucursal_id: str) -> Caso:
+    """Secuencia de presupuestos parecidos con arranque tibio."""
+    def preparar():
+        agente = AgenteRecomendador(sucursal_id)
+        presupuestos = cycle(range(90, 130, 7))
+
+        def ejecutar():
+            agente.generar_recomendaciones(
+                next(presupuestos), ['lacteos', 'panaderia'], arranque_tibio=True
+            )
+            return 1
+        return ejecutar
+
+    return Caso(
+        f'recomendador/{sucursal_id}/arranque_tibio',
+        preparar, repeticiones=10, unidad='recomendaciones'
+    )
+
+
+def caso_recomendaciones_plantillas(sucursal_id: str) -> Caso:
+    """Presupuestos cercanos a la grilla, respondidos desde plantillas."""
+    def preparar():
+        agente = AgenteRecomendador(sucursal_id)
+        agente.precalcular_plantillas([['lacteos', 'panaderia']], presupuestos=(100.0, 150.0))
+        presupuestos = cycle((96, 100, 104, 145, 150, 155))
+
+        def ejecutar():
+            agente.generar_recomendaciones(next(presupuestos), ['lacteos', 'panaderia'])
+            return 1
+        return ejecutar
+
+    return Caso(
+        f'recomendador/{sucursal_id}/plantillas',
+        preparar, repeticiones=10, unidad='recomendaciones'
+    )
+
+
+CASOS = (
+    [caso_temple(p, 35) for p in (50, 200, 1000)]
+    + [caso_temple(200, n) for n in (350, 3500, 35000)]
+    + [caso_optimizador(nombre, 200, 35000) for nombre in (
+        'voraz', 'tabu', 'ramificacion', 'genetico', 'temple_paralelo'
+    )]
+    + [caso_recomendaciones('SUC001', p) for p in (100, 500)]
+    + [caso_recomendaciones_tibias('SUC001'), caso_recomendaciones_plantillas('SUC001')]
+)
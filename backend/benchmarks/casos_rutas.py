@@ -0,0 +1,226 @@
+"""
+Casos de benchmark del planificador de rutas
+buscar_ruta y buscar_ruta_multiple en mapas sintéticos de distintos tamaños
+y densidades de obstáculos, la búsqueda en mapas ponderados con y sin
+landmarks, A* contra A* bidireccional en tramos largos, la planificación
+cooperativa de muchos compradores sobre una tabla de reservas compartida y
+la reparación de sus rutas cuando se bloquea un pasillo (incremental contra
+replanificar con A*).
+"""
+
+import random
+
+from arnes import Caso
+from datos_sinteticos import celdas_libres_pasillo, mapa_pasillos, mapa_pasillos_ponderado
+
+from models.tabla_reservas import TablaReservas
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.busqueda_espacio_tiempo import BusquedaEspacioTiempo
+from utils.grilla_ponderada import LANDMARKS_MAPA, GrillaPonderada
+from utils.planificador_incremental import BusquedaIncremental
+
+TAMANOS = ((20, 30), (100, 100), (200, 300))
+# Probabilidad de obstáculo en las filas de estanterías
+DENSIDADES = (0.5, 0.9)
+
+
+def caso_ruta(filas: int, columnas: int, densidad: float) -> Caso:
+    def preparar():
+        mapa = mapa_pasillos(filas, columnas, densidad)
+        a_estrella = BusquedaAEstrella()
+        inicio = (0, 0)
+        objetivo = (filas - 1, columnas - 1)
+
+        def ejecutar():
+            ruta = a_estrella.buscar_ruta(inicio, objetivo, mapa)
+            return len(ruta)
+        return ejecutar
+
+    return Caso(
+        f'ruta/{filas}x{columnas}/densidad={densidad}',
+        preparar, repeticiones=10, unidad='pasos'
+    )
+
+
+def caso_ruta_multiple(filas: int, columnas: int, densidad: float, objetivos: int = 10) -> Caso:
+    def preparar():
+        mapa = mapa_pasillos(filas, columnas, densidad)
+        a_estrella = BusquedaAEstrella()
+        destinos = celdas_libres_pasillo(mapa, objetivos)
+
+        def ejecutar():
+            ruta, _ = a_estrella.buscar_ruta_multiple((0, 0), destinos, mapa)
+            return len(ruta)
+        return ejecutar
+
+    return Caso(
+        f'ruta_multiple/{filas}x{columnas}/densidad={densidad}/objetivos={objetivos}',
+        preparar, repeticiones=5, unidad='pasos'
+    )
+
+
+def caso_ruta_ponderada(
+    filas: int,
+    columnas: int,
+    landmarks: int = LANDMARKS_MAPA,
+    tramos: int = 20
+) -> Caso:
+    """Tramos entre zonas de un mapa ponderado; con landmarks=0 la heurística es Manhattan."""
+    def preparar():
+        mapa = mapa_pasillos_ponderado(filas, columnas, 0.9)
+        grilla = GrillaPonderada(mapa, landmarks)
+        grilla.preparar_landmarks()
+        a_estrella = BusquedaAEstrella()
+        zonas = celdas_libres_pasillo(mapa, tramos + 1)
+
+        def ejecutar():
+            total = 0
+            for inicio, objetivo in zip(zonas, zonas[1:]):
+                _, nodos = a_estrella._buscar_ruta_ponderada(inicio, objetivo, grilla)
+                total += nodos
+            return total
+        return ejecutar
+
+    return Caso(
+        f'ruta_ponderada/{filas}x{columnas}/landmarks={landmarks}',
+        preparar, repeticiones=5, unidad='nodos'
+    )
+
+
+def caso_ruta_larga(filas: int, columnas: int, bidireccional: bool) -> Caso:
+    """Un tramo de la entrada a la caja, con A* o A* bidireccional."""
+    def preparar():
+        mapa = mapa_pasillos(filas, columnas, 0.9)
+        a_estrella = BusquedaAEstrella()
+        entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+        caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+
+        def ejecutar():
+            _, nodos = a_estrella._buscar_ruta(entrada, caja, mapa, bidireccional)
+            return nodos
+        return ejecutar
+
+    return Caso(
+        f'ruta_larga/{filas}x{columnas}/bidireccional={bidireccional}',
+        preparar, repeticiones=5, unidad='nodos'
+    )
+
+
+def caso_rutas_cooperativas(
+    filas: int,
+    columnas: int,
+    densidad: float,
+    compradores: int = 200,
+    objetivos: int = 4
+) -> Caso:
+    """Planifica y reserva las rutas de `compradores` que entran a la vez."""
+    def preparar():
+        mapa = mapa_pasillos(filas, columnas, densidad)
+        busqueda = BusquedaEspacioTiempo()
+        entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+        caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+        zonas = celdas_libres_pasillo(mapa, 20)
+        listas = [random.Random(i).sample(zonas, objetivos) for i in range(compradores)]
+
+        def ejecutar():
+            tabla = TablaReservas('BENCH', (filas, columnas), reloj=lambda: 0.0)
+            for i, destinos in enumerate(listas):
+                comprador_id = f'C{i}'
+                tiempo_inicio = tabla.primer_paso_libre(entrada, 0)
+                ruta, _ = busqueda.buscar_ruta_multiple_reservada(
+                    entrada, destinos, caja, mapa, tabla, tiempo_inicio, comprador_id
+                )
+                tabla.reservar(comprador_id, ruta, tiempo_inicio, forzar=True)
+            return compradores
+        return ejecutar
+
+    return Caso(
+        f'rutas_cooperativas/{filas}x{columnas}/densidad={densidad}/compradores={compradores}',
+        preparar, repeticiones=3, unidad='compradores'
+    )
+
+
+def caso_replanificacion(
+    filas: int,
+    columnas: int,
+    incremental: bool,
+    compradores: int = 200,
+    objetivos: int = 4,
+    bloqueos: int = 10
+) -> Caso:
+    """
+    Bloquea (y en la repetición siguiente libera) `bloqueos` pasillos
+    transversales usados por las rutas y rehace lo que falta de la ruta de
+    cada comprador, que va por la mitad. Con `incremental` se usan búsquedas
+    D* Lite compartidas por objetivo; si no, A* desde cero en cada tramo.
+    """
+    def preparar():
+        mapa = mapa_pasillos(filas, columnas, 0.9)
+        grilla = GrillaPonderada(mapa)
+        a_estrella = BusquedaAEstrella()
+        caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+        zonas = celdas_libres_pasillo(mapa, 20)
+        pendientes = []
+        for i in range(compradores):
+            destinos = random.Random(i).sample(zonas, objetivos)
+            ruta, _ = a_estrella.buscar_ruta_multiple(zonas[i % len(zonas)], destinos, mapa)
+            mitad = len(ruta) // 2
+            visitados = set(ruta[:mitad + 1])
+            pendientes.append((ruta[mitad], [d for d in destinos if d not in visitados] + [caja]))
+
+        # Pasos libres de las filas de estanterías más transitados por las rutas
+        protegidas = set(zonas) | {caja} | {inicio for inicio, _ in pendientes}
+        uso = {}
+        for inicio, destinos in pendientes:
+            for posicion in a_estrella.buscar_ruta(inicio, destinos[0], mapa):
+                if posicion[0] % 3 == 0 and posicion not in protegidas:
+                    uso[posicion] = uso.get(posicion, 0) + 1
+        cambios = sorted(uso, key=uso.get, reverse=True)[:bloqueos]
+
+        estado = {'bloqueado': False, 'grilla': grilla}
+        busquedas = {}
+
+        def ejecutar():
+            bloquear = not estado['bloqueado']
+            estado['bloqueado'] = bloquear
+            agregar, quitar = (cambios, ()) if bloquear else ((), cambios)
+            if incremental:
+                grilla = estado['grilla'].con_obstaculos(agregar, quitar)
+                estado['grilla'] = grilla
+                for busqueda in busquedas.values():
+                    busqueda.actualizar_grilla(grilla, cambios)
+                for inicio, destinos in pendientes:
+                    posicion = inicio
+                    for destino in destinos:
+                        if destino not in busquedas:
+                            busquedas[destino] = BusquedaIncremental(grilla, destino)
+                        busquedas[destino].buscar_ruta(posicion)
+                        posicion = destino
+            else:
+                nuevo = dict(mapa, obstaculos=mapa['obstaculos'] + [
+                    {'fila': f, 'columna': c} for f, c in agregar
+                ])
+                for inicio, destinos in pendientes:
+                    posicion = inicio
+                    for destino in destinos:
+                        a_estrella.buscar_ruta(posicion, destino, nuevo)
+                        posicion = destino
+            return compradores
+        return ejecutar
+
+    modo = 'incremental' if incremental else 'completa'
+    return Caso(
+        f'replanificacion/{filas}x{columnas}/compradores={compradores}/{modo}',
+        preparar, repeticiones=3, unidad='compradores'
+    )
+
+
+CASOS = (
+    [caso_ruta(f, c, d) for f, c in TAMANOS for d in DENSIDADES]
+    + [caso_ruta_multiple(f, c, d) for f, c in TAMANOS[:2] for d in DENSIDADES]
+    + [caso_ruta_multiple(200, 300, 0.9, objetivos=20)]
+    + [caso_ruta_ponderada(f, c, l) for f, c in TAMANOS for l in (0, LANDMARKS_MAPA)]
+    + [caso_ruta_larga(f, c, modo) for f, c in TAMANOS + ((500, 500),) for modo in (False, True)]
+    + [caso_rutas_cooperativas(20, 30, 0.9), caso_rutas_cooperativas(100, 100, 0.9)]
+    + [caso_replanificacion(f, c, modo) for f, c in TAMANOS[1:] for modo in (False, True)]
+)
@@ -0,0 +1,125 @@
+"""
+Comparación de A* y A* bidireccional
+Busca tramos largos (de la entrada a la caja y entre pares de zonas alejadas)
+en mapas de pasillos de distintos tamaños y reporta los nodos expandidos y el
+tiempo de cada modo. La grilla compilada del mapa se construye antes de medir.
+
+Uso:
+    python benchmarks/comparar_busquedas.py
+    python benchmarks/comparar_busquedas.py --tamanos 100x100 500x500 --tramos 5
+    python benchmarks/comparar_busquedas.py --ponderado --json resultados.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from arnes import percentil
+from datos_sinteticos import mapa_pasillos, mapa_pasillos_ponderado
+
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.grilla_ponderada import obtener_grilla
+
+MODOS = {'a_estrella': False, 'bidireccional': True}
+
+
+def tramos_largos(mapa: Dict, cantidad: int, semilla: int = 7) -> List[Tuple[tuple, tuple]]:
+    """La entrada y la caja, y `cantidad - 1` pares de zonas de productos alejadas."""
+    entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+    caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+    zonas = sorted((z['fila'], z['columna']) for z in mapa['zonas_productos'].values())
+    filas = mapa['dimensiones']['filas']
+    columnas = mapa['dimensiones']['columnas']
+    rng = random.Random(semilla)
+    tramos = [(entrada, caja)]
+    while len(tramos) < cantidad:
+        a, b = rng.sample(zonas, 2)
+        # Solo pares separados por al menos la mitad del mapa
+        if abs(a[0] - b[0]) + abs(a[1] - b[1]) >= (filas + columnas) // 2:
+            tramos.append((a, b))
+    return tramos
+
+
+def comparar(tamanos: List[Tuple[int, int]], tramos: int, ponderado: bool) -> List[Dict]:
+    """
+    Ejecuta los tramos de cada tamaño con ambos modos.
+
+    Args:
+        tamanos: (filas, columnas) de cada mapa
+        tramos: Tramos por mapa
+        ponderado: Usar mapas con zonas concurridas y sentido único
+
+    Returns:
+        Lista de filas con nodos expandidos (mediana y total) y p50/p90 de tiempo (ms)
+    """
+    a_estrella = BusquedaAEstrella()
+    filas_resultado = []
+    for filas, columnas in tamanos:
+        generar = mapa_pasillos_ponderado if ponderado else mapa_pasillos
+        mapa = generar(filas, columnas, 0.9)
+        grilla = obtener_grilla(mapa)
+        if ponderado:
+            grilla.preparar_landmarks()
+        pares = tramos_largos(mapa, tramos)
+        costos = {}
+        for modo, bidireccional in MODOS.items():
+            nodos, tiempos = [], []
+            for inicio, objetivo in pares:
+                comienzo = time.perf_counter()
+                ruta, expandidos = a_estrella._buscar_ruta(inicio, objetivo, mapa, bidireccional)
+                tiempos.append(time.perf_counter() - comienzo)
+                nodos.append(expandidos)
+                costo = grilla.costo_ruta(ruta)
+                # Misma ruta óptima salvo el orden de la suma de costos
+                if abs(costos.setdefault((inicio, objetivo), costo) - costo) > 1e-9:
+                    raise AssertionError(f"Costos distintos en {inicio} -> {objetivo}")
+            fila = {
+                'tamano': f'{filas}x{columnas}',
+                'modo': modo,
+                'nodos_mediana': statistics.median(nodos),
+                'nodos_total': sum(nodos),
+                'p50_ms': round(percentil(tiempos, 50) * 1000, 2),
+                'p90_ms': round(percentil(tiempos, 90) * 1000, 2),
+            }
+            filas_resultado.append(fila)
+            print(
+                f"  {fila['tamano']:<9} {modo:<14} nodos {fila['nodos_mediana']:>9g} "
+                f"(total {fila['nodos_total']:>9})   p50 {fila['p50_ms']:>9.2f} ms   "
+                f"p90 {fila['p90_ms']:>9.2f} ms",
+                flush=True
+            )
+    return filas_resultado
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Nodos y tiempo de A* contra A* bidireccional')
+    parser.add_argument('--tamanos', nargs='+', default=['20x30', '100x100', '200x300', '500x500'],
+                        help='Tamaños de mapa FILASxCOLUMNAS')
+    parser.add_argument('--tramos', type=int, default=10, help='Tramos por mapa')
+    parser.add_argument('--ponderado', action='store_true',
+                        help='Mapas con zonas concurridas y pasillos de sentido único')
+    parser.add_argument('--json', help='Guardar las filas en un archivo JSON')
+    args = parser.parse_args()
+    tamanos = [tuple(int(valor) for valor in tamano.split('x')) for tamano in args.tamanos]
+
+    print("="*80)
+    print("COMPARACIÓN DE BÚSQUEDAS: A* contra A* bidireccional en tramos largos")
+    print("="*80)
+    filas = comparar(tamanos, args.tramos, args.ponderado)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(filas, archivo, indent=2, ensure_ascii=False)
+        print(f"\n✓ Resultados guardados en {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Comparación de optimizadores de listas de compras
+Ejecuta cada backend sobre inventarios de distintos tamaños y presupuestos
+con semillas fijas, y reporta la mediana del costo final y del tiempo.
+
+Uso:
+    python benchmarks/comparar_optimizadores.py
+    python benchmarks/comparar_optimizadores.py --productos 35 3500 --semillas 3
+    python benchmarks/comparar_optimizadores.py --json resultados.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from arnes import percentil
+from datos_sinteticos import cargar_inventario_real, inventario_ampliado
+
+from utils.indice_productos import IndiceProductos
+from utils.optimizadores import OPTIMIZADORES, crear_optimizador
+
+CATEGORIAS = ['lacteos', 'verduras']
+
+
+def comparar(
+    productos: List[int],
+    presupuestos: List[float],
+    semillas: int,
+    optimizadores: List[str]
+) -> List[Dict]:
+    """
+    Ejecuta todas las combinaciones y retorna una fila por combinación.
+
+    Args:
+        productos: Tamaños de inventario (35 usa el inventario real de SUC001)
+        presupuestos: Presupuestos objetivo
+        semillas: Ejecuciones por combinación
+        optimizadores: Nombres de los optimizadores a comparar
+
+    Returns:
+        Lista de filas con costo mediano, p50 y p90 de tiempo (ms)
+    """
+    filas = []
+    for cantidad in productos:
+        inventario = cargar_inventario_real() if cantidad == 35 else inventario_ampliado(cantidad)
+        indice = IndiceProductos(inventario)
+        for presupuesto in presupuestos:
+            for nombre in optimizadores:
+                optimizador = crear_optimizador(nombre)
+                costos, tiempos = [], []
+                for semilla in range(semillas):
+                    rng = random.Random(semilla)
+                    inicio = time.perf_counter()
+                    lista = optimizador.optimizar(
+                        inventario, presupuesto, CATEGORIAS, indice=indice, rng=rng
+                    )
+                    tiempos.append(time.perf_counter() - inicio)
+                    costos.append(optimizador.calcular_costo(lista, presupuesto, CATEGORIAS, inventario))
+                fila = {
+                    'productos': cantidad,
+                    'presupuesto': presupuesto,
+                    'optimizador': nombre,
+                    'costo_mediano': round(statistics.median(costos), 3),
+                    'p50_ms': round(percentil(tiempos, 50) * 1000, 2),
+                    'p90_ms': round(percentil(tiempos, 90) * 1000, 2),
+                }
+                filas.append(fila)
+                print(
+                    f"  productos={cantidad:<6} presupuesto={presupuesto:<7g} {nombre:<13} "
+                    f"costo {fila['costo_mediano']:>10.3f}   p50 {fila['p50_ms']:>9.2f} ms   "
+                    f"p90 {fila['p90_ms']:>9.2f} ms",
+                    flush=True
+                )
+    return filas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Costo contra tiempo de los optimizadores')
+    parser.add_argument('--productos', type=int, nargs='+', default=[35, 3500, 35000])
+    parser.add_argument('--presupuestos', type=float, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--semillas', type=int, default=5)
+    parser.add_argument('--optimizadores', nargs='+', default=list(OPTIMIZADORES),
+                        choices=list(OPTIMIZADORES))
+    parser.add_argument('--json', help='Guardar las filas en un archivo JSON')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("COMPARACIÓN DE OPTIMIZADORES: costo final contra tiempo")
+    print("="*80)
+    filas = comparar(args.productos, args.presupuestos, args.semillas, args.optimizadores)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(filas, archivo, indent=2, ensure_ascii=False)
+        print(f"\n✓ Resultados guardados en {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Datos sintéticos para benchmarks
+Inventarios y mapas de pasillos deterministas construidos con
+utils.generador_sucursales, a partir de semillas fijas.
+"""
+
+import json
+import os
+import random
+from typing import Dict, List
+
+from utils.generador_sucursales import generar_inventario, generar_mapa, ponderar_mapa
+
+DIRECTORIO_DATOS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server', 'data'
+)
+
+
+def cargar_inventario_real(sucursal_id: str = 'SUC001') -> List[Dict]:
+    """Retorna la lista de productos del inventario real de una sucursal."""
+    ruta = os.path.join(DIRECTORIO_DATOS, 'inventario', f'{sucursal_id}.json')
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        return json.load(archivo)['productos']
+
+
+def inventario_ampliado(cantidad: int, semilla: int = 7) -> List[Dict]:
+    """
+    Genera un inventario sintético de `cantidad` productos con las 15
+    categorías base.
+
+    Args:
+        cantidad: Número de productos
+        semilla: Semilla del generador
+
+    Returns:
+        Lista de productos
+    """
+    return generar_inventario(f'SINT_{cantidad}', cantidad, 15, semilla)['productos']
+
+
+def mapa_pasillos(filas: int, columnas: int, densidad: float, semilla: int = 7) -> Dict:
+    """
+    Genera un mapa de pasillos con un inventario sintético proporcional a su área.
+
+    Args:
+        filas: Filas del mapa
+        columnas: Columnas del mapa
+        densidad: Probabilidad de obstáculo en las celdas de estantería (0-1)
+        semilla: Semilla del generador
+
+    Returns:
+        Diccionario con el formato de data/mapas
+    """
+    sucursal_id = f'SINT_{filas}x{columnas}'
+    productos = max(35, filas * columnas // 20)
+    inventario = generar_inventario(sucursal_id, productos, 15, semilla)
+    return generar_mapa(sucursal_id, inventario, filas, columnas, densidad, semilla=semilla)
+
+
+def mapa_pasillos_ponderado(filas: int, columnas: int, densidad: float, semilla: int = 7) -> Dict:
+    """
+    Mapa de pasillos con zonas concurridas y pasillos de sentido único.
+
+    Args:
+        filas: Filas del mapa
+        columnas: Columnas del mapa
+        densidad: Probabilidad de obstáculo en las celdas de estantería (0-1)
+        semilla: Semilla del generador
+
+    Returns:
+        Diccionario con el formato de data/mapas, con 'costos_celdas' y 'sentido_unico'
+    """
+    zonas = max(4, filas * columnas // 2500)
+    return ponderar_mapa(mapa_pasillos(filas, columnas, densidad, semilla), zonas, semilla=semilla)
+
+
+def celdas_libres_pasillo(mapa: Dict, cantidad: int, semilla: int = 7) -> List[tuple]:
+    """Elige `cantidad` posiciones de zonas de productos (siempre alcanzables)."""
+    rng = random.Random(semilla)
+    zonas = sorted(
+        (zona['fila'], zona['columna']) for zona in mapa['zonas_productos'].values()
+    )
+    return rng.sample(zonas, min(cantidad, len(zonas)))
@@ -0,0 +1,63 @@
+"""
+Suite de benchmarks del recomendador y del planificador de rutas.
+
+Uso:
+    python benchmarks/ejecutar.py                         # ejecutar y comparar con la línea base
+    python benchmarks/ejecutar.py --filtro temple         # solo casos cuyo nombre contiene 'temple'
+    python benchmarks/ejecutar.py --guardar-linea-base    # actualizar linea_base.json
+    python benchmarks/ejecutar.py --umbral 0.3            # tolerar hasta +30% en p50
+
+Termina con código 1 si algún caso supera la mediana de la línea base más el umbral.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from arnes import (
+    cargar_linea_base, comparar_con_linea_base, ejecutar_casos, guardar_linea_base
+)
+import casos_recomendador
+import casos_rutas
+
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base.json')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks del sistema multi-agente')
+    parser.add_argument('--filtro', help='Subcadena del nombre de los casos a ejecutar')
+    parser.add_argument('--guardar-linea-base', action='store_true',
+                        help='Guardar los resultados como nueva línea base')
+    parser.add_argument('--linea-base', default=RUTA_LINEA_BASE,
+                        help='Ruta del archivo JSON de línea base')
+    parser.add_argument('--umbral', type=float, default=0.20,
+                        help='Aumento relativo tolerado de p50 (por defecto 0.20)')
+    args = parser.parse_args()
+
+    casos = casos_recomendador.CASOS + casos_rutas.CASOS
+
+    print("="*80)
+    print("BENCHMARKS: recomendador y planificador de rutas")
+    print("="*80)
+    resultados = ejecutar_casos(casos, args.filtro)
+
+    if args.guardar_linea_base:
+        guardar_linea_base(resultados, args.linea_base)
+        print(f"\n✓ Línea base guardada en {args.linea_base}")
+        return 0
+
+    regresiones = comparar_con_linea_base(resultados, cargar_linea_base(args.linea_base), args.umbral)
+    if regresiones:
+        print(f"\n✗ {len(regresiones)} regresión(es) de rendimiento:")
+        for regresion in regresiones:
+            print(f"  • {regresion}")
+        return 1
+
+    print("\n✓ Sin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Prueba de Carga del Sistema Multi-Agente
+Simula flotas de compradores concurrentes que recorren
+crear → iniciar_compra → compra_completa (y opcionalmente solicitan una
+recomendación por WebSocket), con llegadas a una tasa configurable, y
+reporta throughput, percentiles de latencia y tasa de errores.
+
+Uso:
+    python prueba_carga.py --compradores 200 --tasa 20               # app en proceso
+    python prueba_carga.py --url http://localhost:5000 --tasa 50     # servidor local
+    python prueba_carga.py --llegadas constante --proporcion-ws 0.5 --json resultado.json
+
+En proceso se usan los clientes de prueba de Flask y Flask-SocketIO; contra
+un servidor se usa urllib y, para WebSocket, el cliente de python-socketio
+(opcional: sin él se omite el paso de WebSocket).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from arnes import percentil
+
+OPERACIONES = ('ws_recomendacion', 'crear', 'iniciar_compra', 'compra_completa')
+
+
+class TransporteEnProceso:
+    """Ejecuta las peticiones contra la app importada, sin red."""
+
+    def __init__(self):
+        import app as servidor  # requiere Flask y Flask-SocketIO
+
+        self.servidor = servidor
+        if not servidor.agentes_recomendadores:
+            servidor.inicializar_agentes_recomendadores()
+
+    def post(self, ruta: str, datos: Dict) -> Tuple[int, Dict]:
+        # El cliente de prueba no es seguro entre hilos: uno por petición
+        respuesta = self.servidor.app.test_client().post(ruta, json=datos)
+        return respuesta.status_code, respuesta.get_json(silent=True) or {}
+
+    def recomendacion_ws(self, datos: Dict) -> Tuple[bool, Dict]:
+        cliente = self.servidor.socketio.test_client(self.servidor.app)
+        try:
+            cliente.emit('solicitar_recomendacion_ws', datos)
+            for evento in cliente.get_received():
+                if evento['name'] == 'recomendaciones_generadas':
+                    return True, evento['args'][0]
+                if evento['name'] == 'error':
+                    return False, evento['args'][0]
+            return False, {'mensaje': 'Sin respuesta'}
+        finally:
+            cliente.disconnect()
+
+
+class TransporteHTTP:
+    """Ejecuta las peticiones contra un servidor en ejecución."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def post(self, ruta: str, datos: Dict) -> Tuple[int, Dict]:
+        peticion = urllib.request.Request(
+            self.url + ruta,
+            data=json.dumps(datos).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                return respuesta.status, json.loads(respuesta.read() or b'{}')
+        except urllib.error.HTTPError as e:
+            return e.code, {}
+
+    def recomendacion_ws(self, datos: Dict) -> Tuple[bool, Dict]:
+        try:
+            import socketio
+        except ImportError:
+            raise RuntimeError("python-socketio no está instalado")
+
+        with socketio.SimpleClient() as cliente:
+            cliente.connect(self.url, transports=['websocket'])
+            cliente.emit('solicitar_recomendacion_ws', datos)
+            while True:
+                nombre, *argumentos = cliente.receive(timeout=self.timeout)
+                if nombre == 'recomendaciones_generadas':
+                    return True, argumentos[0]
+                if nombre == 'error':
+                    return False, argumentos[0]
+
+
+class Estadisticas:
+    """Latencias y errores acumulados por operación."""
+
+    def __init__(self):
+        self.latencias: Dict[str, List[float]] = {op: [] for op in OPERACIONES}
+        self.errores: Dict[str, int] = {op: 0 for op in OPERACIONES}
+        self.compradores_completos = 0
+        self.compradores_fallidos = 0
+
+    def registrar(self, operacion: str, segundos: float, exito: bool):
+        self.latencias[operacion].append(segundos)
+        if not exito:
+            self.errores[operacion] += 1
+
+    def resumir(self, duracion: float) -> Dict:
+        """
+        Resume la ejecución.
+
+        Args:
+            duracion: Duración total de la prueba en segundos
+
+        Returns:
+            Diccionario con throughput y estadísticas por operación
+        """
+        operaciones = {}
+        for op, tiempos in self.latencias.items():
+            if not tiempos:
+                continue
+            operaciones[op] = {
+                'peticiones': len(tiempos),
+                'errores': self.errores[op],
+                'tasa_error': round(self.errores[op] / len(tiempos), 4),
+                'p50_ms': round(percentil(tiempos, 50) * 1000, 2),
+                'p90_ms': round(percentil(tiempos, 90) * 1000, 2),
+                'p99_ms': round(percentil(tiempos, 99) * 1000, 2),
+                'max_ms': round(max(tiempos) * 1000, 2),
+            }
+        total = sum(len(t) for t in self.latencias.values())
+        return {
+            'duracion_s': round(duracion, 3),
+            'compradores_completos': self.compradores_completos,
+            'compradores_fallidos': self.compradores_fallidos,
+            'peticiones_por_segundo': round(total / duracion, 2) if duracion > 0 else 0.0,
+            'compradores_por_segundo': (
+                round(self.compradores_completos / duracion, 2) if duracion > 0 else 0.0
+            ),
+            'operaciones': operaciones,
+        }
+
+
+def tiempos_llegada(cantidad: int, tasa: float, llegadas: str, semilla: int) -> List[float]:
+    """
+    Calcula el instante de llegada (segundos desde el inicio) de cada comprador.
+
+    Args:
+        cantidad: Número de compradores
+        tasa: Llegadas por segundo (0 = todos al inicio)
+        llegadas: 'poisson' (intervalos exponenciales) o 'constante'
+        semilla: Semilla del generador
+
+    Returns:
+        Lista creciente de instantes de llegada
+    """
+    if tasa <= 0:
+        return [0.0] * cantidad
+
+    rng = random.Random(semilla)
+    instantes = []
+    actual = 0.0
+    for _ in range(cantidad):
+        instantes.append(actual)
+        actual += rng.expovariate(tasa) if llegadas == 'poisson' else 1.0 / tasa
+    return instantes
+
+
+async def _medir(estadisticas: Estadisticas, operacion: str, funcion, *argumentos) -> bool:
+    """Ejecuta una operación bloqueante en un hilo y registra su latencia."""
+    inicio = time.perf_counter()
+    try:
+        exito = await asyncio.to_thread(funcion, *argumentos)
+    except Exception:
+        exito = False
+    estadisticas.registrar(operacion, time.perf_counter() - inicio, exito)
+    return exito
+
+
+async def simular_comprador(
+    transporte,
+    estadisticas: Estadisticas,
+    comprador_id: str,
+    sucursal_id: str,
+    presupuesto: float,
+    categorias: List[str],
+    usar_ws: bool
+):
+    """Recorre el flujo completo de un comprador, deteniéndose en el primer error."""
+    def post(ruta, datos):
+        estado, _ = transporte.post(ruta, datos)
+        return estado < 400
+
+    def recomendacion_ws():
+        exito, _ = transporte.recomendacion_ws({
+            'sucursal_id': sucursal_id,
+            'presupuesto': presupuesto,
+            'categorias_preferidas': categorias
+        })
+        return exito
+
+    pasos = [
+        ('crear', post, '/api/comprador/crear',
+         {'comprador_id': comprador_id, 'sucursal_id': sucursal_id}),
+        ('iniciar_compra', post, '/api/comprador/iniciar_compra',
+         {'comprador_id': comprador_id, 'sucursal_id': sucursal_id,
+          'presupuesto': presupuesto, 'categorias_preferidas': categorias}),
+        ('compra_completa', post, '/api/comprador/compra_completa',
+         {'comprador_id': comprador_id}),
+    ]
+    if usar_ws:
+        pasos.insert(0, ('ws_recomendacion', recomendacion_ws))
+
+    for operacion, funcion, *argumentos in pasos:
+        if not await _medir(estadisticas, operacion, funcion, *argumentos):
+            estadisticas.compradores_fallidos += 1
+            return
+    estadisticas.compradores_completos += 1
+
+
+async def ejecutar_carga(
+    transporte,
+    compradores: int = 100,
+    tasa: float = 10.0,
+    llegadas: str = 'poisson',
+    concurrencia: int = 32,
+    sucursales: Optional[List[str]] = None,
+    presupuestos: Tuple[float, float] = (50.0, 300.0),
+    proporcion_ws: float = 0.2,
+    semilla: int = 42
+) -> Dict:
+    """
+    Ejecuta una prueba de carga y retorna su resumen.
+
+    Args:
+        transporte: TransporteEnProceso o TransporteHTTP
+        compradores: Número total de compradores simulados
+        tasa: Llegadas por segundo (0 = todos al inicio)
+        llegadas: 'poisson' o 'constante'
+        concurrencia: Máximo de compradores activos a la vez
+        sucursales: Sucursales entre las que se reparten los compradores
+        presupuestos: Rango (mínimo, máximo) de presupuesto por comprador
+        proporcion_ws: Fracción de compradores que piden recomendación por WebSocket
+        semilla: Semilla para llegadas, sucursales y presupuestos
+
+    Returns:
+        Resumen de la ejecución (ver Estadisticas.resumir)
+    """
+    sucursales = sucursales or ['SUC001', 'SUC002']
+    categorias_posibles = ['lacteos', 'panaderia', 'verduras', 'carnes', 'limpieza', 'bebidas']
+    rng = random.Random(semilla)
+    estadisticas = Estadisticas()
+    limite = asyncio.Semaphore(concurrencia)
+    prefijo = f'CARGA{int(time.time() * 1000) % 1000000:06d}'
+
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrencia))
+
+    async def lanzar(indice: int, instante: float, inicio: float):
+        await asyncio.sleep(max(0.0, inicio + instante - time.perf_counter()))
+        async with limite:
+            await simular_comprador(
+                transporte, estadisticas,
+                comprador_id=f'{prefijo}_{indice:05d}',
+                sucursal_id=sucursales[indice % len(sucursales)],
+                presupuesto=round(rng.uniform(*presupuestos), 2),
+                categorias=rng.sample(categorias_posibles, 2),
+                usar_ws=rng.random() < proporcion_ws
+            )
+
+    instantes = tiempos_llegada(compradores, tasa, llegadas, semilla)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(lanzar(i, t, inicio) for i, t in enumerate(instantes)))
+    return estadisticas.resumir(time.perf_counter() - inicio)
+
+
+def imprimir_resumen(resumen: Dict):
+    """Muestra el resumen en formato de tabla."""
+    print("\n" + "="*80)
+    print("RESULTADO DE LA PRUEBA DE CARGA")
+    print("="*80)
+    print(f"\nDuración: {resumen['duracion_s']:.2f} s")
+    print(f"Compradores completos: {resumen['compradores_completos']} | "
+          f"fallidos: {resumen['compradores_fallidos']}")
+    print(f"Throughput: {resumen['peticiones_por_segundo']:.1f} peticiones/s, "
+          f"{resumen['compradores_por_segundo']:.1f} compradores/s\n")
+    print(f"  {'operación':<18}{'peticiones':>11}{'error %':>9}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for operacion, r in resumen['operaciones'].items():
+        print(f"  {operacion:<18}{r['peticiones']:>11}{r['tasa_error'] * 100:>9.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p90_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}")
+    print("="*80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de compradores concurrentes')
+    parser.add_argument('--url', help='URL de un servidor en ejecución (por defecto: app en proceso)')
+    parser.add_argument('--compradores', type=int, default=100)
+    parser.add_argument('--tasa', type=float, default=10.0, help='Llegadas por segundo (0 = todas juntas)')
+    parser.add_argument('--llegadas', choices=('poisson', 'constante'), default='poisson')
+    parser.add_argument('--concurrencia', type=int, default=32)
+    parser.add_argument('--sucursales', nargs='+', default=['SUC001', 'SUC002'])
+    parser.add_argument('--presupuesto-min', type=float, default=50.0)
+    parser.add_argument('--presupuesto-max', type=float, default=300.0)
+    parser.add_argument('--proporcion-ws', type=float, default=0.2)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--json', help='Guardar el resumen en este archivo')
+    args = parser.parse_args()
+
+    if args.url:
+        transporte = TransporteHTTP(args.url)
+    else:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server'))
+        transporte = TransporteEnProceso()
+
+    resumen = asyncio.run(ejecutar_carga(
+        transporte,
+        compradores=args.compradores,
+        tasa=args.tasa,
+        llegadas=args.llegadas,
+        concurrencia=args.concurrencia,
+        sucursales=args.sucursales,
+        presupuestos=(args.presupuesto_min, args.presupuesto_max),
+        proporcion_ws=args.proporcion_ws,
+        semilla=args.semilla
+    ))
+    imprimir_resumen(resumen)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resumen, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,51 +3,152 @@ Servidor Flask para el Sistema Multi-Agente de Supermercado
 Gestiona la comunicación entre agentes recomendadores y compradores.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
+import functools
 import os
 import sys
+import time
 
 # Agregar el directorio actual al path para imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from models.agente_recomendador import AgenteRecomendador
 from models.agente_comprador import AgenteComprador
+from models.directorio_agentes import DirectorioRecomendadores
+from models.libro_stock import StockInsuficiente
+from models.modelo_sucursal import (
+    SucursalNoEncontrada, actualizar_inventario_modelo, cargar_inventario,
+    metadatos_sucursal, obtener_modelo_sucursal
+)
+from models.replanificador import obtener_replanificador
+from utils.cache_respuestas import HIST_JSON_SEGUNDOS, CacheRespuestas, preparar_respuesta
+from utils.cambios_inventario import CambioInvalido
+from utils.codificacion_json import codificar, compactar_rutas, contar_pasos, iterar_json
+from utils.frente_pareto import CAPACIDAD_FRENTE
+from utils.registro import configurar_registro, obtener_logger
+from utils.metricas import metricas, medir, observar, reiniciar_etiquetas
+from utils.optimizadores import OPTIMIZADORES
+from utils.vigilante_datos import VigilanteDatos
+
+registro = obtener_logger('api')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'supermercado_ia_2025'
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Diccionario para mantener los agentes recomendadores activos
-agentes_recomendadores = {}
+# Agentes recomendadores por sucursal, construidos al primer uso o por la precarga
+agentes_recomendadores = DirectorioRecomendadores()
 
 # Diccionario para mantener los agentes compradores activos
 agentes_compradores = {}
 
+# Respuestas serializadas de los endpoints estáticos de sucursales
+cache_respuestas = CacheRespuestas()
+
+# A partir de cuántos pasos de ruta una respuesta se envía por partes
+UMBRAL_PASOS_STREAMING = int(os.environ.get('UMBRAL_PASOS_STREAMING', 20000))
+
+# Precarga de agentes en segundo plano al iniciar (0 = solo al primer uso)
+PRECARGA_HILOS = int(os.environ.get('PRECARGA_HILOS', 4))
+
+# Segundos entre revisiones de los archivos de datos (0 = sin recarga automática)
+VIGILAR_DATOS = float(os.environ.get('VIGILAR_DATOS', 0))
+
+# Las semillas se devuelven en la respuesta: deben caber en un entero de 64 bits con signo
+SEMILLA_MAXIMA = 2**63 - 1
+
+HIST_PETICION_SEGUNDOS = metricas.histograma(
+    'http_peticion_segundos', 'Latencia de las peticiones HTTP', etiquetas=('metodo', 'estado')
+)
+
 
 def inicializar_agentes_recomendadores():
     """
-    Inicializa los agentes recomendadores para todas las sucursales disponibles.
+    Descubre las sucursales disponibles en los archivos de datos y, si la
+    precarga está habilitada, construye sus agentes en segundo plano.
     """
-    print("\n" + "="*60)
-    print("INICIALIZANDO SISTEMA MULTI-AGENTE DE SUPERMERCADO")
-    print("="*60)
+    registro.info("Inicializando sistema multi-agente de supermercado")
     
-    sucursales = ['SUC001', 'SUC002']
+    sucursales = agentes_recomendadores.descubrir()
+    registro.info("Sucursales descubiertas: %d", len(sucursales))
     
-    for sucursal_id in sucursales:
-        try:
-            agente = AgenteRecomendador(sucursal_id)
-            agentes_recomendadores[sucursal_id] = agente
-            print(f"✓ Agente recomendador activo en {agente.nombre_sucursal}")
-        except Exception as e:
-            print(f"✗ Error al inicializar agente en {sucursal_id}: {e}")
+    if PRECARGA_HILOS > 0:
+        agentes_recomendadores.precargar(hilos=PRECARGA_HILOS)
+        registro.info("Precargando agentes recomendadores con %d hilos", PRECARGA_HILOS)
+
+
+def recargar_datos_sucursal(sucursal_id, tipo):
+    """
+    Aplica un cambio en los archivos de datos de una sucursal sin reiniciar.
+    
+    Args:
+        sucursal_id: Sucursal cuyo archivo cambió
+        tipo: 'inventario', 'mapas' o 'compilado'
+    """
+    if sucursal_id not in agentes_recomendadores:
+        agentes_recomendadores.descubrir()
+        return
     
-    print("="*60)
-    print(f"Total de agentes recomendadores activos: {len(agentes_recomendadores)}")
-    print("="*60 + "\n")
+    if tipo == 'mapas':
+        # El mapa cambió en disco: se relee y se reparan las rutas en curso
+        obtener_replanificador(sucursal_id).recargar_mapa()
+        return
+    
+    agente = agentes_recomendadores.activos().get(sucursal_id)
+    if agente is not None:
+        agente.recargar_inventario()
+        inventario = agente.inventario
+    else:
+        inventario = cargar_inventario(sucursal_id)
+    # Solo se republica el inventario: el mapa conserva las zonas asignadas
+    # por la API y los obstáculos aplicados en tiempo de ejecución
+    actualizar_inventario_modelo(sucursal_id, inventario)
+
+
+def iniciar_vigilante():
+    """Inicia la recarga automática de datos si VIGILAR_DATOS > 0."""
+    if VIGILAR_DATOS <= 0:
+        return None
+    vigilante = VigilanteDatos(recargar_datos_sucursal, VIGILAR_DATOS)
+    vigilante.iniciar()
+    registro.info("Vigilando archivos de datos cada %.1f s", VIGILAR_DATOS)
+    return vigilante
+
+
+# ============================================================================
+# INSTRUMENTACIÓN
+# ============================================================================
+
+@app.before_request
+def iniciar_medicion():
+    """Fija las etiquetas de métricas de la petición y marca su inicio."""
+    if not metricas.habilitado:
+        return
+    sucursal_id = (request.view_args or {}).get('sucursal_id', '')
+    reiniciar_etiquetas(endpoint=request.endpoint or 'desconocido', sucursal=sucursal_id)
+    g.inicio_peticion = time.perf_counter()
+
+
+@app.after_request
+def registrar_medicion(respuesta):
+    """Registra la latencia de la petición por endpoint y sucursal."""
+    inicio = g.get('inicio_peticion')
+    if inicio is not None:
+        observar(
+            HIST_PETICION_SEGUNDOS,
+            time.perf_counter() - inicio,
+            metodo=request.method,
+            estado=str(respuesta.status_code)
+        )
+    return respuesta
+
+
+@app.route('/metrics', methods=['GET'])
+def exponer_metricas():
+    """Expone las métricas en formato de texto de Prometheus."""
+    return Response(metricas.exponer(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 
 # ============================================================================
@@ -60,11 +161,12 @@ def index():
     return jsonify({
         'sistema': 'Sistema Multi-Agente de Supermercado',
         'version': '2.0.0',
-        'agentes_recomendadores_activos': len(agentes_recomendadores),
+        'agentes_recomendadores_activos': len(agentes_recomendadores.activos()),
         'agentes_compradores_activos': len(agentes_compradores),
         'sucursales_disponibles': list(agentes_recomendadores.keys()),
         'endpoints': {
             'recomendaciones': '/api/recomendador/solicitar',
+            'frente_pareto': '/api/recomendador/frente_pareto',
             'estado_recomendador': '/api/recomendador/estado/<sucursal_id>',
             'crear_comprador': '/api/comprador/crear',
             'iniciar_compra': '/api/comprador/iniciar_compra',
@@ -72,27 +174,150 @@ def index():
             'estado_comprador': '/api/comprador/estado/<comprador_id>',
             'inventario': '/api/sucursal/<sucursal_id>/inventario',
             'mapa': '/api/sucursal/<sucursal_id>/mapa',
-            'sucursales': '/api/sucursales'
+            'sucursales': '/api/sucursales',
+            'listo': '/api/listo',
+            'metricas': '/metrics'
         }
     })
 
 
+@app.route('/api/listo', methods=['GET'])
+def estado_preparacion():
+    """
+    Indica qué sucursales tienen su agente recomendador construido.
+    Responde 503 mientras la precarga no haya terminado.
+    """
+    estado = agentes_recomendadores.estado()
+    return jsonify(estado), 200 if estado['listo'] else 503
+
+
+def opciones_recomendacion(datos):
+    """
+    Lee las opciones de generación de una solicitud de recomendación.
+    
+    Args:
+        datos: Cuerpo de la solicitud
+        
+    Returns:
+        Tupla (opciones para generar_recomendaciones, mensaje de error o None)
+    """
+    semilla = datos.get('semilla')
+    if semilla is not None and (
+        not isinstance(semilla, int) or isinstance(semilla, bool) or not 0 <= semilla <= SEMILLA_MAXIMA
+    ):
+        return None, f'semilla debe ser un entero entre 0 y {SEMILLA_MAXIMA}'
+    
+    optimizador = datos.get('optimizador')
+    if optimizador is not None and optimizador != 'auto' and optimizador not in OPTIMIZADORES:
+        return None, f'optimizador debe ser uno de: {", ".join(OPTIMIZADORES)}, auto'
+    
+    latencia_ms = datos.get('latencia_ms')
+    if latencia_ms is not None and (
+        not isinstance(latencia_ms, (int, float)) or isinstance(latencia_ms, bool) or latencia_ms <= 0
+    ):
+        return None, 'latencia_ms debe ser un número mayor a 0'
+    
+    arranque_tibio = datos.get('arranque_tibio')
+    if arranque_tibio is not None and not isinstance(arranque_tibio, bool):
+        return None, 'arranque_tibio debe ser true o false'
+    
+    usar_plantillas = datos.get('usar_plantillas')
+    if usar_plantillas is not None and not isinstance(usar_plantillas, bool):
+        return None, 'usar_plantillas debe ser true o false'
+    
+    return {
+        'semilla': semilla,
+        'optimizador': optimizador,
+        'latencia_ms': latencia_ms,
+        'arranque_tibio': arranque_tibio,
+        'usar_plantillas': usar_plantillas
+    }, None
+
+
+def responder_json(datos, estado=200):
+    """
+    Responde datos JSON con el codificador rápido.
+    
+    Con `?formato_ruta=compacto` las rutas detalladas se envían en su forma
+    compacta. Las respuestas con muchos pasos de ruta (o con `?stream=1`) se
+    envían por partes con transferencia fragmentada.
+    
+    Args:
+        datos: Objeto serializable
+        estado: Código de estado HTTP
+    """
+    if request.args.get('formato_ruta') == 'compacto':
+        datos = compactar_rutas(datos)
+    
+    if request.args.get('stream') == '1' or contar_pasos(datos) >= UMBRAL_PASOS_STREAMING:
+        return Response(iterar_json(datos), status=estado, mimetype='application/json')
+    
+    with medir(HIST_JSON_SEGUNDOS):
+        cuerpo = codificar(datos)
+    return Response(cuerpo, status=estado, mimetype='application/json')
+
+
+def responder_cacheado(clave, version, generar):
+    """
+    Responde con el JSON cacheado de un recurso estático.
+    Atiende If-None-Match con 304 y sirve la variante comprimida aceptada.
+    
+    Args:
+        clave: Identificador del recurso en la caché
+        version: Versión actual de los datos fuente
+        generar: Función que produce los datos si la caché está desactualizada
+    """
+    entrada = cache_respuestas.obtener(clave, version, generar)
+    estado, cuerpo, cabeceras = preparar_respuesta(
+        entrada,
+        request.headers.get('If-None-Match'),
+        request.headers.get('Accept-Encoding')
+    )
+    return Response(cuerpo, status=estado, headers=cabeceras, mimetype='application/json')
+
+
 @app.route('/api/sucursales', methods=['GET'])
 def listar_sucursales():
-    """Lista todas las sucursales disponibles."""
-    sucursales = []
-    for sucursal_id, agente in agentes_recomendadores.items():
-        sucursales.append({
-            'sucursal_id': sucursal_id,
-            'nombre': agente.nombre_sucursal,
-            'productos_disponibles': len(agente.productos),
-            'estado': agente.estado
-        })
+    """
+    Lista todas las sucursales disponibles.
+    Las sucursales cuyo agente aún no se construyó se listan con su estado
+    de carga, sin forzar su construcción.
+    """
+    activos = agentes_recomendadores.activos()
     
-    return jsonify({
-        'total': len(sucursales),
-        'sucursales': sucursales
-    })
+    def generar():
+        sucursales = []
+        for sucursal_id in agentes_recomendadores.keys():
+            agente = activos.get(sucursal_id)
+            if agente is None:
+                # Aún cargando: nombre y cantidad salen del archivo compilado (o provisorios)
+                metadatos = metadatos_sucursal(sucursal_id)
+                sucursales.append({
+                    'sucursal_id': sucursal_id,
+                    'nombre': metadatos['nombre'],
+                    'productos_disponibles': metadatos['productos'],
+                    'estado': agentes_recomendadores.estado_sucursal(sucursal_id)
+                })
+                continue
+            sucursales.append({
+                'sucursal_id': sucursal_id,
+                'nombre': agente.nombre_sucursal,
+                'productos_disponibles': len(agente.productos),
+                'estado': agente.estado
+            })
+        
+        return {
+            'total': len(sucursales),
+            'sucursales': sucursales
+        }
+    
+    version = tuple(
+        (sucursal_id, activos[sucursal_id].version_inventario, activos[sucursal_id].estado)
+        if sucursal_id in activos
+        else (sucursal_id, agentes_recomendadores.estado_sucursal(sucursal_id))
+        for sucursal_id in agentes_recomendadores.keys()
+    )
+    return responder_cacheado(('sucursales',), version, generar)
 
 
 @app.route('/api/sucursal/<sucursal_id>/inventario', methods=['GET'])
@@ -102,33 +327,123 @@ def obtener_inventario(sucursal_id):
         return jsonify({
             'error': f'Sucursal {sucursal_id} no encontrada'
         }), 404
+    
+    agente = agentes_recomendadores[sucursal_id]
+    return responder_cacheado(
+        ('inventario', sucursal_id),
+        agente.version_inventario,
+        agente.obtener_inventario
+    )
+
+
+@app.route('/api/sucursal/<sucursal_id>/inventario/cambios', methods=['POST'])
+def cambiar_inventario(sucursal_id):
+    """
+    Aplica un lote de cambios al inventario de una sucursal sin reiniciar el agente.
+    
+    Body JSON:
+    {
+        "cambios": [
+            {"op": "precio", "id": 1, "precio": 9.5},
+            {"op": "stock", "id": 2, "stock": 0},
+            {"op": "agregar", "producto": {"id": 99, "nombre": "Yogurt 1L", "precio": 12.0,
+                                           "categoria": "lacteos"}, "zona": "lacteos"},
+            {"op": "eliminar", "id": 3},
+            {"op": "actualizar", "id": 4, "campos": {"importancia": 0.7}}
+        ]
+    }
+    
+    El lote es atómico. "zona" (opcional) ubica un producto nuevo en una zona del mapa.
+    """
+    if sucursal_id not in agentes_recomendadores:
+        return jsonify({
+            'error': f'Sucursal {sucursal_id} no encontrada'
+        }), 404
+    
+    datos = request.get_json(silent=True) or {}
+    cambios = datos.get('cambios')
+    if not isinstance(cambios, list) or not cambios:
+        return jsonify({'error': 'Debe proporcionar una lista "cambios"'}), 400
+    
+    ubicaciones = {
+        cambio['producto']['id']: cambio['zona']
+        for cambio in cambios
+        if isinstance(cambio, dict) and cambio.get('op') == 'agregar' and cambio.get('zona')
+        and isinstance(cambio.get('producto'), dict)
+        # Los ids inválidos no se ubican: el lote los rechaza con 400
+        and isinstance(cambio['producto'].get('id'), int)
+    }
+    
+    try:
+        if ubicaciones:
+            zonas = obtener_modelo_sucursal(sucursal_id).mapa.get('zonas_productos', {})
+            desconocidas = sorted(set(ubicaciones.values()) - set(zonas))
+            if desconocidas:
+                return jsonify({
+                    'error': f'Zonas no encontradas en el mapa: {", ".join(desconocidas)}'
+                }), 400
+        
+        agente = agentes_recomendadores[sucursal_id]
+        version = agente.aplicar_cambios(cambios)
+        actualizar_inventario_modelo(sucursal_id, agente.inventario, ubicaciones)
+    except CambioInvalido as e:
+        return jsonify({'error': 'Cambio de inventario inválido', 'detalle': str(e)}), 400
+    except SucursalNoEncontrada as e:
+        return jsonify({'error': str(e)}), 404
+    
+    return jsonify({
+        'sucursal_id': sucursal_id,
+        'version_inventario': version,
+        'cambios_aplicados': len(cambios),
+        'productos_disponibles': len(agente.productos)
+    })
 
 
 @app.route('/api/sucursal/<sucursal_id>/mapa', methods=['GET'])
 def obtener_mapa(sucursal_id):
     """Obtiene el mapa de una sucursal."""
-    import json
-    
-    ruta_mapa = os.path.join(
-        os.path.dirname(__file__),
-        'data', 'mapas', f'{sucursal_id}.json'
-    )
-    
     try:
-        with open(ruta_mapa, 'r', encoding='utf-8') as archivo:
-            return jsonify(json.load(archivo))
-    except FileNotFoundError:
+        modelo = obtener_modelo_sucursal(sucursal_id)
+    except SucursalNoEncontrada:
         return jsonify({
             'error': f'Mapa de {sucursal_id} no encontrado'
         }), 404
-    except json.JSONDecodeError:
+    except ValueError:
         return jsonify({
             'error': f'Error al decodificar el mapa de {sucursal_id}'
         }), 500
-            
     
-    agente = agentes_recomendadores[sucursal_id]
-    return jsonify(agente.obtener_inventario())
+    return responder_cacheado(('mapa', sucursal_id), modelo.version, lambda: modelo.mapa)
+
+
+@app.route('/api/sucursal/<sucursal_id>/mapa/obstaculos', methods=['POST'])
+def cambiar_obstaculos(sucursal_id):
+    """
+    Bloquea o libera celdas del mapa y repara las rutas de los compradores en curso.
+    
+    Body JSON:
+    {
+        "agregar": [{"fila": 6, "columna": 12}],
+        "quitar": [{"fila": 9, "columna": 4}]
+    }
+    """
+    datos = request.get_json(silent=True) or {}
+    try:
+        agregar = [(int(c['fila']), int(c['columna'])) for c in datos.get('agregar', [])]
+        quitar = [(int(c['fila']), int(c['columna'])) for c in datos.get('quitar', [])]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Cada celda debe tener "fila" y "columna" enteras'}), 400
+    if not agregar and not quitar:
+        return jsonify({'error': 'Debe proporcionar celdas en "agregar" o "quitar"'}), 400
+    
+    try:
+        resumen = obtener_replanificador(sucursal_id).aplicar_cambios(agregar, quitar)
+    except SucursalNoEncontrada:
+        return jsonify({'error': f'Mapa de {sucursal_id} no encontrado'}), 404
+    except ValueError as e:
+        return jsonify({'error': 'Cambio de mapa inválido', 'detalle': str(e)}), 400
+    
+    return jsonify(resumen)
 
 
 @app.route('/api/recomendador/estado/<sucursal_id>', methods=['GET'])
@@ -152,8 +467,18 @@ def solicitar_recomendacion():
     {
         "sucursal_id": "SUC001",
         "presupuesto": 100.0,
-        "categorias_preferidas": ["lacteos", "panaderia"]  // Opcional
+        "categorias_preferidas": ["lacteos", "panaderia"],  // Opcional
+        "semilla": 42,                                      // Opcional
+        "optimizador": "auto",                              // Opcional
+        "latencia_ms": 100,                                 // Opcional, para "auto"
+        "arranque_tibio": true,                             // Opcional
+        "usar_plantillas": false                            // Opcional
     }
+    
+    La respuesta incluye la semilla y el optimizador usados: repetirlos con
+    el mismo inventario reproduce las mismas listas (salvo con arranque tibio
+    o con "usar_plantillas": true; con semilla las plantillas se omiten por
+    defecto).
     """
     try:
         datos = request.get_json()
@@ -165,6 +490,7 @@ def solicitar_recomendacion():
         sucursal_id = datos.get('sucursal_id')
         presupuesto = datos.get('presupuesto')
         categorias_preferidas = datos.get('categorias_preferidas', [])
+        opciones, error = opciones_recomendacion(datos)
         
         if not sucursal_id:
             return jsonify({'error': 'sucursal_id es requerido'}), 400
@@ -172,6 +498,9 @@ def solicitar_recomendacion():
         if not presupuesto or presupuesto <= 0:
             return jsonify({'error': 'presupuesto debe ser mayor a 0'}), 400
         
+        if error:
+            return jsonify({'error': error}), 400
+        
         # Verificar que el agente existe
         if sucursal_id not in agentes_recomendadores:
             return jsonify({
@@ -182,10 +511,74 @@ def solicitar_recomendacion():
         agente = agentes_recomendadores[sucursal_id]
         recomendaciones = agente.generar_recomendaciones(
             presupuesto=presupuesto,
-            categorias_preferidas=categorias_preferidas if categorias_preferidas else None
+            categorias_preferidas=categorias_preferidas if categorias_preferidas else None,
+            **opciones
         )
         
-        return jsonify(recomendaciones), 200
+        return responder_json(recomendaciones)
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error al procesar solicitud',
+            'detalle': str(e)
+        }), 500
+
+
+@app.route('/api/recomendador/frente_pareto', methods=['POST'])
+def solicitar_frente_pareto():
+    """
+    Solicita el frente de Pareto de listas de compras a un agente recomendador.
+    
+    Body JSON:
+    {
+        "sucursal_id": "SUC001",
+        "presupuesto": 100.0,
+        "categorias_preferidas": ["lacteos", "panaderia"],  // Opcional
+        "semilla": 42,                                      // Opcional
+        "tamano_frente": 12                                 // Opcional, 1-50
+    }
+    
+    Una sola optimización devuelve varias listas con distintos compromisos
+    entre ajuste al presupuesto, importancia, variedad y categorías.
+    """
+    try:
+        datos = request.get_json()
+        
+        if not datos:
+            return jsonify({'error': 'No se proporcionaron datos'}), 400
+        
+        sucursal_id = datos.get('sucursal_id')
+        presupuesto = datos.get('presupuesto')
+        categorias_preferidas = datos.get('categorias_preferidas', [])
+        opciones, error = opciones_recomendacion(datos)
+        tamano = datos.get('tamano_frente', CAPACIDAD_FRENTE)
+        
+        if not sucursal_id:
+            return jsonify({'error': 'sucursal_id es requerido'}), 400
+        
+        if not presupuesto or presupuesto <= 0:
+            return jsonify({'error': 'presupuesto debe ser mayor a 0'}), 400
+        
+        if error:
+            return jsonify({'error': error}), 400
+        
+        if not isinstance(tamano, int) or isinstance(tamano, bool) or not 1 <= tamano <= 50:
+            return jsonify({'error': 'tamano_frente debe ser un entero entre 1 y 50'}), 400
+        
+        if sucursal_id not in agentes_recomendadores:
+            return jsonify({
+                'error': f'Agente recomendador no encontrado para {sucursal_id}'
+            }), 404
+        
+        agente = agentes_recomendadores[sucursal_id]
+        frente = agente.generar_frente_pareto(
+            presupuesto=presupuesto,
+            categorias_preferidas=categorias_preferidas if categorias_preferidas else None,
+            semilla=opciones['semilla'],
+            tamano=tamano
+        )
+        
+        return responder_json(frente)
         
     except Exception as e:
         return jsonify({
@@ -247,6 +640,27 @@ def crear_comprador():
         }), 500
 
 
+def recomendacion_exacta(recomendaciones):
+    """
+    Recomendación exacta de una respuesta de generar_recomendaciones.
+
+    Returns:
+        La recomendación, o None si no se generó ninguna (p. ej. sin stock)
+    """
+    return next(
+        (r for r in recomendaciones.get('recomendaciones', []) if r['tipo'] == 'exacta'), None
+    )
+
+
+def responder_sin_stock(recomendaciones):
+    """409 para una compra sin recomendación porque no quedan productos disponibles."""
+    return jsonify({
+        'error': 'Stock insuficiente',
+        'detalle': recomendaciones.get('error', 'No se pudo generar una recomendación'),
+        'disponibles': {}
+    }), 409
+
+
 @app.route('/api/comprador/iniciar_compra', methods=['POST'])
 def iniciar_compra():
     """
@@ -293,12 +707,12 @@ def iniciar_compra():
         
         agente_comprador = agentes_compradores[comprador_id]
         
-        print(f"[API] Estado del comprador antes de ingresar: {agente_comprador.estado}")
-        print(f"[API] Sucursal actual: {agente_comprador.sucursal_id}")
-        
         # Si ya está comprando o finalizado, no replanificar
         if agente_comprador.estado in ["comprando", "finalizado"]:
-            print(f"[API] Comprador ya en estado '{agente_comprador.estado}', retornando estado actual")
+            registro.debug(
+                "Comprador %s ya en estado '%s', retornando estado actual",
+                comprador_id, agente_comprador.estado
+            )
             return jsonify({
                 'mensaje': f'Compra ya {agente_comprador.estado}',
                 'comprador_id': comprador_id,
@@ -309,23 +723,28 @@ def iniciar_compra():
         # Ingresar a la sucursal (o re-ingresar si ya está ahí)
         agente_comprador.ingresar_a_sucursal(sucursal_id)
         
-        print(f"[API] Estado del comprador después de ingresar: {agente_comprador.estado}")
-        
         # Obtener lista de compras
         lista_compras = datos.get('lista_compras')
         
-        print(f"[API] Lista de compras recibida: {lista_compras}")
+        registro.debug(
+            "Comprador %s en %s, lista de compras con %d productos",
+            comprador_id, sucursal_id, len(lista_compras) if lista_compras else 0
+        )
         
         if not lista_compras:
             # Si no se proporciona lista, solicitar recomendación
             presupuesto = datos.get('presupuesto')
             categorias_preferidas = datos.get('categorias_preferidas', [])
+            opciones, error = opciones_recomendacion(datos)
             
             if not presupuesto or presupuesto <= 0:
                 return jsonify({
                     'error': 'Debe proporcionar "lista_compras" o "presupuesto"'
                 }), 400
             
+            if error:
+                return jsonify({'error': error}), 400
+            
             # Obtener recomendación del agente recomendador
             if sucursal_id not in agentes_recomendadores:
                 return jsonify({
@@ -335,11 +754,14 @@ def iniciar_compra():
             agente_recomendador = agentes_recomendadores[sucursal_id]
             recomendaciones = agente_recomendador.generar_recomendaciones(
                 presupuesto=presupuesto,
-                categorias_preferidas=categorias_preferidas if categorias_preferidas else None
+                categorias_preferidas=categorias_preferidas if categorias_preferidas else None,
+                **opciones
             )
             
             # Usar la recomendación exacta
-            rec_exacta = next(r for r in recomendaciones['recomendaciones'] if r['tipo'] == 'exacta')
+            rec_exacta = recomendacion_exacta(recomendaciones)
+            if rec_exacta is None:
+                return responder_sin_stock(recomendaciones)
             lista_compras = rec_exacta['productos']
         
         # Planificar compra
@@ -352,6 +774,12 @@ def iniciar_compra():
             'estado': agente_comprador.obtener_estado()
         }), 200
         
+    except StockInsuficiente as e:
+        return jsonify({
+            'error': 'Stock insuficiente',
+            'detalle': str(e),
+            'disponibles': {str(pid): n for pid, n in e.faltantes.items()}
+        }), 409
     except Exception as e:
         return jsonify({
             'error': 'Error al iniciar compra',
@@ -390,24 +818,20 @@ def compra_completa():
         
         # Si ya está finalizado, retornar el último resultado en lugar de error
         if agente.estado == "finalizado":
-            print(f"[API] Comprador {comprador_id} ya finalizó. Retornando último resultado.")
-            return jsonify({
-                'comprador_id': agente.comprador_id,
-                'sucursal_id': agente.sucursal_id,
-                'sucursal_nombre': agente.mapa_sucursal['nombre'] if agente.mapa_sucursal else None,
-                'productos_recolectados': agente.productos_recolectados,
-                'ruta_detallada': agente._generar_ruta_detallada(),
-                'distancia_total': agente.distancia_total,
-                'total_items': sum(p['cantidad'] for p in agente.productos_recolectados),
-                'tiempo_estimado': agente._estimar_tiempo(),
-                'posicion_final': agente.posicion_actual,
-                'estado': agente.estado
-            }), 200
+            registro.debug("Comprador %s ya finalizó. Retornando último resultado.", comprador_id)
+            return responder_json(agente.obtener_resultado())
         
         resultado = agente.ejecutar_compra()
         
-        return jsonify(resultado), 200
+        return responder_json(resultado)
         
+    except StockInsuficiente as e:
+        # La reserva venció y las unidades ya no alcanzan
+        return jsonify({
+            'error': 'Stock insuficiente',
+            'detalle': str(e),
+            'disponibles': {str(pid): n for pid, n in e.faltantes.items()}
+        }), 409
     except Exception as e:
         return jsonify({
             'error': 'Error al completar compra',
@@ -448,12 +872,16 @@ def flujo_completo():
         sucursal_id = datos.get('sucursal_id')
         presupuesto = datos.get('presupuesto')
         categorias_preferidas = datos.get('categorias_preferidas', [])
+        opciones, error = opciones_recomendacion(datos)
         
         if not sucursal_id or not presupuesto:
             return jsonify({
                 'error': 'sucursal_id y presupuesto son requeridos'
             }), 400
         
+        if error:
+            return jsonify({'error': error}), 400
+        
         # 1. Crear comprador
         comprador_id = f'COMP{len(agentes_compradores) + 1:03d}'
         agente_comprador = AgenteComprador(comprador_id)
@@ -468,28 +896,37 @@ def flujo_completo():
         agente_recomendador = agentes_recomendadores[sucursal_id]
         recomendaciones = agente_recomendador.generar_recomendaciones(
             presupuesto=presupuesto,
-            categorias_preferidas=categorias_preferidas if categorias_preferidas else None
+            categorias_preferidas=categorias_preferidas if categorias_preferidas else None,
+            **opciones
         )
         
         # 3. Ingresar a sucursal
         agente_comprador.ingresar_a_sucursal(sucursal_id)
         
         # 4. Planificar compra con la recomendación exacta
-        rec_exacta = next(r for r in recomendaciones['recomendaciones'] if r['tipo'] == 'exacta')
+        rec_exacta = recomendacion_exacta(recomendaciones)
+        if rec_exacta is None:
+            return responder_sin_stock(recomendaciones)
         agente_comprador.planificar_compra(rec_exacta['productos'])
         
         # 5. Ejecutar compra
         resultado_compra = agente_comprador.ejecutar_compra()
         
         # 6. Retornar resultado completo en formato simplificado
-        return jsonify({
+        return responder_json({
             'comprador_id': comprador_id,
             'sucursal_id': sucursal_id,
             'sucursal_nombre': recomendaciones['sucursal_nombre'],
             'recomendacion': rec_exacta,  # Solo la recomendación exacta
             'navegacion': resultado_compra  # Resultados de la compra
-        }), 200
+        })
         
+    except StockInsuficiente as e:
+        return jsonify({
+            'error': 'Stock insuficiente',
+            'detalle': str(e),
+            'disponibles': {str(pid): n for pid, n in e.faltantes.items()}
+        }), 409
     except Exception as e:
         return jsonify({
             'error': 'Error en flujo completo',
@@ -501,10 +938,34 @@ def flujo_completo():
 # WEBSOCKETS - Para mantener agentes reactivos
 # ============================================================================
 
-@socketio.on('connect')
+def evento_socket(evento):
+    """
+    Registra un manejador de Socket.IO que reinicia las etiquetas de métricas.
+    
+    Los eventos se atienden en hilos que también atienden peticiones HTTP;
+    sin reiniciarlas, las mediciones heredarían el endpoint y la sucursal de
+    la última petición del hilo.
+    
+    Args:
+        evento: Nombre del evento de Socket.IO
+    """
+    def decorador(manejador):
+        @functools.wraps(manejador)
+        def envoltura(*args):
+            if metricas.habilitado:
+                datos = args[0] if args and isinstance(args[0], dict) else {}
+                reiniciar_etiquetas(
+                    endpoint=f'socket:{evento}', sucursal=str(datos.get('sucursal_id') or '')
+                )
+            return manejador(*args)
+        return socketio.on(evento)(envoltura)
+    return decorador
+
+
+@evento_socket('connect')
 def handle_connect():
     """Maneja la conexión de un cliente WebSocket."""
-    print(f"[WebSocket] Cliente conectado: {request.sid}")
+    registro.info("Cliente WebSocket conectado: %s", request.sid, extra={'evento': 'websocket_conexion'})
     emit('connection_response', {
         'status': 'connected',
         'message': 'Conectado al sistema de agentes',
@@ -512,13 +973,13 @@ def handle_connect():
     })
 
 
-@socketio.on('disconnect')
+@evento_socket('disconnect')
 def handle_disconnect():
     """Maneja la desconexión de un cliente WebSocket."""
-    print(f"[WebSocket] Cliente desconectado: {request.sid}")
+    registro.info("Cliente WebSocket desconectado: %s", request.sid, extra={'evento': 'websocket_conexion'})
 
 
-@socketio.on('registrar_recomendador')
+@evento_socket('registrar_recomendador')
 def handle_registrar_recomendador(data):
     """Registra un agente recomendador en una sala específica."""
     sucursal_id = data.get('sucursal_id')
@@ -528,12 +989,12 @@ def handle_registrar_recomendador(data):
             'sucursal_id': sucursal_id,
             'mensaje': f'Registrado en sala del agente recomendador {sucursal_id}'
         })
-        print(f"[WebSocket] Agente recomendador {sucursal_id} registrado en sala")
+        registro.debug("Agente recomendador %s registrado en sala", sucursal_id)
     else:
         emit('error', {'mensaje': f'Sucursal {sucursal_id} no encontrada'})
 
 
-@socketio.on('solicitar_recomendacion_ws')
+@evento_socket('solicitar_recomendacion_ws')
 def handle_solicitar_recomendacion_ws(data):
     """
     Maneja solicitudes de recomendación vía WebSocket.
@@ -543,21 +1004,27 @@ def handle_solicitar_recomendacion_ws(data):
         sucursal_id = data.get('sucursal_id')
         presupuesto = data.get('presupuesto')
         categorias_preferidas = data.get('categorias_preferidas', [])
+        opciones, error = opciones_recomendacion(data)
         
         if sucursal_id not in agentes_recomendadores:
             emit('error', {'mensaje': f'Agente no encontrado para {sucursal_id}'})
             return
         
+        if error:
+            emit('error', {'mensaje': error})
+            return
+        
         # Generar recomendaciones
         agente = agentes_recomendadores[sucursal_id]
         recomendaciones = agente.generar_recomendaciones(
             presupuesto=presupuesto,
-            categorias_preferidas=categorias_preferidas if categorias_preferidas else None
+            categorias_preferidas=categorias_preferidas if categorias_preferidas else None,
+            **opciones
         )
         
         # Enviar respuesta
         emit('recomendaciones_generadas', recomendaciones)
-        print(f"[WebSocket] Recomendaciones enviadas para {sucursal_id}")
+        registro.debug("Recomendaciones enviadas por WebSocket para %s", sucursal_id)
         
     except Exception as e:
         emit('error', {
@@ -571,8 +1038,12 @@ def handle_solicitar_recomendacion_ws(data):
 # ============================================================================
 
 if __name__ == '__main__':
+    # Configurar el registro (LOG_NIVEL, LOG_FORMATO)
+    configurar_registro()
+    
     # Inicializar agentes recomendadores
     inicializar_agentes_recomendadores()
+    iniciar_vigilante()
     
     # Iniciar servidor
     print("\n🚀 Servidor Flask iniciado")
@@ -4,84 +4,144 @@ Este agente es responsable de navegar por la sucursal y recolectar productos
 de manera eficiente usando planificación de rutas con A*.
 """
 
-import json
-import os
-from typing import List, Dict, Tuple, Optional
+from array import array
+from typing import Callable, List, Dict, Tuple, Optional
 from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.busqueda_espacio_tiempo import BusquedaEspacioTiempo
+from utils.grilla_ponderada import es_mapa_ponderado, obtener_grilla
+from utils.planificador_incremental import BusquedaIncremental
+from models.libro_stock import obtener_libro_stock
+from models.modelo_sucursal import ModeloSucursal, obtener_modelo_sucursal
+from models.replanificador import obtener_replanificador
+from models.tabla_reservas import INTENTOS_RESERVA, RUTAS_COOPERATIVAS, obtener_tabla_reservas
+from utils.registro import obtener_logger
+from utils.metricas import etiquetar
+
+
+class ProductoPlanificado:
+    """
+    Producto que el comprador planea recoger en una zona del mapa.
+    Estructura compacta que evita un diccionario por producto.
+    """
+    
+    __slots__ = ('producto_id', 'nombre', 'cantidad', 'posicion')
+    
+    def __init__(self, producto_id: int, nombre: str, cantidad: int, posicion: Tuple[int, int]):
+        self.producto_id = producto_id
+        self.nombre = nombre
+        self.cantidad = cantidad
+        self.posicion = posicion
+    
+    def a_dict(self) -> Dict:
+        """Retorna la representación serializable del producto."""
+        return {
+            'producto_id': self.producto_id,
+            'nombre': self.nombre,
+            'cantidad': self.cantidad,
+            'posicion': self.posicion
+        }
 
 
 class AgenteComprador:
     """
     Agente inteligente que navega por una sucursal para recolectar productos.
     Utiliza A* para planificar rutas óptimas.
+    
+    El mapa y el inventario no se copian en cada agente: se referencia el
+    ModeloSucursal compartido y el agente solo guarda su estado mutable
+    (posición, ruta y productos) en estructuras compactas.
     """
     
-    def __init__(self, comprador_id: str):
+    __slots__ = (
+        'comprador_id',
+        'sucursal_id',
+        'modelo',
+        'posicion_actual',
+        'lista_compras',
+        '_cantidades_reservadas',
+        'productos_recolectados',
+        '_ruta',
+        'distancia_total',
+        'estado',
+        'registro',
+        'cooperativo',
+        '_paso_inicio',
+    )
+    
+    # A* no guarda estado entre búsquedas, se comparte entre todos los agentes
+    a_estrella = BusquedaAEstrella()
+    a_estrella_espacio_tiempo = BusquedaEspacioTiempo()
+    
+    def __init__(self, comprador_id: str, cooperativo: Optional[bool] = None):
         """
         Inicializa el agente comprador.
         
         Args:
             comprador_id: Identificador único del comprador
+            cooperativo: Planificar evitando las rutas reservadas por otros
+                compradores de la sucursal (por defecto RUTAS_COOPERATIVAS)
         """
+        self.cooperativo = RUTAS_COOPERATIVAS if cooperativo is None else cooperativo
         self.comprador_id = comprador_id
         self.sucursal_id = None
-        self.mapa_sucursal = None
-        self.inventario_sucursal = None
+        self.modelo: Optional[ModeloSucursal] = None
         self.posicion_actual = None
         self.lista_compras = None
-        self.productos_recolectados = []
-        self.ruta_completa = []
+        # Unidades reservadas en el libro de stock al planificar
+        self._cantidades_reservadas: Dict[int, int] = {}
+        self.productos_recolectados: List[ProductoPlanificado] = []
+        self._ruta = array('i')
+        # Paso de tiempo (de la tabla de reservas) en que empieza la ruta
+        self._paso_inicio = 0
         self.distancia_total = 0
         self.estado = "disponible"  # disponible, en_sucursal, comprando, finalizado
-        self.a_estrella = BusquedaAEstrella()
+        self.registro = obtener_logger('comprador', comprador_id=comprador_id)
         
-        print(f"[Agente Comprador] Inicializado con ID: {comprador_id}")
+        self.registro.debug("Agente comprador inicializado")
     
-    def _cargar_mapa(self, sucursal_id: str) -> Dict:
-        """
-        Carga el mapa de la sucursal desde el archivo JSON.
-        
-        Args:
-            sucursal_id: Identificador de la sucursal
-            
-        Returns:
-            Diccionario con la información del mapa
-        """
-        ruta_mapa = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'data', 'mapas', f'{sucursal_id}.json'
-        )
-        
-        try:
-            with open(ruta_mapa, 'r', encoding='utf-8') as archivo:
-                return json.load(archivo)
-        except FileNotFoundError:
-            raise ValueError(f"No se encontró el mapa para la sucursal {sucursal_id}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Error al decodificar el mapa de {sucursal_id}")
+    @property
+    def mapa_sucursal(self) -> Optional[Dict]:
+        """Mapa compartido de la sucursal actual (solo lectura)."""
+        return self.modelo.mapa if self.modelo else None
     
-    def _cargar_inventario(self, sucursal_id: str) -> Dict:
+    @property
+    def inventario_sucursal(self) -> Optional[Dict]:
+        """Inventario compartido de la sucursal actual (solo lectura)."""
+        return self.modelo.inventario if self.modelo else None
+    
+    @property
+    def ruta_completa(self) -> List[Tuple[int, int]]:
+        """Ruta planificada como lista de posiciones (fila, columna)."""
+        if not self._ruta:
+            return []
+        columnas = self.modelo.dimensiones[1]
+        return [divmod(celda, columnas) for celda in self._ruta]
+    
+    @ruta_completa.setter
+    def ruta_completa(self, ruta: List[Tuple[int, int]]):
+        # La ruta se guarda como índices de celda empaquetados (4 bytes por paso)
+        if not ruta:
+            self._ruta = array('i')
+            return
+        columnas = self.modelo.dimensiones[1]
+        self._ruta = array('i', (fila * columnas + columna for fila, columna in ruta))
+    
+    @property
+    def pasos_espera(self) -> int:
         """
-        Carga el inventario de la sucursal desde el archivo JSON.
-        
-        Args:
-            sucursal_id: Identificador de la sucursal
-            
-        Returns:
-            Diccionario con la información del inventario
+        Pasos de la ruta en que el comprador sigue en su celda: esperas por
+        otros compradores y, en rutas reservadas, los pasos extra de las
+        celdas con costo mayor que 1.
         """
-        ruta_inventario = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'data', 'inventario', f'{sucursal_id}.json'
-        )
-        
-        try:
-            with open(ruta_inventario, 'r', encoding='utf-8') as archivo:
-                return json.load(archivo)
-        except FileNotFoundError:
-            raise ValueError(f"No se encontró el inventario para la sucursal {sucursal_id}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Error al decodificar el inventario de {sucursal_id}")
+        return max(len(self._ruta) - 1 - self.distancia_total, 0)
+    
+    @property
+    def paso_actual(self) -> int:
+        """Índice en la ruta de la posición en que está ahora el comprador."""
+        if not self._ruta:
+            return 0
+        transcurridos = obtener_tabla_reservas(self.sucursal_id).tiempo_actual() - self._paso_inicio
+        return min(max(transcurridos, 0), len(self._ruta) - 1)
     
     def ingresar_a_sucursal(self, sucursal_id: str):
         """
@@ -90,21 +150,20 @@ class AgenteComprador:
         Args:
             sucursal_id: Identificador de la sucursal
         """
-        print(f"\n[Agente Comprador {self.comprador_id}] Ingresando a sucursal {sucursal_id}...")
-        
-        # Cargar mapa e inventario
+        # Referenciar el modelo compartido (mapa e inventario) de la sucursal
         self.sucursal_id = sucursal_id
-        self.mapa_sucursal = self._cargar_mapa(sucursal_id)
-        self.inventario_sucursal = self._cargar_inventario(sucursal_id)
+        etiquetar(sucursal=sucursal_id)
+        self.modelo = obtener_modelo_sucursal(sucursal_id)
         
         # Posicionarse en la entrada
-        entrada = self.mapa_sucursal['entrada']
-        self.posicion_actual = (entrada['fila'], entrada['columna'])
+        self.posicion_actual = self.modelo.entrada
         
         self.estado = "en_sucursal"
         
-        print(f"  ✓ Ingreso exitoso a {self.mapa_sucursal['nombre']}")
-        print(f"  ✓ Posición inicial: {self.posicion_actual}")
+        self.registro.debug(
+            "Ingreso a %s (%s), posición inicial %s",
+            self.modelo.nombre, sucursal_id, self.posicion_actual
+        )
     
     def _obtener_posicion_producto(self, producto_id: int) -> Optional[Tuple[int, int]]:
         """
@@ -116,13 +175,7 @@ class AgenteComprador:
         Returns:
             Tupla (fila, columna) o None si no se encuentra
         """
-        zonas_productos = self.mapa_sucursal.get('zonas_productos', {})
-        
-        for zona, info in zonas_productos.items():
-            if producto_id in info.get('productos', []):
-                return (info['fila'], info['columna'])
-        
-        return None
+        return self.modelo.posicion_producto(producto_id)
     
     def _obtener_producto_por_id(self, producto_id: int) -> Optional[Dict]:
         """
@@ -134,11 +187,7 @@ class AgenteComprador:
         Returns:
             Diccionario con información del producto o None
         """
-        productos = self.inventario_sucursal.get('productos', [])
-        for producto in productos:
-            if producto['id'] == producto_id:
-                return producto
-        return None
+        return self.modelo.producto(producto_id)
     
     def planificar_compra(self, lista_compras: List[Dict]):
         """
@@ -147,15 +196,25 @@ class AgenteComprador:
         Args:
             lista_compras: Lista de productos a comprar
                           [{'id': 1, 'nombre': '...', 'cantidad': 2}, ...]
+        
+        Raises:
+            StockInsuficiente: Si no hay unidades disponibles para reservar la lista
         """
         if self.estado != "en_sucursal":
             raise ValueError("El comprador debe estar en la sucursal para planificar")
         
-        print(f"\n[Agente Comprador {self.comprador_id}] Planificando compra...")
-        print(f"  Productos solicitados: {len(lista_compras)}")
+        # Reservar las unidades de los productos ubicables antes de planificar
+        cantidades = {}
+        for item in lista_compras:
+            if self._obtener_posicion_producto(item['id']) is not None:
+                cantidades[item['id']] = cantidades.get(item['id'], 0) + item['cantidad']
+        libro_stock = obtener_libro_stock(self.sucursal_id)
+        libro_stock.reservar(self.comprador_id, cantidades)
+        self._cantidades_reservadas = cantidades
         
         self.lista_compras = lista_compras
         self.estado = "comprando"
+        etiquetar(sucursal=self.sucursal_id)
         
         # Obtener posiciones de todos los productos
         posiciones_productos = []
@@ -169,59 +228,194 @@ class AgenteComprador:
                 # Evitar duplicados de posiciones
                 if posicion not in posiciones_productos:
                     posiciones_productos.append(posicion)
-                    productos_info.append({
-                        'producto_id': producto_id,
-                        'nombre': item['nombre'],
-                        'cantidad': item['cantidad'],
-                        'posicion': posicion
-                    })
+                    productos_info.append(ProductoPlanificado(
+                        producto_id, item['nombre'], item['cantidad'], posicion
+                    ))
             else:
-                print(f"  ⚠️  Producto {item['nombre']} (ID: {producto_id}) no encontrado en el mapa")
+                self.registro.warning(
+                    "Producto %s (ID: %s) no encontrado en el mapa",
+                    item['nombre'], producto_id,
+                    extra={'evento': 'producto_sin_zona'}
+                )
         
-        print(f"  Zonas a visitar: {len(posiciones_productos)}")
+        self.registro.debug(
+            "Planificando compra: %d productos solicitados, %d zonas a visitar",
+            len(lista_compras), len(posiciones_productos)
+        )
         
         # Planificar ruta usando A* con múltiples objetivos
         if posiciones_productos:
-            print("  Calculando ruta óptima con A*...")
-            
             try:
-                ruta, distancia = self.a_estrella.buscar_ruta_multiple(
-                    self.posicion_actual,
-                    posiciones_productos,
-                    self.mapa_sucursal
-                )
+                if self.cooperativo:
+                    ruta, distancia = self._planificar_ruta_cooperativa(posiciones_productos)
+                else:
+                    ruta, distancia = self._planificar_ruta(posiciones_productos)
                 
                 self.ruta_completa = ruta
                 self.distancia_total = distancia
-                
-                # Agregar ruta a la caja
-                caja = self.mapa_sucursal['caja']
-                posicion_caja = (caja['fila'], caja['columna'])
-                
-                if ruta[-1] != posicion_caja:
-                    ruta_a_caja = self.a_estrella.buscar_ruta(
-                        ruta[-1],
-                        posicion_caja,
-                        self.mapa_sucursal
-                    )
-                    
-                    if len(ruta_a_caja) > 1:
-                        self.ruta_completa.extend(ruta_a_caja[1:])
-                        self.distancia_total += len(ruta_a_caja) - 1
+                tabla = obtener_tabla_reservas(self.sucursal_id)
+                intervalo = tabla.intervalo(self.comprador_id) if self.cooperativo else None
+                self._paso_inicio = intervalo[0] if intervalo else tabla.tiempo_actual()
+                # Si el mapa cambia mientras recorre la ruta, se le repara
+                obtener_replanificador(self.sucursal_id).registrar(self)
                 
                 # Registrar productos recolectados
-                for info in productos_info:
-                    self.productos_recolectados.append(info)
+                self.productos_recolectados.extend(productos_info)
                 
-                print(f"  ✓ Ruta calculada exitosamente")
-                print(f"  ✓ Distancia total: {self.distancia_total} pasos")
-                print(f"  ✓ Productos a recolectar: {len(self.productos_recolectados)}")
+                self.registro.debug(
+                    "Ruta calculada: %d pasos, %d productos a recolectar",
+                    self.distancia_total, len(self.productos_recolectados)
+                )
                 
             except ValueError as e:
-                print(f"  ✗ Error al calcular ruta: {e}")
+                self.registro.error("Error al calcular ruta: %s", e)
+                libro_stock.liberar(self.comprador_id)
                 raise
         else:
-            print("  ⚠️  No hay productos para recolectar")
+            self.registro.debug("No hay productos para recolectar")
+    
+    def _planificar_ruta(self, posiciones_productos: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Planifica la ruta por las zonas de productos hasta la caja sin
+        considerar a otros compradores.
+        
+        Returns:
+            Tupla (ruta, distancia)
+        """
+        mapa = self.modelo.mapa
+        ruta, distancia = self.a_estrella.buscar_ruta_multiple(
+            self.posicion_actual,
+            posiciones_productos,
+            mapa
+        )
+        
+        # Agregar ruta a la caja
+        posicion_caja = self.modelo.caja
+        
+        if ruta[-1] != posicion_caja:
+            ruta_a_caja = self.a_estrella.buscar_ruta(
+                ruta[-1],
+                posicion_caja,
+                mapa
+            )
+            
+            if len(ruta_a_caja) > 1:
+                ruta.extend(ruta_a_caja[1:])
+                distancia += len(ruta_a_caja) - 1
+        
+        return ruta, distancia
+    
+    def _planificar_ruta_cooperativa(
+        self,
+        posiciones_productos: List[Tuple[int, int]]
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Planifica la ruta con A* de espacio-tiempo sobre la tabla de reservas
+        de la sucursal y la reserva. La ruta parte en el primer paso en que la
+        posición actual está libre. Si otro comprador reserva una celda de la
+        ruta entre la búsqueda y la reserva, se vuelve a planificar; tras
+        INTENTOS_RESERVA intentos se reserva la última ruta aunque tenga conflictos.
+        
+        Returns:
+            Tupla (posición en cada paso, distancia sin contar las esperas)
+        """
+        tabla = obtener_tabla_reservas(self.sucursal_id)
+        for intento in range(INTENTOS_RESERVA):
+            # Si otro comprador ocupa la posición de partida, se parte cuando la deje
+            tiempo_inicio = tabla.primer_paso_libre(
+                self.posicion_actual, tabla.tiempo_actual(), self.comprador_id
+            )
+            ruta, distancia = self.a_estrella_espacio_tiempo.buscar_ruta_multiple_reservada(
+                self.posicion_actual,
+                posiciones_productos,
+                self.modelo.caja,
+                self.modelo.mapa,
+                tabla,
+                tiempo_inicio,
+                self.comprador_id
+            )
+            if tabla.reservar(
+                self.comprador_id, ruta, tiempo_inicio, forzar=intento == INTENTOS_RESERVA - 1
+            ):
+                break
+        
+        esperas = len(ruta) - 1 - distancia
+        if esperas:
+            self.registro.debug(
+                "Ruta con %d pasos sin avanzar (esperas o celdas de costo mayor que 1)", esperas
+            )
+        return ruta, distancia
+    
+    def reparar_ruta(
+        self,
+        modelo: ModeloSucursal,
+        busqueda_hacia: Callable[[Tuple[int, int]], BusquedaIncremental]
+    ) -> bool:
+        """
+        Adopta el modelo con el mapa modificado y rehace la parte de la ruta
+        que falta recorrer: desde la posición actual, por las zonas aún no
+        visitadas en el mismo orden, hasta la caja. La ruta solo se reemplaza
+        si la anterior quedó bloqueada o si la nueva es más corta.
+        
+        Args:
+            modelo: Modelo de la sucursal con el mapa nuevo
+            busqueda_hacia: Retorna la búsqueda incremental compartida hacia un objetivo
+        
+        Returns:
+            True si la ruta cambió
+        
+        Raises:
+            ValueError: Si ya no existe ruta hasta alguna zona o la caja
+        """
+        self.modelo = modelo
+        if self.estado != "comprando" or not self._ruta:
+            return False
+        
+        ruta = self.ruta_completa
+        paso = self.paso_actual
+        # Zonas pendientes: las que la ruta alcanza por primera vez después del
+        # paso actual (las que no alcanzaba al planificar se siguen omitiendo)
+        primera_visita = {}
+        for i, posicion in enumerate(ruta):
+            primera_visita.setdefault(posicion, i)
+        pendientes = sorted(
+            {
+                p.posicion for p in self.productos_recolectados
+                if primera_visita.get(p.posicion, -1) > paso
+            },
+            key=primera_visita.__getitem__
+        )
+        pendientes.append(modelo.caja)
+        
+        restante = [ruta[paso]]
+        for objetivo in pendientes:
+            if restante[-1] != objetivo:
+                restante.extend(busqueda_hacia(objetivo).buscar_ruta(restante[-1])[1:])
+        
+        grilla = busqueda_hacia(modelo.caja).grilla
+        anterior = ruta[paso:]
+        bloqueada = any(not grilla.es_valida(posicion) for posicion in anterior)
+        # Las esperas de la ruta anterior no cuentan: la reparada no las tiene
+        movimientos = [anterior[0]] + [b for a, b in zip(anterior, anterior[1:]) if a != b]
+        if not bloqueada and grilla.costo_ruta(restante) >= grilla.costo_ruta(movimientos):
+            return False
+        
+        if self.cooperativo:
+            # La reserva ocupa cada celda tantos pasos como su costo redondeado hacia arriba
+            restante = grilla.ruta_en_pasos(restante)
+        ruta = ruta[:paso] + restante
+        self.ruta_completa = ruta
+        self.distancia_total = sum(1 for a, b in zip(ruta, ruta[1:]) if a != b)
+        if self.cooperativo:
+            # La ruta reparada no consulta las reservas: conserva las celdas de los demás
+            obtener_tabla_reservas(self.sucursal_id).reservar(
+                self.comprador_id, ruta, self._paso_inicio, forzar=True
+            )
+        self.registro.debug(
+            "Ruta reparada desde el paso %d: %d pasos restantes%s",
+            paso, len(restante) - 1, " (bloqueada)" if bloqueada else ""
+        )
+        return True
     
     def ejecutar_compra(self) -> Dict:
         """
@@ -233,34 +427,46 @@ class AgenteComprador:
         if self.estado != "comprando":
             raise ValueError("Debe planificar la compra primero")
         
-        print(f"\n[Agente Comprador {self.comprador_id}] Ejecutando compra...")
-        
-        # Generar ruta detallada con acciones
-        ruta_detallada = self._generar_ruta_detallada()
+        # Confirmar la reserva: las unidades salen del stock de la sucursal.
+        # Si venció mientras tanto se vuelve a reservar (StockInsuficiente si ya no alcanza)
+        libro_stock = obtener_libro_stock(self.sucursal_id)
+        if not libro_stock.vigente(self.comprador_id):
+            libro_stock.reservar(self.comprador_id, self._cantidades_reservadas)
+        libro_stock.confirmar(self.comprador_id)
         
         # Actualizar posición final
-        if self.ruta_completa:
-            self.posicion_actual = self.ruta_completa[-1]
+        if self._ruta:
+            self.posicion_actual = divmod(self._ruta[-1], self.modelo.dimensiones[1])
         
         self.estado = "finalizado"
+        obtener_replanificador(self.sucursal_id).retirar(self.comprador_id)
+        
+        resultado = self.obtener_resultado()
         
-        # Calcular resumen
-        total_items = sum(p['cantidad'] for p in self.productos_recolectados)
-        tiempo_estimado = self._estimar_tiempo()
+        self.registro.debug(
+            "Compra finalizada: %d items, tiempo estimado %s",
+            resultado['total_items'], resultado['tiempo_estimado']
+        )
         
-        print(f"  ✓ Compra finalizada")
-        print(f"  ✓ Items recolectados: {total_items}")
-        print(f"  ✓ Tiempo estimado: {tiempo_estimado}")
+        return resultado
+    
+    def obtener_resultado(self) -> Dict:
+        """
+        Construye el resultado de la compra con la ruta detallada.
         
+        Returns:
+            Diccionario con el resultado de la compra
+        """
         return {
             'comprador_id': self.comprador_id,
             'sucursal_id': self.sucursal_id,
-            'sucursal_nombre': self.mapa_sucursal['nombre'],
-            'productos_recolectados': self.productos_recolectados,
-            'ruta_detallada': ruta_detallada,
+            'sucursal_nombre': self.modelo.nombre if self.modelo else None,
+            'productos_recolectados': [p.a_dict() for p in self.productos_recolectados],
+            'ruta_detallada': self._generar_ruta_detallada(),
             'distancia_total': self.distancia_total,
-            'total_items': total_items,
-            'tiempo_estimado': tiempo_estimado,
+            'pasos_espera': self.pasos_espera,
+            'total_items': sum(p.cantidad for p in self.productos_recolectados),
+            'tiempo_estimado': self._estimar_tiempo(),
             'posicion_final': self.posicion_actual,
             'estado': self.estado
         }
@@ -275,6 +481,18 @@ class AgenteComprador:
         ruta_detallada = []
         productos_visitados = set()
         
+        if not self.modelo:
+            return ruta_detallada
+        
+        entrada = self.modelo.entrada
+        caja = self.modelo.caja
+        
+        # Primer producto planificado en cada zona
+        productos_por_posicion = {}
+        for producto_info in self.productos_recolectados:
+            productos_por_posicion.setdefault(producto_info.posicion, producto_info)
+        
+        anterior = None
         for i, posicion in enumerate(self.ruta_completa):
             paso = {
                 'paso': i + 1,
@@ -283,30 +501,30 @@ class AgenteComprador:
             }
             
             # Determinar si es un punto especial
-            entrada = self.mapa_sucursal['entrada']
-            caja = self.mapa_sucursal['caja']
-            
-            if posicion == (entrada['fila'], entrada['columna']) and i == 0:
+            if posicion == anterior:
+                # Espera a que otro comprador libere la celda siguiente o
+                # sigue recorriendo una celda lenta
+                paso['accion'] = 'esperar'
+            elif posicion == entrada and i == 0:
                 paso['accion'] = 'inicio'
                 paso['descripcion'] = 'Entrada al supermercado'
-            elif posicion == (caja['fila'], caja['columna']):
+            elif posicion == caja:
                 paso['accion'] = 'caja'
                 paso['descripcion'] = 'Llegar a la caja'
-            else:
-                # Verificar si es una zona de producto
-                for producto_info in self.productos_recolectados:
-                    if posicion == producto_info['posicion'] and posicion not in productos_visitados:
-                        paso['accion'] = 'recoger_producto'
-                        paso['producto'] = {
-                            'id': producto_info['producto_id'],
-                            'nombre': producto_info['nombre'],
-                            'cantidad': producto_info['cantidad']
-                        }
-                        paso['descripcion'] = f"Recoger {producto_info['cantidad']}x {producto_info['nombre']}"
-                        productos_visitados.add(posicion)
-                        break
+            elif posicion in productos_por_posicion and posicion not in productos_visitados:
+                # Zona de producto visitada por primera vez
+                producto_info = productos_por_posicion[posicion]
+                paso['accion'] = 'recoger_producto'
+                paso['producto'] = {
+                    'id': producto_info.producto_id,
+                    'nombre': producto_info.nombre,
+                    'cantidad': producto_info.cantidad
+                }
+                paso['descripcion'] = f"Recoger {producto_info.cantidad}x {producto_info.nombre}"
+                productos_visitados.add(posicion)
             
             ruta_detallada.append(paso)
+            anterior = posicion
         
         return ruta_detallada
     
@@ -317,8 +535,14 @@ class AgenteComprador:
         Returns:
             Tiempo estimado en formato legible
         """
-        # Estimación: 2 segundos por paso + 10 segundos por producto
-        tiempo_movimiento = self.distancia_total * 2
+        # Estimación: 2 segundos por unidad de costo de la grilla (1 por paso o
+        # espera en celdas normales) + 10 segundos por producto. Las rutas
+        # reservadas ya tienen una posición por paso de 2 segundos, con cada
+        # celda repetida según su costo redondeado hacia arriba
+        if self.modelo and es_mapa_ponderado(self.modelo.mapa) and not self.cooperativo:
+            tiempo_movimiento = obtener_grilla(self.modelo.mapa).costo_ruta(self.ruta_completa) * 2
+        else:
+            tiempo_movimiento = (self.distancia_total + self.pasos_espera) * 2
         tiempo_recoleccion = len(self.productos_recolectados) * 10
         tiempo_total_segundos = tiempo_movimiento + tiempo_recoleccion
         
@@ -341,7 +565,7 @@ class AgenteComprador:
             'comprador_id': self.comprador_id,
             'estado': self.estado,
             'sucursal_id': self.sucursal_id,
-            'sucursal_nombre': self.mapa_sucursal['nombre'] if self.mapa_sucursal else None,
+            'sucursal_nombre': self.modelo.nombre if self.modelo else None,
             'posicion_actual': self.posicion_actual,
             'productos_en_lista': len(self.lista_compras) if self.lista_compras else 0,
             'productos_recolectados': len(self.productos_recolectados),
@@ -350,14 +574,24 @@ class AgenteComprador:
     
     def reiniciar(self):
         """Reinicia el estado del agente para una nueva compra."""
+        # Una compra planificada y no ejecutada devuelve sus unidades reservadas
+        if self.estado == "comprando":
+            obtener_libro_stock(self.sucursal_id).liberar(self.comprador_id)
+        # Y deja de ocupar las celdas de su ruta
+        if self.cooperativo and self.sucursal_id is not None:
+            obtener_tabla_reservas(self.sucursal_id).liberar(self.comprador_id)
+        if self.sucursal_id is not None:
+            obtener_replanificador(self.sucursal_id).retirar(self.comprador_id)
+        
         self.sucursal_id = None
-        self.mapa_sucursal = None
-        self.inventario_sucursal = None
+        self.modelo = None
         self.posicion_actual = None
         self.lista_compras = None
+        self._cantidades_reservadas = {}
         self.productos_recolectados = []
-        self.ruta_completa = []
+        self._ruta = array('i')
+        self._paso_inicio = 0
         self.distancia_total = 0
         self.estado = "disponible"
         
-        print(f"[Agente Comprador {self.comprador_id}] Reiniciado y disponible")
+        self.registro.debug("Reiniciado y disponible")
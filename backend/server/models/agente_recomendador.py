@@ -4,10 +4,34 @@ Este agente es responsable de generar listas de compras optimizadas
 basadas en presupuesto y preferencias del usuario.
 """
 
-import json
-import os
+import random
+import threading
+from collections import Counter
 from typing import List, Dict, Optional
-from utils.algoritmos_busqueda import TempleSimulado
+from models.libro_stock import obtener_libro_stock
+from models.modelo_sucursal import cargar_inventario, obtener_modelo_sucursal
+from utils.algoritmos_busqueda import TempleSimulado, limitar_a_topes
+from utils.cache_soluciones import (
+    ARRANQUE_TIBIO, TEMPERATURA_ARRANQUE_TIBIO, CacheSoluciones, escalar_lista
+)
+from utils.cambios_inventario import aplicar_lote, diferencias
+from utils.frente_pareto import CAPACIDAD_FRENTE, ArchivoPareto
+from utils.indice_productos import IndiceProductos
+from utils.plantillas_canasta import (
+    CONJUNTOS_PLANTILLA, PEDIDOS_PARA_PLANTILLA, PRESUPUESTOS_PLANTILLA, PROCESOS_PLANTILLAS,
+    TablaPlantillas, precalcular, programar
+)
+from utils.optimizadores import (
+    HIST_OPTIMIZACION_SEGUNDOS, OPTIMIZADOR_POR_DEFECTO, OPTIMIZADORES,
+    crear_optimizador, seleccionar_optimizador
+)
+from utils.registro import obtener_logger
+from utils.temple_paralelo import TempleParalelo
+from utils.metricas import metricas, medir, etiquetar
+
+HIST_AJUSTE_SEGUNDOS = metricas.histograma(
+    'ajuste_presupuesto_segundos', 'Duración de _ajustar_a_presupuesto_exacto'
+)
 
 
 class AgenteRecomendador:
@@ -24,40 +48,225 @@ class AgenteRecomendador:
             sucursal_id: Identificador único de la sucursal
         """
         self.sucursal_id = sucursal_id
-        self.inventario = self._cargar_inventario()
+        self.registro = obtener_logger('recomendador', sucursal_id=sucursal_id)
+        columnas = self._cargar_inventario()
         self.nombre_sucursal = self.inventario.get('nombre', f'Sucursal {sucursal_id}')
         self.productos = self.inventario.get('productos', [])
+        self._reconstruir_indices(columnas)
+        # Versión de los datos del inventario; las cachés derivadas se invalidan al cambiar
+        self.version_inventario = 1
+        # Serializa los cambios de inventario; las lecturas no toman el candado
+        # porque cada cambio publica listas e índices nuevos
+        self._candado_inventario = threading.RLock()
+        # Stock compartido con los compradores de la sucursal. Se inicializa
+        # con el inventario del modelo la primera vez; un libro existente ya
+        # tiene las ventas confirmadas y no se vuelve a sincronizar
+        self.libro_stock = obtener_libro_stock(sucursal_id)
         self.temple_simulado = TempleSimulado(
             temperatura_inicial=1000.0,
             temperatura_minima=1.0,
             factor_enfriamiento=0.95,
             iteraciones_por_temperatura=100
         )
+        # Listas resueltas por el temple para el arranque tibio
+        self.cache_soluciones = CacheSoluciones()
+        # Plantillas precalculadas de la versión actual (None hasta precalcularlas)
+        self.plantillas: Optional[TablaPlantillas] = None
+        self._plantillas_programadas = False
+        # Conjuntos de categorías pedidos, para elegir los de las plantillas
+        self.conjuntos_pedidos: Counter = Counter()
+        self._candado_conjuntos = threading.Lock()
+        # Backends disponibles para generar_recomendaciones
+        self.optimizadores = {
+            nombre: self.temple_simulado if nombre == 'temple' else crear_optimizador(nombre)
+            for nombre in OPTIMIZADORES
+        }
         self.estado = "activo"
-        print(f"[Agente Recomendador] Inicializado para {self.nombre_sucursal} ({sucursal_id})")
-        print(f"[Agente Recomendador] Productos disponibles: {len(self.productos)}")
+        self.registro.info(
+            "Inicializado para %s con %d productos disponibles",
+            self.nombre_sucursal, len(self.productos)
+        )
     
-    def _cargar_inventario(self) -> Dict:
+    def _cargar_inventario(self):
         """
-        Carga el inventario de la sucursal desde el archivo JSON.
+        Toma el inventario del modelo compartido de la sucursal (los productos
+        no se modifican: los cambios publican copias), así que no se lee ni
+        se materializa una segunda vez.
         
         Returns:
-            Diccionario con la información del inventario
+            Archivo compilado cuyas columnas corresponden a los productos, o None
+        """
+        try:
+            modelo = obtener_modelo_sucursal(self.sucursal_id)
+        except ValueError as e:
+            self.registro.error("%s", e)
+            self.inventario = {'productos': []}
+            return None
+        self.inventario = modelo.inventario
+        return modelo.columnas_inventario()
+    
+    def _reconstruir_indices(self, columnas=None):
+        """
+        Construye los índices derivados de `self.productos` desde cero.
+        
+        Args:
+            columnas: Columnas compiladas de los mismos productos (opcional)
         """
-        ruta_inventario = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'data', 'inventario', f'{self.sucursal_id}.json'
+        self.productos_por_id = {producto['id']: producto for producto in self.productos}
+        # Categoría, franja de precio e importancia para los vecinos del temple
+        self.indice_productos = IndiceProductos(self.productos, columnas)
+    
+    def _actualizar_indices(self, tocados: Dict, agregados: List):
+        """
+        Actualiza los índices con los productos que tocó un lote, sin
+        recorrer el inventario. Se publican copias: las lecturas en curso
+        conservan los índices anteriores.
+        
+        Args:
+            tocados: id -> producto nuevo (None si se eliminó)
+            agregados: Ids dados de alta, en el orden del lote
+        """
+        productos_por_id = dict(self.productos_por_id)
+        for producto_id, producto in tocados.items():
+            if producto is None:
+                productos_por_id.pop(producto_id, None)
+            else:
+                productos_por_id[producto_id] = producto
+        self.indice_productos = self.indice_productos.actualizar(
+            self.productos,
+            {
+                producto_id: (self.productos_por_id.get(producto_id), producto)
+                for producto_id, producto in tocados.items()
+            },
+            agregados
         )
+        self.productos_por_id = productos_por_id
+    
+    def aplicar_cambios(self, cambios: List[Dict], desde_archivo: bool = False) -> int:
+        """
+        Aplica un lote de cambios de inventario (precio, stock, alta, baja,
+        actualización) sin reiniciar el agente.
         
-        try:
-            with open(ruta_inventario, 'r', encoding='utf-8') as archivo:
-                return json.load(archivo)
-        except FileNotFoundError:
-            print(f"[ERROR] No se encontró el inventario para {self.sucursal_id}")
-            return {'productos': []}
-        except json.JSONDecodeError:
-            print(f"[ERROR] Error al decodificar el inventario para {self.sucursal_id}")
-            return {'productos': []}
+        El lote es atómico: si un cambio no es válido no se aplica ninguno.
+        Las recomendaciones en curso terminan con la versión anterior.
+        
+        Args:
+            cambios: Lote de cambios (ver utils.cambios_inventario)
+            desde_archivo: Los cambios vienen de recargar el archivo de
+                inventario; si no, cada stock indicado es un recuento (ver
+                LibroStock.fijar_stock)
+            
+        Returns:
+            Nueva versión del inventario
+            
+        Raises:
+            CambioInvalido: Si algún cambio no es válido
+        """
+        with self._candado_inventario:
+            if not cambios:
+                return self.version_inventario
+            productos, tocados = aplicar_lote(self.productos, cambios)
+            anteriores = {
+                producto_id: self.productos_por_id[producto_id].get('stock')
+                for producto_id in tocados if producto_id in self.productos_por_id
+            }
+            inventario = dict(self.inventario)
+            inventario['productos'] = productos
+            
+            self.productos = productos
+            self._actualizar_indices(tocados, [
+                cambio['producto']['id'] for cambio in cambios if cambio['op'] == 'agregar'
+            ])
+            self.inventario = inventario
+            self.version_inventario += 1
+            
+            # Un cambio de precio no toca el stock. Con el archivo recargado solo
+            # cuentan los stocks que cambiaron y se les descuentan las ventas ya
+            # confirmadas; por la API cada stock indicado es un recuento
+            recuentos = set() if desde_archivo else {
+                cambio['producto']['id'] if cambio['op'] == 'agregar' else cambio['id']
+                for cambio in cambios
+                if cambio['op'] == 'stock'
+                or cambio['op'] == 'actualizar' and 'stock' in cambio['campos']
+                or cambio['op'] == 'agregar' and 'stock' in cambio['producto']
+            }
+            stocks, recontados = {}, {}
+            for producto_id, producto in tocados.items():
+                stock = producto.get('stock') if producto is not None else None
+                if producto is not None and producto_id in recuentos:
+                    recontados[producto_id] = stock
+                elif anteriores.get(producto_id) != stock or producto is None:
+                    stocks[producto_id] = stock
+            if stocks:
+                self.libro_stock.fijar_stock(stocks)
+            if recontados:
+                self.libro_stock.fijar_stock(recontados, recuento=True)
+            self.registro.info(
+                "Inventario actualizado a la versión %d (%d cambios, %d productos)",
+                self.version_inventario, len(cambios), len(productos)
+            )
+            if self._plantillas_programadas:
+                self.programar_plantillas()
+            return self.version_inventario
+    
+    def recargar_inventario(self) -> int:
+        """
+        Vuelve a leer el inventario de su archivo y aplica solo las diferencias.
+        
+        Returns:
+            Versión del inventario tras la recarga
+        """
+        nuevo = cargar_inventario(self.sucursal_id)
+        with self._candado_inventario:
+            self.nombre_sucursal = nuevo.get('nombre', self.nombre_sucursal)
+            return self.aplicar_cambios(
+                diferencias(self.productos, nuevo.get('productos', [])), desde_archivo=True
+            )
+    
+    def buscar_por_precio(
+        self,
+        precio: float,
+        categoria: Optional[str] = None,
+        sin_superar: bool = True,
+        solo_con_stock: bool = True
+    ) -> Optional[Dict]:
+        """
+        Retorna el producto de precio más cercano a un monto.
+        
+        Args:
+            precio: Monto buscado
+            categoria: Restringir la búsqueda a una categoría (opcional)
+            sin_superar: Solo productos con precio menor o igual al monto
+            solo_con_stock: Saltar los productos sin unidades disponibles
+            
+        Returns:
+            Producto encontrado o None
+        """
+        admitir = None
+        if solo_con_stock:
+            topes = self.libro_stock.topes()
+            if topes:
+                admitir = lambda p: topes.get(p['id'], 1) > 0
+        return self.indice_productos.mas_cercano(precio, categoria, sin_superar, admitir)
+    
+    def productos_en_rango(
+        self,
+        minimo: float,
+        maximo: float,
+        categoria: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Retorna los productos con precio entre dos montos, ordenados por precio.
+        
+        Args:
+            minimo: Precio mínimo (inclusive)
+            maximo: Precio máximo (inclusive)
+            categoria: Restringir la búsqueda a una categoría (opcional)
+            
+        Returns:
+            Lista de productos
+        """
+        return self.indice_productos.en_rango(minimo, maximo, categoria)
     
     def filtrar_por_categorias(
         self, 
@@ -82,27 +291,91 @@ class AgenteRecomendador:
     def generar_recomendaciones(
         self,
         presupuesto: float,
-        categorias_preferidas: Optional[List[str]] = None
+        categorias_preferidas: Optional[List[str]] = None,
+        semilla: Optional[int] = None,
+        optimizador: Optional[str] = None,
+        latencia_ms: Optional[float] = None,
+        arranque_tibio: Optional[bool] = None,
+        usar_plantillas: Optional[bool] = None
     ) -> Dict:
         """
         Genera tres listas de compras recomendadas: exacta, superior e inferior.
         
+        Con la misma semilla, el mismo inventario (version_inventario) y el
+        mismo stock disponible, las listas generadas son idénticas, salvo con
+        arranque tibio o con `usar_plantillas=True`: el punto de partida
+        depende de las solicitudes anteriores o de si el precálculo en
+        segundo plano ya terminó, y la reparación de una plantilla no usa la
+        semilla. Por eso una solicitud con semilla no usa plantillas salvo
+        que se pidan explícitamente.
+        
         Args:
             presupuesto: Presupuesto disponible del comprador
             categorias_preferidas: Categorías de productos preferidas (opcional)
+            semilla: Semilla del generador aleatorio (por defecto una al azar)
+            optimizador: 'temple', 'voraz', 'tabu', 'ramificacion' o 'auto'
+                (por defecto la variable de entorno OPTIMIZADOR)
+            latencia_ms: Latencia objetivo de cada optimización para 'auto' (opcional)
+            arranque_tibio: Arrancar el temple desde la lista resuelta del
+                presupuesto más cercano (por defecto la variable ARRANQUE_TIBIO)
+            usar_plantillas: Partir de las plantillas precalculadas, si existen
+                para la versión actual y la solicitud no elige optimizador
+                (por defecto sí, salvo que se indique la semilla)
             
         Returns:
-            Diccionario con las tres recomendaciones y metadatos
+            Diccionario con las tres recomendaciones y metadatos, incluida la
+            semilla y el optimizador usados y cuántas optimizaciones
+            arrancaron desde una lista previa o se repararon desde una plantilla
+            
+        Raises:
+            ValueError: Si el optimizador no existe
         """
-        print(f"\n[Agente Recomendador] Generando recomendaciones...")
-        print(f"  Presupuesto: {presupuesto} Bs.")
-        print(f"  Categorías preferidas: {categorias_preferidas or 'Ninguna'}")
+        if usar_plantillas is None:
+            usar_plantillas = semilla is None
+        plantillas = self.plantillas if usar_plantillas and optimizador is None else None
+        optimizador = optimizador or OPTIMIZADOR_POR_DEFECTO
+        if arranque_tibio is None:
+            arranque_tibio = ARRANQUE_TIBIO
+        if optimizador != 'auto' and optimizador not in self.optimizadores:
+            raise ValueError(
+                f"Optimizador desconocido: {optimizador!r} "
+                f"(disponibles: {', '.join(self.optimizadores)}, auto)"
+            )
+        self.registro.debug(
+            "Generando recomendaciones: presupuesto %s Bs., categorías %s",
+            presupuesto, categorias_preferidas or 'Ninguna'
+        )
         
         if categorias_preferidas is None:
             categorias_preferidas = []
+        if semilla is None:
+            semilla = random.getrandbits(32)
+        # Generador propio de la petición: no comparte estado entre hilos
+        rng = random.Random(semilla)
+        
+        etiquetar(sucursal=self.sucursal_id)
+        conjunto = frozenset(categorias_preferidas)
+        with self._candado_conjuntos:
+            self.conjuntos_pedidos[conjunto] += 1
+            pedidos = self.conjuntos_pedidos[conjunto]
+        # Un conjunto que se vuelve popular obtiene sus plantillas
+        if self._plantillas_programadas and pedidos == PEDIDOS_PARA_PLANTILLA:
+            self.programar_plantillas()
         
         # Filtrar inventario según categorías
         inventario_filtrado = self.filtrar_por_categorias(categorias_preferidas)
+        # Índice de la misma versión que la lista (un cambio concurrente publica otro)
+        indice = self.indice_productos
+        if indice.productos is not inventario_filtrado:
+            indice = None
+        version = self.version_inventario
+        if plantillas is not None and plantillas.version != version:
+            plantillas = None
+        
+        # Unidades disponibles (sin contar reservas de otros compradores)
+        topes = self.libro_stock.topes()
+        if topes:
+            inventario_filtrado = [p for p in inventario_filtrado if topes.get(p['id'], 1) > 0]
         
         if not inventario_filtrado:
             return {
@@ -110,63 +383,284 @@ class AgenteRecomendador:
                 "recomendaciones": []
             }
         
-        # Generar lista base usando Temple Simulado
-        print("  Ejecutando Temple Simulado...")
-        lista_base = self.temple_simulado.optimizar(
-            inventario_filtrado,
-            presupuesto,
-            categorias_preferidas
-        )
+        if optimizador == 'auto':
+            optimizador = seleccionar_optimizador(len(inventario_filtrado), latencia_ms)
+        backend = self.optimizadores[optimizador]
+        
+        tibio = arranque_tibio and optimizador == 'temple'
+        origenes = Counter()
+        
+        def optimizar(presupuesto_objetivo: float) -> List[tuple]:
+            lista, origen = self._optimizar(
+                backend, optimizador, inventario_filtrado, presupuesto_objetivo,
+                categorias_preferidas, topes, indice, rng, version, tibio, plantillas
+            )
+            origenes[origen] += 1
+            return lista
+        
+        # Generar lista base con el optimizador elegido
+        lista_base = optimizar(presupuesto)
         
         # Generar tres variantes: exacta, superior e inferior
         recomendaciones = []
         
         # 1. Lista exacta (ajustar al presupuesto exacto)
-        lista_exacta = self._ajustar_a_presupuesto_exacto(
-            lista_base, presupuesto, inventario_filtrado
-        )
+        with medir(HIST_AJUSTE_SEGUNDOS):
+            lista_exacta = self._ajustar_a_presupuesto_exacto(
+                lista_base, presupuesto, inventario_filtrado, topes=topes, indice=indice
+            )
         recomendaciones.append(self._formatear_recomendacion(
             lista_exacta, presupuesto, "exacta"
         ))
         
         # 2. Lista superior (2-5% más del presupuesto)
         presupuesto_superior = presupuesto * 1.03  # 3% más
-        lista_superior = self.temple_simulado.optimizar(
-            inventario_filtrado,
-            presupuesto_superior,
-            categorias_preferidas
-        )
+        lista_superior = optimizar(presupuesto_superior)
         recomendaciones.append(self._formatear_recomendacion(
             lista_superior, presupuesto, "superior"
         ))
         
         # 3. Lista inferior (2-5% menos del presupuesto)
         presupuesto_inferior = presupuesto * 0.97  # 3% menos
-        lista_inferior = self.temple_simulado.optimizar(
-            inventario_filtrado,
-            presupuesto_inferior,
-            categorias_preferidas
-        )
+        lista_inferior = optimizar(presupuesto_inferior)
         recomendaciones.append(self._formatear_recomendacion(
             lista_inferior, presupuesto, "inferior"
         ))
         
-        print(f"  ✓ Recomendaciones generadas exitosamente")
-        
         return {
             "sucursal_id": self.sucursal_id,
             "sucursal_nombre": self.nombre_sucursal,
             "presupuesto_solicitado": presupuesto,
             "categorias_preferidas": categorias_preferidas,
+            "semilla": semilla,
+            "optimizador": optimizador,
+            "version_inventario": version,
+            "arranques_tibios": origenes['tibio'],
+            "plantillas": origenes['plantilla'],
             "recomendaciones": recomendaciones
         }
     
+    def _optimizar(
+        self,
+        backend,
+        optimizador: str,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        topes: Dict[int, int],
+        indice: Optional[IndiceProductos],
+        rng: random.Random,
+        version: int,
+        tibio: bool,
+        plantillas: Optional[TablaPlantillas] = None
+    ) -> tuple:
+        """
+        Ejecuta una optimización. Si hay una plantilla cercana la escala y la
+        repara con búsqueda local; si no, y `tibio` es verdadero, arranca el
+        temple desde la lista resuelta del presupuesto más cercano.
+        
+        Returns:
+            Tupla (lista de compras, origen: 'plantilla', 'tibio' o 'completa')
+        """
+        plantilla = plantillas.mas_cercana(categorias_preferidas, presupuesto) if plantillas else None
+        if plantilla is not None:
+            presupuesto_plantilla, lista = plantilla
+            inicial = escalar_lista(lista, presupuesto / presupuesto_plantilla, self.productos_por_id)
+            if topes:
+                inicial = limitar_a_topes(inicial, topes)
+            with medir(HIST_OPTIMIZACION_SEGUNDOS, optimizador='plantilla'):
+                lista_compras = self.optimizadores['voraz'].mejorar(
+                    inicial, inventario, presupuesto, categorias_preferidas, topes, indice
+                )
+            if lista_compras:
+                return lista_compras, 'plantilla'
+        
+        estado_inicial = None
+        if tibio:
+            cercana = self.cache_soluciones.mas_cercana(version, categorias_preferidas, presupuesto)
+            if cercana is not None:
+                resuelto, lista = cercana
+                estado_inicial = escalar_lista(lista, presupuesto / resuelto, self.productos_por_id)
+                if topes:
+                    estado_inicial = limitar_a_topes(estado_inicial, topes)
+                estado_inicial = estado_inicial or None
+        
+        with medir(HIST_OPTIMIZACION_SEGUNDOS, optimizador=optimizador):
+            if estado_inicial is not None:
+                lista_compras = backend.optimizar(
+                    inventario, presupuesto, categorias_preferidas, topes, indice, rng,
+                    estado_inicial=estado_inicial,
+                    temperatura_inicial=TEMPERATURA_ARRANQUE_TIBIO
+                )
+            else:
+                lista_compras = backend.optimizar(
+                    inventario, presupuesto, categorias_preferidas, topes, indice, rng
+                )
+        
+        if tibio:
+            self.cache_soluciones.guardar(version, categorias_preferidas, presupuesto, lista_compras)
+        return lista_compras, 'tibio' if estado_inicial is not None else 'completa'
+    
+    def conjuntos_populares(self, cantidad: int = CONJUNTOS_PLANTILLA) -> List[List[str]]:
+        """
+        Conjuntos de categorías para las plantillas: sin preferencias y los
+        más pedidos hasta ahora.
+        
+        Args:
+            cantidad: Total de conjuntos
+        """
+        with self._candado_conjuntos:
+            pedidos = [c for c, _ in self.conjuntos_pedidos.most_common() if c]
+        return [[]] + [sorted(c) for c in pedidos[:max(cantidad - 1, 0)]]
+    
+    def precalcular_plantillas(
+        self,
+        conjuntos: Optional[List[List[str]]] = None,
+        presupuestos=PRESUPUESTOS_PLANTILLA,
+        semilla: int = 0
+    ) -> TablaPlantillas:
+        """
+        Resuelve la grilla de plantillas con el temple paralelo (el doble de
+        iteraciones que el temple) más búsqueda local, y la publica si el
+        inventario no cambió mientras tanto. Las celdas de la tabla vigente
+        de la misma versión se reutilizan.
+        
+        Args:
+            conjuntos: Conjuntos de categorías (por defecto conjuntos_populares())
+            presupuestos: Grilla de presupuestos
+            semilla: Semilla base de la tabla
+            
+        Returns:
+            Tabla calculada
+        """
+        version = self.version_inventario
+        productos = self.productos
+        indice = self.indice_productos
+        if indice.productos is not productos:
+            indice = IndiceProductos(productos)
+        if conjuntos is None:
+            conjuntos = self.conjuntos_populares()
+        
+        tabla = precalcular(
+            productos, indice, version, conjuntos,
+            TempleParalelo(pasos_por_replica=4500, procesos=PROCESOS_PLANTILLAS),
+            presupuestos, semilla,
+            reparador=self.optimizadores['voraz'],
+            continuar=lambda: self.version_inventario == version,
+            base=self.plantillas
+        )
+        if self.version_inventario == version:
+            self.plantillas = tabla
+            self.registro.info(
+                "Plantillas precalculadas: %d listas (%d conjuntos de categorías, versión %d)",
+                len(tabla), len(tabla.conjuntos()), version
+            )
+        return tabla
+    
+    def programar_plantillas(self):
+        """
+        Precalcula las plantillas en segundo plano y las vuelve a calcular
+        cada vez que cambia el inventario.
+        
+        Returns:
+            Futuro del precálculo
+        """
+        self._plantillas_programadas = True
+        return programar(self.precalcular_plantillas)
+    
+    def generar_frente_pareto(
+        self,
+        presupuesto: float,
+        categorias_preferidas: Optional[List[str]] = None,
+        semilla: Optional[int] = None,
+        tamano: int = CAPACIDAD_FRENTE
+    ) -> Dict:
+        """
+        Genera un frente de Pareto aproximado de listas de compras con una
+        sola ejecución del temple.
+        
+        Cada lista del frente no es dominada por ninguna otra en diferencia
+        con el presupuesto, importancia promedio, productos distintos y
+        categorías preferidas cubiertas, y ninguna se aleja del presupuesto
+        más de la tolerancia del archivo (10%).
+        
+        Args:
+            presupuesto: Presupuesto disponible del comprador
+            categorias_preferidas: Categorías de productos preferidas (opcional)
+            semilla: Semilla del generador aleatorio (por defecto una al azar)
+            tamano: Máximo de listas del frente
+            
+        Returns:
+            Diccionario con el frente (ordenado por diferencia con el
+            presupuesto), la semilla y la cantidad de listas evaluadas
+        """
+        if categorias_preferidas is None:
+            categorias_preferidas = []
+        if semilla is None:
+            semilla = random.getrandbits(32)
+        rng = random.Random(semilla)
+        
+        etiquetar(sucursal=self.sucursal_id)
+        
+        inventario_filtrado = self.filtrar_por_categorias(categorias_preferidas)
+        indice = self.indice_productos
+        if indice.productos is not inventario_filtrado:
+            indice = None
+        version = self.version_inventario
+        
+        topes = self.libro_stock.topes()
+        if topes:
+            inventario_filtrado = [p for p in inventario_filtrado if topes.get(p['id'], 1) > 0]
+        
+        if not inventario_filtrado:
+            return {
+                "error": "No hay productos disponibles en el inventario",
+                "frente": []
+            }
+        
+        archivo = ArchivoPareto(presupuesto, categorias_preferidas, capacidad=tamano)
+        with medir(HIST_OPTIMIZACION_SEGUNDOS, optimizador='temple'):
+            mejor = self.temple_simulado.optimizar(
+                inventario_filtrado,
+                presupuesto,
+                categorias_preferidas,
+                topes,
+                indice,
+                rng,
+                archivo=archivo
+            )
+        archivo.ofrecer(mejor)
+        
+        frente = []
+        for objetivos, lista in archivo.frente():
+            recomendacion = self._formatear_recomendacion(lista, presupuesto, "pareto")
+            recomendacion['objetivos'] = {
+                'diferencia_presupuesto': objetivos[0],
+                'importancia_promedio': round(1.0 - objetivos[1], 4),
+                'productos_diferentes': -objetivos[2],
+                'categorias_sin_cubrir': objetivos[3]
+            }
+            frente.append(recomendacion)
+        
+        return {
+            "sucursal_id": self.sucursal_id,
+            "sucursal_nombre": self.nombre_sucursal,
+            "presupuesto_solicitado": presupuesto,
+            "categorias_preferidas": categorias_preferidas,
+            "semilla": semilla,
+            "version_inventario": version,
+            "listas_evaluadas": archivo.ofrecidas,
+            "frente": frente
+        }
+    
     def _ajustar_a_presupuesto_exacto(
         self,
         lista_base: List[tuple],
         presupuesto: float,
         inventario: List[Dict],
-        tolerancia: float = 0.5
+        tolerancia: float = 0.5,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None
     ) -> List[tuple]:
         """
         Ajusta una lista de compras para que esté lo más cerca posible del presupuesto.
@@ -176,13 +670,27 @@ class AgenteRecomendador:
             presupuesto: Presupuesto objetivo
             inventario: Inventario disponible
             tolerancia: Tolerancia aceptable en Bs.
+            topes: Unidades disponibles por producto (opcional)
+            indice: Índice de `inventario` (por defecto se construye)
             
         Returns:
             Lista ajustada
         """
-        lista_ajustada = lista_base.copy()
+        if indice is None:
+            indice = IndiceProductos(inventario)
+        
+        lista_ajustada = limitar_a_topes(lista_base, topes) if topes else lista_base.copy()
         total_actual = sum(p['precio'] * c for p, c in lista_ajustada)
         
+        # Unidades que aún pueden agregarse de los productos con stock controlado
+        restantes = {}
+        if topes:
+            restantes = dict(topes)
+            for producto, cantidad in lista_ajustada:
+                if producto['id'] in restantes:
+                    restantes[producto['id']] -= cantidad
+        admitir = (lambda p: restantes.get(p['id'], 1) > 0) if restantes else None
+        
         intentos = 0
         max_intentos = 50
         
@@ -190,12 +698,13 @@ class AgenteRecomendador:
             intentos += 1
             
             if total_actual < presupuesto:
-                # Agregar productos baratos o aumentar cantidades
-                productos_baratos = [p for p in inventario if p['precio'] <= (presupuesto - total_actual)]
-                if productos_baratos:
-                    producto = min(productos_baratos, key=lambda p: abs(p['precio'] - (presupuesto - total_actual)))
+                # Agregar el producto de precio más cercano a lo que falta sin superarlo
+                producto = indice.mas_cercano(presupuesto - total_actual, admitir=admitir)
+                if producto is not None:
                     lista_ajustada.append((producto, 1))
                     total_actual += producto['precio']
+                    if producto['id'] in restantes:
+                        restantes[producto['id']] -= 1
                 else:
                     break
             else:
@@ -228,7 +737,7 @@ class AgenteRecomendador:
         Args:
             lista_productos: Lista de tuplas (producto, cantidad)
             presupuesto_original: Presupuesto solicitado por el usuario
-            tipo: Tipo de recomendación ('exacta', 'superior', 'inferior')
+            tipo: Tipo de recomendación ('exacta', 'superior', 'inferior', 'pareto')
             
         Returns:
             Diccionario con la recomendación formateada
@@ -277,6 +786,8 @@ class AgenteRecomendador:
                 mensaje = f"Te faltan {abs(diferencia)} Bs. para completar esta compra"
             else:
                 mensaje = f"Lista ligeramente superior a tu presupuesto"
+        elif tipo == "pareto":
+            mensaje = f"Alternativa del frente (diferencia: {diferencia} Bs.)"
         else:  # inferior
             if diferencia < 0:
                 mensaje = f"Con esta lista te sobrarán {abs(diferencia)} Bs."
@@ -306,7 +817,7 @@ class AgenteRecomendador:
             'sucursal_nombre': self.nombre_sucursal,
             'estado': self.estado,
             'productos_disponibles': len(self.productos),
-            'categorias_disponibles': list(set(p['categoria'] for p in self.productos))
+            'categorias_disponibles': self.indice_productos.categorias()
         }
     
     def obtener_inventario(self) -> Dict:
@@ -0,0 +1,241 @@
+"""
+Directorio de Agentes Recomendadores
+Descubre las sucursales a partir de los archivos de datos y construye cada
+agente recomendador de forma perezosa, la primera vez que se usa. Un
+precargador en segundo plano los construye en un pool de hilos para que las
+sucursales estén listas antes de la primera petición.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional
+
+from models.agente_recomendador import AgenteRecomendador
+from models.modelo_sucursal import obtener_modelo_sucursal
+from utils.formato_binario import EXTENSION
+from utils.metricas import metricas, medir
+from utils.plantillas_canasta import PRECALCULAR_PLANTILLAS
+from utils.registro import obtener_logger
+
+HIST_INICIALIZACION_SEGUNDOS = metricas.histograma(
+    'inicializacion_agente_segundos', 'Duración de la construcción de un agente recomendador'
+)
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Estados de una sucursal en el directorio
+PENDIENTE = 'pendiente'
+CARGANDO = 'cargando'
+LISTA = 'lista'
+ERROR = 'error'
+
+registro = obtener_logger('directorio')
+
+
+def descubrir_sucursales(directorio_datos: Optional[str] = None) -> List[str]:
+    """
+    Retorna los identificadores de las sucursales con inventario disponible,
+    en JSON (data/inventario) o compilado (data/compilado).
+
+    Args:
+        directorio_datos: Directorio 'data' del servidor (opcional)
+
+    Returns:
+        Lista ordenada de identificadores de sucursal
+    """
+    directorio = directorio_datos or DIRECTORIO_DATOS
+    sucursales = set()
+    for subdirectorio, extension in (('inventario', '.json'), ('compilado', EXTENSION)):
+        ruta = os.path.join(directorio, subdirectorio)
+        if not os.path.isdir(ruta):
+            continue
+        sucursales.update(
+            nombre[:-len(extension)] for nombre in os.listdir(ruta) if nombre.endswith(extension)
+        )
+    return sorted(sucursales)
+
+
+def crear_agente(sucursal_id: str) -> AgenteRecomendador:
+    """
+    Construye el agente recomendador de una sucursal y carga su modelo
+    compartido (mapa), de modo que ambos queden listos. Con
+    PRECALCULAR_PLANTILLAS encola además el precálculo de sus plantillas.
+    """
+    agente = AgenteRecomendador(sucursal_id)
+    if PRECALCULAR_PLANTILLAS:
+        agente.programar_plantillas()
+    try:
+        obtener_modelo_sucursal(sucursal_id)
+    except ValueError as e:
+        registro.warning("Sin mapa para %s: %s", sucursal_id, e)
+    return agente
+
+
+class DirectorioRecomendadores:
+    """
+    Colección perezosa de agentes recomendadores indexada por sucursal.
+
+    `sucursal_id in directorio` consulta solo las sucursales descubiertas;
+    `directorio[sucursal_id]` construye el agente si aún no existe. Cada
+    sucursal tiene su propio candado, así que construir una no bloquea a las
+    demás.
+    """
+
+    def __init__(
+        self,
+        fabrica: Callable[[str], AgenteRecomendador] = crear_agente,
+        directorio_datos: Optional[str] = None
+    ):
+        """
+        Args:
+            fabrica: Función que construye el agente de una sucursal
+            directorio_datos: Directorio 'data' donde se descubren las sucursales
+        """
+        self._fabrica = fabrica
+        self._directorio_datos = directorio_datos
+        self._agentes: Dict[str, AgenteRecomendador] = {}
+        self._estados: Dict[str, str] = {}
+        self._errores: Dict[str, str] = {}
+        self._candados: Dict[str, threading.Lock] = {}
+        self._candado = threading.Lock()
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        self._pendientes: List[Future] = []
+        self._precargadas = set()
+
+    def descubrir(self) -> List[str]:
+        """
+        Agrega al directorio las sucursales presentes en los archivos de datos.
+
+        Returns:
+            Lista de todas las sucursales conocidas
+        """
+        with self._candado:
+            for sucursal_id in descubrir_sucursales(self._directorio_datos):
+                if sucursal_id not in self._estados:
+                    self._estados[sucursal_id] = PENDIENTE
+                    self._candados[sucursal_id] = threading.Lock()
+            return sorted(self._estados)
+
+    def __contains__(self, sucursal_id) -> bool:
+        return sucursal_id in self._estados
+
+    def __len__(self) -> int:
+        return len(self._estados)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._estados))
+
+    def keys(self) -> List[str]:
+        """Sucursales conocidas (construidas o no)."""
+        return sorted(self._estados)
+
+    def __getitem__(self, sucursal_id: str) -> AgenteRecomendador:
+        agente = self._agentes.get(sucursal_id)
+        if agente is not None:
+            return agente
+        if sucursal_id not in self._estados:
+            raise KeyError(sucursal_id)
+        return self._construir(sucursal_id)
+
+    def get(self, sucursal_id: str, default=None) -> Optional[AgenteRecomendador]:
+        """Retorna el agente (construyéndolo si es necesario) o `default`."""
+        try:
+            return self[sucursal_id]
+        except KeyError:
+            return default
+
+    def activos(self) -> Dict[str, AgenteRecomendador]:
+        """Agentes ya construidos, sin construir los pendientes."""
+        return dict(self._agentes)
+
+    def estado_sucursal(self, sucursal_id: str) -> Optional[str]:
+        """Estado de una sucursal: pendiente, cargando, lista o error."""
+        return self._estados.get(sucursal_id)
+
+    def _construir(self, sucursal_id: str) -> AgenteRecomendador:
+        with self._candados[sucursal_id]:
+            agente = self._agentes.get(sucursal_id)
+            if agente is not None:
+                return agente
+
+            self._estados[sucursal_id] = CARGANDO
+            try:
+                with medir(HIST_INICIALIZACION_SEGUNDOS):
+                    agente = self._fabrica(sucursal_id)
+            except Exception as e:
+                self._estados[sucursal_id] = ERROR
+                self._errores[sucursal_id] = str(e)
+                registro.error("Error al inicializar agente en %s: %s", sucursal_id, e)
+                raise
+
+            self._agentes[sucursal_id] = agente
+            self._errores.pop(sucursal_id, None)
+            self._estados[sucursal_id] = LISTA
+            return agente
+
+    def _precargar_una(self, sucursal_id: str):
+        try:
+            self[sucursal_id]
+        except Exception:
+            pass  # ya registrado en _construir
+
+    def precargar(self, sucursales: Optional[List[str]] = None, hilos: int = 4) -> List[Future]:
+        """
+        Construye en segundo plano los agentes que aún no existen.
+
+        Args:
+            sucursales: Sucursales a precargar (por defecto todas las conocidas)
+            hilos: Tamaño del pool de hilos
+
+        Returns:
+            Futuros de las construcciones encoladas
+        """
+        with self._candado:
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(
+                    max_workers=hilos, thread_name_prefix='precarga'
+                )
+            conocidas = [s for s in (sucursales or sorted(self._estados)) if s in self._estados]
+            futuros = [
+                self._ejecutor.submit(self._precargar_una, sucursal_id)
+                for sucursal_id in conocidas
+                if self._estados[sucursal_id] != LISTA
+            ]
+            self._precargadas.update(conocidas)
+            self._pendientes.extend(futuros)
+        return futuros
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que termine la precarga.
+
+        Returns:
+            True si no quedan construcciones en curso
+        """
+        _, en_curso = wait(list(self._pendientes), timeout=timeout)
+        return not en_curso
+
+    def estado(self) -> Dict:
+        """
+        Resume la preparación del directorio. Está listo cuando todas las
+        sucursales enviadas a precarga terminaron de construirse (o fallaron);
+        sin precarga, las sucursales se construyen al primer uso y el
+        directorio se considera listo.
+
+        Returns:
+            Diccionario con 'listo', conteos y el estado de cada sucursal
+        """
+        estados = dict(self._estados)
+        conteos = {PENDIENTE: 0, CARGANDO: 0, LISTA: 0, ERROR: 0}
+        for valor in estados.values():
+            conteos[valor] += 1
+        return {
+            'listo': all(estados.get(s) in (LISTA, ERROR) for s in self._precargadas),
+            'total': len(estados),
+            'listas': conteos[LISTA],
+            'cargando': conteos[CARGANDO],
+            'pendientes': conteos[PENDIENTE],
+            'errores': dict(self._errores),
+            'sucursales': dict(sorted(estados.items())),
+        }
@@ -0,0 +1,311 @@
+"""
+Libro de Stock
+Lleva el stock disponible de cada sucursal y las reservas de los
+compradores. Las reservas se hacen al planificar una compra, se confirman al
+ejecutarla y se liberan si el comprador se reinicia o si vencen sin
+confirmarse (un comprador que abandonó la compra).
+
+Los productos sin campo `stock` en el inventario no se controlan (stock
+ilimitado). Un cambio de stock por la API es un recuento: fija las unidades
+disponibles tal cual. Al recargar el archivo de inventario, cuyo valor puede
+ser anterior a las ventas confirmadas en el proceso, esas ventas se siguen
+descontando.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models.modelo_sucursal import obtener_modelo_sucursal
+from utils.registro import obtener_logger
+
+registro = obtener_logger('stock')
+
+# Segundos que una reserva sin confirmar retiene sus unidades (0 = sin vencimiento)
+VENCIMIENTO_RESERVAS = float(os.environ.get('VENCIMIENTO_RESERVAS', '900'))
+
+
+class StockInsuficiente(ValueError):
+    """No hay unidades disponibles suficientes para una reserva."""
+
+    def __init__(self, faltantes: Dict[int, int]):
+        """
+        Args:
+            faltantes: Producto -> unidades disponibles en el momento de la reserva
+        """
+        self.faltantes = faltantes
+        detalle = ', '.join(f'{pid} (disponibles: {n})' for pid, n in sorted(faltantes.items()))
+        super().__init__(f"Stock insuficiente para los productos {detalle}")
+
+
+class LibroStock:
+    """
+    Stock y reservas de una sucursal.
+
+    Los productos se reparten en franjas, cada una con su candado; una
+    reserva toma solo los candados de sus productos, en orden, así que
+    reservas sobre productos distintos no se bloquean entre sí. Cada
+    reserva es todo o nada.
+    """
+
+    def __init__(
+        self,
+        sucursal_id: str,
+        franjas: int = 64,
+        vencimiento: float = VENCIMIENTO_RESERVAS
+    ):
+        """
+        Args:
+            sucursal_id: Identificador de la sucursal
+            franjas: Número de candados entre los que se reparten los productos
+            vencimiento: Segundos tras los que se libera una reserva sin confirmar
+                (0 = sin vencimiento)
+        """
+        self.sucursal_id = sucursal_id
+        self.vencimiento = vencimiento
+        # Las claves de estos diccionarios solo cambian con todos los candados
+        # tomados; cada valor se modifica con el candado de su franja
+        self._stock: Dict[int, int] = {}
+        self._reservado: Dict[int, int] = {}
+        self._vendido: Dict[int, int] = {}
+        self._candados = [threading.Lock() for _ in range(franjas)]
+        self._reservas: Dict[str, Dict[int, int]] = {}
+        self._vencen: Dict[str, float] = {}
+        self._candado_reservas = threading.Lock()
+        self._proxima_revision = 0.0
+
+    def _candados_de(self, productos: Iterable[int]) -> List[threading.Lock]:
+        franjas = sorted({hash(producto_id) % len(self._candados) for producto_id in productos})
+        return [self._candados[franja] for franja in franjas]
+
+    def _tomar_todos(self):
+        for candado in self._candados:
+            candado.acquire()
+
+    def _soltar_todos(self):
+        for candado in reversed(self._candados):
+            candado.release()
+
+    def fijar_stock(self, stocks: Dict[int, Optional[int]], recuento: bool = False):
+        """
+        Fija el stock registrado en el inventario de los productos indicados.
+        Las reservas vigentes se conservan. Salvo en un recuento, las unidades
+        ya vendidas se descuentan de la nueva existencia.
+
+        Args:
+            stocks: Producto -> unidades (None deja de controlar el producto)
+            recuento: Las unidades son la existencia actual (p. ej. un cambio
+                de stock por la API): se fijan tal cual y las ventas
+                registradas vuelven a cero
+        """
+        self._tomar_todos()
+        try:
+            for producto_id, stock in stocks.items():
+                if stock is None:
+                    self._stock.pop(producto_id, None)
+                    self._reservado.pop(producto_id, None)
+                    self._vendido.pop(producto_id, None)
+                elif recuento:
+                    self._stock[producto_id] = stock
+                    self._reservado.setdefault(producto_id, 0)
+                    self._vendido[producto_id] = 0
+                else:
+                    self._stock[producto_id] = max(0, stock - self._vendido.get(producto_id, 0))
+                    self._reservado.setdefault(producto_id, 0)
+                    self._vendido.setdefault(producto_id, 0)
+        finally:
+            self._soltar_todos()
+
+    def sincronizar(self, productos: List[Dict]):
+        """
+        Reemplaza el stock controlado por el de una lista de productos.
+
+        Args:
+            productos: Productos del inventario (los que tienen 'stock' se controlan)
+        """
+        stocks = {p['id']: p['stock'] for p in productos if p.get('stock') is not None}
+        stocks.update({pid: None for pid in list(self._stock) if pid not in stocks})
+        self.fijar_stock(stocks)
+
+    def disponible(self, producto_id: int) -> Optional[int]:
+        """Unidades disponibles (existencia menos reservas) o None si es ilimitado."""
+        stock = self._stock.get(producto_id)
+        if stock is None:
+            return None
+        return stock - self._reservado.get(producto_id, 0)
+
+    def topes(self) -> Dict[int, int]:
+        """
+        Instantánea de las unidades disponibles de los productos controlados.
+        Es aproximada bajo concurrencia; la reserva es la comprobación definitiva.
+        """
+        self._revisar_vencidas()
+        reservado = self._reservado
+        return {pid: stock - reservado.get(pid, 0) for pid, stock in list(self._stock.items())}
+
+    def reservar(self, reserva_id: str, cantidades: Dict[int, int]) -> Dict[int, int]:
+        """
+        Reserva unidades para un comprador.
+
+        Args:
+            reserva_id: Identificador de la reserva (p. ej. el comprador_id)
+            cantidades: Producto -> unidades solicitadas
+
+        Returns:
+            Unidades reservadas de los productos controlados
+
+        Raises:
+            StockInsuficiente: Si algún producto no alcanza (no se reserva nada)
+            ValueError: Si la reserva ya existe
+        """
+        self._revisar_vencidas()
+        with self._candado_reservas:
+            if reserva_id in self._reservas:
+                raise ValueError(f"La reserva {reserva_id} ya existe")
+            self._reservas[reserva_id] = {}
+
+        try:
+            controlados = {
+                pid: cantidad for pid, cantidad in cantidades.items()
+                if cantidad > 0 and pid in self._stock
+            }
+            candados = self._candados_de(controlados)
+            for candado in candados:
+                candado.acquire()
+            try:
+                # Un producto pudo dejar de controlarse antes de tomar los candados
+                controlados = {pid: c for pid, c in controlados.items() if pid in self._stock}
+                faltantes = {}
+                for pid, cantidad in controlados.items():
+                    disponibles = self._stock.get(pid, 0) - self._reservado.get(pid, 0)
+                    if disponibles < cantidad:
+                        faltantes[pid] = max(0, disponibles)
+                if faltantes:
+                    raise StockInsuficiente(faltantes)
+                for pid, cantidad in controlados.items():
+                    self._reservado[pid] += cantidad
+            finally:
+                for candado in reversed(candados):
+                    candado.release()
+        except Exception:
+            with self._candado_reservas:
+                self._reservas.pop(reserva_id, None)
+            raise
+
+        with self._candado_reservas:
+            self._reservas[reserva_id] = controlados
+            if self.vencimiento > 0:
+                self._vencen[reserva_id] = time.monotonic() + self.vencimiento
+        return controlados
+
+    def _cerrar(self, reserva_id: str, confirmar: bool) -> Dict[int, int]:
+        with self._candado_reservas:
+            reserva = self._reservas.pop(reserva_id, None)
+            self._vencen.pop(reserva_id, None)
+        if not reserva:
+            return {}
+
+        candados = self._candados_de(reserva)
+        for candado in candados:
+            candado.acquire()
+        try:
+            for pid, cantidad in reserva.items():
+                if pid not in self._stock:
+                    continue  # el producto dejó de controlarse
+                self._reservado[pid] = max(0, self._reservado[pid] - cantidad)
+                if confirmar:
+                    self._stock[pid] = max(0, self._stock[pid] - cantidad)
+                    self._vendido[pid] += cantidad
+        finally:
+            for candado in reversed(candados):
+                candado.release()
+        return reserva
+
+    def confirmar(self, reserva_id: str) -> Dict[int, int]:
+        """
+        Confirma una reserva: descuenta sus unidades de la existencia.
+
+        Returns:
+            Unidades confirmadas por producto (vacío si la reserva no existe)
+        """
+        return self._cerrar(reserva_id, confirmar=True)
+
+    def liberar(self, reserva_id: str) -> Dict[int, int]:
+        """
+        Cancela una reserva y devuelve sus unidades al disponible.
+
+        Returns:
+            Unidades liberadas por producto (vacío si la reserva no existe)
+        """
+        return self._cerrar(reserva_id, confirmar=False)
+
+    def vigente(self, reserva_id: str) -> bool:
+        """Indica si la reserva existe (no se confirmó, liberó ni venció)."""
+        return reserva_id in self._reservas
+
+    def liberar_vencidas(self, ahora: Optional[float] = None) -> List[str]:
+        """
+        Libera las reservas cuyo vencimiento pasó.
+
+        Args:
+            ahora: Instante de referencia en segundos de time.monotonic() (opcional)
+
+        Returns:
+            Identificadores de las reservas liberadas
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        with self._candado_reservas:
+            vencidas = [reserva_id for reserva_id, vence in self._vencen.items() if vence <= ahora]
+        for reserva_id in vencidas:
+            if self.liberar(reserva_id):
+                registro.warning(
+                    "Reserva %s de %s vencida sin confirmar; unidades liberadas",
+                    reserva_id, self.sucursal_id, extra={'evento': 'reserva_vencida'}
+                )
+        return vencidas
+
+    def _revisar_vencidas(self):
+        # Revisión perezosa, como mucho una vez por segundo
+        if self.vencimiento <= 0 or not self._vencen:
+            return
+        ahora = time.monotonic()
+        if ahora < self._proxima_revision:
+            return
+        self._proxima_revision = ahora + min(1.0, self.vencimiento)
+        self.liberar_vencidas(ahora)
+
+    def reservas_activas(self) -> int:
+        """Número de reservas vigentes."""
+        return len(self._reservas)
+
+
+_libros: Dict[str, LibroStock] = {}
+_candado_libros = threading.Lock()
+
+
+def obtener_libro_stock(sucursal_id: str) -> LibroStock:
+    """
+    Retorna el libro de stock compartido de una sucursal. La primera vez se
+    inicializa con el inventario del modelo de la sucursal.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Instancia compartida de LibroStock
+    """
+    libro = _libros.get(sucursal_id)
+    if libro is not None:
+        return libro
+
+    with _candado_libros:
+        libro = _libros.get(sucursal_id)
+        if libro is None:
+            libro = LibroStock(sucursal_id)
+            try:
+                libro.sincronizar(obtener_modelo_sucursal(sucursal_id).inventario.get('productos', []))
+            except ValueError as e:
+                registro.warning("Libro de stock de %s sin inventario inicial: %s", sucursal_id, e)
+            _libros[sucursal_id] = libro
+        return libro
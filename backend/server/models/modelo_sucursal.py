@@ -0,0 +1,411 @@
+"""
+Modelo de Sucursal compartido
+Mantiene una única copia de solo lectura del mapa y del inventario de cada
+sucursal, compartida por todos los agentes que operan en ella.
+"""
+
+import itertools
+import json
+import os
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from utils.formato_binario import SucursalCompilada, compilada_vigente, ruta_compilada
+from utils.grilla_ponderada import registrar_ocupacion
+from utils.metricas import metricas, medir
+
+HIST_CARGA_ARCHIVO = metricas.histograma(
+    'carga_archivo_segundos', 'Duración de la carga de archivos de datos', etiquetas=('tipo',)
+)
+
+
+class ModeloSucursal:
+    """
+    Vista inmutable de los datos estáticos de una sucursal.
+    Los agentes guardan solo una referencia a esta instancia; nunca deben
+    modificar `mapa` ni `inventario`.
+
+    Si proviene de un archivo compilado, `mapa`, `inventario`, `obstaculos`
+    y `productos_por_id` se materializan al primer acceso; las consultas por
+    producto leen las columnas del archivo y la grilla de A* se compila desde
+    su grilla de ocupación.
+    """
+
+    __slots__ = (
+        'sucursal_id',
+        'nombre',
+        'dimensiones',
+        'entrada',
+        'caja',
+        'posiciones_productos',
+        'compilada',
+        'version',
+        '_mapa',
+        '_inventario',
+        '_obstaculos',
+        '_productos_por_id',
+        '_filas_por_id',
+        '_inventario_compilado',
+        '_candado',
+    )
+
+    def __init__(
+        self,
+        sucursal_id: str,
+        mapa: Optional[Dict],
+        inventario: Optional[Dict],
+        compilada: Optional[SucursalCompilada] = None
+    ):
+        """
+        Construye el modelo y precalcula los índices de consulta frecuente.
+
+        Args:
+            sucursal_id: Identificador de la sucursal
+            mapa: Diccionario con el mapa de la sucursal (None para leerlo de `compilada`)
+            inventario: Diccionario con el inventario (None para leerlo de `compilada`)
+            compilada: Archivo compilado del que provienen los datos (opcional);
+                expone las columnas del inventario y la grilla de ocupación sin copia
+        """
+        if compilada is None and (mapa is None or inventario is None):
+            raise ValueError("Sin archivo compilado se necesitan el mapa y el inventario")
+        self.sucursal_id = sucursal_id
+        self.compilada = compilada
+        self._mapa = mapa
+        self._inventario = inventario
+        self._obstaculos = None
+        self._productos_por_id = None
+        self._filas_por_id = None
+        self._inventario_compilado = inventario is None
+        self._candado = threading.Lock()
+
+        # El encabezado del archivo compilado es el mapa sin obstáculos ni zonas
+        cabecera = mapa if mapa is not None else compilada.encabezado['mapa']
+        self.nombre = cabecera.get('nombre', f'Sucursal {sucursal_id}')
+        self.dimensiones = (cabecera['dimensiones']['filas'], cabecera['dimensiones']['columnas'])
+        self.entrada = (cabecera['entrada']['fila'], cabecera['entrada']['columna'])
+        self.caja = (cabecera['caja']['fila'], cabecera['caja']['columna'])
+
+        # Índice producto -> posición (la primera zona que lo contiene)
+        if mapa is None:
+            self.posiciones_productos = compilada.posiciones_productos()
+        else:
+            posiciones = {}
+            for info in mapa.get('zonas_productos', {}).values():
+                posicion = (info['fila'], info['columna'])
+                for producto_id in info.get('productos', []):
+                    posiciones.setdefault(producto_id, posicion)
+            self.posiciones_productos = posiciones
+
+        # Versión monótona dentro del proceso: cambia cada vez que se
+        # construye un modelo nuevo a partir de los datos fuente
+        self.version = next(_contador_versiones)
+
+    @property
+    def mapa(self) -> Dict:
+        """Diccionario del mapa con el formato de data/mapas."""
+        if self._mapa is None:
+            with self._candado:
+                if self._mapa is None:
+                    mapa = self.compilada.mapa()
+                    # La grilla de A* se compila desde la grilla de ocupación del archivo
+                    registrar_ocupacion(mapa, self.compilada.libres)
+                    self._mapa = mapa
+        return self._mapa
+
+    @property
+    def inventario(self) -> Dict:
+        """Diccionario del inventario con el formato de data/inventario."""
+        if self._inventario is None:
+            with self._candado:
+                if self._inventario is None:
+                    self._inventario = self.compilada.inventario()
+        return self._inventario
+
+    @property
+    def obstaculos(self) -> FrozenSet[Tuple[int, int]]:
+        """Posiciones bloqueadas."""
+        if self._obstaculos is None:
+            if self._mapa is None:
+                obstaculos = frozenset(self.compilada.obstaculos())
+            else:
+                obstaculos = frozenset(
+                    (obst['fila'], obst['columna'])
+                    for obst in self._mapa.get('obstaculos', [])
+                )
+            self._obstaculos = obstaculos
+        return self._obstaculos
+
+    @property
+    def productos_por_id(self) -> Dict[int, Dict]:
+        """Índice id -> producto del inventario."""
+        if self._productos_por_id is None:
+            self._productos_por_id = {
+                producto['id']: producto
+                for producto in self.inventario.get('productos', [])
+            }
+        return self._productos_por_id
+
+    def columnas_inventario(self) -> Optional[SucursalCompilada]:
+        """
+        Archivo compilado cuyas columnas corresponden, fila por fila, a
+        `inventario['productos']` (None si el inventario no proviene de él).
+        """
+        return self.compilada if self._inventario_compilado else None
+
+    def posicion_producto(self, producto_id: int) -> Optional[Tuple[int, int]]:
+        """Retorna la posición (fila, columna) de un producto o None."""
+        return self.posiciones_productos.get(producto_id)
+
+    def producto(self, producto_id: int) -> Optional[Dict]:
+        """Retorna la información de un producto del inventario o None."""
+        if self._inventario is not None or self.compilada is None:
+            return self.productos_por_id.get(producto_id)
+        # Sin materializar el inventario: se lee la fila del archivo compilado
+        if self._filas_por_id is None:
+            self._filas_por_id = self.compilada.filas_por_id()
+        fila = self._filas_por_id.get(producto_id)
+        return self.compilada.producto(fila) if fila is not None else None
+
+
+class SucursalNoEncontrada(ValueError):
+    """Los archivos de datos de la sucursal no existen."""
+
+
+_contador_versiones = itertools.count(1)
+
+
+def _ruta_datos(tipo: str, sucursal_id: str) -> str:
+    """Retorna la ruta del archivo JSON de datos de una sucursal."""
+    return os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        'data', tipo, f'{sucursal_id}.json'
+    )
+
+
+def _cargar_json(tipo: str, descripcion: str, sucursal_id: str) -> Dict:
+    """
+    Carga un archivo de datos de la sucursal.
+
+    Args:
+        tipo: Subdirectorio de datos ('mapas' o 'inventario')
+        descripcion: Nombre legible del recurso para los mensajes de error
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Diccionario con el contenido del archivo
+    """
+    try:
+        with medir(HIST_CARGA_ARCHIVO, tipo=tipo), \
+                open(_ruta_datos(tipo, sucursal_id), 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        raise SucursalNoEncontrada(f"No se encontró el {descripcion} para la sucursal {sucursal_id}")
+    except json.JSONDecodeError:
+        raise ValueError(f"Error al decodificar el {descripcion} de {sucursal_id}")
+
+
+# Archivos compilados abiertos: ruta -> ((mtime, tamaño), SucursalCompilada)
+_compiladas: Dict[str, Tuple[Tuple[int, int], SucursalCompilada]] = {}
+_candado_compiladas = threading.Lock()
+
+
+def _cargar_compilada(sucursal_id: str) -> Optional[SucursalCompilada]:
+    """
+    Abre el archivo compilado de la sucursal si existe y está al día con sus JSON.
+    El mapeo se reutiliza mientras el archivo no cambie.
+
+    Returns:
+        SucursalCompilada o None si se deben usar los JSON
+    """
+    ruta = ruta_compilada(sucursal_id)
+    fuentes = [_ruta_datos('mapas', sucursal_id), _ruta_datos('inventario', sucursal_id)]
+    if not compilada_vigente(ruta, fuentes):
+        return None
+    estado = os.stat(ruta)
+    firma = (estado.st_mtime_ns, estado.st_size)
+    with _candado_compiladas:
+        guardada = _compiladas.get(ruta)
+        if guardada is not None and guardada[0] == firma:
+            return guardada[1]
+        # El mapeo anterior se libera cuando ningún modelo lo referencia
+        with medir(HIST_CARGA_ARCHIVO, tipo='compilado'):
+            compilada = SucursalCompilada(ruta)
+        _compiladas[ruta] = (firma, compilada)
+        return compilada
+
+
+def cargar_inventario(sucursal_id: str) -> Dict:
+    """
+    Carga el inventario de una sucursal, desde el archivo compilado si está
+    vigente o desde el JSON en caso contrario. Cada llamada retorna una copia nueva.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Diccionario con el formato de data/inventario
+    """
+    compilada = _cargar_compilada(sucursal_id)
+    if compilada is not None:
+        return compilada.inventario()
+    return _cargar_json('inventario', 'inventario', sucursal_id)
+
+
+def metadatos_sucursal(sucursal_id: str) -> Dict:
+    """
+    Nombre y cantidad de productos de una sucursal sin cargarla: se leen del
+    encabezado del archivo compilado. Sin archivo compilado vigente se usa el
+    nombre provisorio del agente y la cantidad queda en None.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Diccionario con 'nombre' y 'productos'
+    """
+    compilada = _cargar_compilada(sucursal_id)
+    if compilada is None:
+        return {'nombre': f'Sucursal {sucursal_id}', 'productos': None}
+    return {
+        'nombre': compilada.encabezado['inventario'].get('nombre') or f'Sucursal {sucursal_id}',
+        'productos': len(compilada)
+    }
+
+
+_modelos: Dict[str, ModeloSucursal] = {}
+_candado_modelos = threading.Lock()
+
+
+def obtener_modelo_sucursal(sucursal_id: str) -> ModeloSucursal:
+    """
+    Retorna el modelo compartido de una sucursal, cargándolo la primera vez.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Instancia compartida de ModeloSucursal
+    """
+    modelo = _modelos.get(sucursal_id)
+    if modelo is not None:
+        return modelo
+
+    with _candado_modelos:
+        return _modelo_publicado(sucursal_id)
+
+
+def _modelo_publicado(sucursal_id: str) -> ModeloSucursal:
+    """Modelo publicado de una sucursal, cargándolo si falta (con _candado_modelos tomado)."""
+    modelo = _modelos.get(sucursal_id)
+    if modelo is None:
+        compilada = _cargar_compilada(sucursal_id)
+        if compilada is not None:
+            # El mapa y el inventario se leen del archivo al primer uso
+            modelo = ModeloSucursal(sucursal_id, None, None, compilada)
+        else:
+            mapa = _cargar_json('mapas', 'mapa', sucursal_id)
+            inventario = _cargar_json('inventario', 'inventario', sucursal_id)
+            modelo = ModeloSucursal(sucursal_id, mapa, inventario)
+        _modelos[sucursal_id] = modelo
+    return modelo
+
+
+def recargar_modelo_sucursal(sucursal_id: str) -> ModeloSucursal:
+    """
+    Descarta el modelo cargado de una sucursal y lo vuelve a leer de sus archivos.
+    Los agentes que ya tienen el modelo anterior lo conservan hasta reingresar.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Nuevo modelo compartido
+    """
+    with _candado_modelos:
+        _modelos.pop(sucursal_id, None)
+        return _modelo_publicado(sucursal_id)
+
+
+def actualizar_inventario_modelo(
+    sucursal_id: str,
+    inventario: Dict,
+    ubicaciones: Optional[Dict[int, str]] = None
+) -> ModeloSucursal:
+    """
+    Publica un modelo nuevo con el inventario indicado y el mismo mapa. La
+    lectura del modelo vigente y la publicación del nuevo se hacen con el
+    candado de modelos tomado, así que no se pierden cambios concurrentes
+    del mapa.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+        inventario: Inventario actualizado
+        ubicaciones: Productos nuevos -> nombre de la zona del mapa donde se ubican
+
+    Returns:
+        Nuevo modelo compartido
+    """
+    with _candado_modelos:
+        actual = _modelo_publicado(sucursal_id)
+        mapa = actual.mapa
+        if ubicaciones:
+            zonas = dict(mapa.get('zonas_productos', {}))
+            for producto_id, nombre_zona in ubicaciones.items():
+                if nombre_zona not in zonas:
+                    raise ValueError(f"La zona {nombre_zona} no existe en el mapa de {sucursal_id}")
+                zona = dict(zonas[nombre_zona])
+                zona['productos'] = list(zona.get('productos', [])) + [producto_id]
+                zonas[nombre_zona] = zona
+            mapa = dict(mapa)
+            mapa['zonas_productos'] = zonas
+
+        # Mismo diccionario de mapa: la grilla compilada de A* se reutiliza
+        modelo = ModeloSucursal(sucursal_id, mapa, inventario, actual.compilada)
+        _modelos[sucursal_id] = modelo
+        return modelo
+
+
+def actualizar_obstaculos_modelo(
+    sucursal_id: str,
+    agregar: Iterable[Tuple[int, int]] = (),
+    quitar: Iterable[Tuple[int, int]] = ()
+) -> ModeloSucursal:
+    """
+    Publica un modelo nuevo con obstáculos agregados o quitados y el mismo
+    inventario. Como en actualizar_inventario_modelo, se lee y publica con
+    el candado de modelos tomado.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+        agregar: Posiciones (fila, columna) que pasan a estar bloqueadas
+        quitar: Posiciones (fila, columna) que vuelven a ser transitables
+
+    Returns:
+        Nuevo modelo compartido
+
+    Raises:
+        ValueError: Si una posición está fuera del mapa o se intenta bloquear
+            la entrada, la caja o una zona de productos
+    """
+    agregar, quitar = set(agregar), set(quitar)
+    with _candado_modelos:
+        actual = _modelo_publicado(sucursal_id)
+        filas, columnas = actual.dimensiones
+        protegidas = {actual.entrada, actual.caja} | set(actual.posiciones_productos.values())
+        for posicion in agregar | quitar:
+            if not (0 <= posicion[0] < filas and 0 <= posicion[1] < columnas):
+                raise ValueError(f"La posición {posicion} está fuera del mapa de {sucursal_id}")
+        bloqueadas = sorted(agregar & protegidas)
+        if bloqueadas:
+            raise ValueError(
+                f"No se puede bloquear la entrada, la caja ni una zona de productos: {bloqueadas}"
+            )
+
+        obstaculos = (actual.obstaculos - quitar) | agregar
+        mapa = dict(actual.mapa)
+        mapa['obstaculos'] = [{'fila': fila, 'columna': columna} for fila, columna in sorted(obstaculos)]
+
+        # El inventario sigue sin materializar si aún se lee del archivo compilado
+        modelo = ModeloSucursal(sucursal_id, mapa, actual._inventario, actual.compilada)
+        _modelos[sucursal_id] = modelo
+        return modelo
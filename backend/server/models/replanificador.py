@@ -0,0 +1,228 @@
+"""
+Replanificador de Rutas por Cambios en el Mapa
+Cuando se bloquea o se libera un pasillo de una sucursal, publica el mapa
+nuevo y repara el resto de la ruta de cada comprador activo con búsquedas
+incrementales (D* Lite), en lugar de volver a ejecutar A* desde cero para
+cada comprador y cada tramo.
+
+Hay una búsqueda incremental por celda objetivo (zona de productos o caja),
+compartida por todos los compradores de la sucursal que van hacia ella; al
+cambiar el mapa cada búsqueda corrige solo las celdas afectadas.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from models.modelo_sucursal import (
+    actualizar_obstaculos_modelo, obtener_modelo_sucursal, recargar_modelo_sucursal
+)
+from utils.grilla_ponderada import GrillaPonderada, obtener_grilla, registrar_grilla
+from utils.metricas import metricas, medir
+from utils.planificador_incremental import BusquedaIncremental
+from utils.registro import obtener_logger
+
+registro = obtener_logger('replanificador')
+
+HIST_REPLANIFICACION_SEGUNDOS = metricas.histograma(
+    'replanificacion_segundos', 'Duración de la reparación de rutas tras un cambio del mapa'
+)
+
+# Búsquedas incrementales guardadas por sucursal (una por celda objetivo)
+CAPACIDAD_BUSQUEDAS = 64
+
+
+class Replanificador:
+    """
+    Compradores con una ruta por recorrer en una sucursal y búsquedas
+    incrementales hacia sus objetivos.
+
+    Los compradores se registran al planificar y se retiran al terminar o
+    reiniciarse; `aplicar_cambios` llama a `reparar_ruta` de cada uno.
+    """
+
+    def __init__(self, sucursal_id: str, capacidad: int = CAPACIDAD_BUSQUEDAS):
+        """
+        Args:
+            sucursal_id: Identificador de la sucursal
+            capacidad: Búsquedas incrementales guardadas como máximo
+        """
+        self.sucursal_id = sucursal_id
+        self.capacidad = capacidad
+        self._compradores: Dict[str, object] = {}
+        self._busquedas: 'OrderedDict[Tuple[int, int], BusquedaIncremental]' = OrderedDict()
+        self._candado = threading.RLock()
+
+    def registrar(self, comprador):
+        """Agrega un comprador con ruta planificada."""
+        with self._candado:
+            self._compradores[comprador.comprador_id] = comprador
+
+    def retirar(self, comprador_id: str):
+        """Quita un comprador (terminó o se reinició)."""
+        with self._candado:
+            self._compradores.pop(comprador_id, None)
+
+    def compradores_activos(self) -> int:
+        """Número de compradores registrados."""
+        return len(self._compradores)
+
+    def busqueda_hacia(
+        self,
+        objetivo: Tuple[int, int],
+        grilla: GrillaPonderada
+    ) -> BusquedaIncremental:
+        """
+        Búsqueda incremental hacia `objetivo` sobre `grilla`, creándola si no existe.
+
+        Args:
+            objetivo: Posición objetivo
+            grilla: Grilla del mapa vigente
+
+        Returns:
+            Búsqueda compartida hacia el objetivo
+        """
+        with self._candado:
+            busqueda = self._busquedas.get(objetivo)
+            if busqueda is None or busqueda.grilla is not grilla:
+                # Una búsqueda de otra grilla sin los cambios intermedios no se puede reparar
+                busqueda = BusquedaIncremental(grilla, objetivo)
+                self._busquedas[objetivo] = busqueda
+                while len(self._busquedas) > self.capacidad:
+                    self._busquedas.popitem(last=False)
+            self._busquedas.move_to_end(objetivo)
+            return busqueda
+
+    def aplicar_cambios(
+        self,
+        agregar: Iterable[Tuple[int, int]] = (),
+        quitar: Iterable[Tuple[int, int]] = ()
+    ) -> Dict:
+        """
+        Publica el mapa con los obstáculos cambiados y repara las rutas de
+        los compradores activos.
+
+        Args:
+            agregar: Posiciones que pasan a estar bloqueadas
+            quitar: Posiciones que vuelven a ser transitables
+
+        Returns:
+            Diccionario con la cantidad de obstáculos agregados y quitados,
+            los compradores cuya ruta cambió y los que quedaron sin ruta
+
+        Raises:
+            ValueError: Si algún cambio no es válido (ver actualizar_obstaculos_modelo)
+        """
+        with self._candado, medir(HIST_REPLANIFICACION_SEGUNDOS):
+            anterior = obtener_modelo_sucursal(self.sucursal_id)
+            modelo = actualizar_obstaculos_modelo(self.sucursal_id, agregar, quitar)
+            agregadas = modelo.obstaculos - anterior.obstaculos
+            quitadas = anterior.obstaculos - modelo.obstaculos
+
+            # La grilla nueva se deriva de la anterior recalculando solo las celdas cambiadas
+            grilla = obtener_grilla(anterior.mapa).con_obstaculos(agregadas, quitadas)
+            registrar_grilla(modelo.mapa, grilla)
+            for objetivo, busqueda in list(self._busquedas.items()):
+                try:
+                    busqueda.actualizar_grilla(grilla, agregadas | quitadas)
+                except ValueError:
+                    del self._busquedas[objetivo]
+
+            reparados, sin_ruta = self._reparar_rutas(modelo, grilla)
+
+        registro.info(
+            "Mapa de %s actualizado: +%d/-%d obstáculos, %d rutas reparadas",
+            self.sucursal_id, len(agregadas), len(quitadas), len(reparados)
+        )
+        return {
+            'sucursal_id': self.sucursal_id,
+            'obstaculos_agregados': len(agregadas),
+            'obstaculos_quitados': len(quitadas),
+            'compradores_activos': len(self._compradores),
+            'rutas_reparadas': reparados,
+            'sin_ruta': sin_ruta,
+        }
+
+
+    def recargar_mapa(self) -> Dict:
+        """
+        Vuelve a leer el mapa de sus archivos (cambió en disco) y repara las
+        rutas de los compradores activos. El archivo manda: se descartan los
+        obstáculos y ubicaciones aplicados en tiempo de ejecución.
+
+        Returns:
+            Diccionario con los compradores cuya ruta cambió y los que quedaron sin ruta
+        """
+        with self._candado, medir(HIST_REPLANIFICACION_SEGUNDOS):
+            modelo = recargar_modelo_sucursal(self.sucursal_id)
+            grilla = obtener_grilla(modelo.mapa)
+            # Las búsquedas guardadas corresponden a la grilla anterior
+            self._busquedas.clear()
+            reparados, sin_ruta = self._reparar_rutas(modelo, grilla)
+
+        registro.info(
+            "Mapa de %s recargado: %d rutas reparadas", self.sucursal_id, len(reparados)
+        )
+        return {
+            'sucursal_id': self.sucursal_id,
+            'compradores_activos': len(self._compradores),
+            'rutas_reparadas': reparados,
+            'sin_ruta': sin_ruta,
+        }
+
+    def _reparar_rutas(self, modelo, grilla: GrillaPonderada) -> Tuple[List[str], List[str]]:
+        """
+        Repara la ruta de cada comprador registrado sobre el modelo nuevo.
+
+        Returns:
+            Tupla (compradores cuya ruta cambió, compradores sin ruta)
+        """
+        def busqueda(objetivo: Tuple[int, int]) -> BusquedaIncremental:
+            return self.busqueda_hacia(objetivo, grilla)
+
+        reparados: List[str] = []
+        sin_ruta: List[str] = []
+        for comprador_id, comprador in list(self._compradores.items()):
+            try:
+                if comprador.reparar_ruta(modelo, busqueda):
+                    reparados.append(comprador_id)
+            except ValueError as e:
+                registro.warning(
+                    "No se pudo reparar la ruta de %s: %s", comprador_id, e,
+                    extra={'evento': 'ruta_sin_reparar'}
+                )
+                sin_ruta.append(comprador_id)
+            except Exception:
+                # Un fallo con un comprador no deja sin reparar a los demás
+                registro.exception(
+                    "Error al reparar la ruta de %s", comprador_id,
+                    extra={'evento': 'ruta_sin_reparar'}
+                )
+                sin_ruta.append(comprador_id)
+        return reparados, sin_ruta
+
+
+_replanificadores: Dict[str, Replanificador] = {}
+_candado_replanificadores = threading.Lock()
+
+
+def obtener_replanificador(sucursal_id: str) -> Replanificador:
+    """
+    Retorna el replanificador compartido de una sucursal.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Instancia compartida de Replanificador
+    """
+    replanificador = _replanificadores.get(sucursal_id)
+    if replanificador is not None:
+        return replanificador
+
+    with _candado_replanificadores:
+        replanificador = _replanificadores.get(sucursal_id)
+        if replanificador is None:
+            replanificador = Replanificador(sucursal_id)
+            _replanificadores[sucursal_id] = replanificador
+        return replanificador
@@ -0,0 +1,229 @@
+"""
+Tabla de Reservas de Espacio-Tiempo
+Lleva qué celda ocupa cada comprador en cada paso de tiempo dentro de una
+sucursal. Los compradores planifican con A* de espacio-tiempo (A* cooperativo)
+sobre esta tabla, de modo que no pasan por la misma celda en el mismo paso ni
+se cruzan de frente en un pasillo.
+
+El tiempo avanza en pasos de SEGUNDOS_POR_PASO (la misma estimación de
+`AgenteComprador._estimar_tiempo`). Las reservas de un comprador vencen al
+terminar su ruta o se liberan al reiniciarlo.
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.modelo_sucursal import obtener_modelo_sucursal
+
+# Planificar las rutas de los compradores con reservas de espacio-tiempo (1 = activado)
+RUTAS_COOPERATIVAS = os.environ.get('RUTAS_COOPERATIVAS', '1') == '1'
+
+# Segundos que representa un paso de la ruta
+SEGUNDOS_POR_PASO = 2.0
+
+# Intentos de planificar y reservar antes de reservar la ruta con conflictos
+INTENTOS_RESERVA = 3
+
+
+class TablaReservas:
+    """
+    Ocupación reservada de las celdas de una sucursal por paso de tiempo.
+
+    Cada reserva se guarda con la clave entera `t * celdas + celda`, así que
+    consultar si una celda está ocupada en un paso es una búsqueda en un
+    diccionario. Las lecturas no toman el candado; `reservar` vuelve a
+    verificar la ruta completa con el candado tomado antes de escribirla.
+    """
+
+    def __init__(
+        self,
+        sucursal_id: str,
+        dimensiones: Tuple[int, int],
+        segundos_por_paso: float = SEGUNDOS_POR_PASO,
+        reloj: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            sucursal_id: Identificador de la sucursal
+            dimensiones: (filas, columnas) del mapa
+            segundos_por_paso: Segundos que representa un paso de tiempo
+            reloj: Fuente del tiempo en segundos
+        """
+        self.sucursal_id = sucursal_id
+        self.columnas = dimensiones[1]
+        self.celdas = dimensiones[0] * dimensiones[1]
+        self.segundos_por_paso = segundos_por_paso
+        self.reloj = reloj
+        # Último paso con alguna reserva; después de él no hay conflictos posibles
+        self.tiempo_maximo = -1
+        # clave -> comprador; la búsqueda de espacio-tiempo lo lee directamente
+        self.ocupacion: Dict[int, str] = {}
+        # comprador -> (paso inicial, paso final, claves reservadas)
+        self._reservas: Dict[str, Tuple[int, int, List[int]]] = {}
+        # (paso final, comprador) de cada reserva, para vencerlas en orden
+        self._vencimientos: List[Tuple[int, str]] = []
+        self._candado = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ocupacion)
+
+    def tiempo_actual(self) -> int:
+        """Paso de tiempo actual según el reloj de la tabla."""
+        return int(self.reloj() / self.segundos_por_paso)
+
+    def clave(self, posicion: Tuple[int, int], t: int) -> int:
+        """Clave de la celda `posicion` en el paso `t`."""
+        return t * self.celdas + posicion[0] * self.columnas + posicion[1]
+
+    def ocupante(self, posicion: Tuple[int, int], t: int) -> Optional[str]:
+        """Comprador que reservó la celda en el paso `t`, o None."""
+        return self.ocupacion.get(self.clave(posicion, t))
+
+    def primer_paso_libre(
+        self,
+        posicion: Tuple[int, int],
+        desde: int,
+        comprador_id: Optional[str] = None
+    ) -> int:
+        """
+        Primer paso desde `desde` en que la celda no está reservada por otro
+        comprador (p. ej. para entrar a la sucursal cuando la entrada se libera).
+        """
+        t = desde
+        while self.ocupante(posicion, t) not in (None, comprador_id):
+            t += 1
+        return t
+
+    def hay_conflicto(
+        self,
+        desde: Tuple[int, int],
+        hacia: Tuple[int, int],
+        t: int,
+        comprador_id: Optional[str] = None
+    ) -> bool:
+        """
+        Indica si moverse de `desde` (paso t) a `hacia` (paso t+1) choca con
+        otro comprador: porque ocupa `hacia` en t+1 o porque hace el
+        movimiento inverso en el mismo paso.
+
+        Args:
+            desde: Celda en el paso t
+            hacia: Celda en el paso t+1 (igual a `desde` si se espera)
+            t: Paso de tiempo de partida
+            comprador_id: Comprador que se mueve (sus reservas no cuentan)
+        """
+        ocupacion = self.ocupacion
+        ocupante = ocupacion.get(self.clave(hacia, t + 1))
+        if ocupante is not None and ocupante != comprador_id:
+            return True
+        if hacia == desde:
+            return False
+        ocupante = ocupacion.get(self.clave(hacia, t))
+        return (
+            ocupante is not None and ocupante != comprador_id
+            and ocupacion.get(self.clave(desde, t + 1)) == ocupante
+        )
+
+    def reservar(
+        self,
+        comprador_id: str,
+        ruta: List[Tuple[int, int]],
+        tiempo_inicio: int,
+        forzar: bool = False
+    ) -> bool:
+        """
+        Reserva la ruta de un comprador (la posición `ruta[i]` en el paso
+        `tiempo_inicio + i`), reemplazando su reserva anterior.
+
+        Args:
+            comprador_id: Comprador que reserva
+            ruta: Posiciones paso a paso (las esperas repiten la posición)
+            tiempo_inicio: Paso de la primera posición
+            forzar: Reservar aunque haya conflictos; las celdas ya tomadas por
+                otros compradores se conservan para ellos
+
+        Returns:
+            True si la ruta quedó reservada sin conflictos
+        """
+        with self._candado:
+            self._vencer(self.tiempo_actual())
+            if not forzar:
+                for i in range(1, len(ruta)):
+                    if self.hay_conflicto(ruta[i - 1], ruta[i], tiempo_inicio + i - 1, comprador_id):
+                        return False
+            self._liberar(comprador_id)
+
+            claves = []
+            ocupacion = self.ocupacion
+            for i, posicion in enumerate(ruta):
+                clave = self.clave(posicion, tiempo_inicio + i)
+                if ocupacion.setdefault(clave, comprador_id) == comprador_id:
+                    claves.append(clave)
+            fin = tiempo_inicio + len(ruta) - 1
+            self._reservas[comprador_id] = (tiempo_inicio, fin, claves)
+            heapq.heappush(self._vencimientos, (fin, comprador_id))
+            self.tiempo_maximo = max(self.tiempo_maximo, fin)
+            return True
+
+    def liberar(self, comprador_id: str):
+        """Elimina las reservas de un comprador."""
+        with self._candado:
+            self._liberar(comprador_id)
+
+    def _liberar(self, comprador_id: str):
+        reserva = self._reservas.pop(comprador_id, None)
+        if reserva is None:
+            return
+        ocupacion = self.ocupacion
+        for clave in reserva[2]:
+            if ocupacion.get(clave) == comprador_id:
+                del ocupacion[clave]
+
+    def _vencer(self, tiempo: int):
+        """Libera las reservas cuyo último paso es anterior a `tiempo`."""
+        vencimientos = self._vencimientos
+        while vencimientos and vencimientos[0][0] < tiempo:
+            fin, comprador_id = heapq.heappop(vencimientos)
+            reserva = self._reservas.get(comprador_id)
+            if reserva is not None and reserva[1] == fin:
+                self._liberar(comprador_id)
+        if not self._reservas:
+            self.tiempo_maximo = -1
+
+    def intervalo(self, comprador_id: str) -> Optional[Tuple[int, int]]:
+        """(primer paso, último paso) de la reserva de un comprador, o None."""
+        reserva = self._reservas.get(comprador_id)
+        return reserva[:2] if reserva is not None else None
+
+    def compradores_activos(self) -> int:
+        """Número de compradores con reservas vigentes."""
+        return len(self._reservas)
+
+
+_tablas: Dict[str, TablaReservas] = {}
+_candado_tablas = threading.Lock()
+
+
+def obtener_tabla_reservas(sucursal_id: str) -> TablaReservas:
+    """
+    Retorna la tabla de reservas compartida de una sucursal.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+
+    Returns:
+        Instancia compartida de TablaReservas
+    """
+    tabla = _tablas.get(sucursal_id)
+    if tabla is not None:
+        return tabla
+
+    with _candado_tablas:
+        tabla = _tablas.get(sucursal_id)
+        if tabla is None:
+            tabla = TablaReservas(sucursal_id, obtener_modelo_sucursal(sucursal_id).dimensiones)
+            _tablas[sucursal_id] = tabla
+        return tabla
@@ -0,0 +1,304 @@
+"""
+Algoritmo Genético por Islas
+Optimizador poblacional alternativo al Temple Simulado. Cada individuo es un
+vector disperso de cantidades (producto -> unidades); la mutación reutiliza
+los cuatro movimientos del temple (agregar, quitar, modificar, reemplazar)
+y el cruce combina las cantidades de dos padres producto a producto. La
+aptitud de toda la población se calcula en una sola llamada que reproduce
+los términos de `calcular_costo`.
+
+Varias islas evolucionan por separado y cada cierto número de generaciones
+intercambian sus mejores individuos en anillo. Las islas pueden ejecutarse
+en los procesos trabajadores compartidos (ver trabajadores) para aprovechar
+varios núcleos; las semillas de cada isla se derivan del generador de la
+ejecución, así que el resultado es el mismo con o sin procesos.
+"""
+
+import os
+import random
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from utils.algoritmos_busqueda import OptimizadorListas
+from utils.costos import (
+    MINIMO_VARIEDAD, MULTIPLO_CANTIDAD_TIPICA, PENALIZACION_CATEGORIA,
+    PENALIZACION_EXCESO, PENALIZACION_IMPORTANCIA, PENALIZACION_VARIEDAD,
+    PESO_CATEGORIA, PESO_IMPORTANCIA, PESO_PRESUPUESTO, PESO_REALISMO,
+    PESO_VARIEDAD
+)
+from utils.indice_productos import IndiceProductos
+from utils.trabajadores import mapear
+
+# Procesos usados por defecto para las islas (0 = en el proceso actual)
+PROCESOS_GENETICO = int(os.environ.get('PROCESOS_GENETICO', 0))
+
+Individuo = Dict[int, int]
+
+
+class _Contexto:
+    """Datos de una ejecución compartidos por todas las islas."""
+
+    def __init__(
+        self,
+        optimizador: 'AlgoritmoGenetico',
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        topes: Optional[Dict[int, int]],
+        indice: Optional[IndiceProductos] = None
+    ):
+        self.optimizador = optimizador
+        self.inventario = inventario
+        self.presupuesto = presupuesto
+        self.categorias_preferidas = categorias_preferidas
+        self.preferidas = set(categorias_preferidas)
+        self.topes = topes or {}
+        self.indice = indice if indice is not None else IndiceProductos(inventario)
+        self.por_id = self.indice.por_id
+
+    def lista(self, individuo: Individuo) -> List[Tuple[Dict, int]]:
+        return [(self.por_id[producto_id], cantidad) for producto_id, cantidad in individuo.items()]
+
+    def limitar(self, individuo: Individuo) -> Individuo:
+        """Descarta cantidades no positivas y recorta al stock disponible."""
+        topes = self.topes
+        return {
+            producto_id: min(cantidad, topes.get(producto_id, cantidad))
+            for producto_id, cantidad in individuo.items()
+            if cantidad > 0 and topes.get(producto_id, 1) > 0
+        }
+
+
+def costos_poblacion(poblacion: List[Individuo], contexto: _Contexto) -> List[float]:
+    """
+    Calcula el costo de todos los individuos de una población.
+
+    Reproduce los términos de `OptimizadorListas.calcular_costo` sobre
+    listas consolidadas (una entrada por producto).
+
+    Args:
+        poblacion: Individuos (producto -> unidades)
+        contexto: Datos de la ejecución
+
+    Returns:
+        Costo de cada individuo, en el mismo orden
+    """
+    por_id = contexto.por_id
+    presupuesto = contexto.presupuesto
+    preferidas = contexto.preferidas
+    costos = []
+    for individuo in poblacion:
+        if not individuo:
+            costos.append(float('inf'))
+            continue
+        total = 0.0
+        importancia = 0.0
+        unidades = 0
+        realismo = 0.0
+        categorias = set()
+        for producto_id, cantidad in individuo.items():
+            producto = por_id[producto_id]
+            total += producto['precio'] * cantidad
+            importancia += producto.get('importancia', 0.5) * cantidad
+            unidades += cantidad
+            limite = producto.get('cantidad_tipica', 1) * MULTIPLO_CANTIDAD_TIPICA
+            if cantidad > limite:
+                realismo += (cantidad - limite) * PENALIZACION_EXCESO
+            categorias.add(producto['categoria'])
+        promedio = importancia / unidades if unidades > 0 else 0
+        variedad = (
+            (MINIMO_VARIEDAD - len(individuo)) * PENALIZACION_VARIEDAD
+            if len(individuo) < MINIMO_VARIEDAD else 0
+        )
+        categoria = len(preferidas - categorias) * PENALIZACION_CATEGORIA if preferidas else 0.0
+        costos.append(
+            (total - presupuesto) ** 2 * PESO_PRESUPUESTO
+            + realismo * PESO_REALISMO
+            + (1.0 - promedio) * PENALIZACION_IMPORTANCIA * PESO_IMPORTANCIA
+            + variedad * PESO_VARIEDAD
+            + categoria * PESO_CATEGORIA
+        )
+    return costos
+
+
+def _evolucionar(
+    contexto: _Contexto,
+    poblacion: List[Individuo],
+    generaciones: int,
+    semilla: int
+) -> Tuple[List[Individuo], List[float]]:
+    """Evoluciona una isla durante varias generaciones."""
+    optimizador = contexto.optimizador
+    rng = random.Random(semilla)
+    costos = costos_poblacion(poblacion, contexto)
+
+    for _ in range(generaciones):
+        orden = sorted(range(len(poblacion)), key=costos.__getitem__)
+        nueva = [poblacion[i] for i in orden[:optimizador.elite]]
+
+        def torneo() -> Individuo:
+            participantes = rng.sample(range(len(poblacion)), optimizador.tamano_torneo)
+            return poblacion[min(participantes, key=costos.__getitem__)]
+
+        while len(nueva) < len(poblacion):
+            padre = torneo()
+            if rng.random() < optimizador.prob_cruce:
+                hijo = optimizador.cruzar(padre, torneo(), rng)
+            else:
+                hijo = dict(padre)
+            for _ in range(1 + (rng.random() < 0.3)):
+                hijo = optimizador.mutar(hijo, contexto, rng)
+            nueva.append(hijo)
+
+        poblacion = nueva
+        costos = costos_poblacion(poblacion, contexto)
+    return poblacion, costos
+
+
+def _evolucionar_en_trabajador(indice: IndiceProductos, argumentos):
+    optimizador, presupuesto, categorias_preferidas, topes, poblacion, generaciones, semilla = argumentos
+    contexto = _Contexto(
+        optimizador, indice.productos, presupuesto, categorias_preferidas, topes, indice
+    )
+    return _evolucionar(contexto, poblacion, generaciones, semilla)
+
+
+class AlgoritmoGenetico(OptimizadorListas):
+    """
+    Algoritmo genético con modelo de islas.
+    """
+
+    nombre = 'genetico'
+
+    def __init__(
+        self,
+        poblacion: int = 30,
+        generaciones: int = 60,
+        islas: int = 4,
+        migracion_cada: int = 15,
+        migrantes: int = 2,
+        elite: int = 2,
+        tamano_torneo: int = 3,
+        prob_cruce: float = 0.8,
+        procesos: Optional[int] = None
+    ):
+        """
+        Args:
+            poblacion: Individuos por isla
+            generaciones: Generaciones totales de cada isla
+            islas: Número de islas
+            migracion_cada: Generaciones entre migraciones
+            migrantes: Mejores individuos que cada isla envía a la siguiente
+            elite: Mejores individuos que pasan sin cambios a la siguiente generación
+            tamano_torneo: Participantes de cada torneo de selección
+            prob_cruce: Probabilidad de cruzar dos padres (si no, se copia uno)
+            procesos: Procesos para las islas (por defecto PROCESOS_GENETICO; 0 = sin procesos)
+        """
+        self.poblacion = poblacion
+        self.generaciones = generaciones
+        self.islas = islas
+        self.migracion_cada = migracion_cada
+        self.migrantes = migrantes
+        self.elite = elite
+        self.tamano_torneo = min(tamano_torneo, poblacion)
+        self.prob_cruce = prob_cruce
+        self.procesos = PROCESOS_GENETICO if procesos is None else procesos
+
+    def cruzar(self, padre: Individuo, madre: Individuo, rng) -> Individuo:
+        """Cruce uniforme: cada producto toma la cantidad de uno de los padres."""
+        hijo = {}
+        for producto_id in padre.keys() | madre.keys():
+            cantidad = (padre if rng.random() < 0.5 else madre).get(producto_id, 0)
+            if cantidad > 0:
+                hijo[producto_id] = cantidad
+        return hijo or dict(padre)
+
+    def mutar(self, individuo: Individuo, contexto: _Contexto, rng) -> Individuo:
+        """Aplica uno de los movimientos del temple y consolida el resultado."""
+        vecino = self.generar_vecino(
+            contexto.lista(individuo), contexto.inventario, contexto.presupuesto,
+            contexto.indice, contexto.categorias_preferidas, rng
+        )
+        mutado: Individuo = {}
+        for producto, cantidad in vecino:
+            mutado[producto['id']] = mutado.get(producto['id'], 0) + cantidad
+        return contexto.limitar(mutado)
+
+    def _poblacion_inicial(self, contexto: _Contexto, rng) -> List[Individuo]:
+        topes = contexto.topes
+        importantes = list(islice(
+            (p for p in contexto.indice.por_importancia if topes.get(p['id'], 1) > 0), 5
+        ))
+        poblacion = []
+        for _ in range(self.poblacion):
+            individuo = {
+                p['id']: rng.randint(1, p.get('cantidad_tipica', 1))
+                for p in importantes if rng.random() > 0.5
+            }
+            for _ in range(rng.randint(0, 3)):
+                individuo = self.mutar(individuo, contexto, rng)
+            poblacion.append(contexto.limitar(individuo))
+        return poblacion
+
+    def optimizar(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> List[Tuple[Dict, int]]:
+        categorias_preferidas = categorias_preferidas or []
+        rng = rng or random
+        if topes:
+            inventario = [p for p in inventario if topes.get(p['id'], 1) > 0]
+        if not inventario:
+            return []
+
+        contexto = _Contexto(self, inventario, presupuesto, categorias_preferidas, topes, indice)
+        islas = [self._poblacion_inicial(contexto, rng) for _ in range(self.islas)]
+        costos: List[List[float]] = [[] for _ in islas]
+
+        en_procesos = self.procesos > 0 and self.islas > 1
+        restantes = self.generaciones
+        while restantes > 0:
+            generaciones = min(self.migracion_cada, restantes)
+            restantes -= generaciones
+            trabajos = [(isla, generaciones, rng.getrandbits(32)) for isla in islas]
+            if en_procesos:
+                resultados = mapear(self.procesos, contexto.indice, _evolucionar_en_trabajador, [
+                    (self, presupuesto, categorias_preferidas, topes, *trabajo) for trabajo in trabajos
+                ])
+            else:
+                resultados = [_evolucionar(contexto, *trabajo) for trabajo in trabajos]
+            islas = [poblacion for poblacion, _ in resultados]
+            costos = [costos_isla for _, costos_isla in resultados]
+
+            if restantes > 0 and self.islas > 1:
+                self._migrar(islas, costos)
+
+        candidatos = [
+            (costo, individuo)
+            for poblacion, costos_isla in zip(islas, costos)
+            for costo, individuo in zip(costos_isla, poblacion)
+            if individuo
+        ]
+        if not candidatos:
+            return []
+        _, mejor = min(candidatos, key=lambda candidato: candidato[0])
+        return contexto.lista(mejor)
+
+    def _migrar(self, islas: List[List[Individuo]], costos: List[List[float]]):
+        """Los mejores de cada isla reemplazan a los peores de la siguiente (anillo)."""
+        emigrantes = []
+        for poblacion, costos_isla in zip(islas, costos):
+            orden = sorted(range(len(poblacion)), key=costos_isla.__getitem__)
+            emigrantes.append([(poblacion[i], costos_isla[i]) for i in orden[:self.migrantes]])
+        for i, poblacion in enumerate(islas):
+            llegan = emigrantes[i - 1]
+            costos_isla = costos[i]
+            peores = sorted(range(len(poblacion)), key=costos_isla.__getitem__)[-len(llegan):]
+            for destino, (individuo, costo) in zip(peores, llegan):
+                poblacion[destino] = dict(individuo)
+                costos_isla[destino] = costo
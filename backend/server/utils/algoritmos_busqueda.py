@@ -3,37 +3,111 @@ Algoritmos de Búsqueda y Optimización
 Este módulo contiene las implementaciones de los algoritmos de IA utilizados por los agentes.
 """
 
+import os
 import random
 import math
-from typing import List, Dict, Tuple, Set
+from itertools import islice
+from typing import List, Dict, Optional, Tuple, Set
+from utils.costos import (
+    MINIMO_VARIEDAD, MULTIPLO_CANTIDAD_TIPICA, PENALIZACION_CATEGORIA,
+    PENALIZACION_EXCESO, PENALIZACION_IMPORTANCIA, PENALIZACION_VARIEDAD,
+    PESO_CATEGORIA, PESO_IMPORTANCIA, PESO_PRESUPUESTO, PESO_REALISMO,
+    PESO_VARIEDAD
+)
+from utils.frente_pareto import ArchivoPareto
+from utils.grilla_ponderada import GrillaPonderada, es_mapa_ponderado, obtener_grilla
+from utils.indice_productos import IndiceProductos
+from utils.registro import obtener_logger
+from utils.metricas import BUCKETS_CONTEO, BUCKETS_COSTO, metricas, medir
 
+registro = obtener_logger('busqueda')
 
-class TempleSimulado:
+# Iteraciones del temple sin mejorar la mejor lista tras las que se detiene (0 = nunca)
+TEMPLE_ITERACIONES_SIN_MEJORA = int(os.environ.get('TEMPLE_ITERACIONES_SIN_MEJORA', '5000'))
+
+HIST_TEMPLE_SEGUNDOS = metricas.histograma(
+    'temple_optimizar_segundos', 'Duración de TempleSimulado.optimizar'
+)
+HIST_TEMPLE_ITERACIONES = metricas.histograma(
+    'temple_iteraciones', 'Iteraciones por ejecución de Temple Simulado', BUCKETS_CONTEO
+)
+HIST_TEMPLE_ACEPTACIONES = metricas.histograma(
+    'temple_aceptaciones', 'Vecinos aceptados por ejecución de Temple Simulado', BUCKETS_CONTEO
+)
+HIST_TEMPLE_COSTO = metricas.histograma(
+    'temple_costo_final', 'Costo de la mejor solución de Temple Simulado', BUCKETS_COSTO
+)
+HIST_ASTAR_SEGUNDOS = metricas.histograma(
+    'astar_buscar_ruta_segundos', 'Duración de cada búsqueda A*'
+)
+HIST_ASTAR_NODOS = metricas.histograma(
+    'astar_nodos_expandidos', 'Nodos expandidos por búsqueda A*', BUCKETS_CONTEO
+)
+
+
+def limitar_a_topes(
+    lista_compras: List[Tuple[Dict, int]],
+    topes: Dict[int, int]
+) -> List[Tuple[Dict, int]]:
     """
-    Implementación del algoritmo de Temple Simulado para optimización
-    de listas de compras basado en presupuesto y preferencias.
+    Recorta las cantidades de una lista para no superar el stock disponible.
+    
+    Args:
+        lista_compras: Lista de tuplas (producto, cantidad)
+        topes: Producto -> unidades disponibles (los ausentes no tienen límite)
+        
+    Returns:
+        Lista con las cantidades recortadas y sin entradas en cero
     """
+    restantes = {}
+    limitada = []
+    for producto, cantidad in lista_compras:
+        tope = topes.get(producto['id'])
+        if tope is not None:
+            disponible = restantes.get(producto['id'], tope)
+            cantidad = min(cantidad, disponible)
+            restantes[producto['id']] = disponible - cantidad
+            if cantidad <= 0:
+                continue
+        limitada.append((producto, cantidad))
+    return limitada
+
+
+class OptimizadorListas:
+    """
+    Interfaz común de los optimizadores de listas de compras.
     
-    def __init__(
+    Define la función de costo y la generación de vecinos que comparten
+    todos los backends; cada subclase implementa `optimizar`.
+    """
+    
+    # Nombre con el que se registra y se elige el optimizador
+    nombre = ''
+    
+    def optimizar(
         self,
-        temperatura_inicial: float = 1000.0,
-        temperatura_minima: float = 1.0,
-        factor_enfriamiento: float = 0.95,
-        iteraciones_por_temperatura: int = 100
-    ):
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> List[Tuple[Dict, int]]:
         """
-        Inicializa el algoritmo de Temple Simulado.
+        Busca la lista de compras de menor costo.
         
         Args:
-            temperatura_inicial: Temperatura de inicio del algoritmo
-            temperatura_minima: Temperatura mínima antes de detener
-            factor_enfriamiento: Factor de reducción de temperatura (0-1)
-            iteraciones_por_temperatura: Iteraciones antes de enfriar
+            inventario: Lista de productos disponibles
+            presupuesto: Presupuesto objetivo
+            categorias_preferidas: Categorías preferidas por el usuario
+            topes: Unidades disponibles por producto (restricción estricta, opcional)
+            indice: Índices precalculados del inventario (opcional)
+            rng: Generador aleatorio de esta ejecución (opcional)
+            
+        Returns:
+            Lista de compras [(producto, cantidad), ...]
         """
-        self.temperatura_inicial = temperatura_inicial
-        self.temperatura_minima = temperatura_minima
-        self.factor_enfriamiento = factor_enfriamiento
-        self.iteraciones_por_temperatura = iteraciones_por_temperatura
+        raise NotImplementedError
     
     def calcular_costo(
         self,
@@ -76,9 +150,9 @@ class TempleSimulado:
                 productos_ids[prod_id] = cantidad
             
             # Penalizar cantidades muy alejadas de la típica
-            cantidad_tipica = producto.get('cantidad_tipica', 1)
-            if cantidad > cantidad_tipica * 3:  # Más de 3x la cantidad típica
-                penalizacion_realismo += (cantidad - cantidad_tipica * 3) * 10
+            limite = producto.get('cantidad_tipica', 1) * MULTIPLO_CANTIDAD_TIPICA
+            if cantidad > limite:
+                penalizacion_realismo += (cantidad - limite) * PENALIZACION_EXCESO
         
         # 3. Penalización por baja importancia de productos
         importancia_total = sum(
@@ -87,12 +161,12 @@ class TempleSimulado:
         )
         num_items = sum(cantidad for _, cantidad in lista_compras)
         importancia_promedio = importancia_total / num_items if num_items > 0 else 0
-        penalizacion_importancia = (1.0 - importancia_promedio) * 50
+        penalizacion_importancia = (1.0 - importancia_promedio) * PENALIZACION_IMPORTANCIA
         
         # 4. Penalización por falta de variedad
         num_productos_diferentes = len(productos_ids)
-        if num_productos_diferentes < 3:
-            penalizacion_variedad = (3 - num_productos_diferentes) * 30
+        if num_productos_diferentes < MINIMO_VARIEDAD:
+            penalizacion_variedad = (MINIMO_VARIEDAD - num_productos_diferentes) * PENALIZACION_VARIEDAD
         else:
             penalizacion_variedad = 0
         
@@ -101,15 +175,15 @@ class TempleSimulado:
         if categorias_preferidas:
             categorias_en_lista = set(p['categoria'] for p, _ in lista_compras)
             categorias_faltantes = set(categorias_preferidas) - categorias_en_lista
-            penalizacion_categoria = len(categorias_faltantes) * 25
+            penalizacion_categoria = len(categorias_faltantes) * PENALIZACION_CATEGORIA
         
         # Costo total ponderado
         costo_total = (
-            penalizacion_presupuesto * 1.0 +
-            penalizacion_realismo * 0.5 +
-            penalizacion_importancia * 0.3 +
-            penalizacion_variedad * 0.4 +
-            penalizacion_categoria * 0.6
+            penalizacion_presupuesto * PESO_PRESUPUESTO +
+            penalizacion_realismo * PESO_REALISMO +
+            penalizacion_importancia * PESO_IMPORTANCIA +
+            penalizacion_variedad * PESO_VARIEDAD +
+            penalizacion_categoria * PESO_CATEGORIA
         )
         
         return costo_total
@@ -118,7 +192,10 @@ class TempleSimulado:
         self,
         lista_actual: List[Tuple[Dict, int]],
         inventario: List[Dict],
-        presupuesto: float
+        presupuesto: float,
+        indice: Optional[IndiceProductos] = None,
+        categorias_preferidas: Optional[List[str]] = None,
+        rng: Optional[random.Random] = None
     ) -> List[Tuple[Dict, int]]:
         """
         Genera un vecino (solución cercana) de la lista actual.
@@ -127,45 +204,146 @@ class TempleSimulado:
             lista_actual: Lista de compras actual
             inventario: Inventario de productos disponibles
             presupuesto: Presupuesto objetivo
+            indice: Índices del inventario para proponer productos dirigidos (opcional)
+            categorias_preferidas: Categorías preferidas por el usuario (opcional)
+            rng: Generador aleatorio (por defecto el del módulo `random`)
             
         Returns:
             Nueva lista de compras (vecino)
         """
+        if rng is None:
+            rng = random
         nueva_lista = lista_actual.copy()
-        accion = random.choice(['agregar', 'quitar', 'modificar', 'reemplazar'])
+        accion = rng.choice(['agregar', 'quitar', 'modificar', 'reemplazar'])
         
         if accion == 'agregar' or not nueva_lista:
             # Agregar un producto aleatorio
-            producto = random.choice(inventario)
-            cantidad = random.randint(1, producto.get('cantidad_tipica', 1) * 2)
+            if indice is not None:
+                faltante = presupuesto - sum(p['precio'] * c for p, c in nueva_lista)
+                producto = self._proponer_producto(
+                    nueva_lista, faltante, indice, categorias_preferidas, rng
+                )
+            else:
+                producto = rng.choice(inventario)
+            cantidad = rng.randint(1, producto.get('cantidad_tipica', 1) * 2)
             nueva_lista.append((producto, cantidad))
             
         elif accion == 'quitar' and len(nueva_lista) > 1:
             # Quitar un producto aleatorio
-            indice = random.randint(0, len(nueva_lista) - 1)
-            nueva_lista.pop(indice)
+            indice_lista = rng.randint(0, len(nueva_lista) - 1)
+            nueva_lista.pop(indice_lista)
             
         elif accion == 'modificar' and nueva_lista:
             # Modificar cantidad de un producto
-            indice = random.randint(0, len(nueva_lista) - 1)
-            producto, cantidad_actual = nueva_lista[indice]
-            nueva_cantidad = max(1, cantidad_actual + random.randint(-2, 2))
-            nueva_lista[indice] = (producto, nueva_cantidad)
+            indice_lista = rng.randint(0, len(nueva_lista) - 1)
+            producto, cantidad_actual = nueva_lista[indice_lista]
+            nueva_cantidad = max(1, cantidad_actual + rng.randint(-2, 2))
+            nueva_lista[indice_lista] = (producto, nueva_cantidad)
             
         elif accion == 'reemplazar' and nueva_lista:
             # Reemplazar un producto por otro
-            indice = random.randint(0, len(nueva_lista) - 1)
-            _, cantidad = nueva_lista[indice]
-            nuevo_producto = random.choice(inventario)
-            nueva_lista[indice] = (nuevo_producto, cantidad)
+            indice_lista = rng.randint(0, len(nueva_lista) - 1)
+            anterior, cantidad = nueva_lista.pop(indice_lista)
+            if indice is not None:
+                # Lo que falta por unidad sin el producto reemplazado
+                faltante = (presupuesto - sum(p['precio'] * c for p, c in nueva_lista)) / cantidad
+                nuevo_producto = self._proponer_producto(
+                    nueva_lista, faltante, indice, categorias_preferidas, rng
+                )
+            else:
+                nuevo_producto = rng.choice(inventario)
+            nueva_lista.insert(indice_lista, (nuevo_producto, cantidad))
         
         return nueva_lista
     
+    def _proponer_producto(
+        self,
+        lista: List[Tuple[Dict, int]],
+        faltante: float,
+        indice: IndiceProductos,
+        categorias_preferidas: Optional[List[str]],
+        rng
+    ) -> Dict:
+        """
+        Elige el producto a agregar: una categoría preferida que falta, un
+        producto cuyo precio cubre lo que falta del presupuesto, uno de
+        importancia alta o, en el resto de los casos, uno al azar.
+        
+        Args:
+            lista: Lista de compras a la que se agregará el producto
+            faltante: Precio unitario que llevaría la lista al presupuesto
+            indice: Índices del inventario
+            categorias_preferidas: Categorías preferidas por el usuario
+            rng: Generador aleatorio
+        """
+        sorteo = rng.random()
+        
+        if categorias_preferidas and sorteo < 0.5:
+            presentes = {p['categoria'] for p, _ in lista}
+            faltantes = [c for c in categorias_preferidas if c not in presentes]
+            if faltantes:
+                producto = indice.de_categoria(rng.choice(faltantes), rng)
+                if producto is not None:
+                    return producto
+        
+        if sorteo < 0.8 and faltante > 0:
+            producto = indice.hasta_precio(faltante, rng)
+            if producto is not None:
+                return producto
+        
+        if sorteo < 0.9:
+            producto = indice.importante(rng)
+            if producto is not None:
+                return producto
+        
+        return rng.choice(indice.productos)
+
+
+class TempleSimulado(OptimizadorListas):
+    """
+    Implementación del algoritmo de Temple Simulado para optimización
+    de listas de compras basado en presupuesto y preferencias.
+    """
+    
+    nombre = 'temple'
+    
+    def __init__(
+        self,
+        temperatura_inicial: float = 1000.0,
+        temperatura_minima: float = 1.0,
+        factor_enfriamiento: float = 0.95,
+        iteraciones_por_temperatura: int = 100,
+        iteraciones_sin_mejora: int = TEMPLE_ITERACIONES_SIN_MEJORA
+    ):
+        """
+        Inicializa el algoritmo de Temple Simulado.
+        
+        Args:
+            temperatura_inicial: Temperatura de inicio del algoritmo
+            temperatura_minima: Temperatura mínima antes de detener
+            factor_enfriamiento: Factor de reducción de temperatura (0-1)
+            iteraciones_por_temperatura: Iteraciones antes de enfriar
+            iteraciones_sin_mejora: Detener antes de la temperatura mínima si la
+                mejor lista no mejora en esta cantidad de iteraciones (0 = recorrer
+                el esquema completo)
+        """
+        self.temperatura_inicial = temperatura_inicial
+        self.temperatura_minima = temperatura_minima
+        self.factor_enfriamiento = factor_enfriamiento
+        self.iteraciones_por_temperatura = iteraciones_por_temperatura
+        self.iteraciones_sin_mejora = iteraciones_sin_mejora
+    
     def optimizar(
         self,
         inventario: List[Dict],
         presupuesto: float,
-        categorias_preferidas: List[str] = None
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None,
+        archivo: Optional[ArchivoPareto] = None,
+        estado_inicial: Optional[List[Tuple[Dict, int]]] = None,
+        temperatura_inicial: Optional[float] = None
     ) -> List[Tuple[Dict, int]]:
         """
         Ejecuta el algoritmo de Temple Simulado para encontrar una lista óptima.
@@ -174,27 +352,50 @@ class TempleSimulado:
             inventario: Lista de productos disponibles
             presupuesto: Presupuesto objetivo
             categorias_preferidas: Categorías preferidas por el usuario
+            topes: Unidades disponibles por producto (restricción estricta, opcional)
+            indice: Índices precalculados del inventario (por defecto se construyen
+                a partir de `inventario`; pueden incluir productos sin stock)
+            rng: Generador aleatorio de esta ejecución. Con un `random.Random`
+                sembrado, las mismas entradas producen la misma lista; por
+                defecto se usa el estado global del módulo `random`
+            archivo: Archivo de Pareto que recibe cada lista evaluada (opcional)
+            estado_inicial: Lista desde la que arrancar (p. ej. una solución
+                previa escalada); por defecto algunos productos importantes
+            temperatura_inicial: Temperatura de arranque (por defecto la del
+                temple); con un buen estado inicial conviene una más baja
             
         Returns:
             Lista de compras optimizada [(producto, cantidad), ...]
         """
         if categorias_preferidas is None:
             categorias_preferidas = []
+        if rng is None:
+            rng = random
+        
+        if topes:
+            inventario = [p for p in inventario if topes.get(p['id'], 1) > 0]
+            if not inventario:
+                return []
+        
+        if indice is None:
+            indice = IndiceProductos(inventario)
         
         # Estado inicial: lista vacía o con algunos productos básicos
-        estado_actual = []
+        estado_actual = list(estado_inicial or [])
         
         # Agregar algunos productos iniciales de alta importancia
-        productos_importantes = sorted(
-            inventario, 
-            key=lambda p: p.get('importancia', 0), 
-            reverse=True
-        )[:5]
+        if estado_inicial is None:
+            productos_importantes = list(islice(
+                (p for p in indice.por_importancia if not topes or topes.get(p['id'], 1) > 0), 5
+            ))
+            
+            for producto in productos_importantes:
+                if rng.random() > 0.5:  # 50% de probabilidad
+                    cantidad = rng.randint(1, producto.get('cantidad_tipica', 1))
+                    estado_actual.append((producto, cantidad))
         
-        for producto in productos_importantes:
-            if random.random() > 0.5:  # 50% de probabilidad
-                cantidad = random.randint(1, producto.get('cantidad_tipica', 1))
-                estado_actual.append((producto, cantidad))
+        if topes:
+            estado_actual = limitar_a_topes(estado_actual, topes)
         
         costo_actual = self.calcular_costo(
             estado_actual, presupuesto, categorias_preferidas, inventario
@@ -203,39 +404,66 @@ class TempleSimulado:
         mejor_estado = estado_actual.copy()
         mejor_costo = costo_actual
         
-        temperatura = self.temperatura_inicial
-        
-        # Proceso de temple simulado
-        while temperatura > self.temperatura_minima:
-            for _ in range(self.iteraciones_por_temperatura):
-                # Generar vecino
-                estado_vecino = self.generar_vecino(estado_actual, inventario, presupuesto)
-                costo_vecino = self.calcular_costo(
-                    estado_vecino, presupuesto, categorias_preferidas, inventario
-                )
-                
-                # Calcular diferencia de costos
-                delta_costo = costo_vecino - costo_actual
-                
-                # Decidir si aceptar el vecino
-                if delta_costo < 0:
-                    # Mejor solución, aceptar siempre
-                    estado_actual = estado_vecino
-                    costo_actual = costo_vecino
+        temperatura = self.temperatura_inicial if temperatura_inicial is None else temperatura_inicial
+        iteraciones = 0
+        aceptaciones = 0
+        # Iteración en que mejoró por última vez la mejor lista
+        ultima_mejora = 0
+        
+        with medir(HIST_TEMPLE_SEGUNDOS) as span:
+            # Proceso de temple simulado
+            while temperatura > self.temperatura_minima:
+                for _ in range(self.iteraciones_por_temperatura):
+                    # Generar vecino
+                    estado_vecino = self.generar_vecino(
+                        estado_actual, inventario, presupuesto, indice, categorias_preferidas, rng
+                    )
+                    if topes:
+                        estado_vecino = limitar_a_topes(estado_vecino, topes)
+                    costo_vecino = self.calcular_costo(
+                        estado_vecino, presupuesto, categorias_preferidas, inventario
+                    )
+                    if archivo is not None:
+                        archivo.ofrecer(estado_vecino)
+                    
+                    # Calcular diferencia de costos
+                    delta_costo = costo_vecino - costo_actual
                     
-                    # Actualizar mejor solución global
-                    if costo_actual < mejor_costo:
-                        mejor_estado = estado_actual.copy()
-                        mejor_costo = costo_actual
-                else:
-                    # Peor solución, aceptar con probabilidad
-                    probabilidad = math.exp(-delta_costo / temperatura)
-                    if random.random() < probabilidad:
+                    # Decidir si aceptar el vecino
+                    if delta_costo < 0:
+                        # Mejor solución, aceptar siempre
                         estado_actual = estado_vecino
                         costo_actual = costo_vecino
+                        aceptaciones += 1
+                        
+                        # Actualizar mejor solución global
+                        if costo_actual < mejor_costo:
+                            mejor_estado = estado_actual.copy()
+                            mejor_costo = costo_actual
+                            ultima_mejora = iteraciones
+                    else:
+                        # Peor solución, aceptar con probabilidad
+                        probabilidad = math.exp(-delta_costo / temperatura)
+                        if rng.random() < probabilidad:
+                            estado_actual = estado_vecino
+                            costo_actual = costo_vecino
+                            aceptaciones += 1
+                
+                iteraciones += self.iteraciones_por_temperatura
+                
+                # Con vecinos dirigidos la lista converge mucho antes de
+                # enfriarse del todo: se corta al estancarse
+                if self.iteraciones_sin_mejora and \
+                        iteraciones - ultima_mejora >= self.iteraciones_sin_mejora:
+                    break
+                
+                # Enfriar temperatura
+                temperatura *= self.factor_enfriamiento
             
-            # Enfriar temperatura
-            temperatura *= self.factor_enfriamiento
+            span.observar(HIST_TEMPLE_ITERACIONES, iteraciones)
+            span.observar(HIST_TEMPLE_ACEPTACIONES, aceptaciones)
+            if mejor_costo != float('inf'):
+                span.observar(HIST_TEMPLE_COSTO, mejor_costo)
         
         return mejor_estado
 
@@ -243,7 +471,8 @@ class TempleSimulado:
 class BusquedaAEstrella:
     """
     Implementación del algoritmo A* para búsqueda de rutas óptimas.
-    Utiliza la distancia Manhattan como heurística.
+    Utiliza la distancia Manhattan como heurística; en mapas con costos por
+    celda o sentido único usa la grilla ponderada y la heurística de landmarks.
     """
     
     def __init__(self):
@@ -331,7 +560,8 @@ class BusquedaAEstrella:
         self, 
         inicio: Tuple[int, int], 
         objetivo: Tuple[int, int], 
-        mapa: Dict
+        mapa: Dict,
+        bidireccional: bool = False
     ) -> List[Tuple[int, int]]:
         """
         Encuentra la ruta óptima entre dos puntos usando A*.
@@ -340,10 +570,32 @@ class BusquedaAEstrella:
             inicio: Posición inicial (fila, columna)
             objetivo: Posición objetivo (fila, columna)
             mapa: Diccionario con la información del mapa
+            bidireccional: Buscar a la vez desde el inicio y desde el objetivo
+                sobre la grilla compilada (conviene en tramos largos de mapas grandes)
             
         Returns:
             Lista de posiciones que forman la ruta óptima
         """
+        with medir(HIST_ASTAR_SEGUNDOS) as span:
+            ruta, nodos_expandidos = self._buscar_ruta(inicio, objetivo, mapa, bidireccional)
+            span.observar(HIST_ASTAR_NODOS, nodos_expandidos)
+        return ruta
+    
+    def _buscar_ruta(
+        self, 
+        inicio: Tuple[int, int], 
+        objetivo: Tuple[int, int], 
+        mapa: Dict,
+        bidireccional: bool = False
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Ejecuta A* y retorna la ruta junto con la cantidad de nodos expandidos.
+        """
+        if bidireccional:
+            return self._buscar_ruta_bidireccional(inicio, objetivo, obtener_grilla(mapa))
+        if es_mapa_ponderado(mapa):
+            return self._buscar_ruta_ponderada(inicio, objetivo, obtener_grilla(mapa))
+        
         # Extraer información del mapa
         dimensiones = (mapa['dimensiones']['filas'], mapa['dimensiones']['columnas'])
         obstaculos = set(
@@ -359,7 +611,7 @@ class BusquedaAEstrella:
         
         # Si inicio y objetivo son iguales, retornar
         if inicio == objetivo:
-            return [inicio]
+            return [inicio], 0
         
         # Inicializar estructuras de datos
         import heapq
@@ -388,7 +640,7 @@ class BusquedaAEstrella:
             
             # Si llegamos al objetivo, reconstruir ruta
             if actual == objetivo:
-                return self.reconstruir_ruta(padre, inicio, objetivo)
+                return self.reconstruir_ruta(padre, inicio, objetivo), len(visitados)
             
             # Marcar como visitado
             if actual in visitados:
@@ -420,11 +672,162 @@ class BusquedaAEstrella:
         # No se encontró ruta
         raise ValueError(f"No existe ruta desde {inicio} hasta {objetivo}")
     
+    def _buscar_ruta_ponderada(
+        self,
+        inicio: Tuple[int, int],
+        objetivo: Tuple[int, int],
+        grilla: GrillaPonderada
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        A* con el costo de entrada de cada celda y la heurística ALT de la grilla.
+        Retorna la ruta de menor costo y la cantidad de nodos expandidos.
+        """
+        if not grilla.es_valida(inicio):
+            raise ValueError(f"Posición de inicio inválida: {inicio}")
+        if not grilla.es_valida(objetivo):
+            raise ValueError(f"Posición de objetivo inválida: {objetivo}")
+        if inicio == objetivo:
+            return [inicio], 0
+        
+        import heapq
+        
+        celda_inicio, celda_objetivo = grilla.celda(inicio), grilla.celda(objetivo)
+        heuristica = grilla.heuristica(celda_objetivo, celda_inicio)
+        adyacencia = grilla.adyacencia
+        
+        # Empates de f: primero el de menor h (más cerca del objetivo)
+        h_inicio = heuristica(celda_inicio)
+        contador = 0
+        frontera = [(h_inicio, h_inicio, contador, celda_inicio)]
+        padre = {}
+        g_score = {celda_inicio: 0.0}
+        visitados = set()
+        
+        while frontera:
+            _, _, _, actual = heapq.heappop(frontera)
+            
+            if actual == celda_objetivo:
+                ruta = [objetivo]
+                while actual != celda_inicio:
+                    actual = padre[actual]
+                    ruta.append(grilla.posicion(actual))
+                ruta.reverse()
+                return ruta, len(visitados)
+            
+            if actual in visitados:
+                continue
+            visitados.add(actual)
+            
+            g_actual = g_score[actual]
+            for vecino, costo in adyacencia[actual]:
+                nuevo_g_score = g_actual + costo
+                if vecino not in g_score or nuevo_g_score < g_score[vecino]:
+                    padre[vecino] = actual
+                    g_score[vecino] = nuevo_g_score
+                    contador += 1
+                    h = heuristica(vecino)
+                    heapq.heappush(frontera, (nuevo_g_score + h, h, contador, vecino))
+        
+        raise ValueError(f"No existe ruta desde {inicio} hasta {objetivo}")
+    
+    def _buscar_ruta_bidireccional(
+        self,
+        inicio: Tuple[int, int],
+        objetivo: Tuple[int, int],
+        grilla: GrillaPonderada
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        A* bidireccional con potenciales promediados: hacia adelante sobre
+        `adyacencia` y hacia atrás sobre `predecesores` de la grilla.
+        
+        Con p(v) = (h_objetivo(v) - h_inicio(v)) / 2 (cotas de la grilla:
+        Manhattan, o ALT si tiene landmarks) los costos reducidos son no
+        negativos en ambos sentidos, así que la búsqueda equivale a Dijkstra
+        bidireccional y puede detenerse en cuanto la suma de las claves
+        mínimas de ambas colas alcanza el costo μ de la mejor ruta
+        encontrada, que entonces es óptima.
+        Retorna la ruta y la cantidad de nodos expandidos en ambos sentidos.
+        """
+        if not grilla.es_valida(inicio):
+            raise ValueError(f"Posición de inicio inválida: {inicio}")
+        if not grilla.es_valida(objetivo):
+            raise ValueError(f"Posición de objetivo inválida: {objetivo}")
+        if inicio == objetivo:
+            return [inicio], 0
+        
+        import heapq
+        
+        celda_inicio, celda_objetivo = grilla.celda(inicio), grilla.celda(objetivo)
+        hasta_objetivo = grilla.heuristica(celda_objetivo, celda_inicio)
+        desde_inicio = grilla.heuristica(celda_inicio, celda_objetivo, inversa=True)
+        costos = grilla.costos
+        infinito = float('inf')
+        
+        def potencial(celda: int) -> float:
+            return (hasta_objetivo(celda) - desde_inicio(celda)) / 2
+        
+        # Por sentido: (frontera, g, padre, cerrados, vecinos, signo del potencial)
+        # En la frontera, empates de clave: primero el que más avanzó (mayor g)
+        adelante = (
+            [(potencial(celda_inicio), 0.0, celda_inicio)], {celda_inicio: 0.0}, {}, set(),
+            grilla.adyacencia, 1.0
+        )
+        atras = (
+            [(-potencial(celda_objetivo), 0.0, celda_objetivo)], {celda_objetivo: 0.0}, {}, set(),
+            grilla.predecesores(), -1.0
+        )
+        mejor = infinito
+        encuentro = -1
+        
+        while adelante[0] and atras[0]:
+            if adelante[0][0][0] + atras[0][0][0] >= mejor:
+                break
+            # Se expande el sentido con la frontera más chica
+            if len(adelante[0]) <= len(atras[0]):
+                actual, otro = adelante, atras
+            else:
+                actual, otro = atras, adelante
+            frontera, g, padre, cerrados, vecinos, signo = actual
+            g_otro = otro[1]
+            _, _, celda = heapq.heappop(frontera)
+            if celda in cerrados:
+                continue
+            cerrados.add(celda)
+            
+            g_celda = g[celda]
+            for vecino, costo in vecinos[celda]:
+                # Hacia atrás se recorre vecino -> celda, que cuesta entrar a `celda`
+                nuevo_g = g_celda + (costo if signo > 0 else costos[celda])
+                if nuevo_g < g.get(vecino, infinito):
+                    g[vecino] = nuevo_g
+                    padre[vecino] = celda
+                    heapq.heappush(frontera, (nuevo_g + signo * potencial(vecino), -nuevo_g, vecino))
+                    if vecino in g_otro and nuevo_g + g_otro[vecino] < mejor:
+                        mejor = nuevo_g + g_otro[vecino]
+                        encuentro = vecino
+        
+        nodos = len(adelante[3]) + len(atras[3])
+        if encuentro < 0:
+            raise ValueError(f"No existe ruta desde {inicio} hasta {objetivo}")
+        
+        ruta = [grilla.posicion(encuentro)]
+        celda = encuentro
+        while celda != celda_inicio:
+            celda = adelante[2][celda]
+            ruta.append(grilla.posicion(celda))
+        ruta.reverse()
+        celda = encuentro
+        while celda != celda_objetivo:
+            celda = atras[2][celda]
+            ruta.append(grilla.posicion(celda))
+        return ruta, nodos
+    
     def buscar_ruta_multiple(
         self, 
         inicio: Tuple[int, int],
         objetivos: List[Tuple[int, int]], 
-        mapa: Dict
+        mapa: Dict,
+        bidireccional: bool = False
     ) -> Tuple[List[Tuple[int, int]], float]:
         """
         Encuentra una ruta que visite múltiples objetivos.
@@ -434,6 +837,7 @@ class BusquedaAEstrella:
             inicio: Posición inicial
             objetivos: Lista de posiciones objetivo a visitar
             mapa: Diccionario con la información del mapa
+            bidireccional: Usar A* bidireccional en cada tramo
             
         Returns:
             Tupla (ruta_completa, distancia_total)
@@ -456,7 +860,9 @@ class BusquedaAEstrella:
             
             # Buscar ruta al objetivo más cercano
             try:
-                ruta_parcial = self.buscar_ruta(posicion_actual, objetivo_mas_cercano, mapa)
+                ruta_parcial = self.buscar_ruta(
+                    posicion_actual, objetivo_mas_cercano, mapa, bidireccional
+                )
                 
                 # Agregar ruta (sin duplicar el punto actual)
                 if len(ruta_parcial) > 1:
@@ -468,7 +874,10 @@ class BusquedaAEstrella:
                 objetivos_restantes.remove(objetivo_mas_cercano)
                 
             except ValueError as e:
-                print(f"[A*] Advertencia: No se puede llegar a {objetivo_mas_cercano}: {e}")
+                registro.warning(
+                    "No se puede llegar a %s: %s", objetivo_mas_cercano, e,
+                    extra={'evento': 'objetivo_inalcanzable'}
+                )
                 objetivos_restantes.remove(objetivo_mas_cercano)
         
         return ruta_completa, distancia_total
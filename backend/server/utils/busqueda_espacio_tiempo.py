@@ -0,0 +1,265 @@
+"""
+A* de Espacio-Tiempo (A* cooperativo)
+Variante de A* cuyos estados son (posición, paso de tiempo). Además de los
+cuatro movimientos, el comprador puede esperar un paso en su celda, y se
+descartan los movimientos que chocan con las reservas de otros compradores
+en la tabla de la sucursal (misma celda en el mismo paso o cruce de frente).
+
+Entrar a una celda ocupa tantos pasos como su costo redondeado hacia arriba
+(`GrillaPonderada.pasos`), igual que la estimación de tiempo del comprador
+(SEGUNDOS_POR_PASO por unidad de costo): en una zona concurrida de costo 2.5
+el comprador reserva la celda durante 3 pasos.
+
+Después del último paso reservado de la tabla ya no hay conflictos posibles:
+desde ahí el estado deja de depender del tiempo y la búsqueda se comporta
+como A* espacial. Sin reservas vigentes se recorren las mismas celdas que en
+`BusquedaAEstrella.buscar_ruta`. En mapas ponderados se minimiza el costo de
+la grilla con la misma heurística de landmarks.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from utils.algoritmos_busqueda import HIST_ASTAR_NODOS, HIST_ASTAR_SEGUNDOS, BusquedaAEstrella
+from utils.grilla_ponderada import obtener_grilla
+from utils.metricas import medir
+from utils.registro import obtener_logger
+
+registro = obtener_logger('busqueda')
+
+# Nodos expandidos por tramo, en múltiplos de las celdas del mapa, antes de
+# abandonar la búsqueda con reservas y tomar la ruta espacial
+FACTOR_NODOS_MAXIMOS = 8
+
+
+class BusquedaEspacioTiempo(BusquedaAEstrella):
+    """
+    A* sobre (posición, paso de tiempo) que evita las celdas reservadas.
+
+    La tabla de reservas solo se consulta (`ocupacion` y `tiempo_maximo`);
+    reservar la ruta resultante es responsabilidad de
+    quien planifica.
+    """
+
+    def __init__(self, factor_nodos_maximos: int = FACTOR_NODOS_MAXIMOS):
+        """
+        Args:
+            factor_nodos_maximos: Nodos expandidos por tramo, en múltiplos de
+                las celdas del mapa, antes de recurrir a la ruta sin reservas
+        """
+        super().__init__()
+        self.factor_nodos_maximos = factor_nodos_maximos
+
+    def buscar_ruta_reservada(
+        self,
+        inicio: Tuple[int, int],
+        objetivo: Tuple[int, int],
+        mapa: Dict,
+        reservas,
+        tiempo_inicio: int,
+        comprador_id: Optional[str] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Encuentra la ruta más corta en tiempo que no choca con las reservas.
+
+        Args:
+            inicio: Posición inicial (fila, columna)
+            objetivo: Posición objetivo (fila, columna)
+            mapa: Diccionario con la información del mapa
+            reservas: Tabla de reservas de la sucursal
+            tiempo_inicio: Paso de tiempo en que se parte de `inicio`
+            comprador_id: Comprador que planifica (sus reservas no cuentan)
+
+        Returns:
+            Posición en cada paso desde `tiempo_inicio`; una espera, o cada
+            paso extra en una celda de costo mayor que 1, repite la posición
+            anterior
+
+        Raises:
+            ValueError: Si inicio u objetivo no son válidos o no existe ruta,
+                aun ignorando las reservas
+        """
+        with medir(HIST_ASTAR_SEGUNDOS) as span:
+            ruta, nodos_expandidos = self._buscar_ruta_reservada(
+                inicio, objetivo, mapa, reservas, tiempo_inicio, comprador_id
+            )
+            span.observar(HIST_ASTAR_NODOS, nodos_expandidos)
+        return ruta
+
+    def _buscar_ruta_reservada(
+        self,
+        inicio: Tuple[int, int],
+        objetivo: Tuple[int, int],
+        mapa: Dict,
+        reservas,
+        tiempo_inicio: int,
+        comprador_id: Optional[str] = None
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Ejecuta A* de espacio-tiempo y retorna la ruta junto con los nodos expandidos.
+
+        Las celdas y los estados se manejan como enteros con la misma
+        codificación de la tabla (`t * celdas + celda`), así que cada
+        verificación de conflicto es una consulta directa a `reservas.ocupacion`.
+        Se minimiza el costo de la grilla (cada espera cuesta 1); una espera
+        avanza un paso de tiempo y un movimiento los pasos de la celda a la
+        que se entra, durante los cuales esa celda debe estar libre.
+        """
+        grilla = obtener_grilla(mapa)
+        celdas = grilla.celdas
+        if reservas.celdas != celdas or reservas.columnas != grilla.columnas:
+            raise ValueError("La tabla de reservas no corresponde a las dimensiones del mapa")
+        if not grilla.es_valida(inicio):
+            raise ValueError(f"Posición de inicio inválida: {inicio}")
+        if not grilla.es_valida(objetivo):
+            raise ValueError(f"Posición de objetivo inválida: {objetivo}")
+
+        ocupacion = reservas.ocupacion
+        adyacencia = grilla.adyacencia
+        pasos_celda = grilla.pasos
+        celda_inicio, celda_objetivo = grilla.celda(inicio), grilla.celda(objetivo)
+        heuristica = grilla.heuristica(celda_objetivo, celda_inicio)
+        # Desde este paso no hay reservas: los estados dejan de depender del tiempo
+        tiempo_libre = max(reservas.tiempo_maximo + 1, tiempo_inicio)
+        nodos_maximos = self.factor_nodos_maximos * celdas
+
+        inicial = min(tiempo_inicio, tiempo_libre) * celdas + celda_inicio
+        contador = 0
+        frontera = [(heuristica(celda_inicio), contador, 0.0, tiempo_inicio, celda_inicio)]
+        padre: Dict[int, int] = {}
+        mejor_costo = {inicial: 0.0}
+        visitados = set()
+
+        while frontera:
+            _, _, g, t, celda = heapq.heappop(frontera)
+            con_reservas = t < tiempo_libre
+            estado = (t if con_reservas else tiempo_libre) * celdas + celda
+
+            if celda == celda_objetivo:
+                ruta = [objetivo]
+                while estado != inicial:
+                    estado = padre[estado]
+                    ruta.append(grilla.posicion(estado % celdas))
+                ruta.reverse()
+                return grilla.ruta_en_pasos(ruta), len(visitados)
+
+            if estado in visitados:
+                continue
+            visitados.add(estado)
+
+            if len(visitados) > nodos_maximos:
+                break
+
+            siguientes = adyacencia[celda]
+            if con_reservas:
+                # Esperar solo tiene sentido mientras quedan reservas por delante
+                siguientes = siguientes + ((celda, 1.0),)
+
+            base_actual = t * celdas
+            base_siguiente = base_actual + celdas
+            for vecino, costo in siguientes:
+                t_siguiente = t + 1 if vecino == celda else t + pasos_celda[vecino]
+                if con_reservas:
+                    # Otro comprador en la celda de llegada mientras se la recorre,
+                    # o cruzándose de frente
+                    ocupada = False
+                    for base in range(base_siguiente, t_siguiente * celdas + 1, celdas):
+                        ocupante = ocupacion.get(base + vecino)
+                        if ocupante is not None and ocupante != comprador_id:
+                            ocupada = True
+                            break
+                    if ocupada:
+                        continue
+                    if vecino != celda:
+                        ocupante = ocupacion.get(base_actual + vecino)
+                        if (
+                            ocupante is not None and ocupante != comprador_id
+                            and ocupacion.get(base_siguiente + celda) == ocupante
+                        ):
+                            continue
+                    estado_vecino = t_siguiente * celdas + vecino if t_siguiente < tiempo_libre else (
+                        tiempo_libre * celdas + vecino
+                    )
+                else:
+                    estado_vecino = estado - celda + vecino
+
+                g_vecino = g + costo
+                if estado_vecino not in mejor_costo or g_vecino < mejor_costo[estado_vecino]:
+                    padre[estado_vecino] = estado
+                    mejor_costo[estado_vecino] = g_vecino
+                    contador += 1
+                    heapq.heappush(frontera, (
+                        g_vecino + heuristica(vecino), contador, g_vecino, t_siguiente, vecino
+                    ))
+
+        # Las reservas cierran todos los caminos (o la búsqueda se hizo muy
+        # larga): se toma la ruta espacial y quien planifica resuelve el conflicto
+        ruta, nodos = self._buscar_ruta(inicio, objetivo, mapa)
+        ruta = grilla.ruta_en_pasos(ruta)
+        registro.warning(
+            "Sin ruta libre de reservas de %s a %s tras %d nodos; se usa la ruta sin reservas",
+            inicio, objetivo, len(visitados),
+            extra={'evento': 'ruta_sin_reservas'}
+        )
+        return ruta, len(visitados) + nodos
+
+    def buscar_ruta_multiple_reservada(
+        self,
+        inicio: Tuple[int, int],
+        objetivos: List[Tuple[int, int]],
+        destino: Tuple[int, int],
+        mapa: Dict,
+        reservas,
+        tiempo_inicio: int,
+        comprador_id: Optional[str] = None
+    ) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        Ruta que visita los objetivos (vecino más cercano primero) y termina
+        en `destino`, evitando las reservas. Cada tramo parte en el paso en
+        que terminó el anterior.
+
+        Args:
+            inicio: Posición inicial
+            objetivos: Posiciones a visitar
+            destino: Posición final (p. ej. la caja)
+            mapa: Diccionario con la información del mapa
+            reservas: Tabla de reservas de la sucursal
+            tiempo_inicio: Paso de tiempo en que se parte de `inicio`
+            comprador_id: Comprador que planifica
+
+        Returns:
+            Tupla (posición en cada paso, movimientos sin contar las esperas)
+
+        Raises:
+            ValueError: Si no existe ruta hasta `destino`
+        """
+        ruta = [inicio]
+        posicion_actual = inicio
+        restantes = list(objetivos)
+
+        def tramo(objetivo):
+            with medir(HIST_ASTAR_SEGUNDOS) as span:
+                parcial, nodos = self._buscar_ruta_reservada(
+                    posicion_actual, objetivo, mapa, reservas,
+                    tiempo_inicio + len(ruta) - 1, comprador_id
+                )
+                span.observar(HIST_ASTAR_NODOS, nodos)
+            ruta.extend(parcial[1:])
+
+        while restantes:
+            objetivo = min(restantes, key=lambda obj: self.heuristica_manhattan(posicion_actual, obj))
+            restantes.remove(objetivo)
+            try:
+                tramo(objetivo)
+                posicion_actual = objetivo
+            except ValueError as e:
+                registro.warning(
+                    "No se puede llegar a %s: %s", objetivo, e,
+                    extra={'evento': 'objetivo_inalcanzable'}
+                )
+
+        if posicion_actual != destino:
+            tramo(destino)
+
+        movimientos = sum(1 for anterior, siguiente in zip(ruta, ruta[1:]) if anterior != siguiente)
+        return ruta, movimientos
@@ -0,0 +1,190 @@
+"""
+Caché de Respuestas Serializadas
+Guarda el cuerpo JSON ya codificado de los endpoints estáticos junto con su
+ETag y variantes comprimidas, regenerándolos solo cuando cambia la versión
+de los datos fuente.
+"""
+
+import gzip
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+from utils.codificacion_json import codificar
+from utils.metricas import metricas, medir
+
+HIST_JSON_SEGUNDOS = metricas.histograma(
+    'json_codificacion_segundos', 'Duración de la codificación JSON de las respuestas'
+)
+
+
+class RespuestaCacheada:
+    """
+    Cuerpo codificado de una respuesta con su ETag fuerte y sus variantes
+    comprimidas por codificación ('gzip', 'br').
+    """
+
+    __slots__ = ('version', 'cuerpo', 'etag', 'comprimidos')
+
+    def __init__(self, version: Hashable, cuerpo: bytes, comprimir_desde: int):
+        """
+        Args:
+            version: Versión de los datos fuente que generaron el cuerpo
+            cuerpo: Bytes del JSON sin comprimir
+            comprimir_desde: Tamaño mínimo en bytes para generar variantes comprimidas
+        """
+        self.version = version
+        self.cuerpo = cuerpo
+        self.etag = '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+        self.comprimidos: Dict[str, bytes] = {}
+
+        if len(cuerpo) >= comprimir_desde:
+            self.comprimidos['gzip'] = gzip.compress(cuerpo, compresslevel=6)
+            if brotli is not None:
+                self.comprimidos['br'] = brotli.compress(cuerpo)
+
+    def etag_variante(self, codificacion: Optional[str]) -> str:
+        """Retorna el ETag de la representación con la codificación dada."""
+        if codificacion is None:
+            return self.etag
+        return self.etag[:-1] + '-' + codificacion + '"'
+
+
+class CacheRespuestas:
+    """
+    Caché en memoria de respuestas JSON indexada por clave de recurso.
+    Cada entrada se regenera únicamente cuando cambia su versión.
+    """
+
+    def __init__(self, comprimir_desde: int = 1024):
+        """
+        Args:
+            comprimir_desde: Tamaño mínimo en bytes para comprimir un cuerpo
+        """
+        self.comprimir_desde = comprimir_desde
+        self._entradas: Dict[Hashable, RespuestaCacheada] = {}
+        self._candado = threading.Lock()
+
+    def obtener(
+        self,
+        clave: Hashable,
+        version: Hashable,
+        generar: Callable[[], Any]
+    ) -> RespuestaCacheada:
+        """
+        Retorna la respuesta cacheada del recurso, regenerándola si la versión cambió.
+
+        Args:
+            clave: Identificador del recurso (p. ej. ('mapa', 'SUC001'))
+            version: Versión actual de los datos fuente
+            generar: Función que produce los datos a serializar
+
+        Returns:
+            RespuestaCacheada vigente para la versión indicada
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is not None and entrada.version == version:
+            return entrada
+
+        # La serialización ocurre fuera del candado; si dos hilos regeneran
+        # a la vez el resultado es idéntico y cualquiera de los dos es válido
+        datos = generar()
+        with medir(HIST_JSON_SEGUNDOS):
+            cuerpo = codificar(datos)
+        entrada = RespuestaCacheada(version, cuerpo, self.comprimir_desde)
+        with self._candado:
+            self._entradas[clave] = entrada
+        return entrada
+
+    def invalidar(self, clave: Optional[Hashable] = None):
+        """
+        Elimina una entrada de la caché, o todas si no se indica clave.
+
+        Args:
+            clave: Recurso a invalidar (opcional)
+        """
+        with self._candado:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+
+def _etags_solicitados(if_none_match: str) -> set:
+    """Extrae los ETags de una cabecera If-None-Match (comparación débil)."""
+    etags = set()
+    for etag in if_none_match.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        if etag:
+            etags.add(etag)
+    return etags
+
+
+def _elegir_codificacion(accept_encoding: str, disponibles: Dict[str, bytes]) -> Optional[str]:
+    """
+    Elige la mejor codificación aceptada por el cliente entre las disponibles.
+    Prefiere brotli sobre gzip.
+    """
+    if not disponibles or not accept_encoding:
+        return None
+
+    aceptadas = set()
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        parametros = parametros.replace(' ', '')
+        if parametros.startswith('q='):
+            try:
+                if float(parametros[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        aceptadas.add(nombre.strip().lower())
+
+    for codificacion in ('br', 'gzip'):
+        if codificacion in disponibles and (codificacion in aceptadas or '*' in aceptadas):
+            return codificacion
+    return None
+
+
+def preparar_respuesta(
+    entrada: RespuestaCacheada,
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None
+) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    Resuelve la respuesta HTTP para una entrada cacheada.
+
+    Args:
+        entrada: Respuesta cacheada del recurso
+        if_none_match: Valor de la cabecera If-None-Match de la petición
+        accept_encoding: Valor de la cabecera Accept-Encoding de la petición
+
+    Returns:
+        Tupla (código de estado, cuerpo, cabeceras)
+    """
+    codificacion = _elegir_codificacion(accept_encoding or '', entrada.comprimidos)
+    cabeceras = {
+        'ETag': entrada.etag_variante(codificacion),
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+
+    if if_none_match:
+        solicitados = _etags_solicitados(if_none_match)
+        variantes = {entrada.etag_variante(c) for c in entrada.comprimidos}
+        variantes.add(entrada.etag)
+        if '*' in solicitados or solicitados & variantes:
+            return 304, b'', cabeceras
+
+    if codificacion is None:
+        return 200, entrada.cuerpo, cabeceras
+
+    cabeceras['Content-Encoding'] = codificacion
+    return 200, entrada.comprimidos[codificacion], cabeceras
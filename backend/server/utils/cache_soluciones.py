@@ -0,0 +1,151 @@
+"""
+Caché de Soluciones del Temple
+Guarda las listas que el temple ya resolvió por conjunto de categorías y
+presupuesto. Una solicitud nueva busca por bisección la lista del
+presupuesto resuelto más cercano, la escala al presupuesto pedido y el temple
+arranca desde ella a temperatura baja (arranque tibio), con muchas menos
+iteraciones que desde cero.
+
+Las listas se guardan como (id de producto, cantidad) y se descartan al
+cambiar la versión del inventario.
+"""
+
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+# Arranque tibio por defecto en las recomendaciones (1 = activado)
+ARRANQUE_TIBIO = os.environ.get('ARRANQUE_TIBIO', '0') == '1'
+
+# Temperatura de arranque del temple desde una solución escalada
+TEMPERATURA_ARRANQUE_TIBIO = float(os.environ.get('TEMPERATURA_ARRANQUE_TIBIO', 10.0))
+
+# Distancia relativa máxima entre el presupuesto pedido y el resuelto
+DISTANCIA_MAXIMA = 0.25
+
+# Listas guardadas como máximo (se descartan las menos usadas)
+CAPACIDAD_SOLUCIONES = 512
+
+
+class CacheSoluciones:
+    """
+    Caché acotada de listas resueltas, con búsqueda del presupuesto más cercano.
+    """
+
+    def __init__(
+        self,
+        capacidad: int = CAPACIDAD_SOLUCIONES,
+        distancia_maxima: float = DISTANCIA_MAXIMA
+    ):
+        """
+        Args:
+            capacidad: Máximo de listas guardadas
+            distancia_maxima: Distancia relativa máxima de presupuesto para reutilizar
+        """
+        self.capacidad = capacidad
+        self.distancia_maxima = distancia_maxima
+        self._version: Optional[Hashable] = None
+        # (categorías, presupuesto) -> [(id, cantidad), ...], en orden de uso
+        self._listas: 'OrderedDict[Tuple[FrozenSet[str], float], List[Tuple[int, int]]]' = OrderedDict()
+        # categorías -> presupuestos resueltos ordenados
+        self._presupuestos: Dict[FrozenSet[str], List[float]] = {}
+        self._candado = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._listas)
+
+    def _validar_version(self, version: Hashable):
+        if version != self._version:
+            self._listas.clear()
+            self._presupuestos.clear()
+            self._version = version
+
+    def guardar(
+        self,
+        version: Hashable,
+        categorias: List[str],
+        presupuesto: float,
+        lista_compras: List[Tuple[Dict, int]]
+    ):
+        """
+        Guarda la lista resuelta para un presupuesto y conjunto de categorías.
+
+        Args:
+            version: Versión del inventario con que se resolvió
+            categorias: Categorías preferidas de la solicitud
+            presupuesto: Presupuesto resuelto
+            lista_compras: Lista de tuplas (producto, cantidad)
+        """
+        if not lista_compras:
+            return
+        clave = (frozenset(categorias), presupuesto)
+        with self._candado:
+            self._validar_version(version)
+            if clave not in self._listas:
+                insort(self._presupuestos.setdefault(clave[0], []), presupuesto)
+            self._listas[clave] = [(producto['id'], cantidad) for producto, cantidad in lista_compras]
+            self._listas.move_to_end(clave)
+            while len(self._listas) > self.capacidad:
+                (categorias_viejas, presupuesto_viejo), _ = self._listas.popitem(last=False)
+                presupuestos = self._presupuestos[categorias_viejas]
+                del presupuestos[bisect_left(presupuestos, presupuesto_viejo)]
+                if not presupuestos:
+                    del self._presupuestos[categorias_viejas]
+
+    def mas_cercana(
+        self,
+        version: Hashable,
+        categorias: List[str],
+        presupuesto: float
+    ) -> Optional[Tuple[float, List[Tuple[int, int]]]]:
+        """
+        Lista resuelta del presupuesto más cercano con las mismas categorías.
+
+        Args:
+            version: Versión actual del inventario
+            categorias: Categorías preferidas de la solicitud
+            presupuesto: Presupuesto pedido
+
+        Returns:
+            (presupuesto resuelto, [(id, cantidad), ...]) o None si no hay
+            ninguno dentro de la distancia máxima
+        """
+        conjunto = frozenset(categorias)
+        with self._candado:
+            self._validar_version(version)
+            presupuestos = self._presupuestos.get(conjunto)
+            if not presupuestos:
+                return None
+            posicion = bisect_left(presupuestos, presupuesto)
+            vecinos = presupuestos[max(posicion - 1, 0):posicion + 1]
+            cercano = min(vecinos, key=lambda p: abs(p - presupuesto))
+            if abs(cercano - presupuesto) > presupuesto * self.distancia_maxima:
+                return None
+            clave = (conjunto, cercano)
+            self._listas.move_to_end(clave)
+            return cercano, self._listas[clave]
+
+
+def escalar_lista(
+    lista: List[Tuple[int, int]],
+    factor: float,
+    por_id: Dict[int, Dict]
+) -> List[Tuple[Dict, int]]:
+    """
+    Escala las cantidades de una lista guardada a otro presupuesto.
+
+    Args:
+        lista: [(id de producto, cantidad), ...]
+        factor: Presupuesto pedido / presupuesto resuelto
+        por_id: Productos vigentes por id (los ausentes se descartan)
+
+    Returns:
+        Lista de tuplas (producto, cantidad), con al menos una unidad por producto
+    """
+    return [
+        (por_id[producto_id], max(1, round(cantidad * factor)))
+        for producto_id, cantidad in lista
+        if producto_id in por_id
+    ]
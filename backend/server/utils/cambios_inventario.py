@@ -0,0 +1,189 @@
+"""
+Cambios Incrementales de Inventario
+Valida y aplica lotes de cambios (precio, stock, alta, baja y actualización
+de campos) sobre una lista de productos, y calcula los cambios entre dos
+versiones de un inventario.
+
+Formato de los cambios:
+    {"op": "precio", "id": 1, "precio": 9.5}
+    {"op": "stock", "id": 1, "stock": 20}
+    {"op": "agregar", "producto": {"id": 99, "nombre": "...", "precio": 5.0, "categoria": "..."}}
+    {"op": "eliminar", "id": 1}
+    {"op": "actualizar", "id": 1, "campos": {"importancia": 0.7}}
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+OPERACIONES = ('precio', 'stock', 'agregar', 'eliminar', 'actualizar')
+CAMPOS_OBLIGATORIOS = ('id', 'nombre', 'precio', 'categoria')
+
+
+class CambioInvalido(ValueError):
+    """Un cambio del lote no es válido; el lote completo se descarta."""
+
+
+def _validar_precio(precio) -> float:
+    if isinstance(precio, bool) or not isinstance(precio, (int, float)) or precio <= 0:
+        raise CambioInvalido(f"Precio inválido: {precio!r}")
+    return float(precio)
+
+
+def _validar_stock(stock) -> int:
+    if isinstance(stock, bool) or not isinstance(stock, int) or stock < 0:
+        raise CambioInvalido(f"Stock inválido: {stock!r}")
+    return stock
+
+
+def _validar_id(producto_id) -> int:
+    if isinstance(producto_id, bool) or not isinstance(producto_id, int):
+        raise CambioInvalido(f"Id de producto inválido: {producto_id!r}")
+    return producto_id
+
+
+def _validar_textos(producto: Dict):
+    for campo in ('nombre', 'categoria'):
+        if campo in producto and not isinstance(producto[campo], str):
+            raise CambioInvalido(f"'{campo}' debe ser un texto: {producto[campo]!r}")
+
+
+def _validar_producto(producto: Dict) -> Dict:
+    if not isinstance(producto, dict):
+        raise CambioInvalido("'producto' debe ser un objeto")
+    faltantes = [campo for campo in CAMPOS_OBLIGATORIOS if campo not in producto]
+    if faltantes:
+        raise CambioInvalido(f"Faltan campos del producto: {', '.join(faltantes)}")
+    nuevo = {'importancia': 0.5, 'cantidad_tipica': 1}
+    nuevo.update(producto)
+    _validar_id(nuevo['id'])
+    _validar_textos(nuevo)
+    nuevo['precio'] = _validar_precio(nuevo['precio'])
+    if 'stock' in nuevo:
+        nuevo['stock'] = _validar_stock(nuevo['stock'])
+    return nuevo
+
+
+def aplicar_cambios(productos: List[Dict], cambios: List[Dict]) -> List[Dict]:
+    """
+    Aplica un lote de cambios de forma atómica.
+
+    Ni la lista ni los productos originales se modifican: los productos
+    cambiados se reemplazan por copias, así que quien conserve la lista
+    anterior sigue viendo un inventario consistente.
+
+    Args:
+        productos: Lista de productos actual
+        cambios: Lote de cambios (ver el formato en el docstring del módulo)
+
+    Returns:
+        Nueva lista de productos
+
+    Raises:
+        CambioInvalido: Si algún cambio no es válido (no se aplica ninguno)
+    """
+    return aplicar_lote(productos, cambios)[0]
+
+
+def aplicar_lote(
+    productos: List[Dict],
+    cambios: List[Dict]
+) -> Tuple[List[Dict], Dict[object, Optional[Dict]]]:
+    """
+    Como aplicar_cambios, pero informa además qué productos tocó el lote,
+    para actualizar los índices sin recorrer el inventario.
+
+    Returns:
+        Tupla (nueva lista de productos, id -> producto nuevo o None si se eliminó)
+
+    Raises:
+        CambioInvalido: Si algún cambio no es válido (no se aplica ninguno)
+    """
+    nuevos = list(productos)
+    posiciones = {producto['id']: i for i, producto in enumerate(nuevos)}
+    eliminados = False
+    tocados = set()
+
+    for cambio in cambios:
+        operacion = cambio.get('op') if isinstance(cambio, dict) else None
+        if operacion not in OPERACIONES:
+            raise CambioInvalido(f"Operación desconocida: {operacion!r}")
+
+        if operacion == 'agregar':
+            producto = _validar_producto(cambio.get('producto'))
+            if producto['id'] in posiciones:
+                raise CambioInvalido(f"El producto {producto['id']} ya existe")
+            posiciones[producto['id']] = len(nuevos)
+            nuevos.append(producto)
+            tocados.add(producto['id'])
+            continue
+
+        producto_id = _validar_id(cambio.get('id'))
+        if producto_id not in posiciones:
+            raise CambioInvalido(f"Producto {producto_id!r} no encontrado")
+        indice = posiciones[producto_id]
+        tocados.add(producto_id)
+
+        if operacion == 'eliminar':
+            nuevos[indice] = None
+            del posiciones[producto_id]
+            eliminados = True
+            continue
+
+        producto = dict(nuevos[indice])
+        if operacion == 'precio':
+            producto['precio'] = _validar_precio(cambio.get('precio'))
+        elif operacion == 'stock':
+            producto['stock'] = _validar_stock(cambio.get('stock'))
+        else:
+            campos = cambio.get('campos')
+            if not isinstance(campos, dict) or 'id' in campos:
+                raise CambioInvalido("'campos' debe ser un objeto sin 'id'")
+            producto.update(campos)
+            _validar_textos(producto)
+            producto['precio'] = _validar_precio(producto.get('precio'))
+            if 'stock' in producto:
+                producto['stock'] = _validar_stock(producto['stock'])
+        nuevos[indice] = producto
+
+    resultado = {
+        producto_id: nuevos[posiciones[producto_id]] if producto_id in posiciones else None
+        for producto_id in tocados
+    }
+    if eliminados:
+        nuevos = [producto for producto in nuevos if producto is not None]
+    return nuevos, resultado
+
+
+def diferencias(actuales: List[Dict], nuevos: List[Dict]) -> List[Dict]:
+    """
+    Calcula el lote de cambios que transforma `actuales` en `nuevos`.
+
+    Args:
+        actuales: Productos actuales
+        nuevos: Productos de la nueva versión (p. ej. el archivo recargado)
+
+    Returns:
+        Lista de cambios (vacía si los inventarios son iguales)
+    """
+    por_id = {producto['id']: producto for producto in actuales}
+    cambios = []
+    vistos = set()
+
+    for producto in nuevos:
+        vistos.add(producto['id'])
+        anterior = por_id.get(producto['id'])
+        if anterior is None:
+            cambios.append({'op': 'agregar', 'producto': producto})
+        elif set(anterior) - set(producto):
+            # Se quitaron campos: reemplazar el producto completo
+            cambios.append({'op': 'eliminar', 'id': producto['id']})
+            cambios.append({'op': 'agregar', 'producto': producto})
+        elif anterior != producto:
+            campos = {k: v for k, v in producto.items() if k != 'id' and anterior.get(k) != v}
+            if campos:
+                cambios.append({'op': 'actualizar', 'id': producto['id'], 'campos': campos})
+
+    cambios.extend(
+        {'op': 'eliminar', 'id': producto_id}
+        for producto_id in por_id if producto_id not in vistos
+    )
+    return cambios
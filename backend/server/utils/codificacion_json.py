@@ -0,0 +1,199 @@
+"""
+Codificación JSON rápida
+Codificador intercambiable para las respuestas grandes de los agentes: usa
+orjson cuando está instalado y la librería estándar en caso contrario.
+Incluye una codificación compacta de rutas y serialización por fragmentos
+para respuestas muy grandes.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional
+    orjson = None
+
+
+def _codificar_orjson(datos: Any) -> bytes:
+    return orjson.dumps(datos, option=orjson.OPT_NON_STR_KEYS)
+
+
+_codificador_estandar = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def _codificar_estandar(datos: Any) -> bytes:
+    return _codificador_estandar.encode(datos).encode('utf-8')
+
+
+CODIFICADORES: Dict[str, Callable[[Any], bytes]] = {'json': _codificar_estandar}
+if orjson is not None:
+    CODIFICADORES['orjson'] = _codificar_orjson
+
+_codificador_activo = 'orjson' if orjson is not None else 'json'
+_codificar = CODIFICADORES[_codificador_activo]
+
+
+def configurar_codificador(nombre: str):
+    """
+    Selecciona el codificador JSON usado por `codificar`.
+
+    Args:
+        nombre: 'orjson' o 'json'
+    """
+    global _codificador_activo, _codificar
+
+    if nombre not in CODIFICADORES:
+        raise ValueError(
+            f"Codificador JSON no disponible: {nombre}. "
+            f"Opciones: {', '.join(sorted(CODIFICADORES))}"
+        )
+    _codificador_activo = nombre
+    _codificar = CODIFICADORES[nombre]
+
+
+def codificador_activo() -> str:
+    """Retorna el nombre del codificador JSON en uso."""
+    return _codificador_activo
+
+
+def codificar(datos: Any) -> bytes:
+    """
+    Serializa datos a JSON compacto en UTF-8 con el codificador activo.
+
+    Args:
+        datos: Objeto serializable
+
+    Returns:
+        Bytes del documento JSON
+    """
+    return _codificar(datos)
+
+
+def compactar_ruta(ruta_detallada: List[Dict]) -> Dict:
+    """
+    Convierte una ruta detallada (un diccionario por paso) en su forma compacta.
+
+    La forma compacta guarda todas las posiciones en una lista plana
+    [fila0, col0, fila1, col1, ...] y solo conserva como eventos los pasos
+    con una acción distinta de 'avanzar'.
+
+    Args:
+        ruta_detallada: Lista de pasos generada por el agente comprador
+
+    Returns:
+        Diccionario con la ruta compacta
+    """
+    posiciones = []
+    eventos = []
+    for paso in ruta_detallada:
+        posiciones.extend(paso['posicion'])
+        if paso['accion'] != 'avanzar':
+            evento = {k: v for k, v in paso.items() if k != 'posicion'}
+            eventos.append(evento)
+
+    return {
+        'formato': 'compacto',
+        'pasos': len(ruta_detallada),
+        'posiciones': posiciones,
+        'eventos': eventos
+    }
+
+
+def compactar_rutas(datos: Any) -> Any:
+    """
+    Reemplaza toda clave 'ruta_detallada' de una respuesta por su forma compacta.
+
+    Args:
+        datos: Respuesta de un endpoint (se retorna una copia superficial)
+
+    Returns:
+        Respuesta con las rutas compactadas
+    """
+    if isinstance(datos, dict):
+        return {
+            clave: compactar_ruta(valor) if clave == 'ruta_detallada' else compactar_rutas(valor)
+            for clave, valor in datos.items()
+        }
+    if isinstance(datos, list):
+        return [compactar_rutas(valor) for valor in datos]
+    return datos
+
+
+def contar_pasos(datos: Any) -> int:
+    """Cuenta los pasos de todas las 'ruta_detallada' presentes en una respuesta."""
+    if isinstance(datos, dict):
+        total = 0
+        for clave, valor in datos.items():
+            if clave == 'ruta_detallada' and isinstance(valor, list):
+                total += len(valor)
+            elif isinstance(valor, (dict, list)):
+                total += contar_pasos(valor)
+        return total
+    if isinstance(datos, list):
+        return sum(contar_pasos(valor) for valor in datos if isinstance(valor, (dict, list)))
+    return 0
+
+
+def _codificar_clave(clave: Any) -> bytes:
+    """
+    Codifica una clave de diccionario seguida de ':' con el codificador
+    activo, que la convierte igual que al codificar el documento entero
+    (True -> "true", None -> "null").
+    """
+    return codificar({clave: 0})[1:-2]
+
+
+def _fragmentos(datos: Any) -> Iterator[bytes]:
+    """
+    Genera el JSON de `datos` por piezas: recorre los diccionarios y codifica
+    cada elemento de las listas de contenedores por separado.
+    """
+    if isinstance(datos, dict):
+        yield b'{'
+        primero = True
+        for clave, valor in datos.items():
+            if not primero:
+                yield b','
+            primero = False
+            yield _codificar_clave(clave)
+            yield from _fragmentos(valor)
+        yield b'}'
+    elif isinstance(datos, (list, tuple)) and datos and isinstance(datos[0], (dict, list)):
+        yield b'['
+        primero = True
+        for valor in datos:
+            if not primero:
+                yield b','
+            primero = False
+            yield codificar(valor)
+        yield b']'
+    else:
+        yield codificar(datos)
+
+
+def iterar_json(datos: Any, tamano_fragmento: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Serializa datos a JSON en fragmentos de tamaño acotado para respuestas por partes.
+
+    Args:
+        datos: Objeto serializable
+        tamano_fragmento: Tamaño aproximado en bytes de cada fragmento emitido
+
+    Returns:
+        Iterador de fragmentos de bytes cuya concatenación es el documento JSON
+    """
+    buffer = bytearray()
+    for pieza in _fragmentos(datos):
+        buffer += pieza
+        if len(buffer) >= tamano_fragmento:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+# Selección del codificador por variable de entorno (p. ej. JSON_CODIFICADOR=json)
+if os.environ.get('JSON_CODIFICADOR'):
+    configurar_codificador(os.environ['JSON_CODIFICADOR'])
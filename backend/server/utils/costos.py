@@ -0,0 +1,18 @@
+"""
+Términos de Costo de las Listas de Compras
+Constantes de OptimizadorListas.calcular_costo. Viven aparte para que los
+optimizadores que lo reproducen o lo acotan, y el frente de Pareto, las
+compartan sin importarse entre sí.
+"""
+
+MULTIPLO_CANTIDAD_TIPICA = 3     # unidades por encima de 3x la típica se penalizan
+PENALIZACION_EXCESO = 10         # por unidad sobre ese límite
+PENALIZACION_IMPORTANCIA = 50    # por la importancia media que falta para llegar a 1
+MINIMO_VARIEDAD = 3              # productos distintos sin penalización
+PENALIZACION_VARIEDAD = 30       # por producto distinto que falta
+PENALIZACION_CATEGORIA = 25      # por categoría preferida ausente
+PESO_PRESUPUESTO = 1.0
+PESO_REALISMO = 0.5
+PESO_IMPORTANCIA = 0.3
+PESO_VARIEDAD = 0.4
+PESO_CATEGORIA = 0.6
@@ -0,0 +1,416 @@
+"""
+Formato Binario Compilado de Sucursales
+Compila el mapa y el inventario JSON de una sucursal en un único archivo con
+una tabla de productos por columnas, una grilla de ocupación empaquetada en
+bits y un índice de zonas. El archivo se abre con `mmap` y las columnas se
+exponen como `memoryview` sin copia (o como vistas de NumPy, si está
+instalado), de modo que varios procesos comparten las mismas páginas.
+
+Estructura del archivo (little-endian):
+    cabecera   '<4sHHI': magia, versión, reservado, longitud del encabezado JSON
+    encabezado JSON con metadatos y la tabla de secciones, relleno a 8 bytes
+    secciones  arreglos alineados a 8 bytes, con offsets relativos al fin
+               del encabezado
+
+Uso:
+    python server/utils/formato_binario.py               # compilar todas las sucursales
+    python server/utils/formato_binario.py SUC001 SUC002
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # numpy es opcional
+    numpy = None
+
+MAGIA = b'SUCB'
+VERSION_FORMATO = 1
+EXTENSION = '.sucb'
+_CABECERA = struct.Struct('<4sHHI')
+
+# Campos de producto almacenados como columnas; el resto va al encabezado
+CAMPOS_COLUMNAS = ('id', 'nombre', 'precio', 'categoria', 'importancia', 'cantidad_tipica')
+CAMPOS_ZONA = ('fila', 'columna', 'productos')
+
+# Por valor de un byte de la grilla de ocupación, sus 8 celdas como 1 (libre) o 0 (obstáculo)
+_CELDAS_LIBRES = [bytes(1 - ((valor >> bit) & 1) for bit in range(8)) for valor in range(256)]
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def _alinear(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def ruta_compilada(sucursal_id: str, directorio_datos: Optional[str] = None) -> str:
+    """Retorna la ruta del archivo compilado de una sucursal."""
+    return os.path.join(directorio_datos or DIRECTORIO_DATOS, 'compilado', sucursal_id + EXTENSION)
+
+
+def compilar(mapa: Dict, inventario: Dict, ruta_destino: str) -> str:
+    """
+    Escribe el archivo compilado de una sucursal.
+
+    Args:
+        mapa: Diccionario con el formato de data/mapas
+        inventario: Diccionario con el formato de data/inventario
+        ruta_destino: Ruta del archivo a escribir
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    productos = inventario.get('productos', [])
+    categorias: List[str] = []
+    indice_categoria: Dict[str, int] = {}
+
+    ids, precios, importancias = array('i'), array('d'), array('d')
+    cantidades, codigos_categoria = array('i'), array('H')
+    nombres, offsets_nombres = bytearray(), array('I', [0])
+    extras_productos = {}
+
+    for i, producto in enumerate(productos):
+        categoria = producto.get('categoria', '')
+        if categoria not in indice_categoria:
+            indice_categoria[categoria] = len(categorias)
+            categorias.append(categoria)
+        ids.append(producto['id'])
+        precios.append(producto.get('precio', 0.0))
+        importancias.append(producto.get('importancia', 0.5))
+        cantidades.append(producto.get('cantidad_tipica', 1))
+        codigos_categoria.append(indice_categoria[categoria])
+        nombres += producto.get('nombre', '').encode('utf-8')
+        offsets_nombres.append(len(nombres))
+        extras = {k: v for k, v in producto.items() if k not in CAMPOS_COLUMNAS}
+        if extras:
+            extras_productos[str(i)] = extras
+
+    filas = mapa['dimensiones']['filas']
+    columnas = mapa['dimensiones']['columnas']
+    ocupacion = bytearray((filas * columnas + 7) // 8)
+    for obstaculo in mapa.get('obstaculos', []):
+        celda = obstaculo['fila'] * columnas + obstaculo['columna']
+        ocupacion[celda >> 3] |= 1 << (celda & 7)
+
+    zonas = mapa.get('zonas_productos', {})
+    posiciones_zonas, offsets_zonas, productos_zonas = array('i'), array('I', [0]), array('i')
+    extras_zonas = {}
+    for nombre, zona in zonas.items():
+        posiciones_zonas.extend((zona['fila'], zona['columna']))
+        productos_zonas.extend(zona.get('productos', []))
+        offsets_zonas.append(len(productos_zonas))
+        extras = {k: v for k, v in zona.items() if k not in CAMPOS_ZONA}
+        if extras:
+            extras_zonas[nombre] = extras
+
+    secciones = [
+        ('ids', ids), ('precios', precios), ('importancias', importancias),
+        ('cantidades', cantidades), ('categorias', codigos_categoria),
+        ('nombres_offsets', offsets_nombres), ('nombres', array('B', nombres)),
+        ('ocupacion', array('B', ocupacion)),
+        ('zonas_posiciones', posiciones_zonas), ('zonas_offsets', offsets_zonas),
+        ('zonas_productos', productos_zonas),
+    ]
+
+    tabla, cuerpo = {}, bytearray()
+    for nombre, arreglo in secciones:
+        if sys.byteorder == 'big' and arreglo.itemsize > 1:
+            arreglo = array(arreglo.typecode, arreglo)
+            arreglo.byteswap()
+        tabla[nombre] = [len(cuerpo), arreglo.typecode, len(arreglo)]
+        cuerpo += arreglo.tobytes()
+        cuerpo += b'\0' * (_alinear(len(cuerpo)) - len(cuerpo))
+
+    encabezado = json.dumps({
+        'sucursal_id': inventario.get('sucursal_id', mapa.get('sucursal_id')),
+        'inventario': {k: v for k, v in inventario.items() if k != 'productos'},
+        'mapa': {k: v for k, v in mapa.items() if k not in ('obstaculos', 'zonas_productos')},
+        'categorias': categorias,
+        'zonas': list(zonas),
+        'extras_productos': extras_productos,
+        'extras_zonas': extras_zonas,
+        'secciones': tabla,
+    }, ensure_ascii=False).encode('utf-8')
+    inicio_datos = _alinear(_CABECERA.size + len(encabezado))
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta_destino)), exist_ok=True)
+    temporal = ruta_destino + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(_CABECERA.pack(MAGIA, VERSION_FORMATO, 0, len(encabezado)))
+        archivo.write(encabezado)
+        archivo.write(b'\0' * (inicio_datos - _CABECERA.size - len(encabezado)))
+        archivo.write(cuerpo)
+    # Reemplazo atómico: los procesos con el archivo anterior mapeado no se ven afectados
+    os.replace(temporal, ruta_destino)
+    return ruta_destino
+
+
+def compilar_sucursal(sucursal_id: str, directorio_datos: Optional[str] = None) -> str:
+    """
+    Compila los JSON de una sucursal de data/ a data/compilado/.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+        directorio_datos: Directorio 'data' del servidor (opcional)
+
+    Returns:
+        Ruta del archivo compilado
+    """
+    directorio = directorio_datos or DIRECTORIO_DATOS
+    with open(os.path.join(directorio, 'mapas', f'{sucursal_id}.json'), 'r', encoding='utf-8') as archivo:
+        mapa = json.load(archivo)
+    with open(os.path.join(directorio, 'inventario', f'{sucursal_id}.json'), 'r', encoding='utf-8') as archivo:
+        inventario = json.load(archivo)
+    return compilar(mapa, inventario, ruta_compilada(sucursal_id, directorio))
+
+
+class SucursalCompilada:
+    """
+    Vista de solo lectura de un archivo compilado, mapeado en memoria.
+
+    Las columnas (`ids`, `precios`, `importancias`, `cantidades`,
+    `indices_categoria`) y la grilla `ocupacion` son memoryviews sobre el
+    mapeo; no se copian al abrir el archivo.
+    """
+
+    def __init__(self, ruta: str):
+        """
+        Args:
+            ruta: Ruta del archivo compilado
+
+        Raises:
+            ValueError: Si el archivo no tiene el formato o la versión esperados
+        """
+        self.ruta = ruta
+        with open(ruta, 'rb') as archivo:
+            self._mmap = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magia, version, _, largo = _CABECERA.unpack_from(self._mmap, 0)
+        if magia != MAGIA or version != VERSION_FORMATO:
+            self._mmap.close()
+            raise ValueError(f"Archivo compilado no válido o de otra versión: {ruta}")
+
+        self.encabezado = json.loads(self._mmap[_CABECERA.size:_CABECERA.size + largo])
+        self._inicio_datos = _alinear(_CABECERA.size + largo)
+        self._vista = memoryview(self._mmap)
+
+        self.sucursal_id = self.encabezado['sucursal_id']
+        mapa = self.encabezado['mapa']
+        self.nombre = mapa.get('nombre', self.encabezado['inventario'].get('nombre', ''))
+        self.dimensiones = (mapa['dimensiones']['filas'], mapa['dimensiones']['columnas'])
+        self.entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+        self.caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+        self.categorias: List[str] = self.encabezado['categorias']
+        self.zonas: List[str] = self.encabezado['zonas']
+
+        self.ids = self._seccion('ids')
+        self.precios = self._seccion('precios')
+        self.importancias = self._seccion('importancias')
+        self.cantidades = self._seccion('cantidades')
+        self.indices_categoria = self._seccion('categorias')
+        self.ocupacion = self._seccion('ocupacion')
+        self._offsets_nombres = self._seccion('nombres_offsets')
+        self._nombres = self._seccion('nombres')
+        self._posiciones_zonas = self._seccion('zonas_posiciones')
+        self._offsets_zonas = self._seccion('zonas_offsets')
+        self._productos_zonas = self._seccion('zonas_productos')
+
+    def _seccion(self, nombre: str) -> memoryview:
+        offset, tipo, cantidad = self.encabezado['secciones'][nombre]
+        inicio = self._inicio_datos + offset
+        bytes_seccion = self._vista[inicio:inicio + cantidad * array(tipo).itemsize]
+        if sys.byteorder == 'big' and tipo != 'B':
+            copia = array(tipo, bytes_seccion.tobytes())
+            copia.byteswap()
+            return memoryview(copia)
+        return bytes_seccion.cast(tipo)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columna_numpy(self, nombre: str):
+        """
+        Retorna una columna como arreglo de NumPy sin copia.
+
+        Args:
+            nombre: 'ids', 'precios', 'importancias', 'cantidades' o 'categorias'
+
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        if numpy is None:
+            raise ImportError("NumPy no está instalado")
+        offset, tipo, cantidad = self.encabezado['secciones'][nombre]
+        return numpy.frombuffer(
+            self._mmap, dtype=numpy.dtype(tipo).newbyteorder('<'),
+            count=cantidad, offset=self._inicio_datos + offset
+        )
+
+    def nombre_producto(self, indice: int) -> str:
+        """Retorna el nombre del producto en la posición `indice` de la tabla."""
+        return bytes(
+            self._nombres[self._offsets_nombres[indice]:self._offsets_nombres[indice + 1]]
+        ).decode('utf-8')
+
+    def producto(self, indice: int) -> Dict:
+        """Materializa el producto en la posición `indice` con el formato JSON."""
+        producto = {
+            'id': self.ids[indice],
+            'nombre': self.nombre_producto(indice),
+            'precio': self.precios[indice],
+            'categoria': self.categorias[self.indices_categoria[indice]],
+            'importancia': self.importancias[indice],
+            'cantidad_tipica': self.cantidades[indice],
+        }
+        extras = self.encabezado['extras_productos'].get(str(indice))
+        if extras:
+            producto.update(extras)
+        return producto
+
+    def bloqueada(self, fila: int, columna: int) -> bool:
+        """Indica si la celda (fila, columna) es un obstáculo."""
+        celda = fila * self.dimensiones[1] + columna
+        return bool(self.ocupacion[celda >> 3] & (1 << (celda & 7)))
+
+    def obstaculos(self) -> List[Tuple[int, int]]:
+        """Retorna las celdas bloqueadas en orden de filas."""
+        columnas = self.dimensiones[1]
+        celdas = []
+        for indice_byte, valor in enumerate(self.ocupacion):
+            while valor:
+                bit = (valor & -valor).bit_length() - 1
+                celdas.append(divmod(indice_byte * 8 + bit, columnas))
+                valor &= valor - 1
+        return celdas
+
+    def zona(self, indice: int) -> Tuple[Tuple[int, int], memoryview]:
+        """Retorna la posición y los ids de productos de la zona `indice`."""
+        posicion = (self._posiciones_zonas[2 * indice], self._posiciones_zonas[2 * indice + 1])
+        productos = self._productos_zonas[self._offsets_zonas[indice]:self._offsets_zonas[indice + 1]]
+        return posicion, productos
+
+    def productos(self) -> List[Dict]:
+        """
+        Materializa todos los productos con el formato JSON, en el orden de la
+        tabla. Lee cada columna de una vez en lugar de producto por producto.
+        """
+        nombres = bytes(self._nombres)
+        offsets = self._offsets_nombres.tolist()
+        categorias = self.categorias
+        productos = [
+            {
+                'id': producto_id,
+                'nombre': nombres[inicio:fin].decode('utf-8'),
+                'precio': precio,
+                'categoria': categorias[codigo],
+                'importancia': importancia,
+                'cantidad_tipica': cantidad,
+            }
+            for producto_id, inicio, fin, precio, codigo, importancia, cantidad in zip(
+                self.ids.tolist(), offsets, offsets[1:], self.precios.tolist(),
+                self.indices_categoria.tolist(), self.importancias.tolist(),
+                self.cantidades.tolist()
+            )
+        ]
+        for indice, extras in self.encabezado['extras_productos'].items():
+            productos[int(indice)].update(extras)
+        return productos
+
+    def filas_por_id(self) -> Dict[int, int]:
+        """Índice id de producto -> posición en la tabla, leído de la columna de ids."""
+        return {producto_id: fila for fila, producto_id in enumerate(self.ids.tolist())}
+
+    def libres(self) -> bytearray:
+        """
+        Celdas transitables (1) y obstáculos (0) en orden de filas, desempaquetadas
+        de la grilla de ocupación sin pasar por la lista de obstáculos.
+        """
+        celdas = self.dimensiones[0] * self.dimensiones[1]
+        libres = bytearray(b''.join(map(_CELDAS_LIBRES.__getitem__, self.ocupacion)))
+        del libres[celdas:]
+        return libres
+
+    def posiciones_productos(self) -> Dict[int, Tuple[int, int]]:
+        """Índice producto -> posición de la primera zona que lo contiene."""
+        posiciones: Dict[int, Tuple[int, int]] = {}
+        for indice in range(len(self.zonas)):
+            posicion, productos = self.zona(indice)
+            for producto_id in productos.tolist():
+                posiciones.setdefault(producto_id, posicion)
+            productos.release()
+        return posiciones
+
+    def inventario(self) -> Dict:
+        """Reconstruye el diccionario de inventario con el formato de data/inventario."""
+        inventario = dict(self.encabezado['inventario'])
+        inventario['productos'] = self.productos()
+        return inventario
+
+    def mapa(self) -> Dict:
+        """Reconstruye el diccionario de mapa con el formato de data/mapas."""
+        mapa = dict(self.encabezado['mapa'])
+        extras_zonas = self.encabezado['extras_zonas']
+        zonas = {}
+        for indice, nombre in enumerate(self.zonas):
+            (fila, columna), productos = self.zona(indice)
+            zonas[nombre] = {'fila': fila, 'columna': columna, 'productos': productos.tolist()}
+            zonas[nombre].update(extras_zonas.get(nombre, {}))
+        mapa['zonas_productos'] = zonas
+        mapa['obstaculos'] = [{'fila': f, 'columna': c} for f, c in self.obstaculos()]
+        return mapa
+
+    def cerrar(self):
+        """
+        Libera las vistas y el mapeo en memoria. Las vistas obtenidas con
+        `zona()` deben liberarse antes.
+        """
+        for nombre in ('ids', 'precios', 'importancias', 'cantidades', 'indices_categoria',
+                       'ocupacion', '_offsets_nombres', '_nombres', '_posiciones_zonas',
+                       '_offsets_zonas', '_productos_zonas'):
+            getattr(self, nombre).release()
+        self._vista.release()
+        self._mmap.close()
+
+
+def compilada_vigente(ruta: str, fuentes: List[str]) -> bool:
+    """
+    Indica si el archivo compilado existe y no es más antiguo que sus fuentes JSON.
+
+    Args:
+        ruta: Ruta del archivo compilado
+        fuentes: Rutas de los JSON de origen (las que no existen se ignoran)
+    """
+    if not os.path.exists(ruta):
+        return False
+    modificado = os.path.getmtime(ruta)
+    return all(
+        os.path.getmtime(fuente) <= modificado
+        for fuente in fuentes if os.path.exists(fuente)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compila sucursales al formato binario')
+    parser.add_argument('sucursales', nargs='*', help='Sucursales a compilar (por defecto todas)')
+    parser.add_argument('--datos', default=DIRECTORIO_DATOS, help='Directorio data')
+    args = parser.parse_args()
+
+    sucursales = args.sucursales or sorted(
+        nombre[:-len('.json')]
+        for nombre in os.listdir(os.path.join(args.datos, 'inventario'))
+        if nombre.endswith('.json')
+    )
+    for sucursal_id in sucursales:
+        ruta = compilar_sucursal(sucursal_id, args.datos)
+        print(f"✓ {sucursal_id} → {ruta} ({os.path.getsize(ruta)} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Frente de Pareto de Listas de Compras
+En lugar de sumar con pesos fijos el ajuste al presupuesto, la importancia,
+la variedad y la cobertura de categorías, un archivo guarda las listas no
+dominadas que el temple visita durante una sola ejecución. El cliente elige
+después el compromiso que prefiera (p. ej. más variedad a cambio de
+alejarse un poco del presupuesto).
+
+Todos los objetivos se expresan para minimizar:
+    (diferencia con el presupuesto, 1 - importancia promedio,
+     -productos distintos, categorías preferidas sin cubrir)
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from utils.costos import MULTIPLO_CANTIDAD_TIPICA
+
+Objetivos = Tuple[float, float, int, int]
+
+# Diferencia máxima con el presupuesto admitida en el frente (fracción)
+TOLERANCIA_PRESUPUESTO = 0.1
+
+# Listas que conserva el archivo por defecto
+CAPACIDAD_FRENTE = 12
+
+
+def calcular_objetivos(
+    lista_compras: List[Tuple[Dict, int]],
+    presupuesto: float,
+    categorias_preferidas: List[str]
+) -> Optional[Objetivos]:
+    """
+    Objetivos de una lista de compras, o None si la lista no es admisible
+    (vacía o con cantidades por encima de 3 veces la típica, el mismo límite
+    de realismo de `calcular_costo`).
+
+    Args:
+        lista_compras: Lista de tuplas (producto, cantidad)
+        presupuesto: Presupuesto objetivo
+        categorias_preferidas: Categorías preferidas
+
+    Returns:
+        Tupla de objetivos a minimizar
+    """
+    if not lista_compras:
+        return None
+    cantidades: Dict[int, int] = {}
+    productos: Dict[int, Dict] = {}
+    for producto, cantidad in lista_compras:
+        cantidades[producto['id']] = cantidades.get(producto['id'], 0) + cantidad
+        productos[producto['id']] = producto
+
+    total = 0.0
+    importancia = 0.0
+    unidades = 0
+    categorias = set()
+    for producto_id, cantidad in cantidades.items():
+        producto = productos[producto_id]
+        if cantidad > producto.get('cantidad_tipica', 1) * MULTIPLO_CANTIDAD_TIPICA:
+            return None
+        total += producto['precio'] * cantidad
+        importancia += producto.get('importancia', 0.5) * cantidad
+        unidades += cantidad
+        categorias.add(producto['categoria'])
+
+    return (
+        round(abs(total - presupuesto), 2),
+        round(1.0 - importancia / unidades, 4),
+        -len(cantidades),
+        len(set(categorias_preferidas) - categorias)
+    )
+
+
+def domina(a: Objetivos, b: Objetivos) -> bool:
+    """True si `a` es al menos tan bueno como `b` en todo y mejor en algo."""
+    return a != b and all(x <= y for x, y in zip(a, b))
+
+
+class ArchivoPareto:
+    """
+    Archivo acotado de listas no dominadas.
+
+    Si se llena, descarta la lista más amontonada (menor distancia de
+    aglomeración); los extremos de cada objetivo se conservan siempre.
+    """
+
+    def __init__(
+        self,
+        presupuesto: float,
+        categorias_preferidas: Optional[List[str]] = None,
+        capacidad: int = CAPACIDAD_FRENTE,
+        tolerancia: float = TOLERANCIA_PRESUPUESTO
+    ):
+        """
+        Args:
+            presupuesto: Presupuesto objetivo
+            categorias_preferidas: Categorías preferidas
+            capacidad: Máximo de listas en el archivo
+            tolerancia: Diferencia máxima con el presupuesto (fracción)
+        """
+        self.presupuesto = presupuesto
+        self.categorias_preferidas = categorias_preferidas or []
+        self.capacidad = capacidad
+        self.brecha_maxima = presupuesto * tolerancia
+        self.entradas: List[Tuple[Objetivos, List[Tuple[Dict, int]]]] = []
+        self.ofrecidas = 0
+
+    def __len__(self) -> int:
+        return len(self.entradas)
+
+    def ofrecer(self, lista_compras: List[Tuple[Dict, int]]) -> bool:
+        """
+        Agrega la lista si ninguna del archivo la domina.
+
+        Args:
+            lista_compras: Lista de tuplas (producto, cantidad)
+
+        Returns:
+            True si la lista quedó en el archivo
+        """
+        self.ofrecidas += 1
+        # Descarte rápido antes de calcular todos los objetivos
+        total = sum(producto['precio'] * cantidad for producto, cantidad in lista_compras)
+        if abs(total - self.presupuesto) > self.brecha_maxima + 0.005:
+            return False
+        objetivos = calcular_objetivos(lista_compras, self.presupuesto, self.categorias_preferidas)
+        if objetivos is None or objetivos[0] > self.brecha_maxima:
+            return False
+        for existentes, _ in self.entradas:
+            if existentes == objetivos or domina(existentes, objetivos):
+                return False
+
+        self.entradas = [
+            entrada for entrada in self.entradas if not domina(objetivos, entrada[0])
+        ]
+        nueva = (objetivos, list(lista_compras))
+        self.entradas.append(nueva)
+        if len(self.entradas) > self.capacidad:
+            self._descartar_mas_amontonada()
+        return any(entrada is nueva for entrada in self.entradas)
+
+    def _descartar_mas_amontonada(self):
+        distancias = [0.0] * len(self.entradas)
+        for k in range(len(self.entradas[0][0])):
+            orden = sorted(range(len(self.entradas)), key=lambda i: self.entradas[i][0][k])
+            minimo = self.entradas[orden[0]][0][k]
+            maximo = self.entradas[orden[-1]][0][k]
+            distancias[orden[0]] = distancias[orden[-1]] = float('inf')
+            if maximo == minimo:
+                continue
+            for anterior, actual, siguiente in zip(orden, orden[1:], orden[2:]):
+                distancias[actual] += (
+                    self.entradas[siguiente][0][k] - self.entradas[anterior][0][k]
+                ) / (maximo - minimo)
+        del self.entradas[min(range(len(distancias)), key=distancias.__getitem__)]
+
+    def frente(self) -> List[Tuple[Objetivos, List[Tuple[Dict, int]]]]:
+        """Listas del archivo ordenadas por diferencia con el presupuesto."""
+        return sorted(self.entradas, key=lambda entrada: entrada[0])
@@ -0,0 +1,334 @@
+"""
+Generador de Sucursales Sintéticas
+Produce inventarios y mapas en el mismo formato JSON que data/inventario y
+data/mapas, a partir de una semilla, para pruebas de escala.
+
+Uso:
+    python server/utils/generador_sucursales.py --sucursal SUC900 --productos 3500 \\
+        --filas 200 --columnas 300 --semilla 1
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Categorías base con (precio mediano en Bs., importancia media)
+CATEGORIAS_BASE = {
+    'lacteos': (10.0, 0.85),
+    'panaderia': (6.0, 0.8),
+    'granos': (12.0, 0.8),
+    'aceites': (18.0, 0.7),
+    'carnes': (40.0, 0.75),
+    'verduras': (7.0, 0.8),
+    'frutas': (9.0, 0.7),
+    'limpieza': (15.0, 0.6),
+    'bebidas': (10.0, 0.5),
+    'snacks': (6.0, 0.3),
+    'caramelos': (4.0, 0.2),
+    'condimentos': (5.0, 0.5),
+    'desayuno': (14.0, 0.6),
+    'endulzantes': (8.0, 0.55),
+    'enlatados': (11.0, 0.5),
+}
+
+# Distribución de la cantidad típica de compra: (cantidad, peso)
+CANTIDADES_TIPICAS = ((1, 0.6), (2, 0.25), (3, 0.1), (4, 0.05))
+
+
+def generar_categorias(cantidad: int) -> Dict[str, Tuple[float, float]]:
+    """
+    Retorna `cantidad` categorías con su precio mediano e importancia media.
+    Más allá de las categorías base se crean subcategorías numeradas.
+
+    Args:
+        cantidad: Número de categorías
+
+    Returns:
+        Diccionario categoría -> (precio mediano, importancia media)
+    """
+    base = list(CATEGORIAS_BASE.items())
+    categorias = {}
+    for i in range(cantidad):
+        nombre, parametros = base[i % len(base)]
+        if i >= len(base):
+            nombre = f'{nombre}_{i // len(base)}'
+        categorias[nombre] = parametros
+    return categorias
+
+
+def generar_inventario(
+    sucursal_id: str,
+    productos: int,
+    categorias: int = 15,
+    semilla: int = 1,
+    nombre: Optional[str] = None
+) -> Dict:
+    """
+    Genera un inventario sintético.
+
+    Los precios siguen una distribución log-normal alrededor de la mediana de
+    cada categoría y la importancia se dispersa alrededor de su media.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+        productos: Número de productos
+        categorias: Número de categorías
+        semilla: Semilla del generador
+        nombre: Nombre de la sucursal (opcional)
+
+    Returns:
+        Diccionario con el formato de data/inventario
+    """
+    rng = random.Random(semilla)
+    tabla_categorias = list(generar_categorias(categorias).items())
+    cantidades, pesos = zip(*CANTIDADES_TIPICAS)
+
+    lista = []
+    for i in range(productos):
+        categoria, (mediana, importancia_media) = tabla_categorias[i % len(tabla_categorias)]
+        precio = mediana * math.exp(rng.gauss(0.0, 0.5))
+        importancia = min(1.0, max(0.05, rng.gauss(importancia_media, 0.12)))
+        lista.append({
+            'id': i + 1,
+            'nombre': f'{categoria.replace("_", " ").title()} {i // len(tabla_categorias) + 1}',
+            'precio': max(0.5, round(precio * 2) / 2),
+            'categoria': categoria,
+            'importancia': round(importancia, 2),
+            'cantidad_tipica': rng.choices(cantidades, pesos)[0]
+        })
+
+    return {
+        'sucursal_id': sucursal_id,
+        'nombre': nombre or f'Sucursal Sintética {sucursal_id}',
+        'productos': lista
+    }
+
+
+def generar_mapa(
+    sucursal_id: str,
+    inventario: Dict,
+    filas: int,
+    columnas: int,
+    densidad: float = 0.9,
+    separacion_transversal: int = 12,
+    zonas_por_categoria: int = 4,
+    semilla: int = 1,
+    nombre: Optional[str] = None
+) -> Dict:
+    """
+    Genera un mapa de pasillos para un inventario.
+
+    Cada tercera fila es una fila de estanterías; sus celdas son obstáculos con
+    probabilidad `densidad`, salvo en las columnas de pasillo transversal y en
+    los bordes. Las filas restantes son pasillos libres, por lo que todas las
+    celdas libres están conectadas. Las zonas de productos se ubican en celdas
+    de pasillo junto a una estantería.
+
+    Args:
+        sucursal_id: Identificador de la sucursal
+        inventario: Inventario generado (o real) de la sucursal
+        filas: Filas del mapa (mínimo 5)
+        columnas: Columnas del mapa (mínimo 5)
+        densidad: Probabilidad de obstáculo en las celdas de estantería
+        separacion_transversal: Columnas entre pasillos transversales
+        zonas_por_categoria: Zonas del mapa asignadas a cada categoría
+        semilla: Semilla del generador
+        nombre: Nombre de la sucursal (opcional)
+
+    Returns:
+        Diccionario con el formato de data/mapas
+    """
+    if filas < 5 or columnas < 5:
+        raise ValueError("El mapa debe tener al menos 5 filas y 5 columnas")
+
+    rng = random.Random(semilla)
+
+    def es_fila_estanteria(fila: int) -> bool:
+        return 1 < fila < filas - 2 and fila % 3 == 0
+
+    obstaculos = []
+    bloqueadas = set()
+    for fila in range(filas):
+        if not es_fila_estanteria(fila):
+            continue
+        for columna in range(1, columnas - 1):
+            if columna % separacion_transversal == 0:
+                continue
+            if rng.random() < densidad:
+                obstaculos.append({'fila': fila, 'columna': columna})
+                bloqueadas.add((fila, columna))
+
+    # Celdas de pasillo adyacentes a una estantería (candidatas a zona)
+    candidatas = [
+        (fila, columna)
+        for (f, columna) in bloqueadas
+        for fila in (f - 1, f + 1)
+        if (fila, columna) not in bloqueadas
+    ]
+    candidatas = sorted(set(candidatas))
+    rng.shuffle(candidatas)
+
+    # Agrupar productos por categoría
+    por_categoria: Dict[str, List[int]] = {}
+    for producto in inventario.get('productos', []):
+        por_categoria.setdefault(producto['categoria'], []).append(producto['id'])
+
+    zonas_productos = {}
+    indice_celda = 0
+    for categoria, ids in por_categoria.items():
+        zonas = min(zonas_por_categoria, len(ids))
+        for k in range(zonas):
+            if indice_celda < len(candidatas):
+                fila, columna = candidatas[indice_celda]
+                indice_celda += 1
+            else:
+                # Sin estanterías libres: ubicar en el pasillo de entrada
+                fila, columna = 1, rng.randrange(columnas)
+            zonas_productos[f'{categoria}_{k + 1}'] = {
+                'fila': fila,
+                'columna': columna,
+                'productos': ids[k::zonas]
+            }
+
+    return {
+        'sucursal_id': sucursal_id,
+        'nombre': nombre or inventario.get('nombre', f'Sucursal Sintética {sucursal_id}'),
+        'dimensiones': {'filas': filas, 'columnas': columnas},
+        'entrada': {'fila': 0, 'columna': columnas // 2, 'tipo': 'entrada'},
+        'caja': {'fila': filas - 1, 'columna': columnas // 2, 'tipo': 'caja'},
+        'zonas_productos': zonas_productos,
+        'obstaculos': obstaculos
+    }
+
+
+def ponderar_mapa(
+    mapa: Dict,
+    zonas_concurridas: int = 8,
+    costo_maximo: float = 4.0,
+    sentido_unico: bool = True,
+    semilla: int = 1
+) -> Dict:
+    """
+    Agrega costos de tránsito y pasillos de sentido único a un mapa generado.
+
+    Las zonas concurridas son rectángulos de celdas con un costo entre 1.5 y
+    `costo_maximo`. Con `sentido_unico`, en cada par de pasillos entre dos
+    filas de estanterías el primero va hacia la derecha y el segundo hacia la
+    izquierda; la primera y las dos últimas filas siguen siendo de doble
+    sentido, así que todas las celdas libres siguen conectadas.
+
+    Args:
+        mapa: Mapa generado con `generar_mapa`
+        zonas_concurridas: Número de zonas con costo mayor que 1
+        costo_maximo: Costo máximo de una zona concurrida
+        sentido_unico: Convertir los pasillos en carriles de sentido único
+        semilla: Semilla del generador
+
+    Returns:
+        Copia del mapa con 'costos_celdas' y 'sentido_unico'
+    """
+    rng = random.Random(semilla)
+    filas = mapa['dimensiones']['filas']
+    columnas = mapa['dimensiones']['columnas']
+    bloqueadas = {(obst['fila'], obst['columna']) for obst in mapa['obstaculos']}
+
+    costos: Dict[Tuple[int, int], float] = {}
+    for _ in range(zonas_concurridas):
+        alto = rng.randint(2, max(2, filas // 4))
+        ancho = rng.randint(2, max(2, columnas // 4))
+        fila0 = rng.randrange(filas - alto + 1)
+        columna0 = rng.randrange(columnas - ancho + 1)
+        costo = round(rng.uniform(1.5, costo_maximo), 1)
+        for fila in range(fila0, fila0 + alto):
+            for columna in range(columna0, columna0 + ancho):
+                if (fila, columna) not in bloqueadas:
+                    costos[(fila, columna)] = max(costo, costos.get((fila, columna), 1.0))
+
+    carriles = []
+    if sentido_unico:
+        for fila in range(1, filas - 3, 3):
+            for fila_carril, direccion in ((fila, 'derecha'), (fila + 1, 'izquierda')):
+                carriles.extend(
+                    {'fila': fila_carril, 'columna': columna, 'direccion': direccion}
+                    for columna in range(columnas) if (fila_carril, columna) not in bloqueadas
+                )
+
+    ponderado = dict(mapa)
+    ponderado['costos_celdas'] = [
+        {'fila': fila, 'columna': columna, 'costo': costo}
+        for (fila, columna), costo in sorted(costos.items())
+    ]
+    ponderado['sentido_unico'] = carriles
+    return ponderado
+
+
+def generar_sucursal(
+    sucursal_id: str,
+    productos: int = 3500,
+    categorias: int = 60,
+    filas: int = 200,
+    columnas: int = 300,
+    densidad: float = 0.9,
+    semilla: int = 1
+) -> Tuple[Dict, Dict]:
+    """
+    Genera el mapa y el inventario de una sucursal sintética.
+
+    Returns:
+        Tupla (mapa, inventario)
+    """
+    inventario = generar_inventario(sucursal_id, productos, categorias, semilla)
+    mapa = generar_mapa(sucursal_id, inventario, filas, columnas, densidad, semilla=semilla)
+    return mapa, inventario
+
+
+def guardar_sucursal(mapa: Dict, inventario: Dict, directorio_datos: str):
+    """
+    Escribe el mapa y el inventario en data/mapas y data/inventario.
+
+    Args:
+        mapa: Mapa generado
+        inventario: Inventario generado
+        directorio_datos: Directorio 'data' del servidor
+    """
+    for tipo, datos in (('mapas', mapa), ('inventario', inventario)):
+        directorio = os.path.join(directorio_datos, tipo)
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, f"{datos['sucursal_id']}.json")
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, ensure_ascii=False, indent=2)
+
+
+def main():
+    directorio_por_defecto = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'
+    )
+
+    parser = argparse.ArgumentParser(description='Genera una sucursal sintética')
+    parser.add_argument('--sucursal', required=True, help='Identificador (p. ej. SUC900)')
+    parser.add_argument('--productos', type=int, default=3500)
+    parser.add_argument('--categorias', type=int, default=60)
+    parser.add_argument('--filas', type=int, default=200)
+    parser.add_argument('--columnas', type=int, default=300)
+    parser.add_argument('--densidad', type=float, default=0.9)
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--destino', default=directorio_por_defecto,
+                        help='Directorio data de destino')
+    args = parser.parse_args()
+
+    mapa, inventario = generar_sucursal(
+        args.sucursal, args.productos, args.categorias,
+        args.filas, args.columnas, args.densidad, args.semilla
+    )
+    guardar_sucursal(mapa, inventario, args.destino)
+
+    print(f"✓ {args.sucursal}: {len(inventario['productos'])} productos, "
+          f"{len(mapa['zonas_productos'])} zonas, {len(mapa['obstaculos'])} obstáculos "
+          f"en {args.filas}x{args.columnas}")
+
+
+if __name__ == '__main__':
+    main()
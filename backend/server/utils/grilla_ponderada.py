@@ -0,0 +1,468 @@
+"""
+Grilla Ponderada y Heurística de Landmarks (ALT)
+Los mapas pueden indicar un costo de tránsito por celda (zonas concurridas,
+pasillos lentos) y pasillos de sentido único:
+
+    "costos_celdas": [{"fila": 4, "columna": 8, "costo": 2.5}, ...]
+    "sentido_unico": [{"fila": 1, "columna": 3, "direccion": "derecha"}, ...]
+
+El costo de un movimiento es el de la celda a la que se entra (1 por
+defecto, nunca menor). En una celda de sentido único no se puede entrar ni
+salir moviéndose en la dirección contraria a la indicada; los movimientos
+laterales sí se permiten.
+
+Con costos la distancia Manhattan subestima mucho el costo real, así que
+cada grilla precalcula las distancias de Dijkstra desde y hacia unos pocos
+landmarks y la heurística usa la desigualdad triangular:
+    h(v) = max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L))
+"""
+
+import heapq
+import math
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.metricas import metricas, medir
+
+HIST_LANDMARKS_SEGUNDOS = metricas.histograma(
+    'landmarks_precalculo_segundos', 'Duración del precálculo de landmarks de un mapa'
+)
+
+# Landmarks precalculados por mapa ponderado
+LANDMARKS_MAPA = int(os.environ.get('LANDMARKS_MAPA', 8))
+
+# Landmarks que se usan en cada búsqueda (los de mejor cota para el par inicio-objetivo)
+LANDMARKS_ACTIVOS = 4
+
+# Grillas guardadas como máximo (una por mapa en uso)
+CAPACIDAD_GRILLAS = 16
+
+# (nombre, desplazamiento de fila, desplazamiento de columna), en el orden de
+# los movimientos de BusquedaAEstrella
+DIRECCIONES = (
+    ('arriba', -1, 0),
+    ('abajo', 1, 0),
+    ('izquierda', 0, -1),
+    ('derecha', 0, 1),
+)
+_OPUESTA = {'arriba': 'abajo', 'abajo': 'arriba', 'izquierda': 'derecha', 'derecha': 'izquierda'}
+
+INFINITO = float('inf')
+
+
+def es_mapa_ponderado(mapa: Dict) -> bool:
+    """True si el mapa define costos por celda o pasillos de sentido único."""
+    return bool(mapa.get('costos_celdas') or mapa.get('sentido_unico'))
+
+
+class GrillaPonderada:
+    """
+    Grilla compilada de un mapa: celdas transitables, costo de entrada a cada
+    celda y movimientos permitidos desde cada celda (máscara de 4 bits), en
+    arreglos indexados por `fila * columnas + columna`.
+    """
+
+    def __init__(
+        self,
+        mapa: Dict,
+        landmarks: int = LANDMARKS_MAPA,
+        libres: Optional[bytes] = None
+    ):
+        """
+        Args:
+            mapa: Diccionario con la información del mapa
+            landmarks: Landmarks a precalcular para la heurística ALT
+            libres: Celdas transitables (1) en orden de filas, p. ej. la grilla
+                de ocupación de un archivo compilado; reemplaza a los obstáculos del mapa
+
+        Raises:
+            ValueError: Si un costo es menor que 1 o una dirección no existe
+        """
+        self.filas = mapa['dimensiones']['filas']
+        self.columnas = mapa['dimensiones']['columnas']
+        self.celdas = self.filas * self.columnas
+        self.ponderada = es_mapa_ponderado(mapa)
+        self.cantidad_landmarks = landmarks
+        entrada = mapa.get('entrada')
+        self._origen_landmarks = (
+            (entrada['fila'], entrada['columna']) if isinstance(entrada, dict) else None
+        )
+
+        if libres is not None:
+            if len(libres) != self.celdas:
+                raise ValueError("La grilla de ocupación no coincide con las dimensiones del mapa")
+            self.libres = bytearray(libres)
+        else:
+            self.libres = bytearray(b'\x01') * self.celdas
+            for obst in mapa.get('obstaculos', []):
+                if self.dentro((obst['fila'], obst['columna'])):
+                    self.libres[self.celda((obst['fila'], obst['columna']))] = 0
+
+        self.costos = array('d', [1.0]) * self.celdas
+        # Pasos de tiempo que se tarda en entrar a cada celda: su costo redondeado hacia arriba
+        self.pasos = array('i', [1]) * self.celdas
+        for entrada_costo in mapa.get('costos_celdas', []):
+            costo = float(entrada_costo['costo'])
+            if costo < 1:
+                raise ValueError(f"El costo de una celda no puede ser menor que 1: {entrada_costo}")
+            posicion = (entrada_costo['fila'], entrada_costo['columna'])
+            if self.dentro(posicion):
+                self.costos[self.celda(posicion)] = costo
+                self.pasos[self.celda(posicion)] = math.ceil(costo)
+        self.costo_minimo = 1.0
+
+        # Dirección prohibida (la contraria a la del sentido único) por celda
+        contrarias: Dict[int, str] = {}
+        for carril in mapa.get('sentido_unico', []):
+            if carril['direccion'] not in _OPUESTA:
+                raise ValueError(f"Dirección de sentido único desconocida: {carril['direccion']}")
+            posicion = (carril['fila'], carril['columna'])
+            if self.dentro(posicion):
+                contrarias[self.celda(posicion)] = _OPUESTA[carril['direccion']]
+
+        self._contrarias = contrarias
+        self.dirigida = bool(contrarias)
+
+        self.desplazamientos = tuple(df * self.columnas + dc for _, df, dc in DIRECCIONES)
+        self.salidas = bytearray(self.celdas)
+        # Por celda, ((vecino, costo de entrar), ...) en el orden de DIRECCIONES
+        self.adyacencia: List[Tuple[Tuple[int, float], ...]] = [()] * self.celdas
+        for celda in range(self.celdas):
+            if self.libres[celda]:
+                self._compilar_celda(celda)
+
+        self.landmarks: List[int] = []
+        self._desde: List[array] = []
+        self._hacia: List[array] = []
+        self._predecesores: Optional[List[Tuple[Tuple[int, float], ...]]] = None
+        self._candado = threading.Lock()
+
+    def _compilar_celda(self, celda: int):
+        """Calcula los movimientos permitidos desde una celda libre."""
+        contrarias = self._contrarias
+        fila, columna = divmod(celda, self.columnas)
+        mascara = 0
+        for bit, (nombre, df, dc) in enumerate(DIRECCIONES):
+            vecino = (fila + df, columna + dc)
+            if not self.dentro(vecino) or not self.libres[self.celda(vecino)]:
+                continue
+            if contrarias.get(celda) == nombre or contrarias.get(self.celda(vecino)) == nombre:
+                continue
+            mascara |= 1 << bit
+        self.salidas[celda] = mascara
+        self.adyacencia[celda] = tuple(
+            (celda + desplazamiento, self.costos[celda + desplazamiento])
+            for bit, desplazamiento in enumerate(self.desplazamientos) if mascara >> bit & 1
+        )
+
+    def con_obstaculos(
+        self,
+        agregar: Iterable[Tuple[int, int]],
+        quitar: Iterable[Tuple[int, int]]
+    ) -> 'GrillaPonderada':
+        """
+        Grilla nueva con obstáculos agregados o quitados. Copia los arreglos y
+        solo recalcula los movimientos de las celdas cambiadas y sus vecinas;
+        esta grilla no se modifica. Los landmarks se recalculan al usarse.
+
+        Args:
+            agregar: Posiciones que pasan a ser obstáculo
+            quitar: Posiciones que dejan de ser obstáculo
+
+        Returns:
+            Grilla del mapa modificado
+        """
+        nueva = GrillaPonderada.__new__(GrillaPonderada)
+        nueva.__dict__.update(self.__dict__)
+        nueva.libres = bytearray(self.libres)
+        nueva.salidas = bytearray(self.salidas)
+        nueva.adyacencia = list(self.adyacencia)
+        nueva.landmarks, nueva._desde, nueva._hacia = [], [], []
+        nueva._predecesores = None
+        nueva._candado = threading.Lock()
+
+        afectadas = set()
+        for posiciones, libre in ((agregar, 0), (quitar, 1)):
+            for posicion in posiciones:
+                if not nueva.dentro(posicion):
+                    continue
+                celda = nueva.celda(posicion)
+                nueva.libres[celda] = libre
+                afectadas.add(celda)
+                for _, df, dc in DIRECCIONES:
+                    if nueva.dentro((posicion[0] + df, posicion[1] + dc)):
+                        afectadas.add(celda + df * nueva.columnas + dc)
+        for celda in afectadas:
+            if nueva.libres[celda]:
+                nueva._compilar_celda(celda)
+            else:
+                nueva.salidas[celda] = 0
+                nueva.adyacencia[celda] = ()
+        return nueva
+
+    def predecesores(self) -> List[Tuple[Tuple[int, float], ...]]:
+        """
+        Por celda, las celdas desde las que se puede entrar a ella, con el
+        mismo formato que `adyacencia` (el costo es el de la celda vecina).
+        Sin sentido único los movimientos son simétricos y es `adyacencia`;
+        con sentido único se construye una vez y se guarda.
+        """
+        if not self.dirigida:
+            return self.adyacencia
+        with self._candado:
+            if self._predecesores is None:
+                entradas: List[List[Tuple[int, float]]] = [[] for _ in range(self.celdas)]
+                for celda, salidas in enumerate(self.adyacencia):
+                    for vecino, _ in salidas:
+                        entradas[vecino].append((celda, self.costos[celda]))
+                self._predecesores = [tuple(lista) for lista in entradas]
+            return self._predecesores
+
+    def dentro(self, posicion: Tuple[int, int]) -> bool:
+        """True si la posición está dentro del mapa."""
+        return 0 <= posicion[0] < self.filas and 0 <= posicion[1] < self.columnas
+
+    def celda(self, posicion: Tuple[int, int]) -> int:
+        """Índice de celda de una posición (fila, columna)."""
+        return posicion[0] * self.columnas + posicion[1]
+
+    def posicion(self, celda: int) -> Tuple[int, int]:
+        """Posición (fila, columna) de un índice de celda."""
+        return divmod(celda, self.columnas)
+
+    def es_valida(self, posicion: Tuple[int, int]) -> bool:
+        """True si la posición está dentro del mapa y no es un obstáculo."""
+        return self.dentro(posicion) and bool(self.libres[self.celda(posicion)])
+
+    def vecinos(self, celda: int) -> Iterator[int]:
+        """Celdas a las que se puede mover desde `celda`."""
+        for vecino, _ in self.adyacencia[celda]:
+            yield vecino
+
+    def costo_ruta(self, ruta: List[Tuple[int, int]]) -> float:
+        """
+        Costo de recorrer una ruta: el costo de cada celda a la que se entra
+        y 1 por cada paso de espera (posición repetida).
+        """
+        costo = 0.0
+        for anterior, siguiente in zip(ruta, ruta[1:]):
+            costo += 1.0 if siguiente == anterior else self.costos[self.celda(siguiente)]
+        return costo
+
+    def ruta_en_pasos(self, ruta: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        Posición en cada paso de tiempo al recorrer una ruta: cada celda a la
+        que se entra se repite tantos pasos como su costo redondeado hacia
+        arriba; las esperas (posiciones repetidas) se conservan.
+        """
+        pasos = self.pasos
+        resultado = ruta[:1]
+        for anterior, siguiente in zip(ruta, ruta[1:]):
+            resultado.extend([siguiente] * (1 if siguiente == anterior else pasos[self.celda(siguiente)]))
+        return resultado
+
+    def dijkstra(self, origen: int, inversa: bool = False) -> array:
+        """
+        Costo mínimo desde `origen` a cada celda (o desde cada celda hasta
+        `origen` si `inversa`).
+
+        Returns:
+            Arreglo de costos por celda (infinito si no es alcanzable)
+        """
+        distancias = array('d', [INFINITO]) * self.celdas
+        distancias[origen] = 0.0
+        frontera = [(0.0, origen)]
+        salidas, costos, adyacencia = self.salidas, self.costos, self.adyacencia
+        desplazamientos = list(enumerate(self.desplazamientos))
+        while frontera:
+            distancia, celda = heapq.heappop(frontera)
+            if distancia > distancias[celda]:
+                continue
+            if inversa:
+                # Predecesores: celdas desde las que se puede entrar a `celda`
+                siguientes = [
+                    (celda - desplazamiento, costos[celda])
+                    for bit, desplazamiento in desplazamientos
+                    if 0 <= celda - desplazamiento < self.celdas
+                    and salidas[celda - desplazamiento] >> bit & 1
+                ]
+            else:
+                siguientes = adyacencia[celda]
+            for vecino, costo in siguientes:
+                nueva = distancia + costo
+                if nueva < distancias[vecino]:
+                    distancias[vecino] = nueva
+                    heapq.heappush(frontera, (nueva, vecino))
+        return distancias
+
+    def preparar_landmarks(self):
+        """
+        Elige los landmarks por el punto más lejano (el primero es la celda
+        más lejana a la entrada; cada siguiente maximiza su distancia a los
+        ya elegidos) y guarda sus distancias. Se ejecuta una sola vez.
+        """
+        if self.landmarks or self.cantidad_landmarks <= 0:
+            return
+        with self._candado:
+            if self.landmarks:
+                return
+            with medir(HIST_LANDMARKS_SEGUNDOS):
+                self._calcular_landmarks()
+
+    def _calcular_landmarks(self):
+        origen = self._origen_landmarks
+        if origen is None or not self.es_valida(origen):
+            origen = next((self.posicion(c) for c in range(self.celdas) if self.libres[c]), None)
+            if origen is None:
+                return
+        lejania = self.dijkstra(self.celda(origen))
+        landmarks, desde, hacia = [], [], []
+        for _ in range(self.cantidad_landmarks):
+            candidato = max(
+                (c for c in range(self.celdas) if lejania[c] < INFINITO and c not in landmarks),
+                key=lejania.__getitem__, default=None
+            )
+            if candidato is None:
+                break
+            distancias = self.dijkstra(candidato)
+            landmarks.append(candidato)
+            desde.append(distancias)
+            if self.dirigida:
+                hacia.append(self.dijkstra(candidato, inversa=True))
+            else:
+                # Sin sentido único, d(v, L) = d(L, v) - costo(v) + costo(L)
+                costos = self.costos
+                hacia.append(array('d', (
+                    d - costos[c] + costos[candidato] for c, d in enumerate(distancias)
+                )))
+            lejania = array('d', map(min, lejania, distancias)) if len(landmarks) > 1 else distancias
+        self._desde, self._hacia = desde, hacia
+        # Publicar al final: las búsquedas consultan `landmarks` sin el candado
+        self.landmarks = landmarks
+
+    def heuristica(
+        self,
+        objetivo: int,
+        inicio: Optional[int] = None,
+        activos: int = LANDMARKS_ACTIVOS,
+        inversa: bool = False
+    ):
+        """
+        Construye la heurística hacia `objetivo`.
+
+        Usa los `activos` landmarks con mejor cota para el par
+        (inicio, objetivo) y nunca es menor que la distancia Manhattan por el
+        costo mínimo. Sin landmarks es la distancia Manhattan.
+
+        Con `inversa` la cota es la del costo desde `objetivo` hasta cada
+        celda (para búsquedas hacia atrás).
+
+        Returns:
+            Función celda -> cota inferior del costo hasta `objetivo`
+        """
+        columnas = self.columnas
+        fila_objetivo, columna_objetivo = divmod(objetivo, columnas)
+        costo_minimo = self.costo_minimo
+
+        def manhattan(celda: int) -> float:
+            fila, columna = divmod(celda, columnas)
+            return (abs(fila - fila_objetivo) + abs(columna - columna_objetivo)) * costo_minimo
+
+        if self.ponderada:
+            self.preparar_landmarks()
+        if not self.landmarks:
+            return manhattan
+
+        # Pares (d(L, ·), d(L, t)) y (d(·, L), d(t, L)) con el objetivo alcanzable;
+        # hacia atrás las cotas son d(t, L) - d(·, L) y d(L, ·) - d(L, t)
+        cotas = []
+        pares = zip(self._hacia, self._desde) if inversa else zip(self._desde, self._hacia)
+        for desde, hacia in pares:
+            if desde[objetivo] < INFINITO and hacia[objetivo] < INFINITO:
+                cotas.append((desde, desde[objetivo], hacia, hacia[objetivo]))
+        if not cotas:
+            return manhattan
+        if inicio is not None and len(cotas) > activos:
+            def cota(par):
+                desde, desde_objetivo, hacia, hacia_objetivo = par
+                return max(desde_objetivo - desde[inicio], hacia[inicio] - hacia_objetivo)
+            cotas = sorted(cotas, key=cota, reverse=True)[:activos]
+
+        def alt(celda: int) -> float:
+            mejor = manhattan(celda)
+            for desde, desde_objetivo, hacia, hacia_objetivo in cotas:
+                cota = desde_objetivo - desde[celda]
+                if cota > mejor:
+                    mejor = cota
+                cota = hacia[celda] - hacia_objetivo
+                if cota > mejor:
+                    mejor = cota
+            return mejor
+        return alt
+
+
+_grillas: 'OrderedDict[int, Tuple[Dict, GrillaPonderada]]' = OrderedDict()
+_candado_grillas = threading.Lock()
+
+# Mapas cuya grilla se compila desde otra fuente de celdas libres (id -> (mapa, función))
+_ocupaciones: 'OrderedDict[int, Tuple[Dict, Callable[[], bytes]]]' = OrderedDict()
+
+
+def obtener_grilla(mapa: Dict) -> GrillaPonderada:
+    """
+    Retorna la grilla compilada de un mapa, construyéndola la primera vez.
+    Los mapas son de solo lectura y se identifican por la instancia, así que
+    la grilla (y sus landmarks) se comparte entre todas las búsquedas sobre
+    el mismo mapa.
+
+    Args:
+        mapa: Diccionario con la información del mapa
+
+    Returns:
+        Grilla del mapa
+    """
+    clave = id(mapa)
+    with _candado_grillas:
+        guardada = _grillas.get(clave)
+        if guardada is not None and guardada[0] is mapa:
+            _grillas.move_to_end(clave)
+            return guardada[1]
+        ocupacion = _ocupaciones.get(clave)
+    libres = ocupacion[1]() if ocupacion is not None and ocupacion[0] is mapa else None
+    grilla = GrillaPonderada(mapa, libres=libres)
+    registrar_grilla(mapa, grilla)
+    return grilla
+
+
+def registrar_ocupacion(mapa: Dict, libres: Callable[[], bytes]):
+    """
+    Indica de dónde leer las celdas transitables de un mapa (p. ej. la grilla
+    de ocupación de su archivo compilado) cuando `obtener_grilla` lo compile,
+    en lugar de recorrer su lista de obstáculos.
+
+    Args:
+        mapa: Mapa cuya grilla aún no se compiló
+        libres: Función que retorna las celdas transitables (1) en orden de filas
+    """
+    with _candado_grillas:
+        _ocupaciones[id(mapa)] = (mapa, libres)
+        _ocupaciones.move_to_end(id(mapa))
+        while len(_ocupaciones) > CAPACIDAD_GRILLAS:
+            _ocupaciones.popitem(last=False)
+
+
+def registrar_grilla(mapa: Dict, grilla: GrillaPonderada):
+    """
+    Asocia a un mapa una grilla ya construida (p. ej. derivada con
+    `con_obstaculos` de la del mapa anterior) para que `obtener_grilla` no
+    la vuelva a compilar.
+    """
+    with _candado_grillas:
+        # Se guarda el mapa junto a la grilla para que su id no se reutilice
+        _grillas[id(mapa)] = (mapa, grilla)
+        _grillas.move_to_end(id(mapa))
+        while len(_grillas) > CAPACIDAD_GRILLAS:
+            _grillas.popitem(last=False)
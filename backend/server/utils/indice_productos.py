@@ -0,0 +1,314 @@
+"""
+Índices de Productos
+Agrupa los productos de una sucursal por categoría, por franja de precio y
+por importancia para que el temple proponga vecinos dirigidos (una categoría
+preferida que falta, un producto cuyo precio cierra la diferencia con el
+presupuesto) en lugar de sortear sobre todo el catálogo. Además mantiene los
+productos ordenados por precio, en total y por categoría, para buscar por
+bisección el producto de precio más cercano a un monto.
+"""
+
+import math
+import random
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Cociente entre los límites de franjas de precio consecutivas
+RAZON_FRANJA = 1.5
+
+# Fracción de los productos más importantes que forma el grupo de importancia alta
+FRACCION_IMPORTANTES = 0.1
+
+
+def franja_precio(precio: float) -> int:
+    """Franja geométrica de un precio: [RAZON^k, RAZON^(k+1))."""
+    return math.floor(math.log(max(precio, 0.01)) / math.log(RAZON_FRANJA))
+
+
+def _buscar(lista: List[Dict], clave, funcion: Callable[[Dict], tuple]) -> int:
+    """Bisección izquierda de `clave` en `lista`, ordenada por `funcion`."""
+    bajo, alto = 0, len(lista)
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        if funcion(lista[medio]) < clave:
+            bajo = medio + 1
+        else:
+            alto = medio
+    return bajo
+
+
+class IndiceProductos:
+    """
+    Índices inmutables sobre una lista de productos.
+
+    Se construye una vez por versión del inventario; si la lista cambia,
+    `actualizar` retorna un índice nuevo que copia solo los grupos tocados.
+    """
+
+    def __init__(self, productos: List[Dict], columnas=None):
+        """
+        Args:
+            productos: Productos del inventario
+            columnas: Tabla con las columnas `precios`, `importancias`,
+                `indices_categoria` y `categorias` de los mismos productos en el
+                mismo orden (p. ej. una SucursalCompilada); los órdenes se
+                calculan sobre las columnas sin leer los diccionarios
+        """
+        self.productos = productos
+        self._por_id: Optional[Dict] = None
+        if columnas is not None and len(columnas) == len(productos):
+            precios = columnas.precios.tolist()
+            importancias = columnas.importancias.tolist()
+            nombres_categorias = columnas.categorias
+            categorias = [nombres_categorias[codigo] for codigo in columnas.indices_categoria.tolist()]
+        else:
+            precios = [producto['precio'] for producto in productos]
+            importancias = [producto.get('importancia', 0) for producto in productos]
+            categorias = [producto['categoria'] for producto in productos]
+        # Posición de cada producto en el inventario, para desempatar como la lista
+        ids = columnas.ids.tolist() if columnas is not None and len(columnas) == len(productos) \
+            else [producto['id'] for producto in productos]
+        self._orden: Dict = dict(zip(ids, range(len(productos))))
+        self._siguiente = len(productos)
+
+        franjas = {precio: franja_precio(precio) for precio in set(precios)}
+        self.por_categoria: Dict[str, List[Dict]] = {}
+        self.por_franja: Dict[int, List[Dict]] = {}
+        for producto, precio, categoria in zip(productos, precios, categorias):
+            self.por_categoria.setdefault(categoria, []).append(producto)
+            self.por_franja.setdefault(franjas[precio], []).append(producto)
+        self.franjas = sorted(self.por_franja)
+
+        orden = sorted(range(len(productos)), key=importancias.__getitem__, reverse=True)
+        self.por_importancia = [productos[i] for i in orden]
+        self.importantes = self.por_importancia[:max(5, int(len(productos) * FRACCION_IMPORTANTES))]
+
+        # Orden estable: a igual precio se conserva el orden del inventario;
+        # cada categoría toma sus productos del orden total, ya ordenados
+        orden = sorted(range(len(productos)), key=precios.__getitem__)
+        self._por_precio = ([precios[i] for i in orden], [productos[i] for i in orden])
+        self._por_precio_categoria = {categoria: ([], []) for categoria in self.por_categoria}
+        for i in orden:
+            precios_categoria, productos_categoria = self._por_precio_categoria[categorias[i]]
+            precios_categoria.append(precios[i])
+            productos_categoria.append(productos[i])
+
+    def actualizar(
+        self,
+        productos: List[Dict],
+        tocados: Dict[object, Tuple[Optional[Dict], Optional[Dict]]],
+        agregados: Iterable = ()
+    ) -> 'IndiceProductos':
+        """
+        Retorna el índice de una versión nueva del inventario sin recorrerlo
+        entero: cada producto tocado se quita e inserta por bisección en sus
+        grupos y órdenes. El índice actual no se modifica, así que las
+        búsquedas en curso siguen viendo la versión anterior.
+
+        Args:
+            productos: Lista completa de la versión nueva (ver cambios_inventario)
+            tocados: id -> (producto anterior, producto nuevo); None si no existía
+                o si se eliminó
+            agregados: Ids dados de alta en el lote, en el orden de las altas
+                (quedan al final del inventario)
+
+        Returns:
+            Índice equivalente a IndiceProductos(productos)
+        """
+        nuevo = IndiceProductos.__new__(IndiceProductos)
+        nuevo.productos = productos
+        nuevo._por_id = None
+        nuevo._orden = dict(self._orden)
+        nuevo._siguiente = self._siguiente
+        nuevo.por_categoria = dict(self.por_categoria)
+        nuevo.por_franja = dict(self.por_franja)
+        nuevo._por_precio_categoria = dict(self._por_precio_categoria)
+        copiados = set()
+
+        def grupo_de(grupos: Dict, clave) -> List[Dict]:
+            # Cada grupo se copia la primera vez que el lote lo toca
+            if (id(grupos), clave) not in copiados:
+                copiados.add((id(grupos), clave))
+                grupos[clave] = list(grupos.get(clave, ()))
+            return grupos[clave]
+
+        def grupo_precio(categoria: str) -> Tuple[List[float], List[Dict]]:
+            if ('precio', categoria) not in copiados:
+                copiados.add(('precio', categoria))
+                precios_categoria, productos_categoria = nuevo._por_precio_categoria.get(categoria, ((), ()))
+                nuevo._por_precio_categoria[categoria] = (list(precios_categoria), list(productos_categoria))
+            return nuevo._por_precio_categoria[categoria]
+
+        por_importancia = list(self.por_importancia)
+        precios, por_precio = list(self._por_precio[0]), list(self._por_precio[1])
+        orden = nuevo._orden
+        por_orden = lambda p: orden[p['id']]
+        por_precio_orden = lambda p: (p['precio'], orden[p['id']])
+        por_importancia_orden = lambda p: (-p.get('importancia', 0), orden[p['id']])
+
+        # Primero se quitan las versiones anteriores, con su posición anterior
+        for anterior, _ in tocados.values():
+            if anterior is None:
+                continue
+            grupo = grupo_de(nuevo.por_categoria, anterior['categoria'])
+            del grupo[_buscar(grupo, por_orden(anterior), por_orden)]
+            grupo = grupo_de(nuevo.por_franja, franja_precio(anterior['precio']))
+            del grupo[_buscar(grupo, por_orden(anterior), por_orden)]
+            del por_importancia[_buscar(por_importancia, por_importancia_orden(anterior), por_importancia_orden)]
+            i = _buscar(por_precio, por_precio_orden(anterior), por_precio_orden)
+            del precios[i], por_precio[i]
+            precios_categoria, productos_categoria = grupo_precio(anterior['categoria'])
+            i = _buscar(productos_categoria, por_precio_orden(anterior), por_precio_orden)
+            del precios_categoria[i], productos_categoria[i]
+
+        for producto_id in agregados:
+            orden[producto_id] = nuevo._siguiente
+            nuevo._siguiente += 1
+        for producto_id, (_, actual) in tocados.items():
+            if actual is None:
+                orden.pop(producto_id, None)
+
+        for _, actual in tocados.values():
+            if actual is None:
+                continue
+            grupo = grupo_de(nuevo.por_categoria, actual['categoria'])
+            grupo.insert(_buscar(grupo, por_orden(actual), por_orden), actual)
+            grupo = grupo_de(nuevo.por_franja, franja_precio(actual['precio']))
+            grupo.insert(_buscar(grupo, por_orden(actual), por_orden), actual)
+            por_importancia.insert(
+                _buscar(por_importancia, por_importancia_orden(actual), por_importancia_orden), actual
+            )
+            i = _buscar(por_precio, por_precio_orden(actual), por_precio_orden)
+            precios.insert(i, actual['precio'])
+            por_precio.insert(i, actual)
+            precios_categoria, productos_categoria = grupo_precio(actual['categoria'])
+            i = _buscar(productos_categoria, por_precio_orden(actual), por_precio_orden)
+            precios_categoria.insert(i, actual['precio'])
+            productos_categoria.insert(i, actual)
+
+        # Los grupos vacíos desaparecen y las claves siguen el orden de aparición
+        nuevo.por_categoria = dict(sorted(
+            ((c, g) for c, g in nuevo.por_categoria.items() if g), key=lambda par: por_orden(par[1][0])
+        ))
+        nuevo.por_franja = dict(sorted(
+            ((f, g) for f, g in nuevo.por_franja.items() if g), key=lambda par: por_orden(par[1][0])
+        ))
+        nuevo._por_precio_categoria = {
+            categoria: nuevo._por_precio_categoria[categoria] for categoria in nuevo.por_categoria
+        }
+        nuevo.franjas = sorted(nuevo.por_franja)
+        nuevo.por_importancia = por_importancia
+        nuevo.importantes = por_importancia[:max(5, int(len(productos) * FRACCION_IMPORTANTES))]
+        nuevo._por_precio = (precios, por_precio)
+        return nuevo
+
+    def __len__(self) -> int:
+        return len(self.productos)
+
+    @property
+    def por_id(self) -> Dict:
+        """Productos por id; se arma la primera vez que se pide."""
+        if self._por_id is None:
+            self._por_id = {producto['id']: producto for producto in self.productos}
+        return self._por_id
+
+    def categorias(self) -> List[str]:
+        """Categorías presentes en el inventario."""
+        return list(self.por_categoria)
+
+    def mas_importantes(self, cantidad: int) -> List[Dict]:
+        """Los `cantidad` productos de mayor importancia."""
+        return self.por_importancia[:cantidad]
+
+    def de_categoria(self, categoria: str, rng=random) -> Optional[Dict]:
+        """Producto al azar de una categoría (None si no hay)."""
+        productos = self.por_categoria.get(categoria)
+        return rng.choice(productos) if productos else None
+
+    def hasta_precio(self, precio: float, rng=random) -> Optional[Dict]:
+        """
+        Producto al azar de la franja de `precio` o, si está vacía, de la
+        franja inferior más cercana con productos.
+
+        Args:
+            precio: Precio buscado (p. ej. lo que falta para el presupuesto)
+
+        Returns:
+            Producto de precio cercano o None si no hay ninguno por debajo
+        """
+        if not self.franjas:
+            return None
+        franja = franja_precio(precio)
+        while franja >= self.franjas[0]:
+            productos = self.por_franja.get(franja)
+            if productos:
+                return rng.choice(productos)
+            franja -= 1
+        return None
+
+    def importante(self, rng=random) -> Optional[Dict]:
+        """Producto al azar del grupo de importancia alta."""
+        return rng.choice(self.importantes) if self.importantes else None
+
+    def _columnas_precio(self, categoria: Optional[str]):
+        if categoria is None:
+            return self._por_precio
+        return self._por_precio_categoria.get(categoria, ([], []))
+
+    def mas_cercano(
+        self,
+        precio: float,
+        categoria: Optional[str] = None,
+        sin_superar: bool = True,
+        admitir: Optional[Callable[[Dict], bool]] = None
+    ) -> Optional[Dict]:
+        """
+        Producto de precio más cercano a `precio`, por bisección.
+
+        Args:
+            precio: Monto buscado (p. ej. lo que falta para el presupuesto)
+            categoria: Restringir la búsqueda a una categoría (opcional)
+            sin_superar: Solo productos con precio menor o igual a `precio`
+            admitir: Filtro adicional (p. ej. productos con stock); los
+                rechazados se saltan hacia precios más lejanos
+
+        Returns:
+            Producto encontrado o None. A igual precio gana el primero del inventario.
+        """
+        precios, productos = self._columnas_precio(categoria)
+        abajo = bisect_right(precios, precio) - 1
+        arriba = abajo + 1 if not sin_superar else len(precios)
+
+        while abajo >= 0 or arriba < len(precios):
+            if arriba < len(precios) and (
+                abajo < 0 or precios[arriba] - precio < precio - precios[abajo]
+            ):
+                if admitir is None or admitir(productos[arriba]):
+                    return productos[arriba]
+                arriba += 1
+                continue
+
+            # Recorrer los productos de igual precio en el orden del inventario
+            inicio = bisect_left(precios, precios[abajo], 0, abajo + 1)
+            for i in range(inicio, abajo + 1):
+                if admitir is None or admitir(productos[i]):
+                    return productos[i]
+            abajo = inicio - 1
+        return None
+
+    def en_rango(
+        self,
+        minimo: float,
+        maximo: float,
+        categoria: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Productos con precio entre `minimo` y `maximo` (inclusive), ordenados por precio.
+
+        Args:
+            minimo: Precio mínimo
+            maximo: Precio máximo
+            categoria: Restringir la búsqueda a una categoría (opcional)
+        """
+        precios, productos = self._columnas_precio(categoria)
+        return productos[bisect_left(precios, minimo):bisect_right(precios, maximo)]
@@ -0,0 +1,272 @@
+"""
+Métricas de Latencia
+Histogramas en memoria con etiquetas por endpoint y sucursal, spans de
+medición para los algoritmos de los agentes y exposición en formato de
+texto de Prometheus.
+
+Con las métricas deshabilitadas (METRICAS_HABILITADAS=0) `medir` retorna un
+span nulo compartido y no se toma ninguna marca de tiempo.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+PREFIJO = 'supermercado_'
+
+# Límites de los buckets (segundos) para latencias
+BUCKETS_SEGUNDOS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Límites de los buckets para conteos (iteraciones, nodos expandidos, ...)
+BUCKETS_CONTEO = (
+    1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000
+)
+
+# Límites de los buckets para valores de costo de la función objetivo
+BUCKETS_COSTO = (0.1, 1, 5, 10, 25, 50, 100, 500, 1000, 10000, 100000, 1000000)
+
+ETIQUETAS_BASE = ('endpoint', 'sucursal')
+
+_etiquetas_contexto: contextvars.ContextVar = contextvars.ContextVar(
+    'etiquetas_metricas', default=None
+)
+
+
+class Histograma:
+    """
+    Histograma acumulativo con una serie por combinación de etiquetas.
+    Todas las series comparten las etiquetas base (endpoint, sucursal).
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        descripcion: str,
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS,
+        etiquetas: Tuple[str, ...] = ()
+    ):
+        """
+        Args:
+            nombre: Nombre de la métrica (sin prefijo)
+            descripcion: Texto de ayuda mostrado en la exposición
+            buckets: Límites superiores de los buckets, en orden creciente
+            etiquetas: Nombres de etiquetas adicionales a las base
+        """
+        self.nombre = PREFIJO + nombre
+        self.descripcion = descripcion
+        self.buckets = tuple(buckets)
+        self.etiquetas = ETIQUETAS_BASE + tuple(etiquetas)
+        # serie -> [conteos por bucket (no acumulados) ..., suma]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._candado = threading.Lock()
+
+    def observar(self, valor: float, etiquetas: Tuple[str, ...]):
+        """
+        Registra una observación.
+
+        Args:
+            valor: Valor observado
+            etiquetas: Valores de las etiquetas, en el orden de `self.etiquetas`
+        """
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._candado:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[etiquetas] = serie
+            serie[indice] += 1
+            serie[-1] += valor
+
+    def exponer(self) -> List[str]:
+        """Retorna las líneas de la métrica en formato de texto de Prometheus."""
+        lineas = [
+            f'# HELP {self.nombre} {self.descripcion}',
+            f'# TYPE {self.nombre} histogram',
+        ]
+        with self._candado:
+            series = [(etiquetas, list(serie)) for etiquetas, serie in self._series.items()]
+
+        for etiquetas, serie in sorted(series):
+            base = ','.join(
+                f'{nombre}="{_escapar(valor)}"'
+                for nombre, valor in zip(self.etiquetas, etiquetas)
+            )
+            separador = ',' if base else ''
+            acumulado = 0
+            for limite, conteo in zip(self.buckets, serie):
+                acumulado += conteo
+                lineas.append(f'{self.nombre}_bucket{{{base}{separador}le="{limite}"}} {acumulado}')
+            acumulado += serie[len(self.buckets)]
+            lineas.append(f'{self.nombre}_bucket{{{base}{separador}le="+Inf"}} {acumulado}')
+            lineas.append(f'{self.nombre}_sum{{{base}}} {serie[-1]}')
+            lineas.append(f'{self.nombre}_count{{{base}}} {acumulado}')
+        return lineas
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroMetricas:
+    """Colección de histogramas del proceso."""
+
+    def __init__(self, habilitado: bool = True):
+        self.habilitado = habilitado
+        self._histogramas: Dict[str, Histograma] = {}
+        self._candado = threading.Lock()
+
+    def histograma(
+        self,
+        nombre: str,
+        descripcion: str,
+        buckets: Sequence[float] = BUCKETS_SEGUNDOS,
+        etiquetas: Tuple[str, ...] = ()
+    ) -> Histograma:
+        """
+        Declara un histograma, o retorna el existente con el mismo nombre.
+
+        Args:
+            nombre: Nombre de la métrica (sin prefijo)
+            descripcion: Texto de ayuda
+            buckets: Límites superiores de los buckets
+            etiquetas: Etiquetas adicionales a (endpoint, sucursal)
+
+        Returns:
+            Histograma registrado
+        """
+        with self._candado:
+            histograma = self._histogramas.get(nombre)
+            if histograma is None:
+                histograma = Histograma(nombre, descripcion, buckets, etiquetas)
+                self._histogramas[nombre] = histograma
+            return histograma
+
+    def exponer(self) -> str:
+        """Retorna todas las métricas en formato de texto de Prometheus."""
+        lineas = []
+        for nombre in sorted(self._histogramas):
+            lineas.extend(self._histogramas[nombre].exponer())
+        return '\n'.join(lineas) + '\n'
+
+    def reiniciar(self):
+        """Descarta todas las observaciones registradas."""
+        for histograma in self._histogramas.values():
+            with histograma._candado:
+                histograma._series.clear()
+
+
+metricas = RegistroMetricas(
+    habilitado=os.environ.get('METRICAS_HABILITADAS', '1').lower() not in ('0', 'false', 'no')
+)
+
+
+def etiquetar(**etiquetas: str):
+    """
+    Fija etiquetas base (endpoint, sucursal) para las mediciones del contexto actual.
+
+    Args:
+        **etiquetas: Valores de 'endpoint' y/o 'sucursal'
+    """
+    actuales = _etiquetas_contexto.get()
+    nuevas = dict(actuales) if actuales else {}
+    nuevas.update(etiquetas)
+    _etiquetas_contexto.set(nuevas)
+
+
+def reiniciar_etiquetas(**etiquetas: str):
+    """Reemplaza las etiquetas base del contexto actual (p. ej. al iniciar una petición)."""
+    _etiquetas_contexto.set(dict(etiquetas))
+
+
+def etiqueta_actual(nombre: str) -> str:
+    """Retorna el valor de una etiqueta base del contexto actual ('' si no existe)."""
+    actuales = _etiquetas_contexto.get()
+    return actuales.get(nombre, '') if actuales else ''
+
+
+class Span:
+    """Medición de duración de un bloque, con observaciones adicionales."""
+
+    __slots__ = ('histograma', 'etiquetas', 'inicio')
+
+    def __init__(self, histograma: Histograma, etiquetas: Tuple[str, ...]):
+        self.histograma = histograma
+        self.etiquetas = etiquetas
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.histograma.observar(time.perf_counter() - self.inicio, self.etiquetas)
+        return False
+
+    def observar(self, histograma: Histograma, valor: float):
+        """Registra un valor en otro histograma con las mismas etiquetas base."""
+        histograma.observar(valor, self.etiquetas[:len(ETIQUETAS_BASE)])
+
+
+class _SpanNulo:
+    """Span sin efecto usado cuando las métricas están deshabilitadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+    def observar(self, histograma: Histograma, valor: float):
+        pass
+
+
+SPAN_NULO = _SpanNulo()
+
+
+def medir(histograma: Histograma, **extra: str):
+    """
+    Crea un span que mide la duración de un bloque `with`.
+
+    Args:
+        histograma: Histograma de duraciones (segundos)
+        **extra: Valores de las etiquetas adicionales del histograma
+
+    Returns:
+        Span (o el span nulo si las métricas están deshabilitadas)
+    """
+    if not metricas.habilitado:
+        return SPAN_NULO
+
+    actuales = _etiquetas_contexto.get()
+    if actuales:
+        etiquetas = (actuales.get('endpoint', ''), actuales.get('sucursal', ''))
+    else:
+        etiquetas = ('', '')
+    if len(histograma.etiquetas) > len(ETIQUETAS_BASE):
+        etiquetas += tuple(str(extra.get(nombre, '')) for nombre in histograma.etiquetas[2:])
+    return Span(histograma, etiquetas)
+
+
+def observar(histograma: Histograma, valor: float, **extra: str):
+    """
+    Registra un valor con las etiquetas base del contexto actual.
+
+    Args:
+        histograma: Histograma destino
+        valor: Valor observado
+        **extra: Valores de las etiquetas adicionales del histograma
+    """
+    if not metricas.habilitado:
+        return
+    histograma.observar(valor, (
+        etiqueta_actual('endpoint'),
+        etiqueta_actual('sucursal'),
+        *(str(extra.get(nombre, '')) for nombre in histograma.etiquetas[2:])
+    ))
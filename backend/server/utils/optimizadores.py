@@ -0,0 +1,575 @@
+"""
+Optimizadores de Listas de Compras
+Backends alternativos al Temple Simulado que comparten su función de costo:
+una construcción voraz con búsqueda local, una búsqueda tabú y una
+ramificación y poda sobre un conjunto reducido de candidatos. Incluye el
+registro de optimizadores (con el algoritmo genético de
+utils/algoritmo_genetico.py y el temple paralelo de utils/temple_paralelo.py) y un selector por tamaño de inventario y latencia.
+"""
+
+import math
+import os
+import random
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.algoritmo_genetico import AlgoritmoGenetico
+from utils.algoritmos_busqueda import OptimizadorListas, TempleSimulado, limitar_a_topes
+from utils.costos import PENALIZACION_CATEGORIA, PESO_CATEGORIA, PESO_PRESUPUESTO
+from utils.indice_productos import IndiceProductos
+from utils.metricas import metricas
+from utils.temple_paralelo import TempleParalelo
+
+HIST_OPTIMIZACION_SEGUNDOS = metricas.histograma(
+    'optimizacion_segundos', 'Duración de cada optimización de una lista de compras',
+    etiquetas=('optimizador',)
+)
+
+# Optimizador usado cuando la petición no indica uno ('auto' usa el selector)
+OPTIMIZADOR_POR_DEFECTO = os.environ.get('OPTIMIZADOR', 'temple')
+
+# Latencia objetivo (ms) de una optimización cuando se usa 'auto'
+LATENCIA_OBJETIVO_MS = float(os.environ.get('LATENCIA_OBJETIVO_MS', 250))
+
+Lista = List[Tuple[Dict, int]]
+
+
+def _preparar(
+    inventario: List[Dict],
+    topes: Optional[Dict[int, int]],
+    indice: Optional[IndiceProductos]
+) -> Tuple[List[Dict], Optional[IndiceProductos]]:
+    """Descarta los productos sin stock y construye el índice si falta."""
+    if topes:
+        inventario = [p for p in inventario if topes.get(p['id'], 1) > 0]
+    if not inventario:
+        return inventario, None
+    return inventario, indice if indice is not None else IndiceProductos(inventario)
+
+
+class _Cesta:
+    """Lista de compras consolidada por producto, con su total."""
+
+    def __init__(self, lista: Lista = ()):
+        self.cantidades: Dict[int, Tuple[Dict, int]] = {}
+        self.total = 0.0
+        for producto, cantidad in lista:
+            self.sumar(producto, cantidad)
+
+    def sumar(self, producto: Dict, cantidad: int):
+        anterior = self.cantidades.get(producto['id'], (producto, 0))[1]
+        if anterior + cantidad > 0:
+            self.cantidades[producto['id']] = (producto, anterior + cantidad)
+        else:
+            self.cantidades.pop(producto['id'], None)
+        self.total += producto['precio'] * cantidad
+
+    def cantidad(self, producto_id: int) -> int:
+        return self.cantidades.get(producto_id, (None, 0))[1]
+
+    def lista(self) -> Lista:
+        return list(self.cantidades.values())
+
+    def con(self, cambios: List[Tuple[Dict, int]]) -> Lista:
+        """Lista resultante de aplicar cambios (producto, delta) sin modificar la cesta."""
+        cantidades = dict(self.cantidades)
+        for producto, delta in cambios:
+            nueva = cantidades.get(producto['id'], (producto, 0))[1] + delta
+            if nueva > 0:
+                cantidades[producto['id']] = (producto, nueva)
+            else:
+                cantidades.pop(producto['id'], None)
+        return list(cantidades.values())
+
+
+class VorazBusquedaLocal(OptimizadorListas):
+    """
+    Construcción voraz seguida de búsqueda local.
+
+    La construcción agrega en cada paso la unidad que más reduce el costo
+    entre unos pocos candidatos dirigidos (categorías preferidas que faltan,
+    precios cercanos a lo que falta del presupuesto y productos importantes).
+    La búsqueda local prueba subir, bajar y reemplazar cada producto hasta
+    que ningún movimiento mejora. Es determinista salvo por el muestreo de
+    productos importantes.
+    """
+
+    nombre = 'voraz'
+
+    def __init__(self, importantes_por_paso: int = 8, rondas_maximas: int = 100):
+        """
+        Args:
+            importantes_por_paso: Productos importantes muestreados como candidatos en cada paso
+            rondas_maximas: Límite de pasos de construcción y de mejora
+        """
+        self.importantes_por_paso = importantes_por_paso
+        self.rondas_maximas = rondas_maximas
+
+    def _admitir(self, cesta: _Cesta, topes: Optional[Dict[int, int]]):
+        if not topes:
+            return None
+        return lambda p: cesta.cantidad(p['id']) < topes.get(p['id'], cesta.cantidad(p['id']) + 1)
+
+    def _candidatos(
+        self,
+        cesta: _Cesta,
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        indice: IndiceProductos,
+        topes: Optional[Dict[int, int]],
+        rng
+    ) -> Iterator[Dict]:
+        admitir = self._admitir(cesta, topes)
+        faltante = presupuesto - cesta.total
+        presentes = {p['categoria'] for p, _ in cesta.cantidades.values()}
+        for categoria in categorias_preferidas:
+            if categoria not in presentes:
+                yield indice.mas_cercano(max(faltante, 0), categoria, False, admitir)
+        if faltante > 0:
+            for fraccion in (1, 2, 3):
+                yield indice.mas_cercano(faltante / fraccion, admitir=admitir)
+        k = min(self.importantes_por_paso, len(indice.importantes))
+        yield from rng.sample(indice.importantes, k)
+        for producto, _ in cesta.cantidades.values():
+            yield producto
+
+    def _construir(
+        self,
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        inventario: List[Dict],
+        indice: IndiceProductos,
+        topes: Optional[Dict[int, int]],
+        rng
+    ) -> Tuple[_Cesta, float]:
+        cesta = _Cesta()
+        costo = float('inf')
+        for _ in range(self.rondas_maximas):
+            mejor, mejor_costo = None, costo
+            vistos = set()
+            for producto in self._candidatos(
+                cesta, presupuesto, categorias_preferidas, indice, topes, rng
+            ):
+                if producto is None or producto['id'] in vistos:
+                    continue
+                vistos.add(producto['id'])
+                if topes and cesta.cantidad(producto['id']) >= topes.get(producto['id'], 1 << 30):
+                    continue
+                nuevo = self.calcular_costo(
+                    cesta.con([(producto, 1)]), presupuesto, categorias_preferidas, inventario
+                )
+                if nuevo < mejor_costo:
+                    mejor, mejor_costo = producto, nuevo
+            if mejor is None:
+                break
+            cesta.sumar(mejor, 1)
+            costo = mejor_costo
+        return cesta, costo
+
+    def _movimientos(
+        self,
+        cesta: _Cesta,
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        indice: IndiceProductos,
+        topes: Optional[Dict[int, int]]
+    ) -> Iterator[List[Tuple[Dict, int]]]:
+        faltante = presupuesto - cesta.total
+        presentes = {p['categoria'] for p, _ in cesta.cantidades.values()}
+        faltantes = [c for c in categorias_preferidas if c not in presentes]
+
+        def nuevo(unidades: int):
+            return lambda p: p['id'] not in cesta.cantidades and (
+                not topes or topes.get(p['id'], unidades) >= unidades
+            )
+
+        for producto, cantidad in list(cesta.cantidades.values()):
+            yield [(producto, -1)]
+            if not topes or cantidad < topes.get(producto['id'], cantidad + 1):
+                yield [(producto, 1)]
+
+            # Reemplazar todas las unidades por otro producto
+            objetivo = producto['precio'] + faltante / cantidad
+            for categoria in (producto['categoria'], None):
+                reemplazo = indice.mas_cercano(objetivo, categoria, False, nuevo(cantidad))
+                if reemplazo is not None:
+                    yield [(producto, -cantidad), (reemplazo, cantidad)]
+
+            # Cambiar una unidad por productos nuevos sin alejarse del
+            # presupuesto: uno de una categoría preferida que falta, o dos
+            # más baratos para ganar variedad
+            objetivo = producto['precio'] + faltante
+            for categoria in faltantes:
+                reemplazo = indice.mas_cercano(objetivo, categoria, False, nuevo(1))
+                if reemplazo is not None:
+                    yield [(producto, -1), (reemplazo, 1)]
+            mitad = indice.mas_cercano(objetivo / 2, admitir=nuevo(1))
+            if mitad is not None:
+                resto = indice.mas_cercano(
+                    objetivo - mitad['precio'], None, False,
+                    lambda p: p['id'] != mitad['id'] and nuevo(1)(p)
+                )
+                if resto is not None:
+                    yield [(producto, -1), (mitad, 1), (resto, 1)]
+
+    def optimizar(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> Lista:
+        categorias_preferidas = categorias_preferidas or []
+        rng = rng or random
+        inventario, indice = _preparar(inventario, topes, indice)
+        if indice is None:
+            return []
+
+        cesta, costo = self._construir(
+            presupuesto, categorias_preferidas, inventario, indice, topes, rng
+        )
+        return self._busqueda_local(cesta, costo, presupuesto, categorias_preferidas, inventario, indice, topes)
+
+    def mejorar(
+        self,
+        lista_compras: Lista,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None
+    ) -> Lista:
+        """
+        Aplica solo la búsqueda local a una lista existente (p. ej. una
+        plantilla escalada a otro presupuesto).
+
+        Args:
+            lista_compras: Lista de partida (debe respetar `topes`)
+            inventario: Productos disponibles
+            presupuesto: Presupuesto objetivo
+            categorias_preferidas: Categorías preferidas
+            topes: Unidades disponibles por producto (opcional)
+            indice: Índices precalculados del inventario (opcional)
+
+        Returns:
+            Lista consolidada en un óptimo local
+        """
+        categorias_preferidas = categorias_preferidas or []
+        inventario, indice = _preparar(inventario, topes, indice)
+        if indice is None:
+            return []
+        cesta = _Cesta(lista_compras)
+        costo = self.calcular_costo(cesta.lista(), presupuesto, categorias_preferidas, inventario)
+        return self._busqueda_local(cesta, costo, presupuesto, categorias_preferidas, inventario, indice, topes)
+
+    def _busqueda_local(
+        self,
+        cesta: _Cesta,
+        costo: float,
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        inventario: List[Dict],
+        indice: IndiceProductos,
+        topes: Optional[Dict[int, int]]
+    ) -> Lista:
+        # Búsqueda local de primera mejora
+        for _ in range(self.rondas_maximas):
+            mejoro = False
+            for cambios in self._movimientos(
+                cesta, presupuesto, categorias_preferidas, indice, topes
+            ):
+                nuevo = self.calcular_costo(
+                    cesta.con(cambios), presupuesto, categorias_preferidas, inventario
+                )
+                if nuevo < costo:
+                    for producto, delta in cambios:
+                        cesta.sumar(producto, delta)
+                    costo = nuevo
+                    mejoro = True
+                    break
+            if not mejoro:
+                break
+        return cesta.lista()
+
+
+class BusquedaTabu(OptimizadorListas):
+    """
+    Búsqueda tabú sobre los mismos vecinos que el temple.
+
+    En cada iteración evalúa varios vecinos y se mueve al mejor que no sea
+    tabú, aunque empeore. Los productos que cambiaron quedan prohibidos
+    durante `tenencia` iteraciones, salvo que el vecino mejore la mejor
+    solución conocida (criterio de aspiración).
+    """
+
+    nombre = 'tabu'
+
+    def __init__(self, iteraciones: int = 150, vecinos_por_iteracion: int = 20, tenencia: int = 7):
+        """
+        Args:
+            iteraciones: Número de movimientos
+            vecinos_por_iteracion: Vecinos evaluados en cada movimiento
+            tenencia: Iteraciones que un producto modificado permanece tabú
+        """
+        self.iteraciones = iteraciones
+        self.vecinos_por_iteracion = vecinos_por_iteracion
+        self.tenencia = tenencia
+
+    @staticmethod
+    def _cambiados(actual: Lista, vecino: Lista) -> set:
+        cantidades: Dict[int, int] = {}
+        for producto, cantidad in actual:
+            cantidades[producto['id']] = cantidades.get(producto['id'], 0) + cantidad
+        for producto, cantidad in vecino:
+            cantidades[producto['id']] = cantidades.get(producto['id'], 0) - cantidad
+        return {producto_id for producto_id, diferencia in cantidades.items() if diferencia}
+
+    def optimizar(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> Lista:
+        categorias_preferidas = categorias_preferidas or []
+        rng = rng or random
+        inventario, indice = _preparar(inventario, topes, indice)
+        if indice is None:
+            return []
+
+        actual = [
+            (producto, rng.randint(1, producto.get('cantidad_tipica', 1)))
+            for producto in islice(
+                (p for p in indice.por_importancia if not topes or topes.get(p['id'], 1) > 0), 3
+            )
+        ]
+        if topes:
+            actual = limitar_a_topes(actual, topes)
+        costo_actual = self.calcular_costo(actual, presupuesto, categorias_preferidas, inventario)
+        mejor, mejor_costo = actual, costo_actual
+        tabu: Dict[int, int] = {}
+
+        for iteracion in range(self.iteraciones):
+            elegido, costo_elegido, cambiados_elegido = None, float('inf'), set()
+            for _ in range(self.vecinos_por_iteracion):
+                vecino = self.generar_vecino(
+                    actual, inventario, presupuesto, indice, categorias_preferidas, rng
+                )
+                if topes:
+                    vecino = limitar_a_topes(vecino, topes)
+                costo = self.calcular_costo(vecino, presupuesto, categorias_preferidas, inventario)
+                if costo >= costo_elegido:
+                    continue
+                cambiados = self._cambiados(actual, vecino)
+                prohibido = any(tabu.get(producto_id, -1) > iteracion for producto_id in cambiados)
+                if prohibido and costo >= mejor_costo:
+                    continue
+                elegido, costo_elegido, cambiados_elegido = vecino, costo, cambiados
+
+            if elegido is None:
+                continue
+            actual, costo_actual = elegido, costo_elegido
+            for producto_id in cambiados_elegido:
+                tabu[producto_id] = iteracion + self.tenencia
+            if costo_actual < mejor_costo:
+                mejor, mejor_costo = actual, costo_actual
+        return mejor
+
+
+class RamificacionYPoda(OptimizadorListas):
+    """
+    Ramificación y poda exacta sobre un conjunto reducido de candidatos.
+
+    Los candidatos son los productos más importantes de cada categoría
+    preferida y del inventario, más algunos de precio cercano a fracciones
+    del presupuesto para poder ajustarlo. Cada candidato admite de 0 a 3
+    veces su cantidad típica. La cota inferior de un nodo combina la
+    diferencia de presupuesto inevitable y las categorías preferidas que ya
+    no pueden cubrirse; las demás penalizaciones no son negativas, así que
+    la poda es segura. Con `nodos_maximos` se limita la latencia y se
+    retorna la mejor lista encontrada.
+    """
+
+    nombre = 'ramificacion'
+
+    def __init__(self, candidatos: int = 12, nodos_maximos: int = 20000):
+        """
+        Args:
+            candidatos: Número máximo de productos candidatos
+            nodos_maximos: Nodos explorados antes de detener la búsqueda
+        """
+        self.candidatos = candidatos
+        self.nodos_maximos = nodos_maximos
+
+    def _elegir_candidatos(
+        self,
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        indice: IndiceProductos,
+        topes: Optional[Dict[int, int]]
+    ) -> List[Dict]:
+        def admitir(producto):
+            return producto['precio'] <= presupuesto and (
+                not topes or topes.get(producto['id'], 1) > 0
+            )
+
+        elegidos: Dict[int, Dict] = {}
+        for categoria in categorias_preferidas:
+            for producto in islice(
+                (p for p in indice.por_importancia if p['categoria'] == categoria and admitir(p)), 2
+            ):
+                elegidos.setdefault(producto['id'], producto)
+        # Productos para ajustar el total al presupuesto
+        for fraccion in (0.5, 0.25, 0.1, 0.03):
+            producto = indice.mas_cercano(presupuesto * fraccion, admitir=admitir)
+            if producto is not None:
+                elegidos.setdefault(producto['id'], producto)
+        for producto in indice.por_importancia:
+            if len(elegidos) >= self.candidatos:
+                break
+            if admitir(producto):
+                elegidos.setdefault(producto['id'], producto)
+        return list(elegidos.values())[:self.candidatos]
+
+    def optimizar(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> Lista:
+        categorias_preferidas = categorias_preferidas or []
+        inventario, indice = _preparar(inventario, topes, indice)
+        if indice is None:
+            return []
+
+        candidatos = sorted(
+            self._elegir_candidatos(presupuesto, categorias_preferidas, indice, topes),
+            key=lambda p: p['precio'], reverse=True
+        )
+        maximos = []
+        for producto in candidatos:
+            # Hasta 3 veces la cantidad típica, o lo necesario para que entre
+            # todos los candidatos puedan alcanzar el presupuesto
+            maximo = min(
+                max(3 * producto.get('cantidad_tipica', 1),
+                    math.ceil(presupuesto / (len(candidatos) * producto['precio']))),
+                int(presupuesto * 1.05 // producto['precio'])
+            )
+            if topes and producto['id'] in topes:
+                maximo = min(maximo, topes[producto['id']])
+            maximos.append(max(maximo, 0))
+
+        n = len(candidatos)
+        # Máximo total alcanzable y categorías disponibles desde cada profundidad
+        resto_maximo = [0.0] * (n + 1)
+        categorias_restantes = [set() for _ in range(n + 1)]
+        for i in range(n - 1, -1, -1):
+            resto_maximo[i] = resto_maximo[i + 1] + maximos[i] * candidatos[i]['precio']
+            categorias_restantes[i] = categorias_restantes[i + 1] | {candidatos[i]['categoria']}
+        preferidas = set(categorias_preferidas)
+
+        mejor: Lista = []
+        mejor_costo = float('inf')
+        nodos = 0
+        cantidades = [0] * n
+
+        def cota(profundidad: int, total: float, categorias: set) -> float:
+            if total > presupuesto:
+                diferencia = total - presupuesto
+            else:
+                diferencia = max(0.0, presupuesto - total - resto_maximo[profundidad])
+            inalcanzables = preferidas - categorias - categorias_restantes[profundidad]
+            return (
+                diferencia ** 2 * PESO_PRESUPUESTO
+                + len(inalcanzables) * PENALIZACION_CATEGORIA * PESO_CATEGORIA
+            )
+
+        def explorar(profundidad: int, total: float, categorias: set):
+            nonlocal mejor, mejor_costo, nodos
+            nodos += 1
+            if nodos > self.nodos_maximos or cota(profundidad, total, categorias) >= mejor_costo:
+                return
+            if profundidad == n:
+                lista = [(candidatos[i], c) for i, c in enumerate(cantidades) if c]
+                costo = self.calcular_costo(lista, presupuesto, categorias_preferidas, inventario)
+                if costo < mejor_costo:
+                    mejor, mejor_costo = lista, costo
+                return
+
+            producto = candidatos[profundidad]
+            precio = producto['precio']
+            # Primero la cantidad que más acerca el total al presupuesto
+            ideal = min(maximos[profundidad], max(0, int((presupuesto - total) // precio)))
+            for cantidad in sorted(range(maximos[profundidad] + 1), key=lambda c: abs(c - ideal)):
+                cantidades[profundidad] = cantidad
+                explorar(
+                    profundidad + 1, total + cantidad * precio,
+                    categorias | {producto['categoria']} if cantidad else categorias
+                )
+            cantidades[profundidad] = 0
+
+        explorar(0, 0.0, set())
+        return mejor
+
+
+# Nombre -> clase del optimizador
+OPTIMIZADORES = {
+    clase.nombre: clase
+    for clase in (
+        TempleSimulado, VorazBusquedaLocal, BusquedaTabu, RamificacionYPoda, AlgoritmoGenetico,
+        TempleParalelo
+    )
+}
+
+
+def crear_optimizador(nombre: str) -> OptimizadorListas:
+    """
+    Crea un optimizador registrado con sus parámetros por defecto.
+
+    Args:
+        nombre: 'temple', 'voraz', 'tabu', 'ramificacion', 'genetico' o 'temple_paralelo'
+
+    Returns:
+        Instancia del optimizador
+
+    Raises:
+        ValueError: Si el nombre no está registrado
+    """
+    clase = OPTIMIZADORES.get(nombre)
+    if clase is None:
+        raise ValueError(
+            f"Optimizador desconocido: {nombre!r} (disponibles: {', '.join(OPTIMIZADORES)}, auto)"
+        )
+    return clase()
+
+
+def seleccionar_optimizador(productos: int, latencia_ms: Optional[float] = None) -> str:
+    """
+    Elige un optimizador según el tamaño del inventario y la latencia objetivo
+    de una optimización. Los umbrales salen de benchmarks/comparar_optimizadores.py:
+    la construcción voraz tarda ~1 ms, la ramificación y poda da el menor
+    costo en catálogos grandes en ~30 ms y, en catálogos pequeños, la tabú
+    (~40 ms) y el temple (~150-350 ms) toleran mejor los presupuestos altos.
+
+    Args:
+        productos: Productos del inventario
+        latencia_ms: Latencia objetivo en milisegundos (por defecto LATENCIA_OBJETIVO_MS)
+
+    Returns:
+        Nombre del optimizador
+    """
+    latencia_ms = LATENCIA_OBJETIVO_MS if latencia_ms is None else latencia_ms
+    if latencia_ms < 10:
+        return 'voraz'
+    if productos < 500:
+        if latencia_ms >= 400:
+            return 'temple'
+        return 'tabu' if latencia_ms >= 60 else 'voraz'
+    return 'ramificacion' if latencia_ms >= 40 else 'voraz'
@@ -0,0 +1,200 @@
+"""
+Planificador Incremental (D* Lite)
+Búsqueda hacia un objetivo fijo que conserva su estado entre consultas. Cada
+instancia mantiene, sobre la grilla compilada del mapa, el costo estimado
+desde cada celda hasta el objetivo (g) y su valor de un paso (rhs), como en
+LPA*. Cuando el mapa cambia solo se corrigen las celdas afectadas, y cuando
+cambia el punto de partida (otro comprador, o el mismo más adelante en su
+ruta) se reutiliza todo lo ya calculado.
+
+Como la búsqueda parte del objetivo, una misma instancia sirve para todos los
+compradores que van hacia la misma celda (p. ej. la caja).
+
+Referencia: Koenig y Likhachev, "D* Lite" (AAAI 2002).
+"""
+
+import heapq
+from array import array
+from typing import Iterable, List, Set, Tuple
+
+from utils.grilla_ponderada import DIRECCIONES, INFINITO, GrillaPonderada
+
+
+class BusquedaIncremental:
+    """
+    D* Lite hacia `objetivo` sobre una GrillaPonderada.
+
+    Las claves de la cola son (min(g, rhs) + h + km, min(g, rhs)); `km`
+    acumula la heurística entre los sucesivos puntos de partida para no
+    reordenar la cola cuando el punto de partida cambia. La heurística es
+    la distancia Manhattan, válida también después de que cambien los
+    obstáculos.
+    """
+
+    def __init__(self, grilla: GrillaPonderada, objetivo: Tuple[int, int]):
+        """
+        Args:
+            grilla: Grilla compilada del mapa
+            objetivo: Posición objetivo (fila, columna)
+
+        Raises:
+            ValueError: Si el objetivo no es una celda transitable
+        """
+        if not grilla.es_valida(objetivo):
+            raise ValueError(f"Posición de objetivo inválida: {objetivo}")
+        self.grilla = grilla
+        self.objetivo = objetivo
+        self.celda_objetivo = grilla.celda(objetivo)
+        self.g = array('d', [INFINITO]) * grilla.celdas
+        self.rhs = array('d', [INFINITO]) * grilla.celdas
+        self.rhs[self.celda_objetivo] = 0.0
+        self.km = 0.0
+        self._ultimo_inicio = None
+        # Cola con borrado diferido: `_en_cola` guarda la clave vigente de cada celda
+        self._cola: List[Tuple[float, float, int]] = []
+        self._en_cola = {}
+        self.nodos_expandidos = 0
+        self._encolar(self.celda_objetivo, (self._h(self.celda_objetivo, self.celda_objetivo), 0.0))
+
+    def _h(self, desde: int, hacia: int) -> float:
+        columnas = self.grilla.columnas
+        fila_a, columna_a = divmod(desde, columnas)
+        fila_b, columna_b = divmod(hacia, columnas)
+        return (abs(fila_a - fila_b) + abs(columna_a - columna_b)) * self.grilla.costo_minimo
+
+    def _clave(self, celda: int, inicio: int) -> Tuple[float, float]:
+        minimo = min(self.g[celda], self.rhs[celda])
+        return (minimo + self._h(inicio, celda) + self.km, minimo)
+
+    def _encolar(self, celda: int, clave: Tuple[float, float]):
+        self._en_cola[celda] = clave
+        heapq.heappush(self._cola, (clave[0], clave[1], celda))
+
+    def _tope(self) -> Tuple[float, float, int]:
+        """Entrada vigente de menor clave (descarta las obsoletas)."""
+        cola = self._cola
+        while cola:
+            k1, k2, celda = cola[0]
+            if self._en_cola.get(celda) == (k1, k2):
+                return cola[0]
+            heapq.heappop(cola)
+        return (INFINITO, INFINITO, -1)
+
+    def _predecesores(self, celda: int) -> Iterable[int]:
+        """Celdas desde las que se puede entrar a `celda` en un movimiento."""
+        grilla = self.grilla
+        adyacencia = grilla.adyacencia
+        for desplazamiento in grilla.desplazamientos:
+            vecino = celda - desplazamiento
+            if 0 <= vecino < grilla.celdas:
+                for siguiente, _ in adyacencia[vecino]:
+                    if siguiente == celda:
+                        yield vecino
+                        break
+
+    def _actualizar_vertice(self, celda: int, inicio: int):
+        if celda != self.celda_objetivo:
+            g = self.g
+            mejor = INFINITO
+            for vecino, costo in self.grilla.adyacencia[celda]:
+                if costo + g[vecino] < mejor:
+                    mejor = costo + g[vecino]
+            self.rhs[celda] = mejor
+        if self.g[celda] != self.rhs[celda]:
+            self._encolar(celda, self._clave(celda, inicio))
+        else:
+            self._en_cola.pop(celda, None)
+
+    def _calcular(self, inicio: int):
+        """Expande celdas hasta que el costo de `inicio` es consistente."""
+        g, rhs = self.g, self.rhs
+        while True:
+            k1, k2, celda = self._tope()
+            if not ((k1, k2) < self._clave(inicio, inicio) or rhs[inicio] != g[inicio]):
+                return
+            if celda < 0:
+                return
+            heapq.heappop(self._cola)
+            clave_nueva = self._clave(celda, inicio)
+            if (k1, k2) < clave_nueva:
+                self._encolar(celda, clave_nueva)
+                continue
+            del self._en_cola[celda]
+            self.nodos_expandidos += 1
+            if g[celda] > rhs[celda]:
+                g[celda] = rhs[celda]
+                for predecesor in self._predecesores(celda):
+                    self._actualizar_vertice(predecesor, inicio)
+            else:
+                g[celda] = INFINITO
+                self._actualizar_vertice(celda, inicio)
+                for predecesor in self._predecesores(celda):
+                    self._actualizar_vertice(predecesor, inicio)
+
+    def actualizar_grilla(self, grilla: GrillaPonderada, cambiadas: Iterable[Tuple[int, int]]):
+        """
+        Pasa a la grilla del mapa modificado y marca como inconsistentes las
+        celdas afectadas. El recálculo ocurre en la próxima consulta.
+
+        Args:
+            grilla: Grilla compilada del mapa nuevo (mismas dimensiones)
+            cambiadas: Posiciones que pasaron a ser obstáculo o dejaron de serlo
+
+        Raises:
+            ValueError: Si las dimensiones cambian o el objetivo queda bloqueado
+        """
+        if grilla.celdas != self.grilla.celdas or grilla.columnas != self.grilla.columnas:
+            raise ValueError("La grilla nueva no tiene las mismas dimensiones")
+        if not grilla.es_valida(self.objetivo):
+            raise ValueError(f"El objetivo {self.objetivo} quedó bloqueado")
+        self.grilla = grilla
+        inicio = self._ultimo_inicio if self._ultimo_inicio is not None else self.celda_objetivo
+
+        afectadas: Set[int] = set()
+        for posicion in cambiadas:
+            if not grilla.dentro(posicion):
+                continue
+            celda = grilla.celda(posicion)
+            afectadas.add(celda)
+            # Vecinos que podían entrar a la celda o que ahora pueden hacerlo
+            fila, columna = posicion
+            for _, df, dc in DIRECCIONES:
+                if grilla.dentro((fila + df, columna + dc)):
+                    afectadas.add(celda + df * grilla.columnas + dc)
+        for celda in afectadas:
+            self._actualizar_vertice(celda, inicio)
+
+    def buscar_ruta(self, inicio: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """
+        Ruta de menor costo desde `inicio` hasta el objetivo.
+
+        Args:
+            inicio: Posición de partida (fila, columna)
+
+        Returns:
+            Lista de posiciones desde inicio hasta el objetivo
+
+        Raises:
+            ValueError: Si inicio no es válido o no existe ruta
+        """
+        grilla = self.grilla
+        if not grilla.es_valida(inicio):
+            raise ValueError(f"Posición de inicio inválida: {inicio}")
+        celda = grilla.celda(inicio)
+        if self._ultimo_inicio is not None and self._ultimo_inicio != celda:
+            self.km += self._h(self._ultimo_inicio, celda)
+        self._ultimo_inicio = celda
+        self._calcular(celda)
+
+        g = self.g
+        if g[celda] == INFINITO:
+            raise ValueError(f"No existe ruta desde {inicio} hasta {self.objetivo}")
+        # Bajar por el gradiente de g: cada paso va al sucesor de menor costo restante
+        ruta = [inicio]
+        adyacencia = grilla.adyacencia
+        while celda != self.celda_objetivo:
+            celda = min(adyacencia[celda], key=lambda par: par[1] + g[par[0]])[0]
+            ruta.append(grilla.posicion(celda))
+            if len(ruta) > grilla.celdas:
+                raise ValueError(f"No existe ruta desde {inicio} hasta {self.objetivo}")
+        return ruta
@@ -0,0 +1,201 @@
+"""
+Plantillas de Canasta Precalculadas
+Los presupuestos se concentran en pocos valores (50, 100, 150, 200, 300,
+500 Bs.). Un trabajo en segundo plano resuelve por sucursal una grilla de
+presupuestos por los conjuntos de categorías más pedidos con un optimizador
+de alto esfuerzo, y guarda las listas en una tabla compacta. Al atender una
+solicitud se parte de la plantilla del presupuesto más cercano, se escala y
+se repara con una búsqueda local corta; solo las solicitudes fuera de la
+grilla pasan por la optimización completa.
+"""
+
+import os
+import random
+from array import array
+from bisect import bisect_left, insort
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from utils.indice_productos import IndiceProductos
+from utils.registro import obtener_logger
+
+registro = obtener_logger('plantillas')
+
+# Precalcular plantillas al construir cada agente (1 = activado)
+PRECALCULAR_PLANTILLAS = os.environ.get('PRECALCULAR_PLANTILLAS', '0') == '1'
+
+# Grilla de presupuestos de las plantillas
+PRESUPUESTOS_PLANTILLA = tuple(
+    float(valor) for valor in os.environ.get(
+        'PRESUPUESTOS_PLANTILLA', '50,75,100,125,150,175,200,250,300,350,400,450,500'
+    ).split(',')
+)
+
+# Conjuntos de categorías con plantilla (el vacío y los más pedidos)
+CONJUNTOS_PLANTILLA = int(os.environ.get('CONJUNTOS_PLANTILLA', 6))
+
+# Solicitudes de un conjunto de categorías sin plantilla que disparan un nuevo precálculo
+PEDIDOS_PARA_PLANTILLA = 10
+
+# Distancia relativa máxima entre el presupuesto pedido y el de la plantilla
+DISTANCIA_PLANTILLA = 0.1
+
+# Procesos trabajadores para las réplicas del precálculo (0 = en el hilo de plantillas)
+PROCESOS_PLANTILLAS = int(os.environ.get('PROCESOS_PLANTILLAS', 0))
+
+# Un solo hilo para todas las sucursales. En el proceso del servidor el
+# precálculo ocupa CPU y retiene el GIL, así que compite con las peticiones;
+# con PROCESOS_PLANTILLAS > 0 la optimización corre en los procesos
+# trabajadores y el hilo solo espera sus resultados y repara las listas
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plantillas')
+
+
+class TablaPlantillas:
+    """
+    Listas precalculadas de una versión del inventario, por conjunto de
+    categorías y presupuesto. Cada lista se guarda como dos arreglos (ids y
+    cantidades).
+    """
+
+    def __init__(self, version: Hashable):
+        """
+        Args:
+            version: Versión del inventario con que se calcularon
+        """
+        self.version = version
+        self._presupuestos: Dict[FrozenSet[str], List[float]] = {}
+        self._listas: Dict[Tuple[FrozenSet[str], float], Tuple[array, array]] = {}
+
+    def __len__(self) -> int:
+        return len(self._listas)
+
+    def conjuntos(self) -> List[FrozenSet[str]]:
+        """Conjuntos de categorías con plantillas."""
+        return list(self._presupuestos)
+
+    def agregar(
+        self,
+        categorias: Iterable[str],
+        presupuesto: float,
+        lista_compras: List[Tuple[Dict, int]]
+    ):
+        """
+        Guarda la lista de un conjunto de categorías y presupuesto.
+
+        Args:
+            categorias: Categorías preferidas
+            presupuesto: Presupuesto de la plantilla
+            lista_compras: Lista de tuplas (producto, cantidad)
+        """
+        conjunto = frozenset(categorias)
+        clave = (conjunto, presupuesto)
+        if clave not in self._listas:
+            insort(self._presupuestos.setdefault(conjunto, []), presupuesto)
+        self._listas[clave] = (
+            array('q', (producto['id'] for producto, _ in lista_compras)),
+            array('H', (cantidad for _, cantidad in lista_compras))
+        )
+
+    def copiar(self, otra: 'TablaPlantillas', categorias: Iterable[str], presupuesto: float) -> bool:
+        """Copia la plantilla de `otra` para la misma celda, si existe."""
+        clave = (frozenset(categorias), presupuesto)
+        if clave not in otra._listas:
+            return False
+        if clave not in self._listas:
+            insort(self._presupuestos.setdefault(clave[0], []), presupuesto)
+        self._listas[clave] = otra._listas[clave]
+        return True
+
+    def mas_cercana(
+        self,
+        categorias: Iterable[str],
+        presupuesto: float,
+        distancia_maxima: float = DISTANCIA_PLANTILLA
+    ) -> Optional[Tuple[float, List[Tuple[int, int]]]]:
+        """
+        Plantilla del presupuesto más cercano con el mismo conjunto de categorías.
+
+        Args:
+            categorias: Categorías preferidas de la solicitud
+            presupuesto: Presupuesto pedido
+            distancia_maxima: Distancia relativa máxima al presupuesto de la plantilla
+
+        Returns:
+            (presupuesto de la plantilla, [(id, cantidad), ...]) o None si la
+            solicitud queda fuera de la grilla
+        """
+        conjunto = frozenset(categorias)
+        presupuestos = self._presupuestos.get(conjunto)
+        if not presupuestos:
+            return None
+        posicion = bisect_left(presupuestos, presupuesto)
+        cercano = min(
+            presupuestos[max(posicion - 1, 0):posicion + 1], key=lambda p: abs(p - presupuesto)
+        )
+        if abs(cercano - presupuesto) > presupuesto * distancia_maxima:
+            return None
+        ids, cantidades = self._listas[(conjunto, cercano)]
+        return cercano, list(zip(ids, cantidades))
+
+
+def precalcular(
+    inventario: List[Dict],
+    indice: IndiceProductos,
+    version: Hashable,
+    conjuntos: List[List[str]],
+    optimizador,
+    presupuestos: Iterable[float] = PRESUPUESTOS_PLANTILLA,
+    semilla: int = 0,
+    reparador=None,
+    continuar: Callable[[], bool] = lambda: True,
+    base: Optional[TablaPlantillas] = None
+) -> TablaPlantillas:
+    """
+    Resuelve la grilla de presupuestos por conjuntos de categorías.
+
+    Las plantillas no consideran el stock: se recortan al reparar cada
+    solicitud. Cada celda usa un generador sembrado con la semilla, el
+    presupuesto y las categorías, así que la tabla es reproducible.
+
+    Args:
+        inventario: Productos de la sucursal
+        indice: Índices de `inventario`
+        version: Versión del inventario
+        conjuntos: Conjuntos de categorías
+        optimizador: Optimizador de alto esfuerzo (p. ej. TempleParalelo)
+        presupuestos: Grilla de presupuestos
+        semilla: Semilla base
+        reparador: Optimizador con `mejorar` para pulir cada plantilla (opcional)
+        continuar: Se consulta entre celdas; si retorna False se detiene el cálculo
+        base: Tabla anterior de la misma versión cuyas celdas se reutilizan (opcional)
+
+    Returns:
+        Tabla de plantillas (parcial si se detuvo)
+    """
+    tabla = TablaPlantillas(version)
+    for categorias in conjuntos:
+        categorias = sorted(categorias)
+        for presupuesto in presupuestos:
+            if not continuar():
+                return tabla
+            if base is not None and base.version == version and tabla.copiar(
+                base, categorias, presupuesto
+            ):
+                continue
+            rng = random.Random(f"{semilla}:{presupuesto:g}:{','.join(categorias)}")
+            lista = optimizador.optimizar(inventario, presupuesto, categorias, None, indice, rng)
+            if reparador is not None:
+                lista = reparador.mejorar(lista, inventario, presupuesto, categorias, None, indice)
+            if lista:
+                tabla.agregar(categorias, presupuesto, lista)
+    return tabla
+
+
+def programar(tarea: Callable[[], None]) -> Future:
+    """Encola una tarea de precálculo en el hilo de plantillas."""
+    def ejecutar():
+        try:
+            tarea()
+        except Exception:
+            registro.exception("Error al precalcular plantillas")
+    return _ejecutor.submit(ejecutar)
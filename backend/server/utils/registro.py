@@ -0,0 +1,214 @@
+"""
+Registro (logging) del Sistema Multi-Agente
+Configura loggers con niveles, contexto por agente, manejadores asíncronos
+basados en cola y muestreo de eventos de alta frecuencia.
+"""
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Optional
+
+RAIZ = 'supermercado'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_candado_configuracion = threading.Lock()
+
+
+class AdaptadorAgente(logging.LoggerAdapter):
+    """
+    Adaptador que agrega el contexto de un agente (sucursal, comprador, ...)
+    a cada registro emitido.
+    """
+
+    def process(self, msg, kwargs):
+        extra = kwargs.get('extra')
+        if extra:
+            contexto = dict(self.extra)
+            contexto.update(extra.get('contexto', {}))
+            kwargs['extra'] = {**extra, 'contexto': contexto}
+        else:
+            kwargs['extra'] = {'contexto': self.extra}
+        return msg, kwargs
+
+
+def obtener_logger(nombre: str, **contexto) -> logging.LoggerAdapter:
+    """
+    Retorna un logger del sistema con contexto fijo.
+
+    Args:
+        nombre: Nombre del componente (p. ej. 'comprador')
+        **contexto: Campos agregados a cada registro (p. ej. comprador_id='COMP001')
+
+    Returns:
+        Adaptador de logging con el contexto indicado
+    """
+    return AdaptadorAgente(logging.getLogger(f'{RAIZ}.{nombre}'), contexto)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Deja pasar solo uno de cada N registros de los eventos de alta frecuencia.
+
+    Los registros se identifican por el atributo `evento` (pasado con
+    `extra={'evento': '...'}`); los que no lo tienen o cuyo evento no está
+    configurado pasan siempre.
+    """
+
+    def __init__(self, periodos: Dict[str, int]):
+        """
+        Args:
+            periodos: Evento -> se registra 1 de cada `periodo` ocurrencias
+        """
+        super().__init__()
+        self.periodos = periodos
+        self._contadores = {evento: itertools.count() for evento in periodos}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        evento = getattr(record, 'evento', None)
+        periodo = self.periodos.get(evento)
+        if not periodo or periodo <= 1:
+            return True
+        return next(self._contadores[evento]) % periodo == 0
+
+
+class FormateadorTexto(logging.Formatter):
+    """Formato legible: hora, nivel, componente, contexto y mensaje."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s%(contexto_texto)s %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        contexto = getattr(record, 'contexto', None)
+        if contexto:
+            record.contexto_texto = ' [' + ' '.join(f'{k}={v}' for k, v in contexto.items()) + ']'
+        else:
+            record.contexto_texto = ''
+        return super().format(record)
+
+
+class FormateadorJSON(logging.Formatter):
+    """Formato estructurado: un objeto JSON por línea."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'ts': self.formatTime(record),
+            'nivel': record.levelname,
+            'componente': record.name,
+            'mensaje': record.getMessage(),
+        }
+        contexto = getattr(record, 'contexto', None)
+        if contexto:
+            datos.update(contexto)
+        evento = getattr(record, 'evento', None)
+        if evento:
+            datos['evento'] = evento
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Registros que pasaron por la cola: la traza ya viene formateada
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que conserva la traza de las excepciones.
+
+    El `prepare` de la librería estándar pega la traza al mensaje y descarta
+    `exc_info`, así que el formateador JSON no podía emitir `excepcion`. Aquí
+    el mensaje queda resuelto y la traza se guarda formateada en `exc_text`
+    (que los formateadores usan cuando no hay `exc_info`).
+    """
+
+    _formateador_excepciones = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        registro = copy.copy(record)
+        registro.message = record.getMessage()
+        registro.msg = registro.message
+        registro.args = None
+        if record.exc_info and not registro.exc_text:
+            registro.exc_text = self._formateador_excepciones.formatException(record.exc_info)
+        # La traza mantiene vivos los frames; no se envía al hilo de escritura
+        registro.exc_info = None
+        return registro
+
+
+# Periodos de muestreo por defecto para eventos que se repiten en cada petición
+MUESTREO_POR_DEFECTO = {
+    'websocket_conexion': 100,
+    'producto_sin_zona': 20,
+    'objetivo_inalcanzable': 20,
+}
+
+
+def configurar_registro(
+    nivel: Optional[str] = None,
+    formato: Optional[str] = None,
+    asincrono: bool = True,
+    muestreo: Optional[Dict[str, int]] = None,
+    destino=None
+):
+    """
+    Configura el logger raíz del sistema.
+
+    El manejador de salida se ejecuta en un hilo aparte (QueueHandler +
+    QueueListener), de modo que los agentes no bloquean escribiendo en stdout.
+    Puede llamarse más de una vez; cada llamada reemplaza la configuración.
+
+    Args:
+        nivel: Nivel mínimo ('DEBUG', 'INFO', ...). Por defecto $LOG_NIVEL o INFO
+        formato: 'texto' o 'json'. Por defecto $LOG_FORMATO o texto
+        asincrono: Si True, escribe a través de una cola en un hilo aparte
+        muestreo: Periodos de muestreo por evento (ver FiltroMuestreo)
+        destino: Flujo de salida (por defecto sys.stderr)
+    """
+    global _listener
+
+    nivel = (nivel or os.environ.get('LOG_NIVEL', 'INFO')).upper()
+    formato = formato or os.environ.get('LOG_FORMATO', 'texto')
+
+    manejador_salida = logging.StreamHandler(destino or sys.stderr)
+    manejador_salida.setFormatter(FormateadorJSON() if formato == 'json' else FormateadorTexto())
+
+    with _candado_configuracion:
+        detener_registro()
+
+        raiz = logging.getLogger(RAIZ)
+        for manejador in list(raiz.handlers):
+            raiz.removeHandler(manejador)
+        raiz.setLevel(nivel)
+        raiz.propagate = False
+
+        filtro = FiltroMuestreo(MUESTREO_POR_DEFECTO if muestreo is None else muestreo)
+
+        if asincrono:
+            cola = queue.SimpleQueue()
+            manejador_cola = ManejadorCola(cola)
+            manejador_cola.addFilter(filtro)
+            raiz.addHandler(manejador_cola)
+            _listener = logging.handlers.QueueListener(cola, manejador_salida)
+            _listener.start()
+        else:
+            manejador_salida.addFilter(filtro)
+            raiz.addHandler(manejador_salida)
+
+
+def detener_registro():
+    """Vacía la cola y detiene el hilo de escritura, si existe."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(detener_registro)
@@ -0,0 +1,273 @@
+"""
+Temple Paralelo (intercambio de réplicas)
+Varias réplicas del temple recorren el espacio de listas a temperaturas
+fijas, de una escala geométrica entre la mínima y la máxima. Cada cierto
+número de pasos se intenta intercambiar el estado de réplicas vecinas con
+el criterio de Metropolis, de modo que las listas atascadas en un valle
+(p. ej. pocos productos caros que ya cumplen el presupuesto) pueden subir a
+temperaturas altas, salir y volver a bajar.
+
+Las réplicas pueden repartirse en los procesos trabajadores compartidos (ver
+trabajadores); cada proceso conserva el índice del inventario entre
+ejecuciones y en cada ronda solo viajan los estados (id de producto,
+cantidad). Las semillas de cada ronda se derivan del
+generador de la ejecución, así que el resultado es el mismo con o sin
+procesos.
+"""
+
+import math
+import os
+import random
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from utils.algoritmos_busqueda import OptimizadorListas, limitar_a_topes
+from utils.indice_productos import IndiceProductos
+from utils.metricas import metricas, observar
+from utils.trabajadores import mapear
+
+HIST_TASA_INTERCAMBIO = metricas.histograma(
+    'temple_paralelo_tasa_intercambio',
+    'Fracción de intercambios aceptados por par de réplicas y ejecución',
+    (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+    etiquetas=('par',)
+)
+
+# Procesos usados por defecto para las réplicas (0 = en el proceso actual)
+PROCESOS_TEMPLE_PARALELO = int(os.environ.get('PROCESOS_TEMPLE_PARALELO', 0))
+
+# Estado transportable entre procesos: [(id de producto, cantidad), ...]
+Estado = List[Tuple[int, int]]
+
+
+class _Contexto:
+    """Datos de una ejecución compartidos por todas las réplicas."""
+
+    def __init__(
+        self,
+        optimizador: 'TempleParalelo',
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str],
+        topes: Optional[Dict[int, int]],
+        indice: IndiceProductos
+    ):
+        self.optimizador = optimizador
+        self.inventario = inventario
+        self.presupuesto = presupuesto
+        self.categorias_preferidas = categorias_preferidas
+        self.topes = topes
+        self.indice = indice
+        self.por_id = indice.por_id
+
+    def lista(self, estado: Estado) -> List[Tuple[Dict, int]]:
+        return [(self.por_id[producto_id], cantidad) for producto_id, cantidad in estado]
+
+    def costo(self, lista: List[Tuple[Dict, int]]) -> float:
+        return self.optimizador.calcular_costo(
+            lista, self.presupuesto, self.categorias_preferidas, self.inventario
+        )
+
+
+def _recorrer(
+    contexto: _Contexto,
+    estado: Estado,
+    temperatura: float,
+    pasos: int,
+    semilla: int
+) -> Tuple[Estado, float, Estado, float, int]:
+    """
+    Avanza una réplica `pasos` iteraciones de Metropolis a temperatura fija.
+
+    Returns:
+        (estado, costo, mejor estado, mejor costo, aceptaciones)
+    """
+    optimizador = contexto.optimizador
+    rng = random.Random(semilla)
+    actual = contexto.lista(estado)
+    costo_actual = contexto.costo(actual)
+    mejor, mejor_costo = actual, costo_actual
+    aceptaciones = 0
+
+    for _ in range(pasos):
+        vecino = optimizador.generar_vecino(
+            actual, contexto.inventario, contexto.presupuesto,
+            contexto.indice, contexto.categorias_preferidas, rng
+        )
+        if contexto.topes:
+            vecino = limitar_a_topes(vecino, contexto.topes)
+        costo_vecino = contexto.costo(vecino)
+        delta = costo_vecino - costo_actual
+        if delta < 0 or rng.random() < math.exp(-delta / temperatura):
+            actual, costo_actual = vecino, costo_vecino
+            aceptaciones += 1
+            if costo_actual < mejor_costo:
+                mejor, mejor_costo = actual, costo_actual
+
+    def ids(lista):
+        return [(producto['id'], cantidad) for producto, cantidad in lista]
+    return ids(actual), costo_actual, ids(mejor), mejor_costo, aceptaciones
+
+
+def _recorrer_en_trabajador(indice: IndiceProductos, argumentos):
+    optimizador, presupuesto, categorias_preferidas, topes, *trabajo = argumentos
+    contexto = _Contexto(
+        optimizador, indice.productos, presupuesto, categorias_preferidas, topes, indice
+    )
+    return _recorrer(contexto, *trabajo)
+
+
+class TempleParalelo(OptimizadorListas):
+    """
+    Temple con intercambio de réplicas a temperaturas fijas.
+    """
+
+    nombre = 'temple_paralelo'
+
+    def __init__(
+        self,
+        replicas: int = 6,
+        temperatura_minima: float = 1.0,
+        temperatura_maxima: float = 1000.0,
+        pasos_por_replica: int = 2250,
+        pasos_entre_intercambios: int = 50,
+        procesos: Optional[int] = None
+    ):
+        """
+        Args:
+            replicas: Número de réplicas (y de temperaturas)
+            temperatura_minima: Temperatura de la réplica más fría
+            temperatura_maxima: Temperatura de la réplica más caliente
+            pasos_por_replica: Iteraciones de cada réplica; con los valores por
+                defecto el total coincide con una ejecución del temple
+            pasos_entre_intercambios: Iteraciones entre intentos de intercambio
+            procesos: Procesos para las réplicas (por defecto
+                PROCESOS_TEMPLE_PARALELO; 0 = sin procesos)
+        """
+        self.replicas = replicas
+        self.pasos_por_replica = pasos_por_replica
+        self.pasos_entre_intercambios = pasos_entre_intercambios
+        self.procesos = PROCESOS_TEMPLE_PARALELO if procesos is None else procesos
+        if replicas > 1:
+            razon = (temperatura_maxima / temperatura_minima) ** (1 / (replicas - 1))
+            self.temperaturas = [temperatura_minima * razon ** i for i in range(replicas)]
+        else:
+            self.temperaturas = [temperatura_minima]
+
+    def optimizar(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> List[Tuple[Dict, int]]:
+        lista, _ = self.optimizar_con_estadisticas(
+            inventario, presupuesto, categorias_preferidas, topes, indice, rng
+        )
+        return lista
+
+    def optimizar_con_estadisticas(
+        self,
+        inventario: List[Dict],
+        presupuesto: float,
+        categorias_preferidas: List[str] = None,
+        topes: Optional[Dict[int, int]] = None,
+        indice: Optional[IndiceProductos] = None,
+        rng: Optional[random.Random] = None
+    ) -> Tuple[List[Tuple[Dict, int]], Dict]:
+        """
+        Ejecuta el temple paralelo y reporta los intercambios entre réplicas.
+
+        Args:
+            (los mismos que `optimizar`)
+
+        Returns:
+            (lista de compras, estadísticas). Las estadísticas incluyen las
+            temperaturas, los intentos y aceptaciones de cada par de réplicas
+            vecinas, su tasa de aceptación y el costo final de cada réplica.
+        """
+        categorias_preferidas = categorias_preferidas or []
+        rng = rng or random
+        if topes:
+            inventario = [p for p in inventario if topes.get(p['id'], 1) > 0]
+        if not inventario:
+            return [], {}
+        if indice is None:
+            indice = IndiceProductos(inventario)
+
+        contexto = _Contexto(self, inventario, presupuesto, categorias_preferidas, topes, indice)
+        importantes = list(islice(
+            (p for p in indice.por_importancia if not topes or topes.get(p['id'], 1) > 0), 5
+        ))
+        estados: List[Estado] = []
+        for _ in self.temperaturas:
+            estado = [
+                (p, rng.randint(1, p.get('cantidad_tipica', 1)))
+                for p in importantes if rng.random() > 0.5
+            ]
+            if topes:
+                estado = limitar_a_topes(estado, topes)
+            estados.append([(p['id'], cantidad) for p, cantidad in estado])
+        costos = [contexto.costo(contexto.lista(estado)) for estado in estados]
+        mejor, mejor_costo = min(zip(estados, costos), key=lambda par: par[1])
+
+        pares = len(self.temperaturas) - 1
+        intentos = [0] * pares
+        aceptados = [0] * pares
+        aceptaciones = 0
+
+        en_procesos = self.procesos > 0 and self.replicas > 1
+        restantes = self.pasos_por_replica
+        ronda = 0
+        while restantes > 0:
+            pasos = min(self.pasos_entre_intercambios, restantes)
+            restantes -= pasos
+            trabajos = [
+                (estado, temperatura, pasos, rng.getrandbits(32))
+                for estado, temperatura in zip(estados, self.temperaturas)
+            ]
+            if en_procesos:
+                resultados = mapear(self.procesos, indice, _recorrer_en_trabajador, [
+                    (self, presupuesto, categorias_preferidas, topes, *trabajo) for trabajo in trabajos
+                ])
+            else:
+                resultados = [_recorrer(contexto, *trabajo) for trabajo in trabajos]
+
+            estados = [resultado[0] for resultado in resultados]
+            costos = [resultado[1] for resultado in resultados]
+            for _, _, mejor_replica, costo_replica, aceptadas in resultados:
+                aceptaciones += aceptadas
+                if costo_replica < mejor_costo:
+                    mejor, mejor_costo = mejor_replica, costo_replica
+
+            # Intercambios entre vecinas, alternando pares pares e impares
+            for i in range(ronda % 2, pares, 2):
+                intentos[i] += 1
+                if self._aceptar_intercambio(i, costos, rng):
+                    aceptados[i] += 1
+                    estados[i], estados[i + 1] = estados[i + 1], estados[i]
+                    costos[i], costos[i + 1] = costos[i + 1], costos[i]
+            ronda += 1
+
+        tasas = [a / n if n else 0.0 for a, n in zip(aceptados, intentos)]
+        for i, tasa in enumerate(tasas):
+            observar(HIST_TASA_INTERCAMBIO, tasa, par=f'{i}-{i + 1}')
+        estadisticas = {
+            'temperaturas': [round(t, 3) for t in self.temperaturas],
+            'intentos': intentos,
+            'aceptados': aceptados,
+            'tasas': tasas,
+            'aceptaciones': aceptaciones,
+            'costos_finales': costos,
+            'mejor_costo': mejor_costo,
+        }
+        return contexto.lista(mejor), estadisticas
+
+    def _aceptar_intercambio(self, i: int, costos: List[float], rng) -> bool:
+        """Criterio de Metropolis para intercambiar las réplicas i e i+1."""
+        if costos[i] == costos[i + 1]:
+            return True
+        delta = (1 / self.temperaturas[i] - 1 / self.temperaturas[i + 1]) * (costos[i] - costos[i + 1])
+        return delta >= 0 or rng.random() < math.exp(delta)
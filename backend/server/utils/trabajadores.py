@@ -0,0 +1,111 @@
+"""
+Procesos Trabajadores
+Conjunto de procesos compartido por los optimizadores que reparten su
+trabajo (islas del genético, réplicas del temple paralelo). Los procesos se
+crean la primera vez que se piden y viven lo que vive el servidor, así que
+una petición no paga el arranque del conjunto.
+
+El índice de productos de la sucursal es lo único pesado que necesitan las
+tareas. Cada proceso guarda los últimos índices recibidos; las tareas viajan
+solo con una clave del índice y su propio argumento, y el índice se envía
+(serializado una vez) únicamente a los procesos que aún no lo tienen, p. ej.
+la primera vez o tras una recarga del inventario.
+"""
+
+import itertools
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Sequence
+
+from utils.indice_productos import IndiceProductos
+
+# Índices que conserva cada proceso trabajador
+INDICES_POR_TRABAJADOR = int(os.environ.get('INDICES_POR_TRABAJADOR', 4))
+
+_candado = threading.Lock()
+_ejecutores: Dict[int, ProcessPoolExecutor] = {}
+_claves: 'weakref.WeakKeyDictionary[IndiceProductos, int]' = weakref.WeakKeyDictionary()
+_contador = itertools.count(1)
+
+# Índices recibidos por el proceso trabajador (clave -> índice), del más antiguo al más reciente
+_indices_trabajador: 'OrderedDict[int, IndiceProductos]' = OrderedDict()
+
+
+def _ejecutor(procesos: int) -> ProcessPoolExecutor:
+    with _candado:
+        ejecutor = _ejecutores.get(procesos)
+        if ejecutor is None:
+            ejecutor = _ejecutores[procesos] = ProcessPoolExecutor(max_workers=procesos)
+        return ejecutor
+
+
+def _clave(indice: IndiceProductos) -> int:
+    with _candado:
+        clave = _claves.get(indice)
+        if clave is None:
+            clave = _claves[indice] = next(_contador)
+        return clave
+
+
+def _ejecutar(tarea):
+    """Corre una tarea en el trabajador; (False, None) si le falta el índice."""
+    clave, datos, funcion, argumento = tarea
+    indice = _indices_trabajador.get(clave)
+    if indice is not None:
+        _indices_trabajador.move_to_end(clave)
+    elif datos is None:
+        return False, None
+    else:
+        indice = _indices_trabajador[clave] = pickle.loads(datos)
+        while len(_indices_trabajador) > INDICES_POR_TRABAJADOR:
+            _indices_trabajador.popitem(last=False)
+    return True, funcion(indice, argumento)
+
+
+def mapear(
+    procesos: int,
+    indice: IndiceProductos,
+    funcion: Callable[[IndiceProductos, Any], Any],
+    argumentos: Sequence
+) -> List:
+    """
+    Ejecuta `funcion(indice, argumento)` para cada argumento en los procesos
+    trabajadores.
+
+    Args:
+        procesos: Tamaño del conjunto de procesos a usar
+        indice: Índice de productos que reciben todas las tareas
+        funcion: Función de nivel de módulo (se envía por referencia)
+        argumentos: Argumento de cada tarea
+
+    Returns:
+        Resultados en el orden de los argumentos
+
+    Raises:
+        BrokenProcessPool: Si un proceso murió; el conjunto se descarta y la
+            siguiente llamada crea otro
+    """
+    ejecutor = _ejecutor(procesos)
+    clave = _clave(indice)
+    try:
+        resultados = list(ejecutor.map(_ejecutar, [(clave, None, funcion, a) for a in argumentos]))
+        faltantes = [i for i, (completada, _) in enumerate(resultados) if not completada]
+        if faltantes:
+            datos = pickle.dumps(indice, protocol=pickle.HIGHEST_PROTOCOL)
+            reenvios = ejecutor.map(
+                _ejecutar, [(clave, datos, funcion, argumentos[i]) for i in faltantes]
+            )
+            for i, resultado in zip(faltantes, reenvios):
+                resultados[i] = resultado
+    except BrokenProcessPool:
+        with _candado:
+            if _ejecutores.get(procesos) is ejecutor:
+                del _ejecutores[procesos]
+        raise
+    return [resultado for _, resultado in resultados]
+
@@ -0,0 +1,103 @@
+"""
+Vigilante de Archivos de Datos
+Revisa periódicamente las fechas de modificación de data/inventario,
+data/mapas y data/compilado y notifica qué sucursales cambiaron.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.formato_binario import EXTENSION
+from utils.registro import obtener_logger
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Subdirectorio -> extensión de los archivos de cada tipo
+TIPOS_ARCHIVO = {'inventario': '.json', 'mapas': '.json', 'compilado': EXTENSION}
+
+registro = obtener_logger('vigilante')
+
+# Notificación: (sucursal_id, tipo) con tipo 'inventario', 'mapas' o 'compilado'
+Notificacion = Callable[[str, str], None]
+
+
+class VigilanteDatos:
+    """
+    Hilo que detecta archivos de datos nuevos o modificados por sondeo.
+    El sondeo no depende de APIs del sistema operativo y cuesta un `stat`
+    por archivo en cada intervalo.
+    """
+
+    def __init__(
+        self,
+        al_cambiar: Notificacion,
+        intervalo: float = 2.0,
+        directorio_datos: Optional[str] = None
+    ):
+        """
+        Args:
+            al_cambiar: Función llamada con (sucursal_id, tipo) por cada archivo cambiado
+            intervalo: Segundos entre revisiones
+            directorio_datos: Directorio 'data' a vigilar (opcional)
+        """
+        self.al_cambiar = al_cambiar
+        self.intervalo = intervalo
+        self.directorio_datos = directorio_datos or DIRECTORIO_DATOS
+        self._fechas = self._leer_fechas()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def _leer_fechas(self) -> Dict[Tuple[str, str], float]:
+        fechas = {}
+        for tipo, extension in TIPOS_ARCHIVO.items():
+            directorio = os.path.join(self.directorio_datos, tipo)
+            if not os.path.isdir(directorio):
+                continue
+            for nombre in os.listdir(directorio):
+                if not nombre.endswith(extension):
+                    continue
+                try:
+                    fechas[(nombre[:-len(extension)], tipo)] = os.path.getmtime(
+                        os.path.join(directorio, nombre)
+                    )
+                except OSError:
+                    pass  # borrado entre listdir y getmtime
+        return fechas
+
+    def revisar(self) -> int:
+        """
+        Compara las fechas actuales con las de la revisión anterior y notifica
+        los archivos nuevos o modificados.
+
+        Returns:
+            Cantidad de notificaciones emitidas
+        """
+        fechas = self._leer_fechas()
+        cambios = [clave for clave, fecha in fechas.items() if self._fechas.get(clave) != fecha]
+        self._fechas = fechas
+
+        for sucursal_id, tipo in sorted(cambios):
+            registro.info("Cambio detectado en %s/%s", tipo, sucursal_id)
+            try:
+                self.al_cambiar(sucursal_id, tipo)
+            except Exception as e:
+                registro.error("Error al recargar %s/%s: %s", tipo, sucursal_id, e)
+        return len(cambios)
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            self.revisar()
+
+    def iniciar(self):
+        """Inicia el hilo de sondeo (daemon)."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name='vigilante-datos', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de sondeo."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
@@ -280,6 +280,36 @@ def test_visualizacion_ruta():
     print("="*80)
 
 
+def test_modelo_compartido():
+    """Test 8: Los compradores comparten el mapa e inventario de la sucursal."""
+    print("\n" + "="*80)
+    print("TEST 8: Modelo de sucursal compartido")
+    print("="*80)
+    
+    compradores = [AgenteComprador(f'COMP1{i:02d}') for i in range(3)]
+    for comprador in compradores:
+        comprador.ingresar_a_sucursal('SUC001')
+    
+    primero = compradores[0]
+    for comprador in compradores[1:]:
+        assert comprador.modelo is primero.modelo
+        assert comprador.mapa_sucursal is primero.mapa_sucursal
+        assert comprador.inventario_sucursal is primero.inventario_sucursal
+    
+    # El estado propio del agente vive en __slots__, sin diccionario por instancia
+    assert not hasattr(primero, '__dict__')
+    
+    primero.planificar_compra([{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 2}])
+    ruta = primero.ruta_completa
+    print(f"\nPasos en la ruta: {len(ruta)}")
+    print(f"Bytes de la ruta empaquetada: {primero._ruta.itemsize * len(primero._ruta)}")
+    
+    assert ruta[0] == primero.modelo.entrada
+    assert ruta[-1] == primero.modelo.caja
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
 if __name__ == '__main__':
     print("\nEJECUTANDO SUITE DE PRUEBAS DEL AGENTE COMPRADOR")
     print("="*80)
@@ -292,6 +322,7 @@ if __name__ == '__main__':
         test_multiples_productos_misma_zona()
         test_compra_grande()
         test_visualizacion_ruta()
+        test_modelo_compartido()
         
         print("\n" + "="*80)
         print("✅ TODAS LAS PRUEBAS DEL AGENTE COMPRADOR COMPLETADAS EXITOSAMENTE")
@@ -304,6 +335,7 @@ if __name__ == '__main__':
         print("  • Optimización de zonas: ✓")
         print("  • Compras grandes: ✓")
         print("  • Visualización de rutas: ✓")
+        print("  • Modelo compartido: ✓")
         print("\n" + "="*80 + "\n")
         
     except AssertionError as e:
@@ -5,6 +5,8 @@ Valida la funcionalidad del agente sin necesidad de iniciar el servidor.
 
 import sys
 import os
+import random
+import threading
 
 # Agregar el directorio server al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
@@ -138,6 +140,45 @@ def test_estado_inventario():
     print("\n" + "="*80)
 
 
+def test_recomendaciones_reproducibles():
+    """Prueba de reproducibilidad: la misma semilla produce las mismas listas."""
+    print("\n" + "="*80)
+    print("TEST 6: Recomendaciones reproducibles con semilla")
+    print("="*80)
+    
+    agente = AgenteRecomendador('SUC001')
+    primera = agente.generar_recomendaciones(150.0, ['lacteos'], semilla=1234)
+    
+    # El estado global de random no influye en el resultado
+    random.seed(99)
+    segunda = agente.generar_recomendaciones(150.0, ['lacteos'], semilla=1234)
+    assert primera == segunda
+    assert primera['semilla'] == 1234
+    assert primera['version_inventario'] == agente.version_inventario
+    
+    # Hilos concurrentes con la misma semilla obtienen el mismo resultado
+    resultados = []
+    hilos = [
+        threading.Thread(target=lambda: resultados.append(
+            agente.generar_recomendaciones(150.0, ['lacteos'], semilla=1234)
+        ))
+        for _ in range(4)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert all(resultado == primera for resultado in resultados)
+    
+    # Sin semilla se elige una y se informa en la respuesta
+    libre = agente.generar_recomendaciones(150.0)
+    print(f"\nSemilla elegida: {libre['semilla']}")
+    assert isinstance(libre['semilla'], int)
+    assert agente.generar_recomendaciones(150.0, semilla=libre['semilla']) == libre
+    
+    print("\n" + "="*80)
+
+
 if __name__ == '__main__':
     print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL AGENTE RECOMENDADOR")
     print("="*80)
@@ -148,6 +189,7 @@ if __name__ == '__main__':
         test_recomendador_con_categorias()
         test_recomendador_presupuesto_bajo()
         test_recomendador_presupuesto_alto()
+        test_recomendaciones_reproducibles()
         
         print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
         print("="*80 + "\n")
@@ -0,0 +1,122 @@
+"""
+Script de prueba para el algoritmo genético por islas
+Valida que la aptitud por lotes reproduzca la función de costo del temple y
+que las islas den el mismo resultado en procesos separados, que reutilizan
+entre ejecuciones.
+"""
+
+import random
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from utils.algoritmo_genetico import AlgoritmoGenetico, _Contexto, costos_poblacion
+from utils.generador_sucursales import generar_inventario
+from utils.indice_productos import IndiceProductos
+from utils import trabajadores
+
+CATEGORIAS = ['lacteos', 'verduras']
+
+
+def test_costos_poblacion():
+    """Test 1: El costo por lotes coincide con calcular_costo."""
+    print("\n" + "="*80)
+    print("TEST 1: Aptitud de la población")
+    print("="*80)
+
+    productos = generar_inventario('GEN', 350, 15, 2)['productos']
+    genetico = AlgoritmoGenetico()
+    contexto = _Contexto(genetico, productos, 120, CATEGORIAS, None)
+    rng = random.Random(5)
+
+    poblacion = genetico._poblacion_inicial(contexto, rng)
+    poblacion.append({productos[0]['id']: 40})
+    poblacion.append({})
+    costos = costos_poblacion(poblacion, contexto)
+    for individuo, costo in zip(poblacion, costos):
+        esperado = genetico.calcular_costo(contexto.lista(individuo), 120, CATEGORIAS, productos)
+        assert costo == esperado or abs(costo - esperado) < 1e-9, (costo, esperado)
+    print(f"\n{len(poblacion)} individuos, mejor costo {min(costos):.3f}")
+
+    hijo = genetico.cruzar(poblacion[0], poblacion[1], rng)
+    assert all(c == poblacion[0].get(pid) or c == poblacion[1].get(pid) for pid, c in hijo.items())
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_islas_en_procesos():
+    """Test 2: Con o sin procesos, la misma semilla da la misma lista y respeta topes."""
+    print("\n" + "="*80)
+    print("TEST 2: Islas en procesos")
+    print("="*80)
+
+    productos = generar_inventario('GEN', 3500, 15, 2)['productos']
+    indice = IndiceProductos(productos)
+    topes = {p['id']: 1 for p in productos[:500]}
+    topes.update({p['id']: 0 for p in indice.mas_importantes(20)})
+
+    listas = []
+    for procesos in (0, 2):
+        genetico = AlgoritmoGenetico(generaciones=30, procesos=procesos)
+        lista = genetico.optimizar(productos, 200, CATEGORIAS, topes, indice, random.Random(11))
+        costo = genetico.calcular_costo(lista, 200, CATEGORIAS, productos)
+        print(f"\nprocesos={procesos}: costo {costo:.3f} | {len(lista)} productos")
+        assert all(c <= topes.get(p['id'], c) for p, c in lista)
+        listas.append([(p['id'], c) for p, c in lista])
+
+    assert listas[0] == listas[1]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_procesos_persistentes():
+    """Test 3: Los procesos se reutilizan y reciben el índice nuevo tras un cambio."""
+    print("\n" + "="*80)
+    print("TEST 3: Procesos persistentes")
+    print("="*80)
+
+    productos = generar_inventario('GEN', 2000, 15, 3)['productos']
+    indice = IndiceProductos(productos)
+    genetico = AlgoritmoGenetico(generaciones=15, procesos=2)
+    secuencial = AlgoritmoGenetico(generaciones=15, procesos=0)
+
+    def ids(lista):
+        return [(p['id'], c) for p, c in lista]
+
+    primera = genetico.optimizar(productos, 150, CATEGORIAS, None, indice, random.Random(5))
+    ejecutor = trabajadores._ejecutores[2]
+    segunda = genetico.optimizar(productos, 150, CATEGORIAS, None, indice, random.Random(5))
+    assert trabajadores._ejecutores[2] is ejecutor
+    assert ids(primera) == ids(segunda)
+
+    # Un índice nuevo (p. ej. tras una recarga) usa otra clave y se envía de nuevo
+    caros = [dict(p, precio=p['precio'] * 10) for p in productos]
+    tocados = {nuevo['id']: (anterior, nuevo) for anterior, nuevo in zip(productos, caros)}
+    indice_caro = indice.actualizar(caros, tocados)
+    en_procesos = genetico.optimizar(caros, 150, CATEGORIAS, None, indice_caro, random.Random(5))
+    en_proceso = secuencial.optimizar(caros, 150, CATEGORIAS, None, indice_caro, random.Random(5))
+    print(f"\nAntes: {len(primera)} productos | después: {len(en_procesos)} productos")
+    assert ids(en_procesos) == ids(en_proceso)
+    assert trabajadores._ejecutores[2] is ejecutor
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL ALGORITMO GENÉTICO")
+    print("="*80)
+
+    try:
+        test_costos_poblacion()
+        test_islas_en_procesos()
+        test_procesos_persistentes()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,105 @@
+"""
+Script de prueba para el A* bidireccional
+Valida que el modo bidireccional dé rutas del mismo costo que Dijkstra en
+mapas con y sin costos o sentido único, y que expanda menos nodos que A* en
+tramos largos.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.generador_sucursales import generar_sucursal, ponderar_mapa
+from utils.grilla_ponderada import obtener_grilla
+
+
+def verificar_rutas(mapa: dict, paso: int) -> tuple:
+    """Compara ambos modos con Dijkstra entre zonas de productos; retorna los nodos."""
+    a_estrella = BusquedaAEstrella()
+    grilla = obtener_grilla(mapa)
+    zonas = sorted((z['fila'], z['columna']) for z in mapa['zonas_productos'].values())[::paso]
+    nodos_a_estrella = nodos_bidireccional = 0
+    for inicio, objetivo in zip(zonas, zonas[::-1]):
+        if inicio == objetivo:
+            continue
+        exacto = grilla.dijkstra(grilla.celda(inicio))[grilla.celda(objetivo)]
+        ruta, nodos = a_estrella._buscar_ruta(inicio, objetivo, mapa, bidireccional=True)
+        assert ruta[0] == inicio and ruta[-1] == objetivo
+        assert abs(grilla.costo_ruta(ruta) - exacto) < 1e-9
+        nodos_bidireccional += nodos
+        _, nodos = a_estrella._buscar_ruta(inicio, objetivo, mapa)
+        nodos_a_estrella += nodos
+    return nodos_a_estrella, nodos_bidireccional
+
+
+def test_rutas_optimas():
+    """Test 1: El modo bidireccional da el costo óptimo con y sin costos por celda."""
+    print("\n" + "="*80)
+    print("TEST 1: Costos óptimos en ambos sentidos")
+    print("="*80)
+
+    mapa, _ = generar_sucursal('SUC904', productos=300, categorias=20,
+                               filas=60, columnas=90, semilla=6)
+    nodos_a_estrella, nodos_bidireccional = verificar_rutas(mapa, 9)
+    print(f"Sin costos: A*={nodos_a_estrella} nodos, bidireccional={nodos_bidireccional} nodos")
+    assert nodos_bidireccional < nodos_a_estrella
+
+    # Con zonas concurridas y pasillos de sentido único los predecesores difieren de los sucesores
+    ponderado = ponderar_mapa(mapa, zonas_concurridas=6, semilla=6)
+    assert obtener_grilla(ponderado).dirigida
+    nodos_a_estrella, nodos_bidireccional = verificar_rutas(ponderado, 9)
+    print(f"Ponderado: A*={nodos_a_estrella} nodos, bidireccional={nodos_bidireccional} nodos")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_casos_borde():
+    """Test 2: Inicio igual al objetivo, posiciones inválidas y rutas múltiples."""
+    print("\n" + "="*80)
+    print("TEST 2: Casos borde del modo bidireccional")
+    print("="*80)
+
+    mapa, _ = generar_sucursal('SUC905', productos=100, categorias=10,
+                               filas=20, columnas=30, semilla=3)
+    a_estrella = BusquedaAEstrella()
+    entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+    caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+
+    assert a_estrella.buscar_ruta(entrada, entrada, mapa, bidireccional=True) == [entrada]
+    obstaculo = (mapa['obstaculos'][0]['fila'], mapa['obstaculos'][0]['columna'])
+    try:
+        a_estrella.buscar_ruta(obstaculo, caja, mapa, bidireccional=True)
+        assert False, "Se esperaba ValueError"
+    except ValueError as e:
+        print(f"Inicio inválido rechazado: {e}")
+
+    destinos = sorted((z['fila'], z['columna']) for z in mapa['zonas_productos'].values())[:5]
+    ruta, distancia = a_estrella.buscar_ruta_multiple(entrada, destinos, mapa)
+    ruta_bidireccional, distancia_bidireccional = a_estrella.buscar_ruta_multiple(
+        entrada, destinos, mapa, bidireccional=True
+    )
+    print(f"Distancia: A*={distancia}, bidireccional={distancia_bidireccional}")
+    assert distancia_bidireccional == distancia
+    assert all(destino in ruta_bidireccional for destino in destinos)
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE A* BIDIRECCIONAL")
+    print("="*80)
+
+    try:
+        test_rutas_optimas()
+        test_casos_borde()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,90 @@
+"""
+Script de prueba para la caché de respuestas
+Valida ETags, respuestas 304 y variantes comprimidas sin iniciar el servidor.
+"""
+
+import gzip
+import json
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from utils.cache_respuestas import CacheRespuestas, preparar_respuesta
+
+
+def test_regeneracion_por_version():
+    """Test 1: La entrada solo se regenera cuando cambia la versión."""
+    print("\n" + "="*80)
+    print("TEST 1: Regeneración por versión")
+    print("="*80)
+
+    cache = CacheRespuestas()
+    llamadas = []
+
+    def generar():
+        llamadas.append(1)
+        return {'total': len(llamadas)}
+
+    primera = cache.obtener(('inventario', 'SUC001'), 1, generar)
+    segunda = cache.obtener(('inventario', 'SUC001'), 1, generar)
+    tercera = cache.obtener(('inventario', 'SUC001'), 2, generar)
+
+    print(f"\nGeneraciones: {len(llamadas)}")
+    print(f"ETag v1: {primera.etag} | ETag v2: {tercera.etag}")
+
+    assert primera is segunda
+    assert len(llamadas) == 2
+    assert primera.etag != tercera.etag
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_if_none_match_y_compresion():
+    """Test 2: If-None-Match responde 304 y gzip se sirve si se acepta."""
+    print("\n" + "="*80)
+    print("TEST 2: If-None-Match y compresión")
+    print("="*80)
+
+    cache = CacheRespuestas(comprimir_desde=64)
+    datos = {'productos': [{'id': i, 'nombre': f'Producto {i}'} for i in range(50)]}
+    entrada = cache.obtener(('inventario', 'SUC001'), 1, lambda: datos)
+
+    estado, cuerpo, cabeceras = preparar_respuesta(entrada)
+    assert estado == 200
+    assert json.loads(cuerpo) == datos
+
+    estado, cuerpo, _ = preparar_respuesta(entrada, if_none_match=cabeceras['ETag'])
+    assert estado == 304 and cuerpo == b''
+
+    estado, cuerpo, cabeceras = preparar_respuesta(entrada, accept_encoding='gzip, deflate')
+    print(f"\nTamaño original: {len(entrada.cuerpo)} bytes | gzip: {len(cuerpo)} bytes")
+    assert cabeceras['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(cuerpo)) == datos
+
+    # El ETag de la variante comprimida también valida la caché del cliente
+    estado, _, _ = preparar_respuesta(entrada, if_none_match=cabeceras['ETag'])
+    assert estado == 304
+
+    estado, _, cabeceras = preparar_respuesta(entrada, accept_encoding='gzip;q=0')
+    assert estado == 200 and 'Content-Encoding' not in cabeceras
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE LA CACHÉ DE RESPUESTAS")
+    print("="*80)
+
+    try:
+        test_regeneracion_por_version()
+        test_if_none_match_y_compresion()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,98 @@
+"""
+Script de prueba para la caché de soluciones y el arranque tibio del temple
+Valida la búsqueda del presupuesto resuelto más cercano, la invalidación por
+versión y que el agente arranque desde listas previas.
+"""
+
+import random
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.cache_soluciones import CacheSoluciones, escalar_lista
+
+
+def test_cache():
+    """Test 1: Presupuesto más cercano, distancia máxima, capacidad y versión."""
+    print("\n" + "="*80)
+    print("TEST 1: Caché de soluciones")
+    print("="*80)
+
+    productos = {i: {'id': i, 'precio': 10.0} for i in range(1, 4)}
+    cache = CacheSoluciones(capacidad=3)
+    cache.guardar(1, ['lacteos'], 100.0, [(productos[1], 4), (productos[2], 6)])
+    cache.guardar(1, ['lacteos'], 200.0, [(productos[3], 20)])
+    cache.guardar(1, ['panaderia', 'lacteos'], 100.0, [(productos[2], 10)])
+
+    assert cache.mas_cercana(1, ['lacteos'], 110.0) == (100.0, [(1, 4), (2, 6)])
+    assert cache.mas_cercana(1, ['lacteos'], 180.0)[0] == 200.0
+    assert cache.mas_cercana(1, ['lacteos'], 300.0) is None       # más de 25% de distancia
+    assert cache.mas_cercana(1, ['verduras'], 100.0) is None
+    assert cache.mas_cercana(1, ['lacteos', 'panaderia'], 95.0)[1] == [(2, 10)]
+
+    escalada = escalar_lista([(1, 4), (2, 6), (9, 1)], 1.5, productos)
+    assert [(p['id'], c) for p, c in escalada] == [(1, 6), (2, 9)]
+
+    # Capacidad: se descarta la menos usada (200 no se consultó desde 180)
+    cache.mas_cercana(1, ['lacteos'], 100.0)
+    cache.guardar(1, ['verduras'], 50.0, [(productos[1], 5)])
+    assert len(cache) == 3
+    assert cache.mas_cercana(1, ['lacteos'], 200.0) is None
+
+    # Versión nueva del inventario: la caché se vacía
+    assert cache.mas_cercana(2, ['verduras'], 50.0) is None
+    assert len(cache) == 0
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_arranque_tibio_agente():
+    """Test 2: El agente reutiliza listas previas solo con arranque tibio."""
+    print("\n" + "="*80)
+    print("TEST 2: Arranque tibio en el agente recomendador")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    frio = agente.generar_recomendaciones(120.0, ['lacteos'], semilla=3)
+    assert frio['arranques_tibios'] == 0
+    assert len(agente.cache_soluciones) == 0
+
+    primera = agente.generar_recomendaciones(120.0, ['lacteos'], semilla=3, arranque_tibio=True)
+    # La base arranca en frío; superior e inferior parten de ella (3% de distancia)
+    assert primera['arranques_tibios'] == 2
+
+    rng = random.Random(1)
+    for _ in range(5):
+        presupuesto = rng.uniform(100, 140)
+        resultado = agente.generar_recomendaciones(presupuesto, ['lacteos'], arranque_tibio=True)
+        exacta = resultado['recomendaciones'][0]
+        print(f"\n{presupuesto:7.2f} Bs. -> {exacta['total']:7.2f} Bs. "
+              f"({resultado['arranques_tibios']} arranques tibios)")
+        assert resultado['arranques_tibios'] == 3
+        assert abs(exacta['diferencia']) <= presupuesto * 0.05
+
+    # Otro optimizador no usa la caché
+    voraz = agente.generar_recomendaciones(120.0, ['lacteos'], optimizador='voraz', arranque_tibio=True)
+    assert voraz['arranques_tibios'] == 0
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE LA CACHÉ DE SOLUCIONES")
+    print("="*80)
+
+    try:
+        test_cache()
+        test_arranque_tibio_agente()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,145 @@
+"""
+Script de prueba para los cambios incrementales de inventario
+Valida lotes atómicos, diferencias entre versiones, el versionado del agente
+recomendador y la detección de archivos modificados.
+"""
+
+import json
+import sys
+import os
+import tempfile
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.cambios_inventario import CambioInvalido, aplicar_cambios, diferencias
+from utils.vigilante_datos import VigilanteDatos
+
+
+def test_lote_atomico_y_diferencias():
+    """Test 1: Un lote inválido no aplica nada y las diferencias reproducen el destino."""
+    print("\n" + "="*80)
+    print("TEST 1: Lotes atómicos y diferencias")
+    print("="*80)
+
+    productos = [
+        {'id': 1, 'nombre': 'Leche', 'precio': 8.5, 'categoria': 'lacteos', 'importancia': 0.9},
+        {'id': 2, 'nombre': 'Pan', 'precio': 1.0, 'categoria': 'panaderia', 'importancia': 0.8},
+    ]
+    nuevos = aplicar_cambios(productos, [
+        {'op': 'precio', 'id': 1, 'precio': 9.0},
+        {'op': 'stock', 'id': 2, 'stock': 5},
+        {'op': 'agregar', 'producto': {'id': 3, 'nombre': 'Queso', 'precio': 20, 'categoria': 'lacteos'}},
+        {'op': 'eliminar', 'id': 2},
+    ])
+    print(f"\nProductos tras el lote: {[p['id'] for p in nuevos]}")
+
+    assert [p['id'] for p in nuevos] == [1, 3]
+    assert nuevos[0]['precio'] == 9.0 and productos[0]['precio'] == 8.5
+    assert nuevos[1]['importancia'] == 0.5
+
+    try:
+        aplicar_cambios(productos, [{'op': 'precio', 'id': 1, 'precio': 7.0},
+                                    {'op': 'precio', 'id': 99, 'precio': 1.0}])
+        assert False, "Se esperaba CambioInvalido"
+    except CambioInvalido as e:
+        print(f"Lote rechazado: {e}")
+    assert productos[0]['precio'] == 8.5
+
+    # Ids que no son enteros y textos que no son texto se rechazan como cambio inválido
+    for invalido in (
+        {'op': 'precio', 'id': [1], 'precio': 1.0},
+        {'op': 'eliminar', 'id': True},
+        {'op': 'agregar', 'producto': {'id': {'x': 1}, 'nombre': 'A', 'precio': 1, 'categoria': 'c'}},
+        {'op': 'agregar', 'producto': {'id': 'X9', 'nombre': 'A', 'precio': 1, 'categoria': 'c'}},
+        {'op': 'agregar', 'producto': {'id': 9, 'nombre': 5, 'precio': 1, 'categoria': 'c'}},
+        {'op': 'actualizar', 'id': 1, 'campos': {'categoria': ['lacteos']}},
+    ):
+        try:
+            aplicar_cambios(productos, [invalido])
+            assert False, f"Se esperaba CambioInvalido: {invalido}"
+        except CambioInvalido as e:
+            print(f"Cambio rechazado: {e}")
+
+    cambios = diferencias(productos, nuevos)
+    print(f"Diferencias: {[c['op'] for c in cambios]}")
+    assert aplicar_cambios(productos, cambios) == nuevos
+    assert diferencias(nuevos, nuevos) == []
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_versionado_del_agente():
+    """Test 2: Cada lote incrementa la versión y recargar sin cambios no la altera."""
+    print("\n" + "="*80)
+    print("TEST 2: Versionado del inventario del agente")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    version_inicial = agente.version_inventario
+    inventario_anterior = agente.obtener_inventario()
+    precio_original = agente.productos_por_id[1]['precio']
+
+    version = agente.aplicar_cambios([{'op': 'precio', 'id': 1, 'precio': precio_original + 1}])
+    print(f"\nVersión: {version_inicial} → {version}")
+
+    assert version == version_inicial + 1
+    assert agente.productos_por_id[1]['precio'] == precio_original + 1
+    assert inventario_anterior['productos'][0]['precio'] == precio_original
+
+    # Recargar desde el archivo revierte el cambio aplicando solo esa diferencia
+    version = agente.recargar_inventario()
+    assert version == version_inicial + 2
+    assert agente.productos_por_id[1]['precio'] == precio_original
+    assert agente.recargar_inventario() == version
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_vigilante_detecta_cambios():
+    """Test 3: El vigilante notifica archivos nuevos y modificados."""
+    print("\n" + "="*80)
+    print("TEST 3: Vigilante de archivos de datos")
+    print("="*80)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.makedirs(os.path.join(directorio, 'inventario'))
+        ruta = os.path.join(directorio, 'inventario', 'SUC777.json')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump({'productos': []}, archivo)
+
+        notificaciones = []
+        vigilante = VigilanteDatos(
+            lambda sucursal_id, tipo: notificaciones.append((sucursal_id, tipo)),
+            directorio_datos=directorio
+        )
+        assert vigilante.revisar() == 0
+
+        os.utime(ruta, (1, 1))
+        with open(os.path.join(directorio, 'inventario', 'SUC778.json'), 'w') as archivo:
+            archivo.write('{}')
+        assert vigilante.revisar() == 2
+
+    print(f"\nNotificaciones: {notificaciones}")
+    assert notificaciones == [('SUC777', 'inventario'), ('SUC778', 'inventario')]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE CAMBIOS DE INVENTARIO")
+    print("="*80)
+
+    try:
+        test_lote_atomico_y_diferencias()
+        test_versionado_del_agente()
+        test_vigilante_detecta_cambios()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
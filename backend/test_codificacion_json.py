@@ -0,0 +1,93 @@
+"""
+Script de prueba para la codificación JSON rápida
+Valida que todos los codificadores, la ruta compacta y la serialización por
+partes producen documentos equivalentes.
+"""
+
+import json
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from utils.codificacion_json import (
+    CODIFICADORES, codificador_activo, configurar_codificador, codificar,
+    compactar_rutas, iterar_json
+)
+
+
+def _resultado_compra():
+    comprador = AgenteComprador('COMP_JSON')
+    comprador.ingresar_a_sucursal('SUC001')
+    comprador.planificar_compra([
+        {'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 2},
+        {'id': 10, 'nombre': 'Papel Higiénico x4', 'cantidad': 1}
+    ])
+    return comprador.ejecutar_compra()
+
+
+def test_codificadores_equivalentes():
+    """Test 1: Todos los codificadores producen el mismo documento."""
+    print("\n" + "="*80)
+    print("TEST 1: Codificadores equivalentes")
+    print("="*80)
+
+    resultado = _resultado_compra()
+    esperado = json.loads(json.dumps(resultado))
+    original = codificador_activo()
+
+    try:
+        for nombre in CODIFICADORES:
+            configurar_codificador(nombre)
+            print(f"\n{nombre}: {len(codificar(resultado))} bytes")
+            assert json.loads(codificar(resultado)) == esperado
+            assert json.loads(b''.join(iterar_json(resultado, tamano_fragmento=256))) == esperado
+            # Las claves que no son texto se convierten igual que sin fragmentar
+            claves = {True: 1, None: [{'a': 1}], 3: {False: None}, 1.5: 'x'}
+            assert b''.join(iterar_json(claves)) == codificar(claves)
+    finally:
+        configurar_codificador(original)
+
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_ruta_compacta():
+    """Test 2: La ruta compacta conserva posiciones y eventos."""
+    print("\n" + "="*80)
+    print("TEST 2: Ruta compacta")
+    print("="*80)
+
+    resultado = _resultado_compra()
+    compacto = compactar_rutas({'navegacion': resultado})['navegacion']['ruta_detallada']
+    ruta = resultado['ruta_detallada']
+
+    print(f"\nPasos: {compacto['pasos']} | Eventos: {len(compacto['eventos'])}")
+
+    assert compacto['pasos'] == len(ruta)
+    assert compacto['posiciones'][:2] == ruta[0]['posicion']
+    assert compacto['posiciones'][-2:] == ruta[-1]['posicion']
+    assert [e['accion'] for e in compacto['eventos']] == [
+        p['accion'] for p in ruta if p['accion'] != 'avanzar'
+    ]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE CODIFICACIÓN JSON")
+    print("="*80)
+
+    try:
+        test_codificadores_equivalentes()
+        test_ruta_compacta()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
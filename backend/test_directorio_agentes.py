@@ -0,0 +1,106 @@
+"""
+Script de prueba para el directorio de agentes recomendadores
+Valida el descubrimiento de sucursales, la construcción perezosa y la precarga.
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.directorio_agentes import DirectorioRecomendadores, crear_agente
+from models.modelo_sucursal import metadatos_sucursal
+
+
+def test_construccion_perezosa():
+    """Test 1: Los agentes se construyen una sola vez y solo al usarse."""
+    print("\n" + "="*80)
+    print("TEST 1: Construcción perezosa")
+    print("="*80)
+
+    construcciones = []
+    candado = threading.Lock()
+
+    def fabrica(sucursal_id):
+        with candado:
+            construcciones.append(sucursal_id)
+        time.sleep(0.05)
+        return crear_agente(sucursal_id)
+
+    directorio = DirectorioRecomendadores(fabrica)
+    sucursales = directorio.descubrir()
+    print(f"\nSucursales descubiertas: {sucursales}")
+
+    assert 'SUC001' in sucursales and 'SUC002' in sucursales
+    assert 'SUC001' in directorio and 'SUC999' not in directorio
+    assert construcciones == []
+    assert directorio.get('SUC999') is None
+
+    # Muchas peticiones simultáneas a la misma sucursal construyen un solo agente
+    agentes = []
+    hilos = [threading.Thread(target=lambda: agentes.append(directorio['SUC002'])) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    print(f"Construcciones: {construcciones}")
+    assert construcciones == ['SUC002']
+    assert all(agente is agentes[0] for agente in agentes)
+    assert list(directorio.activos()) == ['SUC002']
+    assert directorio.estado_sucursal('SUC001') == 'pendiente'
+
+    # Una sucursal pendiente se lista con nombre provisorio sin construir su agente
+    metadatos = metadatos_sucursal('SUC001')
+    print(f"Metadatos de SUC001 pendiente: {metadatos}")
+    assert metadatos['nombre'] and construcciones == ['SUC002']
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_precarga_y_preparacion():
+    """Test 2: La precarga construye todo en segundo plano y reporta errores."""
+    print("\n" + "="*80)
+    print("TEST 2: Precarga y estado de preparación")
+    print("="*80)
+
+    def fabrica(sucursal_id):
+        if sucursal_id == 'SUC002':
+            raise RuntimeError('inventario corrupto')
+        return crear_agente(sucursal_id)
+
+    directorio = DirectorioRecomendadores(fabrica)
+    directorio.descubrir()
+    assert directorio.estado()['listo']  # sin precarga: todo al primer uso
+
+    directorio.precargar(['SUC001', 'SUC002', 'SUC999'], hilos=2)
+    assert directorio.esperar(timeout=30)
+    estado = directorio.estado()
+    print(f"\nEstado: {estado}")
+
+    assert estado['listo']
+    assert estado['sucursales']['SUC001'] == 'lista'
+    assert estado['sucursales']['SUC002'] == 'error'
+    assert 'inventario corrupto' in estado['errores']['SUC002']
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL DIRECTORIO DE AGENTES")
+    print("="*80)
+
+    try:
+        test_construccion_perezosa()
+        test_precarga_y_preparacion()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,150 @@
+"""
+Script de prueba para el formato binario compilado
+Valida que compilar y abrir una sucursal reproduzca exactamente sus JSON y que
+el modelo, la grilla y el índice de productos lean el archivo compilado.
+"""
+
+import json
+import sys
+import os
+import tempfile
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from utils.formato_binario import (
+    SucursalCompilada, compilada_vigente, compilar, compilar_sucursal, ruta_compilada
+)
+from models.modelo_sucursal import ModeloSucursal
+from utils.generador_sucursales import generar_sucursal
+from utils.grilla_ponderada import GrillaPonderada, obtener_grilla
+from utils.indice_productos import IndiceProductos
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(__file__), 'server', 'data')
+
+
+def _normalizar_mapa(mapa):
+    mapa = dict(mapa)
+    mapa['obstaculos'] = sorted((o['fila'], o['columna']) for o in mapa['obstaculos'])
+    return mapa
+
+
+def test_ida_y_vuelta_sucursal_real():
+    """Test 1: SUC001 compilada reproduce su mapa e inventario."""
+    print("\n" + "="*80)
+    print("TEST 1: Ida y vuelta de SUC001")
+    print("="*80)
+
+    with open(os.path.join(DIRECTORIO_DATOS, 'mapas', 'SUC001.json'), encoding='utf-8') as archivo:
+        mapa = json.load(archivo)
+    with open(os.path.join(DIRECTORIO_DATOS, 'inventario', 'SUC001.json'), encoding='utf-8') as archivo:
+        inventario = json.load(archivo)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.makedirs(os.path.join(directorio, 'mapas'))
+        os.makedirs(os.path.join(directorio, 'inventario'))
+        for tipo, datos in (('mapas', mapa), ('inventario', inventario)):
+            with open(os.path.join(directorio, tipo, 'SUC001.json'), 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo)
+
+        ruta = compilar_sucursal('SUC001', directorio)
+        assert ruta == ruta_compilada('SUC001', directorio)
+        assert compilada_vigente(ruta, [os.path.join(directorio, 'mapas', 'SUC001.json')])
+
+        compilada = SucursalCompilada(ruta)
+        print(f"\nTamaño: {os.path.getsize(ruta)} bytes | Productos: {len(compilada)}")
+        print(f"Nombre: {compilada.nombre} | Dimensiones: {compilada.dimensiones}")
+
+        assert compilada.inventario() == inventario
+        assert _normalizar_mapa(compilada.mapa()) == _normalizar_mapa(mapa)
+        primero = mapa['obstaculos'][0]
+        assert compilada.bloqueada(primero['fila'], primero['columna'])
+        assert not compilada.bloqueada(*compilada.entrada)
+        compilada.cerrar()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_columnas_sin_copia():
+    """Test 2: Las columnas de una sucursal grande son vistas sobre el mapeo."""
+    print("\n" + "="*80)
+    print("TEST 2: Columnas de una sucursal de 3500 productos")
+    print("="*80)
+
+    mapa, inventario = generar_sucursal('SUC900', productos=3500, filas=200, columnas=300)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = compilar(mapa, inventario, os.path.join(directorio, 'SUC900.sucb'))
+        compilada = SucursalCompilada(ruta)
+
+        precios = [p['precio'] for p in inventario['productos']]
+        print(f"\nTamaño: {os.path.getsize(ruta)} bytes | Zonas: {len(compilada.zonas)}")
+
+        assert isinstance(compilada.precios, memoryview) and compilada.precios.obj is not None
+        assert compilada.precios.tolist() == precios
+        assert len(compilada.obstaculos()) == len(mapa['obstaculos'])
+        posicion, productos = compilada.zona(0)
+        zona = mapa['zonas_productos'][compilada.zonas[0]]
+        assert posicion == (zona['fila'], zona['columna'])
+        assert productos.tolist() == zona['productos']
+        productos.release()
+        compilada.cerrar()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_modelo_desde_columnas():
+    """Test 3: El modelo, la grilla y el índice leen el archivo compilado sin pasar por los JSON."""
+    print("\n" + "="*80)
+    print("TEST 3: Modelo de sucursal sobre el archivo compilado")
+    print("="*80)
+
+    mapa, inventario = generar_sucursal('SUC901', productos=2000, filas=100, columnas=150)
+    with tempfile.TemporaryDirectory() as directorio:
+        compilada = SucursalCompilada(compilar(mapa, inventario, os.path.join(directorio, 'SUC901.sucb')))
+        modelo = ModeloSucursal('SUC901', None, None, compilada)
+        referencia = ModeloSucursal('SUC901', mapa, inventario)
+
+        # Las consultas por producto leen las columnas sin materializar el inventario
+        producto = inventario['productos'][123]
+        assert modelo.producto(producto['id']) == producto
+        assert modelo.producto(-1) is None
+        assert modelo.posiciones_productos == referencia.posiciones_productos
+        assert modelo._inventario is None and modelo._mapa is None
+        assert modelo.obstaculos == referencia.obstaculos
+
+        # La grilla se compila desde la grilla de ocupación del archivo
+        assert compilada.libres() == GrillaPonderada(mapa, landmarks=0).libres
+        assert obtener_grilla(modelo.mapa).adyacencia == GrillaPonderada(mapa, landmarks=0).adyacencia
+
+        # El índice ordenado sobre las columnas es el mismo que sobre los diccionarios
+        productos = modelo.inventario['productos']
+        assert productos == inventario['productos']
+        desde_columnas = IndiceProductos(productos, modelo.columnas_inventario())
+        desde_dicts = IndiceProductos(productos)
+        assert desde_columnas.por_franja == desde_dicts.por_franja
+        assert desde_columnas.por_importancia == desde_dicts.por_importancia
+        assert desde_columnas.en_rango(10, 20) == desde_dicts.en_rango(10, 20)
+        categoria = productos[0]['categoria']
+        assert desde_columnas.mas_cercano(15, categoria) == desde_dicts.mas_cercano(15, categoria)
+        print(f"\nProductos: {len(productos)} | Celdas libres: {sum(compilada.libres())}")
+        compilada.cerrar()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL FORMATO BINARIO")
+    print("="*80)
+
+    try:
+        test_ida_y_vuelta_sucursal_real()
+        test_columnas_sin_copia()
+        test_modelo_desde_columnas()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
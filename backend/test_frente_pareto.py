@@ -0,0 +1,104 @@
+"""
+Script de prueba para el frente de Pareto de listas de compras
+Valida la dominancia, el archivo acotado y el frente que genera el agente
+recomendador con una sola ejecución del temple.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.costos import MULTIPLO_CANTIDAD_TIPICA
+from utils.frente_pareto import ArchivoPareto, calcular_objetivos, domina
+
+
+def _producto(producto_id, precio, importancia, categoria='lacteos'):
+    return {
+        'id': producto_id, 'nombre': f'P{producto_id}', 'precio': precio,
+        'importancia': importancia, 'categoria': categoria, 'cantidad_tipica': 2
+    }
+
+
+def test_archivo():
+    """Test 1: El archivo conserva solo listas no dominadas y respeta su capacidad."""
+    print("\n" + "="*80)
+    print("TEST 1: Archivo de Pareto")
+    print("="*80)
+
+    a, b, c = _producto(1, 10, 0.9), _producto(2, 10, 0.5), _producto(3, 5, 0.7, 'panaderia')
+    # Mismo límite de cantidad que calcular_costo
+    limite = a['cantidad_tipica'] * MULTIPLO_CANTIDAD_TIPICA
+    assert calcular_objetivos([(a, limite + 1)], 10 * (limite + 1), []) is None
+    assert calcular_objetivos([(a, limite)], 10 * limite, []) is not None
+    assert calcular_objetivos([(a, 2), (c, 2)], 30, ['panaderia']) == (0.0, 0.2, -2, 0)
+    assert domina((0.0, 0.1, -2, 0), (0.0, 0.2, -2, 0))
+    assert not domina((0.0, 0.1, -2, 0), (1.0, 0.0, -2, 0))
+
+    archivo = ArchivoPareto(20, ['lacteos'])
+    assert archivo.ofrecer([(b, 2)])
+    assert archivo.ofrecer([(a, 2)])           # domina a la anterior
+    assert len(archivo) == 1
+    assert not archivo.ofrecer([(a, 2)])       # repetida
+    assert not archivo.ofrecer([(a, 1)])       # fuera de la tolerancia (10%)
+    assert archivo.ofrecer([(a, 1), (c, 2)])   # más variedad, menos importancia
+    assert len(archivo) == 2
+
+    acotado = ArchivoPareto(100, capacidad=4)
+    for n in range(1, 11):
+        # n productos distintos que suman el presupuesto: más variedad, menos importancia
+        acotado.ofrecer([(_producto(n * 100 + i, 100 / n, 1 - n / 20), 1) for i in range(n)])
+    print(f"\nFrente acotado: {[o for o, _ in acotado.frente()]}")
+    objetivos = [o for o, _ in acotado.frente()]
+    assert len(objetivos) == 4
+    assert not any(domina(x, y) for x in objetivos for y in objetivos)
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_frente_agente():
+    """Test 2: El agente devuelve un frente no dominado y reproducible."""
+    print("\n" + "="*80)
+    print("TEST 2: Frente de Pareto del agente recomendador")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    resultado = agente.generar_frente_pareto(100.0, ['lacteos', 'panaderia'], semilla=4)
+    frente = resultado['frente']
+    print(f"\n{len(frente)} listas de {resultado['listas_evaluadas']} evaluadas")
+    for lista in frente:
+        print(f"  {lista['total']:7.2f} Bs. | {lista['objetivos']}")
+
+    assert 1 < len(frente) <= 12
+    objetivos = [
+        (o['diferencia_presupuesto'], 1 - o['importancia_promedio'],
+         -o['productos_diferentes'], o['categorias_sin_cubrir'])
+        for o in (lista['objetivos'] for lista in frente)
+    ]
+    assert not any(domina(x, y) for x in objetivos for y in objetivos)
+    assert all(abs(lista['diferencia']) <= 10.0 for lista in frente)
+    assert objetivos == sorted(objetivos)
+
+    repetido = agente.generar_frente_pareto(100.0, ['lacteos', 'panaderia'], semilla=4)
+    assert [l['productos'] for l in repetido['frente']] == [l['productos'] for l in frente]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL FRENTE DE PARETO")
+    print("="*80)
+
+    try:
+        test_archivo()
+        test_frente_agente()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
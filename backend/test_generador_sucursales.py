@@ -0,0 +1,81 @@
+"""
+Script de prueba para el generador de sucursales sintéticas
+Valida determinismo, formato y alcanzabilidad de las zonas generadas.
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.modelo_sucursal import ModeloSucursal
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.generador_sucursales import generar_sucursal, guardar_sucursal
+
+
+def test_inventario_y_mapa_deterministas():
+    """Test 1: La misma semilla produce la misma sucursal y todos los productos tienen zona."""
+    print("\n" + "="*80)
+    print("TEST 1: Sucursal sintética determinista")
+    print("="*80)
+
+    mapa, inventario = generar_sucursal('SUC900', productos=3500, categorias=60,
+                                        filas=200, columnas=300, semilla=3)
+    mapa_2, inventario_2 = generar_sucursal('SUC900', productos=3500, categorias=60,
+                                            filas=200, columnas=300, semilla=3)
+
+    productos = inventario['productos']
+    categorias = {p['categoria'] for p in productos}
+    print(f"\nProductos: {len(productos)} | Categorías: {len(categorias)}")
+    print(f"Zonas: {len(mapa['zonas_productos'])} | Obstáculos: {len(mapa['obstaculos'])}")
+
+    assert mapa == mapa_2 and inventario == inventario_2
+    assert len(productos) == 3500 and len(categorias) == 60
+    assert all(p['precio'] > 0 and 0 < p['importancia'] <= 1 for p in productos)
+
+    modelo = ModeloSucursal('SUC900', mapa, inventario)
+    assert all(modelo.posicion_producto(p['id']) is not None for p in productos)
+    assert not any(pos in modelo.obstaculos for pos in modelo.posiciones_productos.values())
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_zonas_alcanzables_y_guardado():
+    """Test 2: Las zonas son alcanzables desde la entrada y se guardan en data/."""
+    print("\n" + "="*80)
+    print("TEST 2: Zonas alcanzables y guardado")
+    print("="*80)
+
+    mapa, inventario = generar_sucursal('SUC901', productos=300, categorias=20,
+                                        filas=40, columnas=60, semilla=5)
+    entrada = (mapa['entrada']['fila'], mapa['entrada']['columna'])
+    a_estrella = BusquedaAEstrella()
+    for zona in list(mapa['zonas_productos'].values())[:10]:
+        ruta = a_estrella.buscar_ruta(entrada, (zona['fila'], zona['columna']), mapa)
+        assert ruta, f"Zona inalcanzable: {zona['fila']},{zona['columna']}"
+
+    with tempfile.TemporaryDirectory() as directorio:
+        guardar_sucursal(mapa, inventario, directorio)
+        assert os.path.exists(os.path.join(directorio, 'mapas', 'SUC901.json'))
+        assert os.path.exists(os.path.join(directorio, 'inventario', 'SUC901.json'))
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL GENERADOR DE SUCURSALES")
+    print("="*80)
+
+    try:
+        test_inventario_y_mapa_deterministas()
+        test_zonas_alcanzables_y_guardado()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
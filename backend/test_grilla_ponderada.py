@@ -0,0 +1,166 @@
+"""
+Script de prueba para la grilla ponderada
+Valida los costos por celda, los pasillos de sentido único y que la
+heurística de landmarks (ALT) encuentre rutas óptimas expandiendo menos nodos.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from models.modelo_sucursal import obtener_modelo_sucursal
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.generador_sucursales import generar_sucursal, ponderar_mapa
+from utils.grilla_ponderada import GrillaPonderada, es_mapa_ponderado, obtener_grilla
+
+
+def mapa_abierto(filas: int = 5, columnas: int = 7, **extras) -> dict:
+    """Mapa sin obstáculos con los costos o carriles indicados."""
+    mapa = {'dimensiones': {'filas': filas, 'columnas': columnas}, 'obstaculos': []}
+    mapa.update(extras)
+    return mapa
+
+
+def test_costos_por_celda():
+    """Test 1: La ruta ponderada rodea las celdas caras y su costo es el de la grilla."""
+    print("\n" + "="*80)
+    print("TEST 1: Costos por celda")
+    print("="*80)
+
+    # Franja concurrida en la fila central, salvo la última columna
+    mapa = mapa_abierto(costos_celdas=[
+        {'fila': 2, 'columna': c, 'costo': 5} for c in range(6)
+    ])
+    assert es_mapa_ponderado(mapa)
+    a_estrella = BusquedaAEstrella()
+    ruta = a_estrella.buscar_ruta((0, 0), (4, 0), mapa)
+    grilla = obtener_grilla(mapa)
+    print(f"Ruta: {ruta}")
+    print(f"Costo: {grilla.costo_ruta(ruta)}")
+
+    # Bajar cruzando la franja cuesta 3 + 5 = 8; rodearla por la columna 6 cuesta 16
+    assert grilla.costo_ruta(ruta) == 8 and (2, 0) in ruta
+    # Los mapas son de solo lectura: otros costos son otro mapa
+    mapa = mapa_abierto(costos_celdas=[
+        {'fila': 2, 'columna': c, 'costo': 20} for c in range(6)
+    ])
+    ruta = a_estrella.buscar_ruta((0, 0), (4, 0), mapa)
+    assert (2, 6) in ruta
+    assert obtener_grilla(mapa).costo_ruta(ruta) == 16
+
+    try:
+        GrillaPonderada(mapa_abierto(costos_celdas=[{'fila': 0, 'columna': 0, 'costo': 0.5}]))
+        assert False, "Se esperaba ValueError"
+    except ValueError as e:
+        print(f"Costo inválido rechazado: {e}")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_sentido_unico():
+    """Test 2: Los carriles de sentido único no se recorren en contra."""
+    print("\n" + "="*80)
+    print("TEST 2: Pasillos de sentido único")
+    print("="*80)
+
+    mapa = mapa_abierto(filas=3, sentido_unico=[
+        {'fila': 0, 'columna': c, 'direccion': 'derecha'} for c in range(7)
+    ])
+    a_estrella = BusquedaAEstrella()
+    ida = a_estrella.buscar_ruta((0, 0), (0, 6), mapa)
+    vuelta = a_estrella.buscar_ruta((0, 6), (0, 0), mapa)
+    print(f"Ida:    {ida}")
+    print(f"Vuelta: {vuelta}")
+
+    assert len(ida) == 7
+    # La vuelta baja del carril, cruza por la fila 1 y vuelve a subir
+    assert len(vuelta) == 9
+    assert all(paso[0] == 1 for paso in vuelta[1:-1])
+
+    try:
+        GrillaPonderada(mapa_abierto(sentido_unico=[{'fila': 0, 'columna': 0, 'direccion': 'norte'}]))
+        assert False, "Se esperaba ValueError"
+    except ValueError as e:
+        print(f"Dirección inválida rechazada: {e}")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_landmarks_optimos_y_con_menos_nodos():
+    """Test 3: ALT da el mismo costo que Dijkstra y expande menos nodos que Manhattan."""
+    print("\n" + "="*80)
+    print("TEST 3: Heurística de landmarks")
+    print("="*80)
+
+    mapa, _ = generar_sucursal('SUC902', productos=300, categorias=20,
+                               filas=60, columnas=90, semilla=4)
+    mapa = ponderar_mapa(mapa, zonas_concurridas=6, semilla=4)
+    con_landmarks = GrillaPonderada(mapa, landmarks=8)
+    sin_landmarks = GrillaPonderada(mapa, landmarks=0)
+    a_estrella = BusquedaAEstrella()
+
+    zonas = sorted((z['fila'], z['columna']) for z in mapa['zonas_productos'].values())[::7]
+    nodos_alt = nodos_manhattan = 0
+    for inicio, objetivo in zip(zonas, zonas[1:]):
+        exacto = con_landmarks.dijkstra(con_landmarks.celda(inicio))[con_landmarks.celda(objetivo)]
+        ruta, nodos = a_estrella._buscar_ruta_ponderada(inicio, objetivo, con_landmarks)
+        assert abs(con_landmarks.costo_ruta(ruta) - exacto) < 1e-9
+        nodos_alt += nodos
+        ruta, nodos = a_estrella._buscar_ruta_ponderada(inicio, objetivo, sin_landmarks)
+        assert abs(sin_landmarks.costo_ruta(ruta) - exacto) < 1e-9
+        nodos_manhattan += nodos
+
+    print(f"Landmarks: {[con_landmarks.posicion(l) for l in con_landmarks.landmarks]}")
+    print(f"Nodos expandidos: ALT={nodos_alt}, Manhattan={nodos_manhattan}")
+    assert len(con_landmarks.landmarks) == 8
+    assert nodos_alt < nodos_manhattan
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_mapa_sin_costos_sin_cambios():
+    """Test 4: Los mapas sin costos conservan la ruta y la estimación de tiempo."""
+    print("\n" + "="*80)
+    print("TEST 4: Mapas sin costos")
+    print("="*80)
+
+    modelo = obtener_modelo_sucursal('SUC001')
+    assert not es_mapa_ponderado(modelo.mapa)
+    grilla = obtener_grilla(modelo.mapa)
+    assert obtener_grilla(modelo.mapa) is grilla
+    assert not grilla.landmarks
+
+    comprador = AgenteComprador('PONDERADO001', cooperativo=False)
+    try:
+        comprador.ingresar_a_sucursal('SUC001')
+        comprador.planificar_compra([{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1}])
+        ruta = comprador.ruta_completa
+        assert grilla.costo_ruta(ruta) == comprador.distancia_total
+        resultado = comprador.obtener_resultado()
+        print(f"Distancia: {comprador.distancia_total}, tiempo estimado: {resultado['tiempo_estimado']}")
+    finally:
+        comprador.reiniciar()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE GRILLA PONDERADA")
+    print("="*80)
+
+    try:
+        test_costos_por_celda()
+        test_sentido_unico()
+        test_landmarks_optimos_y_con_menos_nodos()
+        test_mapa_sin_costos_sin_cambios()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,249 @@
+"""
+Script de prueba para los índices de productos
+Valida los índices por categoría, franja de precio e importancia, que el
+temple dirigido converja con menos iteraciones en catálogos grandes y la
+búsqueda por bisección del producto de precio más cercano.
+"""
+
+import random
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.algoritmos_busqueda import TempleSimulado
+from utils.cambios_inventario import aplicar_lote
+from utils.generador_sucursales import generar_inventario
+from utils.indice_productos import IndiceProductos, franja_precio
+
+
+def test_indices():
+    """Test 1: Cada índice agrupa los productos que corresponde."""
+    print("\n" + "="*80)
+    print("TEST 1: Índices por categoría, precio e importancia")
+    print("="*80)
+
+    productos = generar_inventario('IDX', 2000, 15, 3)['productos']
+    indice = IndiceProductos(productos)
+    print(f"\nCategorías: {len(indice.categorias())} | Franjas: {len(indice.franjas)}")
+
+    assert sum(len(p) for p in indice.por_categoria.values()) == len(productos)
+    assert all(p['categoria'] == 'lacteos' for p in indice.por_categoria['lacteos'])
+    for franja, grupo in indice.por_franja.items():
+        assert all(franja_precio(p['precio']) == franja for p in grupo)
+
+    importancias = [p['importancia'] for p in indice.mas_importantes(50)]
+    assert importancias == sorted(importancias, reverse=True)
+    assert len(indice.importantes) == 200
+
+    rng = random.Random(1)
+    for faltante in (2.0, 15.0, 80.0):
+        producto = indice.hasta_precio(faltante, rng)
+        assert franja_precio(producto['precio']) <= franja_precio(faltante)
+    assert indice.hasta_precio(0.0001, rng) is None
+    assert indice.de_categoria('inexistente', rng) is None
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_convergencia_dirigida():
+    """Test 2: Con vecinos dirigidos, menos iteraciones alcanzan un costo menor."""
+    print("\n" + "="*80)
+    print("TEST 2: Convergencia en un catálogo grande")
+    print("="*80)
+
+    productos = generar_inventario('IDX', 20000, 15, 5)['productos']
+    categorias = ['lacteos', 'verduras']
+
+    class TempleUniforme(TempleSimulado):
+        def generar_vecino(self, lista, inventario, presupuesto, indice=None, preferidas=None, rng=None):
+            return super().generar_vecino(lista, inventario, presupuesto, rng=rng)
+
+    def costo_mediano(temple):
+        costos = []
+        for semilla in range(5):
+            random.seed(semilla)
+            lista = temple.optimizar(productos, 300, categorias)
+            costos.append(temple.calcular_costo(lista, 300, categorias, productos))
+        return sorted(costos)[2]
+
+    # ~1000 iteraciones dirigidas contra ~5500 uniformes
+    dirigido = costo_mediano(TempleSimulado(1000, 1, 0.5, 100))
+    uniforme = costo_mediano(TempleUniforme(1000, 1, 0.88, 100))
+    print(f"\nCosto mediano dirigido: {dirigido:.2f} | uniforme: {uniforme:.2f}")
+    assert dirigido < uniforme
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_indice_del_agente():
+    """Test 3: El agente reconstruye su índice con cada versión del inventario."""
+    print("\n" + "="*80)
+    print("TEST 3: Índice del agente recomendador")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    anterior = agente.indice_productos
+    assert anterior.productos is agente.productos
+
+    agente.aplicar_cambios([{'op': 'agregar', 'producto': {
+        'id': 9001, 'nombre': 'Mate', 'precio': 6.0, 'categoria': 'infusiones'
+    }}])
+    assert agente.indice_productos is not anterior
+    assert 'infusiones' in agente.indice_productos.categorias()
+    assert 'infusiones' not in anterior.categorias()
+
+    resultado = agente.generar_recomendaciones(120, ['infusiones'])
+    assert len(resultado['recomendaciones']) == 3
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_busqueda_por_precio():
+    """Test 4: La bisección coincide con el recorrido lineal que reemplaza."""
+    print("\n" + "="*80)
+    print("TEST 4: Búsqueda del precio más cercano")
+    print("="*80)
+
+    productos = generar_inventario('IDX', 3000, 15, 9)['productos']
+    indice = IndiceProductos(productos)
+    rng = random.Random(4)
+    sin_stock = {p['id'] for p in rng.sample(productos, 300)}
+    admitir = lambda p: p['id'] not in sin_stock
+
+    for _ in range(300):
+        monto = rng.uniform(0.1, 120)
+        categoria = rng.choice([None, 'lacteos', 'bebidas'])
+        candidatos = [
+            p for p in productos
+            if p['precio'] <= monto and admitir(p)
+            and (categoria is None or p['categoria'] == categoria)
+        ]
+        esperado = min(candidatos, key=lambda p: abs(p['precio'] - monto)) if candidatos else None
+        assert indice.mas_cercano(monto, categoria, admitir=admitir) is esperado
+
+        cercano = indice.mas_cercano(monto, categoria, sin_superar=False)
+        grupo = [p for p in productos if categoria is None or p['categoria'] == categoria]
+        assert abs(cercano['precio'] - monto) == min(abs(p['precio'] - monto) for p in grupo)
+
+    rango = indice.en_rango(10, 12, 'lacteos')
+    assert rango == sorted(rango, key=lambda p: p['precio'])
+    assert {p['id'] for p in rango} == {
+        p['id'] for p in productos if p['categoria'] == 'lacteos' and 10 <= p['precio'] <= 12
+    }
+
+    agente = AgenteRecomendador('SUC001')
+    producto = agente.buscar_por_precio(9.0, 'lacteos')
+    print(f"\nProducto más cercano a 9 Bs. en lácteos: {producto['nombre']} ({producto['precio']})")
+    assert producto['categoria'] == 'lacteos' and producto['precio'] <= 9.0
+    assert agente.productos_en_rango(0, 1000) == sorted(agente.productos, key=lambda p: p['precio'])
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_actualizacion_incremental():
+    """Test 5: Actualizar el índice con cada lote equivale a reconstruirlo."""
+    print("\n" + "="*80)
+    print("TEST 5: Actualización incremental del índice")
+    print("="*80)
+
+    productos = generar_inventario('IDX', 1500, 15, 6)['productos']
+    indice = IndiceProductos(productos)
+    rng = random.Random(8)
+    siguiente_id = 10**6
+
+    for _ in range(60):
+        ids = [p['id'] for p in productos]
+        por_id = {p['id']: p for p in productos}
+        cambios = []
+        for producto_id in rng.sample(ids, 4):
+            operacion = rng.choice(['precio', 'stock', 'actualizar', 'eliminar', 'reemplazar'])
+            if operacion == 'precio':
+                cambios.append({'op': 'precio', 'id': producto_id, 'precio': rng.choice([2.5, rng.uniform(1, 90)])})
+            elif operacion == 'stock':
+                cambios.append({'op': 'stock', 'id': producto_id, 'stock': rng.randint(0, 5)})
+            elif operacion == 'actualizar':
+                cambios.append({'op': 'actualizar', 'id': producto_id, 'campos': {
+                    'categoria': rng.choice(['lacteos', 'nueva']), 'importancia': rng.choice([0.5, rng.random()])
+                }})
+            elif operacion == 'eliminar':
+                cambios.append({'op': 'eliminar', 'id': producto_id})
+            else:
+                # Baja y alta del mismo id: el producto pasa al final del inventario
+                cambios.append({'op': 'eliminar', 'id': producto_id})
+                cambios.append({'op': 'agregar', 'producto': dict(por_id[producto_id], precio=2.5)})
+        siguiente_id += 1
+        cambios.append({'op': 'agregar', 'producto': {
+            'id': siguiente_id, 'nombre': 'Nuevo', 'precio': 2.5, 'categoria': rng.choice(['lacteos', 'otra'])
+        }})
+
+        productos, tocados = aplicar_lote(productos, cambios)
+        indice = indice.actualizar(
+            productos,
+            {producto_id: (por_id.get(producto_id), producto) for producto_id, producto in tocados.items()},
+            [cambio['producto']['id'] for cambio in cambios if cambio['op'] == 'agregar']
+        )
+        completo = IndiceProductos(productos)
+        assert list(indice.por_categoria.items()) == list(completo.por_categoria.items())
+        assert list(indice.por_franja.items()) == list(completo.por_franja.items())
+        assert indice.franjas == completo.franjas
+        assert indice.por_importancia == completo.por_importancia
+        assert indice.importantes == completo.importantes
+        assert indice._por_precio == completo._por_precio
+        assert list(indice._por_precio_categoria.items()) == list(completo._por_precio_categoria.items())
+
+    print(f"\nProductos tras 60 lotes: {len(productos)} | Categorías: {len(indice.categorias())}")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_parada_por_estancamiento():
+    """Test 6: El temple se detiene cuando la mejor lista deja de mejorar."""
+    print("\n" + "="*80)
+    print("TEST 6: Parada por estancamiento del temple")
+    print("="*80)
+
+    productos = generar_inventario('IDX', 5000, 15, 2)['productos']
+    indice = IndiceProductos(productos)
+
+    class TempleContado(TempleSimulado):
+        vecinos = 0
+
+        def generar_vecino(self, *args, **kwargs):
+            self.vecinos += 1
+            return super().generar_vecino(*args, **kwargs)
+
+    completo = TempleContado(1000, 1, 0.95, 100, iteraciones_sin_mejora=0)
+    completo.optimizar(productos, 150, ['lacteos'], indice=indice, rng=random.Random(2))
+    con_parada = TempleContado(1000, 1, 0.95, 100, iteraciones_sin_mejora=1000)
+    lista = con_parada.optimizar(productos, 150, ['lacteos'], indice=indice, rng=random.Random(2))
+    print(f"\nIteraciones: esquema completo {completo.vecinos} | con parada {con_parada.vecinos}")
+
+    assert completo.vecinos == 13500
+    assert con_parada.vecinos < completo.vecinos and con_parada.vecinos % 100 == 0
+    assert lista
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE ÍNDICES DE PRODUCTOS")
+    print("="*80)
+
+    try:
+        test_indices()
+        test_convergencia_dirigida()
+        test_indice_del_agente()
+        test_busqueda_por_precio()
+        test_actualizacion_incremental()
+        test_parada_por_estancamiento()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
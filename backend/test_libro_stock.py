@@ -0,0 +1,245 @@
+"""
+Script de prueba para el libro de stock
+Valida reservas atómicas, su comportamiento bajo concurrencia y que las
+recomendaciones y compras respeten el stock disponible.
+"""
+
+import random
+import sys
+import os
+import threading
+import time
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from models.agente_recomendador import AgenteRecomendador
+from models.libro_stock import LibroStock, StockInsuficiente, obtener_libro_stock
+from utils.algoritmos_busqueda import TempleSimulado
+
+
+def test_reservas_atomicas():
+    """Test 1: Reservar, confirmar y liberar; una reserva insuficiente no reserva nada."""
+    print("\n" + "="*80)
+    print("TEST 1: Reservas atómicas")
+    print("="*80)
+
+    libro = LibroStock('PRUEBA')
+    libro.sincronizar([{'id': 1, 'stock': 3}, {'id': 2, 'stock': 1}, {'id': 3}])
+
+    assert libro.reservar('A', {1: 2, 3: 50}) == {1: 2}
+    try:
+        libro.reservar('B', {1: 1, 2: 2})
+        assert False, "Se esperaba StockInsuficiente"
+    except StockInsuficiente as e:
+        print(f"\nReserva rechazada: {e}")
+        assert e.faltantes == {2: 1}
+    assert libro.disponible(1) == 1 and libro.disponible(2) == 1
+    assert libro.disponible(3) is None
+
+    assert libro.confirmar('A') == {1: 2}
+    assert libro.topes() == {1: 1, 2: 1}
+    libro.reservar('C', {1: 1})
+    libro.liberar('C')
+    assert libro.disponible(1) == 1 and libro.reservas_activas() == 0
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_reservas_concurrentes():
+    """Test 2: Muchos hilos compitiendo por las últimas unidades nunca las exceden."""
+    print("\n" + "="*80)
+    print("TEST 2: Reservas concurrentes")
+    print("="*80)
+
+    libro = LibroStock('PRUEBA')
+    libro.sincronizar([{'id': i, 'stock': 50} for i in range(20)])
+    exitos = []
+
+    def comprador(hilo):
+        rng = random.Random(hilo)
+        for intento in range(200):
+            productos = rng.sample(range(20), 3)
+            try:
+                libro.reservar(f'{hilo}-{intento}', {p: 1 for p in productos})
+                exitos.append(len(productos))
+            except StockInsuficiente:
+                pass
+
+    hilos = [threading.Thread(target=comprador, args=(h,)) for h in range(16)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    reservadas = sum(exitos)
+    print(f"\nReservas exitosas: {len(exitos)} | Unidades reservadas: {reservadas}")
+    assert reservadas <= 20 * 50
+    assert all(disponible >= 0 for disponible in libro.topes().values())
+    assert sum(libro.topes().values()) == 20 * 50 - reservadas
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_recomendacion_y_compra_con_stock():
+    """Test 3: El temple respeta los topes y las compras reservan y confirman."""
+    print("\n" + "="*80)
+    print("TEST 3: Recomendación y compra con stock")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    random.seed(3)
+    topes = {p['id']: 0 for p in agente.productos[5:]}
+    topes[1] = 1
+    lista = TempleSimulado(100, 1, 0.9, 30).optimizar(agente.productos, 80, [], topes)
+    cantidades = {}
+    for producto, cantidad in lista:
+        cantidades[producto['id']] = cantidades.get(producto['id'], 0) + cantidad
+    print(f"\nLista con topes: {cantidades}")
+    assert all(cantidad <= topes.get(pid, cantidad) for pid, cantidad in cantidades.items())
+
+    libro = obtener_libro_stock('SUC001')
+    try:
+        agente.aplicar_cambios([{'op': 'stock', 'id': 1, 'stock': 1}])
+        assert libro.disponible(1) == 1
+
+        primero, segundo = AgenteComprador('STOCK_A'), AgenteComprador('STOCK_B')
+        for comprador in (primero, segundo):
+            comprador.ingresar_a_sucursal('SUC001')
+        item = [{'id': 1, 'nombre': 'Leche', 'cantidad': 1}]
+
+        primero.planificar_compra(item)
+        try:
+            segundo.planificar_compra(item)
+            assert False, "Se esperaba StockInsuficiente"
+        except StockInsuficiente:
+            assert segundo.estado == 'en_sucursal'
+
+        primero.reiniciar()
+        segundo.planificar_compra(item)
+        segundo.ejecutar_compra()
+        print(f"Disponible tras la compra: {libro.disponible(1)}")
+        assert libro.disponible(1) == 0
+
+        recomendaciones = agente.generar_recomendaciones(100)
+        for recomendacion in recomendaciones['recomendaciones']:
+            assert all(p['id'] != 1 for p in recomendacion['productos'])
+    finally:
+        libro.fijar_stock({1: None})
+        agente.recargar_inventario()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_ventas_persisten_y_reservas_vencen():
+    """Test 4: Las ventas confirmadas sobreviven a otros cambios y las reservas abandonadas vencen."""
+    print("\n" + "="*80)
+    print("TEST 4: Ventas confirmadas y vencimiento de reservas")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    libro = obtener_libro_stock('SUC001')
+    precio = agente.productos_por_id[1]['precio']
+    try:
+        agente.aplicar_cambios([{'op': 'stock', 'id': 1, 'stock': 5}])
+        comprador = AgenteComprador('STOCK_C')
+        comprador.ingresar_a_sucursal('SUC001')
+        comprador.planificar_compra([{'id': 1, 'nombre': 'Leche', 'cantidad': 3}])
+        comprador.ejecutar_compra()
+        assert libro.disponible(1) == 2
+
+        # Un cambio de precio no repone las unidades vendidas
+        agente.aplicar_cambios([{'op': 'precio', 'id': 1, 'precio': precio + 1}])
+        print(f"\nDisponible tras cambiar el precio: {libro.disponible(1)}")
+        assert libro.disponible(1) == 2
+
+        # Un agente nuevo comparte el libro sin volver a sincronizarlo
+        AgenteRecomendador('SUC001')
+        assert libro.disponible(1) == 2
+
+        # Recargar el archivo con otro stock registrado sigue descontando lo vendido
+        agente.aplicar_cambios([{'op': 'stock', 'id': 1, 'stock': 6}], desde_archivo=True)
+        assert libro.disponible(1) == 3
+
+        # Un recuento por la API fija el disponible tal cual
+        agente.aplicar_cambios([{'op': 'stock', 'id': 1, 'stock': 7}])
+        print(f"Disponible tras recontar 7 unidades: {libro.disponible(1)}")
+        assert libro.disponible(1) == 7
+        agente.aplicar_cambios([{'op': 'stock', 'id': 1, 'stock': 8}], desde_archivo=True)
+        assert libro.disponible(1) == 8
+    finally:
+        libro.fijar_stock({1: None})
+        agente.recargar_inventario()
+
+    libro = LibroStock('PRUEBA', vencimiento=0.05)
+    libro.sincronizar([{'id': 1, 'stock': 2}])
+    libro.reservar('ABANDONADA', {1: 2})
+    assert libro.disponible(1) == 0
+    time.sleep(0.1)
+    assert libro.topes() == {1: 2}
+    assert not libro.vigente('ABANDONADA') and libro.reservas_activas() == 0
+    assert libro.confirmar('ABANDONADA') == {}
+    print("Reserva abandonada liberada al vencer")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_sucursal_agotada_responde_409():
+    """Test 5: Sin stock disponible la compra responde 409 en lugar de fallar."""
+    print("\n" + "="*80)
+    print("TEST 5: Compra en una sucursal agotada")
+    print("="*80)
+
+    import app as servidor
+
+    servidor.agentes_recomendadores.descubrir()
+    cliente = servidor.app.test_client()
+    agente = AgenteRecomendador('SUC001')
+    libro = obtener_libro_stock('SUC001')
+    ids = [p['id'] for p in agente.productos]
+    try:
+        libro.fijar_stock({pid: 0 for pid in ids}, recuento=True)
+
+        respuesta = cliente.post('/api/comprador/crear', json={
+            'comprador_id': 'AGOTADA', 'sucursal_id': 'SUC001'
+        })
+        assert respuesta.status_code < 400
+        respuesta = cliente.post('/api/comprador/iniciar_compra', json={
+            'comprador_id': 'AGOTADA', 'sucursal_id': 'SUC001', 'presupuesto': 100.0
+        })
+        print(f"\niniciar_compra: {respuesta.status_code} {respuesta.get_json()}")
+        assert respuesta.status_code == 409
+        assert respuesta.get_json()['error'] == 'Stock insuficiente'
+
+        respuesta = cliente.post('/api/comprador/flujo_completo', json={
+            'sucursal_id': 'SUC001', 'presupuesto': 100.0
+        })
+        print(f"flujo_completo: {respuesta.status_code}")
+        assert respuesta.status_code == 409
+    finally:
+        servidor.agentes_compradores.pop('AGOTADA', None)
+        libro.fijar_stock({pid: None for pid in ids})
+        agente.recargar_inventario()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL LIBRO DE STOCK")
+    print("="*80)
+
+    try:
+        test_reservas_atomicas()
+        test_reservas_concurrentes()
+        test_recomendacion_y_compra_con_stock()
+        test_ventas_persisten_y_reservas_vencen()
+        test_sucursal_agotada_responde_409()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,83 @@
+"""
+Script de prueba para las métricas de latencia
+Valida los histogramas de los agentes y la exposición en formato Prometheus.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from utils.algoritmos_busqueda import TempleSimulado
+from utils.metricas import SPAN_NULO, metricas, medir, reiniciar_etiquetas
+
+
+def test_histogramas_de_agentes():
+    """Test 1: Temple Simulado y A* registran sus métricas por sucursal."""
+    print("\n" + "="*80)
+    print("TEST 1: Histogramas de los agentes")
+    print("="*80)
+
+    metricas.reiniciar()
+    reiniciar_etiquetas(endpoint='prueba')
+
+    comprador = AgenteComprador('COMP_MET')
+    comprador.ingresar_a_sucursal('SUC001')
+    comprador.planificar_compra([{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1}])
+
+    temple = TempleSimulado(temperatura_inicial=10.0, iteraciones_por_temperatura=10)
+    temple.optimizar(comprador.inventario_sucursal['productos'], 50.0)
+
+    texto = metricas.exponer()
+    lineas = [l for l in texto.splitlines() if 'endpoint="prueba"' in l]
+    for linea in lineas:
+        if '_count' in linea:
+            print(f"  {linea}")
+
+    assert 'supermercado_astar_nodos_expandidos_count{endpoint="prueba",sucursal="SUC001"}' in texto
+    assert '# TYPE supermercado_temple_iteraciones histogram' in texto
+    assert 'supermercado_temple_iteraciones_sum{endpoint="prueba",sucursal="SUC001"} 450' in texto
+    assert 'le="+Inf"' in texto
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_metricas_deshabilitadas():
+    """Test 2: Sin métricas, medir retorna el span nulo y no registra nada."""
+    print("\n" + "="*80)
+    print("TEST 2: Métricas deshabilitadas")
+    print("="*80)
+
+    metricas.reiniciar()
+    histograma = metricas.histograma('prueba_segundos', 'Histograma de prueba')
+    metricas.habilitado = False
+    try:
+        span = medir(histograma)
+        with span:
+            pass
+    finally:
+        metricas.habilitado = True
+
+    assert span is SPAN_NULO
+    assert 'supermercado_prueba_segundos_count' not in metricas.exponer()
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE MÉTRICAS")
+    print("="*80)
+
+    try:
+        test_histogramas_de_agentes()
+        test_metricas_deshabilitadas()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,138 @@
+"""
+Script de prueba para los optimizadores de listas de compras
+Valida los backends alternativos al temple (voraz, tabú, ramificación y
+poda), su integración con el agente recomendador y el selector.
+"""
+
+import itertools
+import random
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils import algoritmos_busqueda, optimizadores
+from utils.generador_sucursales import generar_inventario
+from utils.indice_productos import IndiceProductos
+from utils.optimizadores import (
+    OPTIMIZADORES, RamificacionYPoda, crear_optimizador, seleccionar_optimizador
+)
+
+CATEGORIAS = ['lacteos', 'verduras']
+
+
+def test_backends():
+    """Test 1: Todos los backends respetan topes, son reproducibles y dan costos bajos."""
+    print("\n" + "="*80)
+    print("TEST 1: Backends de optimización")
+    print("="*80)
+
+    productos = generar_inventario('OPT', 3500, 15, 2)['productos']
+    indice = IndiceProductos(productos)
+    topes = {p['id']: 1 for p in productos[:500]}
+    topes.update({p['id']: 0 for p in indice.mas_importantes(20)})
+
+    for nombre in OPTIMIZADORES:
+        optimizador = crear_optimizador(nombre)
+        lista = optimizador.optimizar(productos, 200, CATEGORIAS, topes, indice, random.Random(3))
+        repetida = optimizador.optimizar(productos, 200, CATEGORIAS, topes, indice, random.Random(3))
+        costo = optimizador.calcular_costo(lista, 200, CATEGORIAS, productos)
+        print(f"\n{nombre:<13} costo {costo:8.3f} | {len(lista)} productos")
+
+        assert [(p['id'], c) for p, c in lista] == [(p['id'], c) for p, c in repetida]
+        cantidades = {}
+        for producto, cantidad in lista:
+            cantidades[producto['id']] = cantidades.get(producto['id'], 0) + cantidad
+        assert all(c <= topes.get(pid, c) for pid, c in cantidades.items())
+        assert costo < 25
+
+    try:
+        crear_optimizador('inexistente')
+        assert False, "Se esperaba ValueError"
+    except ValueError as e:
+        print(f"\nOptimizador desconocido: {e}")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_ramificacion_exacta():
+    """Test 2: Con pocos productos la ramificación y poda encuentra el óptimo."""
+    print("\n" + "="*80)
+    print("TEST 2: Ramificación y poda contra búsqueda exhaustiva")
+    print("="*80)
+
+    productos = generar_inventario('OPT', 6, 3, 4)['productos']
+    optimizador = RamificacionYPoda()
+    peso_original = algoritmos_busqueda.PESO_PRESUPUESTO
+    # La cota debe seguir siendo válida con un peso de presupuesto distinto de 1
+    for peso, presupuesto in ((peso_original, 15), (peso_original, 40), (peso_original, 90), (0.05, 15)):
+        algoritmos_busqueda.PESO_PRESUPUESTO = optimizadores.PESO_PRESUPUESTO = peso
+        try:
+            lista = optimizador.optimizar(productos, presupuesto, ['lacteos'])
+            costo = optimizador.calcular_costo(lista, presupuesto, ['lacteos'], productos)
+
+            rangos = [
+                range(min(max(3 * p.get('cantidad_tipica', 1), -(-presupuesto // (len(productos) * p['precio']))),
+                          int(presupuesto * 1.05 // p['precio'])) + 1)
+                for p in productos
+            ]
+            optimo = min(
+                optimizador.calcular_costo(
+                    [(p, c) for p, c in zip(productos, cantidades) if c], presupuesto, ['lacteos'], productos
+                )
+                for cantidades in itertools.product(*rangos)
+            )
+        finally:
+            algoritmos_busqueda.PESO_PRESUPUESTO = optimizadores.PESO_PRESUPUESTO = peso_original
+        print(f"\nPresupuesto {presupuesto} (peso {peso}): costo {costo:.3f} | óptimo {optimo:.3f}")
+        assert abs(costo - optimo) < 1e-9
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_agente_y_selector():
+    """Test 3: El agente usa el optimizador pedido y el selector según la latencia."""
+    print("\n" + "="*80)
+    print("TEST 3: Optimizador en el agente recomendador")
+    print("="*80)
+
+    assert seleccionar_optimizador(35000, 5) == 'voraz'
+    assert seleccionar_optimizador(35000, 100) == 'ramificacion'
+    assert seleccionar_optimizador(35, 100) == 'tabu'
+    assert seleccionar_optimizador(35, 1000) == 'temple'
+
+    agente = AgenteRecomendador('SUC001')
+    for nombre in ('voraz', 'ramificacion', 'auto'):
+        resultado = agente.generar_recomendaciones(150.0, ['lacteos'], semilla=7, optimizador=nombre)
+        print(f"\n{nombre}: {resultado['optimizador']} | "
+              f"totales {[r['total'] for r in resultado['recomendaciones']]}")
+        assert len(resultado['recomendaciones']) == 3
+        assert resultado['optimizador'] == (nombre if nombre != 'auto' else seleccionar_optimizador(35))
+
+    try:
+        agente.generar_recomendaciones(150.0, optimizador='inexistente')
+        assert False, "Se esperaba ValueError"
+    except ValueError:
+        pass
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE OPTIMIZADORES")
+    print("="*80)
+
+    try:
+        test_backends()
+        test_ramificacion_exacta()
+        test_agente_y_selector()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
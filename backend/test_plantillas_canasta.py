@@ -0,0 +1,99 @@
+"""
+Script de prueba para las plantillas de canasta precalculadas
+Valida la tabla compacta, el precálculo reproducible y que el agente
+responda desde las plantillas solo dentro de la grilla.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_recomendador import AgenteRecomendador
+from utils.plantillas_canasta import TablaPlantillas
+
+
+def test_tabla():
+    """Test 1: Plantilla más cercana dentro de la distancia máxima."""
+    print("\n" + "="*80)
+    print("TEST 1: Tabla de plantillas")
+    print("="*80)
+
+    productos = [{'id': i, 'precio': 10.0} for i in range(3)]
+    tabla = TablaPlantillas(version=1)
+    tabla.agregar(['lacteos'], 100.0, [(productos[0], 4), (productos[1], 6)])
+    tabla.agregar(['lacteos'], 200.0, [(productos[2], 20)])
+
+    assert tabla.mas_cercana(['lacteos'], 105.0) == (100.0, [(0, 4), (1, 6)])
+    assert tabla.mas_cercana(['lacteos'], 190.0) == (200.0, [(2, 20)])
+    assert tabla.mas_cercana(['lacteos'], 150.0) is None     # fuera de la grilla (10%)
+    assert tabla.mas_cercana([], 100.0) is None
+
+    copia = TablaPlantillas(version=1)
+    assert copia.copiar(tabla, ['lacteos'], 200.0)
+    assert not copia.copiar(tabla, ['lacteos'], 300.0)
+    assert len(copia) == 1 and copia.conjuntos() == [frozenset(['lacteos'])]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_plantillas_agente():
+    """Test 2: El agente repara plantillas cercanas y optimiza el resto."""
+    print("\n" + "="*80)
+    print("TEST 2: Plantillas en el agente recomendador")
+    print("="*80)
+
+    agente = AgenteRecomendador('SUC001')
+    conjuntos = [[], ['lacteos']]
+    tabla = agente.precalcular_plantillas(conjuntos, presupuestos=(100.0, 150.0))
+    assert len(tabla) == 4 and agente.plantillas is tabla
+    repetida = agente.precalcular_plantillas(conjuntos, presupuestos=(100.0, 150.0))
+    assert repetida.mas_cercana(['lacteos'], 100.0) == tabla.mas_cercana(['lacteos'], 100.0)
+
+    cercana = agente.generar_recomendaciones(104.0, ['lacteos'])
+    print(f"\n104 Bs.: {cercana['plantillas']} plantillas | "
+          f"{[r['total'] for r in cercana['recomendaciones']]}")
+    assert cercana['plantillas'] == 3
+    assert abs(cercana['recomendaciones'][0]['diferencia']) <= 1.0
+
+    # Con semilla se omiten salvo que se pidan, para que la semilla reproduzca el resultado
+    con_semilla = agente.generar_recomendaciones(104.0, ['lacteos'], semilla=1)
+    sin_plantillas = agente.generar_recomendaciones(104.0, ['lacteos'], semilla=1, usar_plantillas=False)
+    assert con_semilla['recomendaciones'] == sin_plantillas['recomendaciones']
+    assert agente.generar_recomendaciones(
+        104.0, ['lacteos'], semilla=1, usar_plantillas=True
+    )['plantillas'] == 3
+
+    for solicitud in (
+        con_semilla,
+        agente.generar_recomendaciones(300.0, ['lacteos']),          # fuera de la grilla
+        agente.generar_recomendaciones(100.0, ['verduras']),         # otro conjunto
+        agente.generar_recomendaciones(100.0, ['lacteos'], optimizador='voraz'),
+        agente.generar_recomendaciones(100.0, ['lacteos'], usar_plantillas=False),
+    ):
+        assert solicitud['plantillas'] == 0
+
+    # Una versión nueva del inventario invalida la tabla
+    producto = agente.productos[0]
+    agente.aplicar_cambios([{'op': 'precio', 'id': producto['id'], 'precio': producto['precio']}])
+    assert agente.generar_recomendaciones(104.0, ['lacteos'])['plantillas'] == 0
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE PLANTILLAS DE CANASTA")
+    print("="*80)
+
+    try:
+        test_tabla()
+        test_plantillas_agente()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
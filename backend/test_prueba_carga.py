@@ -0,0 +1,91 @@
+"""
+Script de prueba para el generador de carga
+Valida el calendario de llegadas y el conteo de latencias y errores usando
+un transporte en memoria, sin iniciar el servidor.
+"""
+
+import asyncio
+import threading
+
+from prueba_carga import ejecutar_carga, tiempos_llegada
+
+
+class TransporteMemoria:
+    """Transporte que responde al instante y falla en los compradores indicados."""
+
+    def __init__(self, fallar_en: str = None):
+        self.fallar_en = fallar_en
+        self.rutas = []
+        self._candado = threading.Lock()
+
+    def post(self, ruta, datos):
+        with self._candado:
+            self.rutas.append(ruta)
+        if self.fallar_en and datos.get('comprador_id', '').endswith(self.fallar_en):
+            return 500, {}
+        return 200, {}
+
+    def recomendacion_ws(self, datos):
+        return True, {'recomendaciones': []}
+
+
+def test_tiempos_llegada():
+    """Test 1: Llegadas constantes y de Poisson son deterministas y crecientes."""
+    print("\n" + "="*80)
+    print("TEST 1: Calendario de llegadas")
+    print("="*80)
+
+    constantes = tiempos_llegada(5, 10.0, 'constante', 1)
+    poisson = tiempos_llegada(1000, 50.0, 'poisson', 1)
+    print(f"\nConstantes: {constantes}")
+    print(f"Poisson: último instante {poisson[-1]:.2f} s (esperado ~20 s)")
+
+    assert [round(t, 6) for t in constantes] == [0.0, 0.1, 0.2, 0.3, 0.4]
+    assert poisson == tiempos_llegada(1000, 50.0, 'poisson', 1)
+    assert all(a <= b for a, b in zip(poisson, poisson[1:]))
+    assert 15 < poisson[-1] < 25
+    assert tiempos_llegada(3, 0, 'poisson', 1) == [0.0, 0.0, 0.0]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_resumen_con_errores():
+    """Test 2: El resumen cuenta peticiones, errores y compradores completos."""
+    print("\n" + "="*80)
+    print("TEST 2: Resumen de la carga")
+    print("="*80)
+
+    transporte = TransporteMemoria(fallar_en='_00003')
+    resumen = asyncio.run(ejecutar_carga(
+        transporte, compradores=20, tasa=0, concurrencia=4, proporcion_ws=1.0
+    ))
+    operaciones = resumen['operaciones']
+    print(f"\nCompletos: {resumen['compradores_completos']} | "
+          f"fallidos: {resumen['compradores_fallidos']}")
+
+    assert resumen['compradores_completos'] == 19
+    assert resumen['compradores_fallidos'] == 1
+    assert operaciones['ws_recomendacion']['peticiones'] == 20
+    # El comprador que falla al crearse no continúa el flujo
+    assert operaciones['crear']['errores'] == 1
+    assert operaciones['iniciar_compra']['peticiones'] == 19
+    assert len(transporte.rutas) == 20 + 19 + 19
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE LA PRUEBA DE CARGA")
+    print("="*80)
+
+    try:
+        test_tiempos_llegada()
+        test_resumen_con_errores()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,104 @@
+"""
+Script de prueba para el subsistema de registro
+Valida niveles, contexto por agente, escritura asíncrona y muestreo.
+"""
+
+import io
+import json
+import logging
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from utils.registro import RAIZ, configurar_registro, detener_registro, obtener_logger
+
+
+def _restaurar_registro():
+    detener_registro()
+    raiz = logging.getLogger(RAIZ)
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+    raiz.setLevel(logging.NOTSET)
+    raiz.propagate = True
+
+
+def test_registro_estructurado_con_contexto():
+    """Test 1: Registros JSON asíncronos con el contexto del agente."""
+    print("\n" + "="*80)
+    print("TEST 1: Registro estructurado con contexto de agente")
+    print("="*80)
+
+    salida = io.StringIO()
+    configurar_registro(nivel='DEBUG', formato='json', asincrono=True, destino=salida)
+    try:
+        comprador = AgenteComprador('COMP_LOG')
+        comprador.ingresar_a_sucursal('SUC001')
+        comprador.planificar_compra([{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1}])
+        try:
+            raise RuntimeError('falla de prueba')
+        except RuntimeError:
+            obtener_logger('comprador', comprador_id='COMP_LOG').exception('Compra fallida')
+    finally:
+        detener_registro()
+        _restaurar_registro()
+
+    registros = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    print(f"\nRegistros emitidos: {len(registros)}")
+    for registro in registros[:3]:
+        print(f"  {registro['nivel']} {registro['componente']}: {registro['mensaje']}")
+
+    assert registros
+    assert all(r['comprador_id'] == 'COMP_LOG' for r in registros)
+    assert all(r['componente'] == 'supermercado.comprador' for r in registros)
+    # La traza llega al formateador aunque el registro pase por la cola
+    assert registros[-1]['mensaje'] == 'Compra fallida'
+    assert 'RuntimeError: falla de prueba' in registros[-1]['excepcion']
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_niveles_y_muestreo():
+    """Test 2: El nivel descarta DEBUG y los eventos frecuentes se muestrean."""
+    print("\n" + "="*80)
+    print("TEST 2: Niveles y muestreo")
+    print("="*80)
+
+    salida = io.StringIO()
+    configurar_registro(nivel='INFO', asincrono=False, muestreo={'frecuente': 10}, destino=salida)
+    try:
+        registro = obtener_logger('prueba', sucursal_id='SUC001')
+        registro.debug("no debe aparecer")
+        for i in range(100):
+            registro.info("evento %d", i, extra={'evento': 'frecuente'})
+        registro.warning("siempre aparece")
+    finally:
+        _restaurar_registro()
+
+    lineas = salida.getvalue().splitlines()
+    print(f"\nLíneas emitidas: {len(lineas)}")
+
+    assert not any('no debe aparecer' in l for l in lineas)
+    assert sum('evento' in l for l in lineas) == 10
+    assert 'sucursal_id=SUC001' in lineas[-1]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL REGISTRO")
+    print("="*80)
+
+    try:
+        test_registro_estructurado_con_contexto()
+        test_niveles_y_muestreo()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,217 @@
+"""
+Script de prueba para la replanificación incremental
+Valida la búsqueda D* Lite ante cambios del mapa y la reparación de las rutas
+de los compradores cuando se bloquea un pasillo, aun con zonas que el plan
+no alcanzaba o compradores cuya reparación falla.
+"""
+
+import sys
+import os
+import random
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from models.modelo_sucursal import obtener_modelo_sucursal
+from models.replanificador import obtener_replanificador
+from models.tabla_reservas import obtener_tabla_reservas
+from utils.generador_sucursales import generar_sucursal
+from utils.grilla_ponderada import GrillaPonderada
+from utils.planificador_incremental import BusquedaIncremental
+
+
+def test_busqueda_incremental():
+    """Test 1: D* Lite da el costo óptimo antes y después de cambiar obstáculos."""
+    print("\n" + "="*80)
+    print("TEST 1: Búsqueda incremental ante cambios del mapa")
+    print("="*80)
+
+    mapa, _ = generar_sucursal('SUC903', productos=300, categorias=20,
+                               filas=45, columnas=60, semilla=2)
+    grilla = GrillaPonderada(mapa, landmarks=0)
+    caja = (mapa['caja']['fila'], mapa['caja']['columna'])
+    zonas = sorted((z['fila'], z['columna']) for z in mapa['zonas_productos'].values())[::5]
+    busqueda = BusquedaIncremental(grilla, caja)
+
+    def verificar(grilla):
+        for zona in zonas:
+            exacto = grilla.dijkstra(grilla.celda(zona))[grilla.celda(caja)]
+            ruta = busqueda.buscar_ruta(zona)
+            assert ruta[0] == zona and ruta[-1] == caja
+            assert all(grilla.es_valida(posicion) for posicion in ruta)
+            assert grilla.costo_ruta(ruta) == exacto
+
+    verificar(grilla)
+    nodos_iniciales = busqueda.nodos_expandidos
+
+    rng = random.Random(5)
+    protegidas = set(zonas) | {caja}
+    libres = [
+        (f, c) for f in range(45) for c in range(60)
+        if grilla.es_valida((f, c)) and (f, c) not in protegidas
+    ]
+    for _ in range(3):
+        agregar = rng.sample(libres, 15)
+        libres = [posicion for posicion in libres if posicion not in agregar]
+        nueva = grilla.con_obstaculos(agregar, [])
+        # La grilla derivada es igual a la compilada desde cero
+        mapa = dict(mapa)
+        mapa['obstaculos'] = mapa['obstaculos'] + [{'fila': f, 'columna': c} for f, c in agregar]
+        assert nueva.adyacencia == GrillaPonderada(mapa).adyacencia
+        assert grilla.es_valida(agregar[0]) and not nueva.es_valida(agregar[0])
+
+        antes = busqueda.nodos_expandidos
+        busqueda.actualizar_grilla(nueva, agregar)
+        verificar(nueva)
+        print(f"Nodos para reparar {len(zonas)} rutas: {busqueda.nodos_expandidos - antes} "
+              f"(búsqueda inicial: {nodos_iniciales})")
+        assert busqueda.nodos_expandidos - antes < nodos_iniciales
+        grilla = nueva
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_reparar_rutas_de_compradores():
+    """Test 2: Al bloquear un pasillo se reparan las rutas en curso de la sucursal."""
+    print("\n" + "="*80)
+    print("TEST 2: Reparación de rutas al bloquear un pasillo")
+    print("="*80)
+
+    tabla = obtener_tabla_reservas('SUC001')
+    reloj = tabla.reloj
+    tabla.reloj = lambda: 0.0
+    replanificador = obtener_replanificador('SUC001')
+    compradores = []
+    bloqueadas = []
+    try:
+        listas = [
+            [{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1},
+             {'id': 10, 'nombre': 'Papel Higiénico x4', 'cantidad': 1}],
+            [{'id': 3, 'nombre': 'Arroz Blanco 1kg', 'cantidad': 1}],
+        ]
+        for i, cooperativo in enumerate((False, True)):
+            comprador = AgenteComprador(f'REPLAN{i:03d}', cooperativo=cooperativo)
+            comprador.ingresar_a_sucursal('SUC001')
+            comprador.planificar_compra(listas[i])
+            compradores.append(comprador)
+        assert replanificador.compradores_activos() >= 2
+
+        # Diez pasos después, se bloquea una celda de lo que falta de la primera ruta
+        tabla.reloj = lambda: 10 * tabla.segundos_por_paso
+        comprador = compradores[0]
+        anterior = comprador.ruta_completa
+        paso = comprador.paso_actual
+        assert paso == 10
+        modelo = obtener_modelo_sucursal('SUC001')
+        protegidas = {modelo.entrada, modelo.caja} | set(modelo.posiciones_productos.values())
+        bloqueadas = [next(p for p in anterior[paso + 1:] if p not in protegidas)]
+
+        resumen = replanificador.aplicar_cambios(agregar=bloqueadas)
+        print(f"Resumen: {resumen}")
+        assert comprador.comprador_id in resumen['rutas_reparadas']
+        assert not resumen['sin_ruta']
+
+        ruta = comprador.ruta_completa
+        print(f"Pasos antes: {len(anterior) - 1}, después: {len(ruta) - 1}")
+        assert ruta[:paso + 1] == anterior[:paso + 1]
+        assert bloqueadas[0] not in ruta[paso:]
+        assert ruta[-1] == comprador.modelo.caja
+        assert comprador.modelo is obtener_modelo_sucursal('SUC001')
+        assert all(p.posicion in ruta for p in comprador.productos_recolectados)
+        assert comprador.distancia_total == sum(1 for a, b in zip(ruta, ruta[1:]) if a != b)
+
+        # No se puede bloquear la caja
+        try:
+            replanificador.aplicar_cambios(agregar=[modelo.caja])
+            assert False, "Se esperaba ValueError"
+        except ValueError as e:
+            print(f"Cambio inválido rechazado: {e}")
+
+        compradores[1].ejecutar_compra()
+        assert replanificador.compradores_activos() >= 1
+    finally:
+        if bloqueadas:
+            replanificador.aplicar_cambios(quitar=bloqueadas)
+        for comprador in compradores:
+            comprador.reiniciar()
+        tabla.reloj = reloj
+
+    assert not (set(bloqueadas) & obtener_modelo_sucursal('SUC001').obstaculos)
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_zona_inalcanzable_y_fallos():
+    """Test 3: Se repara la ruta aunque una zona planificada no fuera alcanzable."""
+    print("\n" + "="*80)
+    print("TEST 3: Zonas inalcanzables y fallos al reparar")
+    print("="*80)
+
+    tabla = obtener_tabla_reservas('SUC001')
+    reloj = tabla.reloj
+    tabla.reloj = lambda: 0.0
+    replanificador = obtener_replanificador('SUC001')
+    modelo = obtener_modelo_sucursal('SUC001')
+    protegidas = {modelo.entrada, modelo.caja} | set(modelo.posiciones_productos.values())
+
+    # Se encierra la zona del arroz para que el plan no la alcance
+    fila, columna = modelo.posiciones_productos[3]
+    vecinas = [(fila - 1, columna), (fila + 1, columna), (fila, columna - 1), (fila, columna + 1)]
+    encierro = [p for p in vecinas if p not in modelo.obstaculos and p not in protegidas]
+    bloqueadas = []
+
+    class CompradorDefectuoso:
+        comprador_id = 'REPLAN_DEFECTUOSO'
+
+        def reparar_ruta(self, modelo, busqueda_hacia):
+            raise RuntimeError("fallo inesperado")
+
+    comprador = AgenteComprador('REPLAN010', cooperativo=False)
+    try:
+        replanificador.aplicar_cambios(agregar=encierro)
+        comprador.ingresar_a_sucursal('SUC001')
+        comprador.planificar_compra([
+            {'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1},
+            {'id': 3, 'nombre': 'Arroz Blanco 1kg', 'cantidad': 1},
+        ])
+        anterior = comprador.ruta_completa
+        assert (fila, columna) not in anterior
+        replanificador.registrar(CompradorDefectuoso())
+
+        tabla.reloj = lambda: 3 * tabla.segundos_por_paso
+        paso = comprador.paso_actual
+        bloqueadas = [next(p for p in anterior[paso + 1:] if p not in protegidas)]
+        resumen = replanificador.aplicar_cambios(agregar=bloqueadas)
+        print(f"Resumen: {resumen}")
+        assert comprador.comprador_id in resumen['rutas_reparadas']
+        assert resumen['sin_ruta'] == ['REPLAN_DEFECTUOSO']
+        assert bloqueadas[0] not in comprador.ruta_completa[paso:]
+        assert comprador.ruta_completa[-1] == modelo.caja
+    finally:
+        replanificador.retirar('REPLAN_DEFECTUOSO')
+        replanificador.aplicar_cambios(quitar=encierro + bloqueadas)
+        comprador.reiniciar()
+        tabla.reloj = reloj
+
+    assert not (set(encierro + bloqueadas) & obtener_modelo_sucursal('SUC001').obstaculos)
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE REPLANIFICACIÓN INCREMENTAL")
+    print("="*80)
+
+    try:
+        test_busqueda_incremental()
+        test_reparar_rutas_de_compradores()
+        test_zona_inalcanzable_y_fallos()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
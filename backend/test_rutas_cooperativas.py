@@ -0,0 +1,230 @@
+"""
+Script de prueba para las rutas cooperativas
+Valida la tabla de reservas de espacio-tiempo, el A* de espacio-tiempo (con
+celdas lentas reservadas varios pasos) y que los compradores de una misma
+sucursal no choquen entre sí.
+"""
+
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from models.agente_comprador import AgenteComprador
+from models.modelo_sucursal import obtener_modelo_sucursal
+from models.tabla_reservas import TablaReservas, obtener_tabla_reservas
+from utils.algoritmos_busqueda import BusquedaAEstrella
+from utils.busqueda_espacio_tiempo import BusquedaEspacioTiempo
+
+
+def mapa_pasillo(columnas: int = 7, nicho: int = 5) -> dict:
+    """Pasillo de una fila con un nicho para ceder el paso."""
+    return {
+        'dimensiones': {'filas': 2, 'columnas': columnas},
+        'obstaculos': [
+            {'fila': 1, 'columna': c} for c in range(columnas) if c != nicho
+        ]
+    }
+
+
+def sin_conflictos(rutas, tiempos) -> bool:
+    """Verifica que ningún par de rutas comparta celda ni se cruce en un paso."""
+    ocupacion = {}
+    for comprador, (ruta, t0) in enumerate(zip(rutas, tiempos)):
+        for i, posicion in enumerate(ruta):
+            if ocupacion.setdefault((posicion, t0 + i), comprador) != comprador:
+                return False
+    for comprador, (ruta, t0) in enumerate(zip(rutas, tiempos)):
+        for i in range(1, len(ruta)):
+            otro = ocupacion.get((ruta[i], t0 + i - 1))
+            if otro not in (None, comprador) and ocupacion.get((ruta[i - 1], t0 + i)) == otro:
+                return False
+    return True
+
+
+def test_tabla_reservas():
+    """Test 1: Reservar, detectar conflictos, liberar y vencer reservas."""
+    print("\n" + "="*80)
+    print("TEST 1: Tabla de reservas")
+    print("="*80)
+
+    reloj = [0.0]
+    tabla = TablaReservas('PRUEBA', (3, 3), segundos_por_paso=1.0, reloj=lambda: reloj[0])
+    assert tabla.reservar('A', [(0, 0), (0, 1), (0, 2)], 0)
+    assert tabla.intervalo('A') == (0, 2)
+    assert tabla.primer_paso_libre((0, 1), 0) == 0
+    assert tabla.primer_paso_libre((0, 1), 1) == 2
+
+    assert tabla.ocupante((0, 1), 1) == 'A'
+    assert tabla.ocupante((0, 1), 2) is None
+    assert tabla.tiempo_maximo == 2
+    # Misma celda en el mismo paso
+    assert tabla.hay_conflicto((1, 1), (0, 1), 0)
+    # Cruce de frente: A va de (0,1) a (0,2) mientras B va de (0,2) a (0,1)
+    assert tabla.hay_conflicto((0, 2), (0, 1), 1)
+    # Las reservas propias no cuentan
+    assert not tabla.hay_conflicto((1, 1), (0, 1), 0, 'A')
+    assert not tabla.reservar('B', [(1, 1), (0, 1)], 0)
+    assert tabla.reservar('B', [(1, 1), (1, 1), (0, 1)], 0)
+    print(f"Celdas reservadas: {len(tabla)}, compradores: {tabla.compradores_activos()}")
+
+    tabla.liberar('A')
+    assert tabla.ocupante((0, 0), 0) is None
+    assert tabla.ocupante((0, 1), 2) == 'B'
+
+    # Al reservar se vencen las rutas que ya terminaron
+    reloj[0] = 10.0
+    assert tabla.reservar('C', [(2, 2)], tabla.tiempo_actual())
+    assert tabla.compradores_activos() == 1
+    assert tabla.ocupante((0, 1), 2) is None
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_sin_reservas_equivale_a_estrella():
+    """Test 2: Sin reservas, la ruta es la misma que la de A*."""
+    print("\n" + "="*80)
+    print("TEST 2: A* de espacio-tiempo sin reservas")
+    print("="*80)
+
+    modelo = obtener_modelo_sucursal('SUC001')
+    tabla = TablaReservas('PRUEBA', modelo.dimensiones)
+    espacio_tiempo = BusquedaEspacioTiempo()
+    a_estrella = BusquedaAEstrella()
+
+    destinos = sorted(set(modelo.posiciones_productos.values()))[:10] + [modelo.caja]
+    for destino in destinos:
+        esperada = a_estrella.buscar_ruta(modelo.entrada, destino, modelo.mapa)
+        ruta = espacio_tiempo.buscar_ruta_reservada(modelo.entrada, destino, modelo.mapa, tabla, 100)
+        assert ruta == esperada, destino
+    print(f"Rutas comparadas: {len(destinos)}")
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_ceder_el_paso():
+    """Test 3: Dos compradores en sentidos opuestos de un pasillo no se cruzan."""
+    print("\n" + "="*80)
+    print("TEST 3: Ceder el paso en un pasillo")
+    print("="*80)
+
+    mapa = mapa_pasillo()
+    tabla = TablaReservas('PRUEBA', (2, 7), reloj=lambda: 0.0)
+    busqueda = BusquedaEspacioTiempo()
+
+    ida = busqueda.buscar_ruta_reservada((0, 0), (0, 6), mapa, tabla, 0, 'A')
+    assert tabla.reservar('A', ida, 0)
+    vuelta = busqueda.buscar_ruta_reservada((0, 6), (0, 0), mapa, tabla, 0, 'B')
+    assert tabla.reservar('B', vuelta, 0)
+
+    print(f"Ida:    {ida}")
+    print(f"Vuelta: {vuelta}")
+    assert len(ida) == 7
+    # La vuelta tiene que apartarse al nicho para dejar pasar
+    assert (1, 5) in vuelta
+    assert sin_conflictos([ida, vuelta], [0, 0])
+
+    # Sin lugar donde apartarse a tiempo, se recurre a la ruta sin reservas
+    cerrado = mapa_pasillo(nicho=3)
+    otra = TablaReservas('PRUEBA', (2, 7), reloj=lambda: 0.0)
+    assert otra.reservar('A', busqueda.buscar_ruta_reservada((0, 0), (0, 6), cerrado, otra, 0, 'A'), 0)
+    ruta = busqueda.buscar_ruta_reservada((0, 6), (0, 0), cerrado, otra, 0, 'B')
+    assert len(ruta) == 7
+    assert not otra.reservar('B', ruta, 0)
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_celdas_lentas():
+    """Test 4: Una celda de costo 2.5 se reserva durante 3 pasos."""
+    print("\n" + "="*80)
+    print("TEST 4: Celdas lentas en la tabla de reservas")
+    print("="*80)
+
+    mapa = dict(mapa_pasillo(), costos_celdas=[{'fila': 0, 'columna': 3, 'costo': 2.5}])
+    tabla = TablaReservas('PRUEBA', (2, 7), reloj=lambda: 0.0)
+    busqueda = BusquedaEspacioTiempo()
+
+    ida = busqueda.buscar_ruta_reservada((0, 0), (0, 6), mapa, tabla, 0, 'A')
+    print(f"Ida:    {ida}")
+    assert ida == [(0, 0), (0, 1), (0, 2), (0, 3), (0, 3), (0, 3), (0, 4), (0, 5), (0, 6)]
+    assert tabla.reservar('A', ida, 0)
+    assert [tabla.ocupante((0, 3), t) for t in range(2, 7)] == [None, 'A', 'A', 'A', None]
+
+    # La vuelta tiene en cuenta los pasos que A pasa en la celda lenta
+    vuelta = busqueda.buscar_ruta_reservada((0, 6), (0, 0), mapa, tabla, 0, 'B')
+    print(f"Vuelta: {vuelta}")
+    assert tabla.reservar('B', vuelta, 0)
+    assert vuelta.count((0, 3)) == 3
+    assert sin_conflictos([ida, vuelta], [0, 0])
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_compradores_concurrentes():
+    """Test 5: Muchos compradores en la sucursal, sin conflictos entre sus rutas."""
+    print("\n" + "="*80)
+    print("TEST 5: Compradores concurrentes en SUC001")
+    print("="*80)
+
+    tabla = obtener_tabla_reservas('SUC001')
+    activos = tabla.compradores_activos()
+    reloj = tabla.reloj
+    tabla.reloj = lambda: 0.0
+    compradores = []
+    try:
+        listas = [
+            [{'id': 1, 'nombre': 'Leche Entera 1L', 'cantidad': 1}],
+            [{'id': 3, 'nombre': 'Arroz Blanco 1kg', 'cantidad': 1}],
+            [{'id': 10, 'nombre': 'Papel Higiénico x4', 'cantidad': 1}],
+        ]
+        for i in range(30):
+            comprador = AgenteComprador(f'COOP{i:03d}', cooperativo=True)
+            comprador.ingresar_a_sucursal('SUC001')
+            comprador.planificar_compra(listas[i % len(listas)])
+            compradores.append(comprador)
+
+        rutas = [comprador.ruta_completa for comprador in compradores]
+        inicios = [tabla.intervalo(comprador.comprador_id)[0] for comprador in compradores]
+        esperas = sum(comprador.pasos_espera for comprador in compradores)
+        print(f"Compradores: {len(compradores)}, pasos de espera en total: {esperas}")
+        print(f"Último ingreso en el paso {max(inicios)}")
+        assert all(ruta[-1] == compradores[0].modelo.caja for ruta in rutas)
+        # La entrada se ocupa de a un comprador por paso
+        assert sorted(inicios) == list(range(len(compradores)))
+        assert sin_conflictos(rutas, inicios)
+
+        resultado = compradores[-1].obtener_resultado()
+        acciones = [paso['accion'] for paso in resultado['ruta_detallada']]
+        assert acciones.count('esperar') == resultado['pasos_espera']
+        assert len(acciones) == resultado['distancia_total'] + resultado['pasos_espera'] + 1
+    finally:
+        for comprador in compradores:
+            comprador.reiniciar()
+        tabla.reloj = reloj
+
+    # Al reiniciarse, los compradores liberan sus celdas
+    assert tabla.compradores_activos() == activos
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DE RUTAS COOPERATIVAS")
+    print("="*80)
+
+    try:
+        test_tabla_reservas()
+        test_sin_reservas_equivale_a_estrella()
+        test_ceder_el_paso()
+        test_celdas_lentas()
+        test_compradores_concurrentes()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,96 @@
+"""
+Script de prueba para el temple paralelo (intercambio de réplicas)
+Valida las estadísticas de intercambio, el respeto del stock y que las
+réplicas den el mismo resultado en procesos separados, que reutilizan entre
+ejecuciones.
+"""
+
+import random
+import sys
+import os
+
+# Agregar el directorio server al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'server'))
+
+from utils.generador_sucursales import generar_inventario
+from utils.indice_productos import IndiceProductos
+from utils.temple_paralelo import TempleParalelo
+from utils import trabajadores
+
+CATEGORIAS = ['lacteos', 'verduras']
+
+
+def test_estadisticas_intercambio():
+    """Test 1: Se reportan intentos y aceptaciones por par de réplicas vecinas."""
+    print("\n" + "="*80)
+    print("TEST 1: Estadísticas de intercambio")
+    print("="*80)
+
+    productos = generar_inventario('PAR', 350, 15, 2)['productos']
+    temple = TempleParalelo(replicas=5, pasos_por_replica=1000)
+    lista, estadisticas = temple.optimizar_con_estadisticas(
+        productos, 150, CATEGORIAS, rng=random.Random(2)
+    )
+    costo = temple.calcular_costo(lista, 150, CATEGORIAS, productos)
+    print(f"\nTemperaturas: {estadisticas['temperaturas']}")
+    print(f"Tasas de intercambio: {[round(t, 2) for t in estadisticas['tasas']]}")
+    print(f"Costo: {costo:.3f}")
+
+    assert estadisticas['temperaturas'][0] == 1.0 and estadisticas['temperaturas'][-1] == 1000.0
+    assert len(estadisticas['intentos']) == len(estadisticas['aceptados']) == 4
+    assert sum(estadisticas['intentos']) == 1000 // 50 * 2
+    assert all(0 <= a <= n for a, n in zip(estadisticas['aceptados'], estadisticas['intentos']))
+    assert sum(estadisticas['aceptados']) > 0
+    assert abs(costo - estadisticas['mejor_costo']) < 1e-9
+    assert costo <= min(estadisticas['costos_finales'])
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+def test_replicas_en_procesos():
+    """Test 2: Con o sin procesos, la misma semilla da la misma lista y respeta topes."""
+    print("\n" + "="*80)
+    print("TEST 2: Réplicas en procesos")
+    print("="*80)
+
+    productos = generar_inventario('PAR', 3500, 15, 2)['productos']
+    indice = IndiceProductos(productos)
+    topes = {p['id']: 1 for p in productos[:500]}
+    topes.update({p['id']: 0 for p in indice.mas_importantes(20)})
+
+    listas, ejecutores = [], []
+    for procesos in (0, 2, 2):
+        temple = TempleParalelo(replicas=4, pasos_por_replica=500, procesos=procesos)
+        lista = temple.optimizar(productos, 200, CATEGORIAS, topes, indice, random.Random(8))
+        costo = temple.calcular_costo(lista, 200, CATEGORIAS, productos)
+        print(f"\nprocesos={procesos}: costo {costo:.3f} | {len(lista)} entradas")
+        cantidades = {}
+        for producto, cantidad in lista:
+            cantidades[producto['id']] = cantidades.get(producto['id'], 0) + cantidad
+        assert all(c <= topes.get(pid, c) for pid, c in cantidades.items())
+        listas.append([(p['id'], c) for p, c in lista])
+        if procesos:
+            ejecutores.append(trabajadores._ejecutores[procesos])
+
+    # La segunda ejecución en procesos reutiliza el mismo conjunto de trabajadores
+    assert ejecutores[0] is ejecutores[1]
+    assert listas[0] == listas[1] == listas[2]
+    print("\n✅ Test completado exitosamente")
+    print("="*80)
+
+
+if __name__ == '__main__':
+    print("\n🧪 EJECUTANDO SUITE DE PRUEBAS DEL TEMPLE PARALELO")
+    print("="*80)
+
+    try:
+        test_estadisticas_intercambio()
+        test_replicas_en_procesos()
+
+        print("\n✅ TODAS LAS PRUEBAS COMPLETADAS EXITOSAMENTE")
+        print("="*80 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ ERROR EN LAS PRUEBAS: {e}")
+        import traceback
+        traceback.print_exc()
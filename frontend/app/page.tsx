@@ -8,25 +8,53 @@ import Link from "next/link"
 interface Sucursal {
   sucursal_id: string
   nombre: string
-  productos_disponibles: number
+  productos_disponibles: number | null
+  // "activo" cuando el agente está listo; "pendiente", "cargando" o "error" mientras no
   estado: string
 }
 
+const ETIQUETAS_ESTADO: Record<string, string> = {
+  activo: "Activo",
+  pendiente: "Pendiente",
+  cargando: "Cargando",
+  error: "Error",
+}
+
 export default function HomePage() {
   const [sucursales, setSucursales] = useState<Sucursal[]>([])
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
-    fetch("http://localhost:5000/api/sucursales")
-      .then((res) => res.json())
-      .then((data) => {
-        setSucursales(data.sucursales || [])
-        setLoading(false)
-      })
-      .catch((error) => {
-        console.error("[v0] Error fetching sucursales:", error)
-        setLoading(false)
-      })
+    let montado = true
+    let temporizador: ReturnType<typeof setTimeout> | undefined
+    const cargar = () =>
+      Promise.all([
+        fetch("http://localhost:5000/api/sucursales").then((res) => res.json()),
+        // 200 cuando la precarga terminó; 503 mientras queden sucursales en cola
+        fetch("http://localhost:5000/api/listo").then((res) => res.ok),
+      ])
+        .then(([data, listo]) => {
+          // Una consulta que termina después de desmontar no programa otra
+          if (!montado) return
+          const lista: Sucursal[] = data.sucursales || []
+          setSucursales(lista)
+          setLoading(false)
+          // Se vuelve a consultar mientras alguna se construye o espera en la cola de precarga
+          const cargando = lista.some((sucursal) => sucursal.estado === "cargando")
+          const enCola = !listo && lista.some((sucursal) => sucursal.estado === "pendiente")
+          if (cargando || enCola) {
+            temporizador = setTimeout(cargar, 2000)
+          }
+        })
+        .catch((error) => {
+          console.error("[v0] Error fetching sucursales:", error)
+          if (montado) setLoading(false)
+        })
+    cargar()
+    return () => {
+      montado = false
+      clearTimeout(temporizador)
+    }
   }, [])
 
   return (
@@ -91,7 +119,7 @@ export default function HomePage() {
                                 : "bg-muted text-muted-foreground border border-border"
                             }`}
                           >
-                            {sucursal.estado === "activo" ? "Activo" : "Inactivo"}
+                            {ETIQUETAS_ESTADO[sucursal.estado] ?? "Inactivo"}
                           </div>
                         </div>
 
@@ -99,7 +127,13 @@ export default function HomePage() {
 
                         <div className="flex items-center gap-2 text-muted-foreground">
                           <ShoppingCart className="w-4 h-4" />
-                          <span className="text-sm">{sucursal.productos_disponibles} productos disponibles</span>
+                          <span className="text-sm">
+                            {sucursal.productos_disponibles !== null
+                              ? `${sucursal.productos_disponibles} productos disponibles`
+                              : sucursal.estado === "cargando"
+                                ? "Cargando inventario..."
+                                : "Inventario se carga al ingresar"}
+                          </span>
                         </div>
 
                         <div className="mt-6 flex items-center text-primary font-medium group-hover:gap-2 transition-all">